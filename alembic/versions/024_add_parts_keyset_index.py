@@ -0,0 +1,32 @@
+"""Add composite index for keyset pagination of parts
+
+Revision ID: 024
+Revises: 023
+Create Date: 2026-10-16 09:00:00.000000
+
+"""
+from collections.abc import Sequence
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "024"
+down_revision: str | None = "023"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+
+def upgrade() -> None:
+    """Upgrade database schema."""
+    # The parts listing orders by (created_at DESC, id DESC) and seeks past the
+    # last row of the previous page; a backward scan of this index serves both
+    op.create_index(
+        "ix_parts_created_at_id",
+        "parts",
+        ["created_at", "id"],
+    )
+
+
+def downgrade() -> None:
+    """Downgrade database schema."""
+    op.drop_index("ix_parts_created_at_id", table_name="parts")
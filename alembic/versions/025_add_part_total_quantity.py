@@ -0,0 +1,44 @@
+"""Add denormalized total_quantity column to parts
+
+Revision ID: 025
+Revises: 024
+Create Date: 2026-10-16 10:00:00.000000
+
+"""
+from collections.abc import Sequence
+
+import sqlalchemy as sa
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "025"
+down_revision: str | None = "024"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+
+def upgrade() -> None:
+    """Add parts.total_quantity and backfill it from part_locations."""
+    op.add_column(
+        "parts",
+        sa.Column("total_quantity", sa.Integer(), nullable=False, server_default="0"),
+    )
+
+    op.execute(
+        sa.text(
+            "UPDATE parts SET total_quantity = totals.qty "
+            "FROM ("
+            "   SELECT part_id, SUM(qty) AS qty FROM part_locations GROUP BY part_id"
+            ") AS totals "
+            "WHERE totals.part_id = parts.id"
+        )
+    )
+
+    op.create_index("ix_parts_total_quantity", "parts", ["total_quantity"])
+
+
+def downgrade() -> None:
+    """Drop parts.total_quantity."""
+    op.drop_index("ix_parts_total_quantity", table_name="parts")
+    op.drop_column("parts", "total_quantity")
@@ -0,0 +1,59 @@
+"""Add generated full-text search vector to parts
+
+Revision ID: 026
+Revises: 025
+Create Date: 2026-10-16 11:00:00.000000
+
+"""
+from collections.abc import Sequence
+
+import sqlalchemy as sa
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "026"
+down_revision: str | None = "025"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+
+def upgrade() -> None:
+    """Add parts.search_vector with a GIN index."""
+    # array_to_string() is only STABLE, which generated columns reject; the
+    # wrapper is safe to declare IMMUTABLE because tags is a plain text[]
+    op.execute(
+        sa.text(
+            "CREATE FUNCTION parts_tags_to_text(tags text[]) RETURNS text "
+            "LANGUAGE sql IMMUTABLE PARALLEL SAFE "
+            "AS $$ SELECT array_to_string(tags, ' ') $$"
+        )
+    )
+
+    # Codes and names are weighted above free text so an exact part number
+    # ranks first; the two-argument to_tsvector() form is IMMUTABLE
+    op.execute(
+        sa.text(
+            "ALTER TABLE parts ADD COLUMN search_vector tsvector "
+            "GENERATED ALWAYS AS ("
+            "   setweight(to_tsvector('english', coalesce(manufacturer_code, '')), 'A') || "
+            "   setweight(to_tsvector('english', coalesce(manufacturer, '') || ' ' || coalesce(series, '')), 'B') || "
+            "   setweight(to_tsvector('english', coalesce(description, '')), 'C') || "
+            "   setweight(to_tsvector('english', coalesce(parts_tags_to_text(tags), '')), 'C')"
+            ") STORED"
+        )
+    )
+
+    op.create_index(
+        "ix_parts_search_vector",
+        "parts",
+        ["search_vector"],
+        postgresql_using="gin",
+    )
+
+
+def downgrade() -> None:
+    """Drop parts.search_vector and its helper function."""
+    op.drop_index("ix_parts_search_vector", table_name="parts")
+    op.drop_column("parts", "search_vector")
+    op.execute(sa.text("DROP FUNCTION parts_tags_to_text(text[])"))
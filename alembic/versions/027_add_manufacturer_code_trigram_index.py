@@ -0,0 +1,54 @@
+"""Add normalized manufacturer code with trigram index
+
+Revision ID: 027
+Revises: 026
+Create Date: 2026-10-16 12:00:00.000000
+
+"""
+from collections.abc import Sequence
+
+import sqlalchemy as sa
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "027"
+down_revision: str | None = "026"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+
+def upgrade() -> None:
+    """Add parts.manufacturer_code_normalized with a pg_trgm GIN index."""
+    op.execute(sa.text("CREATE EXTENSION IF NOT EXISTS pg_trgm"))
+
+    op.add_column(
+        "parts",
+        sa.Column("manufacturer_code_normalized", sa.String(255), nullable=True),
+    )
+
+    # Must match app.utils.manufacturer_code.normalize_manufacturer_code()
+    op.execute(
+        sa.text(
+            "UPDATE parts SET manufacturer_code_normalized = "
+            "NULLIF(upper(regexp_replace(manufacturer_code, '[^A-Za-z0-9]', '', 'g')), '') "
+            "WHERE manufacturer_code IS NOT NULL"
+        )
+    )
+
+    op.create_index(
+        "ix_parts_manufacturer_code_normalized_trgm",
+        "parts",
+        ["manufacturer_code_normalized"],
+        postgresql_using="gin",
+        postgresql_ops={"manufacturer_code_normalized": "gin_trgm_ops"},
+    )
+
+
+def downgrade() -> None:
+    """Drop parts.manufacturer_code_normalized.
+
+    The pg_trgm extension is left installed since other objects may use it.
+    """
+    op.drop_index("ix_parts_manufacturer_code_normalized_trgm", table_name="parts")
+    op.drop_column("parts", "manufacturer_code_normalized")
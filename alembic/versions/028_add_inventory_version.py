@@ -0,0 +1,35 @@
+"""Add global inventory version counter
+
+Revision ID: 028
+Revises: 027
+Create Date: 2026-10-16 13:00:00.000000
+
+"""
+from collections.abc import Sequence
+
+import sqlalchemy as sa
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "028"
+down_revision: str | None = "027"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+
+def upgrade() -> None:
+    """Create the single-row inventory_version table."""
+    op.create_table(
+        "inventory_version",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("version", sa.BigInteger(), nullable=False, server_default="0"),
+        sa.PrimaryKeyConstraint("id"),
+    )
+
+    op.execute(sa.text("INSERT INTO inventory_version (id, version) VALUES (1, 0)"))
+
+
+def downgrade() -> None:
+    """Drop the inventory_version table."""
+    op.drop_table("inventory_version")
@@ -0,0 +1,26 @@
+"""Add GIN index on parts.tags for faceted search
+
+Revision ID: 029
+Revises: 028
+Create Date: 2026-10-16 14:00:00.000000
+
+"""
+from collections.abc import Sequence
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "029"
+down_revision: str | None = "028"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+
+def upgrade() -> None:
+    """Index parts.tags for array containment (@>) filters."""
+    op.create_index("ix_parts_tags", "parts", ["tags"], postgresql_using="gin")
+
+
+def downgrade() -> None:
+    """Drop the parts.tags index."""
+    op.drop_index("ix_parts_tags", table_name="parts")
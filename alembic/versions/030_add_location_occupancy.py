@@ -0,0 +1,46 @@
+"""Add location occupancy flag and free-slot index
+
+Revision ID: 030
+Revises: 029
+Create Date: 2026-10-16 15:00:00.000000
+
+"""
+from collections.abc import Sequence
+
+import sqlalchemy as sa
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "030"
+down_revision: str | None = "029"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+
+def upgrade() -> None:
+    """Add locations.is_occupied, backfill it and index the free locations."""
+    op.add_column(
+        "locations",
+        sa.Column("is_occupied", sa.Boolean(), nullable=False, server_default=sa.false()),
+    )
+    op.create_index("ix_part_locations_location_id", "part_locations", ["location_id"])
+
+    op.execute(sa.text(
+        "UPDATE locations SET is_occupied = EXISTS ("
+        "SELECT 1 FROM part_locations WHERE part_locations.location_id = locations.id)"
+    ))
+
+    op.create_index(
+        "ix_locations_free",
+        "locations",
+        ["box_no", "loc_no"],
+        postgresql_where=sa.text("NOT is_occupied"),
+    )
+
+
+def downgrade() -> None:
+    """Drop the free-slot index and the occupancy flag."""
+    op.drop_index("ix_locations_free", table_name="locations")
+    op.drop_index("ix_part_locations_location_id", table_name="part_locations")
+    op.drop_column("locations", "is_occupied")
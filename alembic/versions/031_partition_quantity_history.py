@@ -0,0 +1,161 @@
+"""Partition quantity_history by month and add daily rollups
+
+Revision ID: 031
+Revises: 030
+Create Date: 2026-10-17 09:00:00.000000
+
+"""
+from collections.abc import Sequence
+from datetime import date, timedelta
+
+import sqlalchemy as sa
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "031"
+down_revision: str | None = "030"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+# Monthly partitions created beyond the current month; the
+# compact-quantity-history command keeps creating them from then on
+MONTHS_AHEAD = 3
+
+COLUMNS = 'id, part_id, delta_qty, location_reference, "timestamp"'
+
+
+def _next_month(month: date) -> date:
+    return (month + timedelta(days=32)).replace(day=1)
+
+
+def upgrade() -> None:
+    """Rebuild quantity_history as a monthly range-partitioned table with rollups."""
+    # A foreign key needs a unique constraint on id alone, which a partitioned
+    # table cannot have; the retention job clears references it would break
+    op.drop_constraint(
+        "kit_pick_list_lines_inventory_change_id_fkey",
+        "kit_pick_list_lines",
+        type_="foreignkey",
+    )
+
+    op.execute(sa.text("ALTER TABLE quantity_history RENAME TO quantity_history_unpartitioned"))
+    op.execute(sa.text(
+        "ALTER TABLE quantity_history_unpartitioned "
+        "RENAME CONSTRAINT quantity_history_pkey TO quantity_history_unpartitioned_pkey"
+    ))
+    op.execute(sa.text("DROP INDEX IF EXISTS idx_quantity_history_timestamp_part_id"))
+    op.execute(sa.text("DROP INDEX IF EXISTS ix_quantity_history_part_id"))
+    op.execute(sa.text("DROP INDEX IF EXISTS ix_quantity_history_timestamp"))
+
+    # The primary key of a partitioned table must include the partition key;
+    # ids stay unique because they keep coming from the same sequence
+    op.execute(sa.text(
+        "CREATE TABLE quantity_history ("
+        "   id integer NOT NULL DEFAULT nextval('quantity_history_id_seq'::regclass),"
+        "   part_id integer NOT NULL REFERENCES parts (id),"
+        "   delta_qty integer NOT NULL,"
+        "   location_reference varchar(20),"
+        '   "timestamp" timestamp without time zone NOT NULL DEFAULT now(),'
+        '   CONSTRAINT quantity_history_pkey PRIMARY KEY (id, "timestamp")'
+        ') PARTITION BY RANGE ("timestamp")'
+    ))
+    op.execute(sa.text("ALTER SEQUENCE quantity_history_id_seq OWNED BY quantity_history.id"))
+    op.execute(sa.text("CREATE TABLE quantity_history_default PARTITION OF quantity_history DEFAULT"))
+
+    bind = op.get_bind()
+    oldest, today = bind.execute(sa.text(
+        'SELECT min("timestamp")::date, current_date FROM quantity_history_unpartitioned'
+    )).one()
+    month = (oldest or today).replace(day=1)
+    last_month = today.replace(day=1)
+    for _ in range(MONTHS_AHEAD):
+        last_month = _next_month(last_month)
+    while month <= last_month:
+        upper = _next_month(month)
+        op.execute(sa.text(
+            f"CREATE TABLE quantity_history_p{month:%Y%m} PARTITION OF quantity_history "
+            f"FOR VALUES FROM ('{month.isoformat()}') TO ('{upper.isoformat()}')"
+        ))
+        month = upper
+
+    op.execute(sa.text(
+        f"INSERT INTO quantity_history ({COLUMNS}) "
+        f"SELECT {COLUMNS} FROM quantity_history_unpartitioned"
+    ))
+    op.execute(sa.text("DROP TABLE quantity_history_unpartitioned"))
+
+    # Indexes on the parent cascade to every partition
+    op.create_index(
+        "ix_quantity_history_part_id_timestamp",
+        "quantity_history",
+        ["part_id", sa.text('"timestamp" DESC')],
+    )
+    op.create_index(
+        "idx_quantity_history_timestamp_part_id",
+        "quantity_history",
+        ["timestamp", "part_id"],
+    )
+
+    op.create_table(
+        "quantity_history_daily",
+        sa.Column("part_id", sa.Integer(), sa.ForeignKey("parts.id", ondelete="CASCADE"), nullable=False),
+        sa.Column("day", sa.Date(), nullable=False),
+        sa.Column("change_count", sa.Integer(), nullable=False),
+        sa.Column("qty_added", sa.Integer(), nullable=False),
+        sa.Column("qty_removed", sa.Integer(), nullable=False),
+        sa.PrimaryKeyConstraint("part_id", "day"),
+    )
+    op.create_index("ix_quantity_history_daily_day", "quantity_history_daily", ["day"])
+    op.execute(sa.text(
+        "INSERT INTO quantity_history_daily (part_id, day, change_count, qty_added, qty_removed) "
+        'SELECT part_id, "timestamp"::date, count(*), '
+        "   sum(greatest(delta_qty, 0)), sum(greatest(-delta_qty, 0)) "
+        'FROM quantity_history GROUP BY part_id, "timestamp"::date'
+    ))
+
+
+def downgrade() -> None:
+    """Rebuild quantity_history as a plain table and drop the rollups."""
+    op.drop_index("ix_quantity_history_daily_day", table_name="quantity_history_daily")
+    op.drop_table("quantity_history_daily")
+
+    op.execute(sa.text(
+        "CREATE TABLE quantity_history_unpartitioned ("
+        "   id integer NOT NULL DEFAULT nextval('quantity_history_id_seq'::regclass),"
+        "   part_id integer NOT NULL REFERENCES parts (id),"
+        "   delta_qty integer NOT NULL,"
+        "   location_reference varchar(20),"
+        '   "timestamp" timestamp without time zone NOT NULL DEFAULT now(),'
+        "   CONSTRAINT quantity_history_unpartitioned_pkey PRIMARY KEY (id)"
+        ")"
+    ))
+    op.execute(sa.text(
+        f"INSERT INTO quantity_history_unpartitioned ({COLUMNS}) "
+        f"SELECT {COLUMNS} FROM quantity_history"
+    ))
+    op.execute(sa.text("ALTER SEQUENCE quantity_history_id_seq OWNED BY quantity_history_unpartitioned.id"))
+    op.execute(sa.text("DROP TABLE quantity_history"))
+    op.execute(sa.text("ALTER TABLE quantity_history_unpartitioned RENAME TO quantity_history"))
+    op.execute(sa.text(
+        "ALTER TABLE quantity_history "
+        "RENAME CONSTRAINT quantity_history_unpartitioned_pkey TO quantity_history_pkey"
+    ))
+    op.create_index(
+        "idx_quantity_history_timestamp_part_id",
+        "quantity_history",
+        ["timestamp", "part_id"],
+    )
+
+    op.execute(sa.text(
+        "UPDATE kit_pick_list_lines SET inventory_change_id = NULL "
+        "WHERE inventory_change_id NOT IN (SELECT id FROM quantity_history)"
+    ))
+    op.create_foreign_key(
+        "kit_pick_list_lines_inventory_change_id_fkey",
+        "kit_pick_list_lines",
+        "quantity_history",
+        ["inventory_change_id"],
+        ["id"],
+        ondelete="SET NULL",
+    )
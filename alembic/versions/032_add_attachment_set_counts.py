@@ -0,0 +1,44 @@
+"""Add attachment count to attachment sets
+
+Revision ID: 032
+Revises: 031
+Create Date: 2026-10-17 12:00:00.000000
+
+"""
+from collections.abc import Sequence
+
+import sqlalchemy as sa
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "032"
+down_revision: str | None = "031"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+
+def upgrade() -> None:
+    """Add attachment_sets.attachment_count, backfill it and index the empty sets."""
+    op.add_column(
+        "attachment_sets",
+        sa.Column("attachment_count", sa.Integer(), nullable=False, server_default="0"),
+    )
+
+    op.execute(sa.text(
+        "UPDATE attachment_sets SET attachment_count = ("
+        "SELECT count(*) FROM attachments WHERE attachments.attachment_set_id = attachment_sets.id)"
+    ))
+
+    op.create_index(
+        "ix_attachment_sets_empty",
+        "attachment_sets",
+        ["id"],
+        postgresql_where=sa.text("attachment_count = 0"),
+    )
+
+
+def downgrade() -> None:
+    """Drop the empty-set index and the attachment count."""
+    op.drop_index("ix_attachment_sets_empty", table_name="attachment_sets")
+    op.drop_column("attachment_sets", "attachment_count")
@@ -0,0 +1,36 @@
+"""Add occupied location counter to boxes
+
+Revision ID: 033
+Revises: 032
+Create Date: 2026-10-17 15:00:00.000000
+
+"""
+from collections.abc import Sequence
+
+import sqlalchemy as sa
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "033"
+down_revision: str | None = "032"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+
+def upgrade() -> None:
+    """Add boxes.occupied_locations and backfill it from the location flags."""
+    op.add_column(
+        "boxes",
+        sa.Column("occupied_locations", sa.Integer(), nullable=False, server_default="0"),
+    )
+
+    op.execute(sa.text(
+        "UPDATE boxes SET occupied_locations = ("
+        "SELECT count(*) FROM locations WHERE locations.box_no = boxes.box_no AND locations.is_occupied)"
+    ))
+
+
+def downgrade() -> None:
+    """Drop the occupied location counter."""
+    op.drop_column("boxes", "occupied_locations")
@@ -41,8 +41,17 @@ def create_app(settings: "Settings | None" = None, app_settings: "AppSettings |
     # Import models to register them with SQLAlchemy
     from app import models
 
-    # Import empty string normalization to register event handlers
-    from app.utils import empty_string_normalization
+    # Import empty string normalization, attachment counts, part total
+    # quantity, location occupancy, quantity history rollups and inventory
+    # version tracking to register their event handlers
+    from app.utils import (
+        attachment_count,
+        empty_string_normalization,
+        inventory_version_tracking,
+        location_occupancy,
+        part_total_quantity,
+        quantity_history_rollup,
+    )
 
     # Initialize SessionLocal for per-request sessions
     # This needs to be done in app context since db.engine requires it
@@ -86,7 +95,9 @@ def create_app(settings: "Settings | None" = None, app_settings: "AppSettings |
     app.container = container
 
     # Configure CORS
-    CORS(app, origins=settings.cors_origins)
+    # Cursor pagination and ETags are carried in response headers that the
+    # browser hides from cross-origin scripts unless they are exposed
+    CORS(app, origins=settings.cors_origins, expose_headers=["X-Next-Cursor", "ETag"])
 
     # Initialize correlation ID tracking
     from app.utils import _init_request_id
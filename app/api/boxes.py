@@ -7,8 +7,11 @@ from flask import Blueprint, request
 from spectree import Response as SpectreeResponse
 
 from app.schemas.box import (
+    BoxBulkCreateResponseSchema,
+    BoxBulkCreateSchema,
     BoxCreateSchema,
     BoxListSchema,
+    BoxMapSchema,
     BoxResponseSchema,
     BoxUpdateSchema,
     BoxUsageStatsSchema,
@@ -22,10 +25,31 @@ from app.schemas.location import (
 )
 from app.services.box_service import BoxService
 from app.services.container import ServiceContainer
+from app.utils.etag import inventory_etag
+from app.utils.list_serialization import RowEncoder, list_json_response
 from app.utils.spectree_config import api
 
 boxes_bp = Blueprint("boxes", __name__, url_prefix="/boxes")
 
+# Fast-path encoders for the location grid
+_LOCATION_ENCODER = RowEncoder.for_schema(LocationResponseSchema)
+_PART_ASSIGNMENT_ENCODER = RowEncoder.for_schema(PartAssignmentSchema)
+_LOCATION_WITH_PARTS_ENCODER = RowEncoder.for_schema(
+    LocationWithPartResponseSchema,
+    overrides={
+        # Empty locations report None rather than an empty list
+        "part_assignments": lambda location: (
+            _PART_ASSIGNMENT_ENCODER.encode_many(location.part_assignments)
+            if location.part_assignments
+            else None
+        ),
+    },
+)
+_BOX_MAP_ENCODER = RowEncoder.for_schema(
+    BoxMapSchema,
+    overrides={"locations": lambda box: _LOCATION_WITH_PARTS_ENCODER.encode_many(box.locations)},
+)
+
 
 @boxes_bp.route("", methods=["POST"])
 @api.validate(json=BoxCreateSchema, resp=SpectreeResponse(HTTP_201=BoxResponseSchema, HTTP_400=ErrorResponseSchema))
@@ -38,7 +62,19 @@ def create_box(box_service: BoxService = Provide[ServiceContainer.box_service])
     return BoxResponseSchema.model_validate(box).model_dump(), 201
 
 
+@boxes_bp.route("/bulk", methods=["POST"])
+@api.validate(json=BoxBulkCreateSchema, resp=SpectreeResponse(HTTP_201=BoxBulkCreateResponseSchema, HTTP_400=ErrorResponseSchema))
+@inject
+def create_boxes_bulk(box_service: BoxService = Provide[ServiceContainer.box_service]) -> Any:
+    """Create several boxes with their locations in a single transaction."""
+    data = BoxBulkCreateSchema.model_validate(request.get_json())
+    boxes = box_service.create_boxes([(box_data.description, box_data.capacity) for box_data in data.boxes])
+
+    return BoxBulkCreateResponseSchema(box_nos=[box.box_no for box in boxes]).model_dump(), 201
+
+
 @boxes_bp.route("", methods=["GET"])
+@inventory_etag()
 @api.validate(resp=SpectreeResponse(HTTP_200=list[BoxWithUsageSchema]))
 @inject
 def list_boxes(box_service: BoxService = Provide[ServiceContainer.box_service]) -> Any:
@@ -70,6 +106,16 @@ def list_boxes(box_service: BoxService = Provide[ServiceContainer.box_service])
         return [BoxListSchema.model_validate(box).model_dump() for box in boxes]
 
 
+@boxes_bp.route("/map", methods=["GET"])
+@inventory_etag()
+# Sampled validation in list_json_response
+@api.validate(resp=SpectreeResponse(HTTP_200=list[BoxMapSchema]), skip_validation=True)
+@inject
+def get_box_map(box_service: BoxService = Provide[ServiceContainer.box_service]) -> Any:
+    """Get every box with its location grid, for full-warehouse views."""
+    return list_json_response(_BOX_MAP_ENCODER.encode_many(box_service.get_box_map()), BoxMapSchema)
+
+
 @boxes_bp.route("/<int:box_no>", methods=["GET"])
 @api.validate(resp=SpectreeResponse(HTTP_200=BoxResponseSchema, HTTP_404=ErrorResponseSchema))
 @inject
@@ -116,7 +162,8 @@ def get_box_usage(box_no: int, box_service: BoxService = Provide[ServiceContaine
 
 
 @boxes_bp.route("/<int:box_no>/locations", methods=["GET"])
-@api.validate(resp=SpectreeResponse(HTTP_200=list[LocationResponseSchema], HTTP_404=ErrorResponseSchema))
+# Sampled validation in list_json_response
+@api.validate(resp=SpectreeResponse(HTTP_200=list[LocationResponseSchema], HTTP_404=ErrorResponseSchema), skip_validation=True)
 @inject
 def get_box_locations(box_no: int, box_service: BoxService = Provide[ServiceContainer.box_service]) -> Any:
     """Get all locations in box.
@@ -129,32 +176,14 @@ def get_box_locations(box_no: int, box_service: BoxService = Provide[ServiceCont
     if include_parts:
         # Use enhanced service method with part data
         locations_with_parts = box_service.get_box_locations_with_parts(box_no)
-        result = []
-        for location_data in locations_with_parts:
-            # Convert PartAssignmentData to PartAssignmentSchema
-            part_assignments = [
-                PartAssignmentSchema(
-                    key=part.key,
-                    qty=part.qty,
-                    manufacturer_code=part.manufacturer_code,
-                    description=part.description,
-                    cover_url=part.cover_url,
-                )
-                for part in location_data.part_assignments
-            ]
-
-            location_response = LocationWithPartResponseSchema(
-                box_no=location_data.box_no,
-                loc_no=location_data.loc_no,
-                is_occupied=location_data.is_occupied,
-                part_assignments=part_assignments if part_assignments else None
-            )
-            result.append(location_response.model_dump())
-        return result
+        return list_json_response(
+            _LOCATION_WITH_PARTS_ENCODER.encode_many(locations_with_parts),
+            LocationWithPartResponseSchema,
+        )
     else:
         # Use existing logic for basic location data
         box = box_service.get_box(box_no)
-        return [
-            LocationResponseSchema.model_validate(location).model_dump()
-            for location in box.locations
-        ]
+        return list_json_response(
+            _LOCATION_ENCODER.encode_many(box.locations),
+            LocationResponseSchema,
+        )
@@ -17,12 +17,14 @@ from app.schemas.dashboard import (
 )
 from app.services.container import ServiceContainer
 from app.services.dashboard_service import DashboardService
+from app.utils.etag import inventory_etag
 from app.utils.spectree_config import api
 
 dashboard_bp = Blueprint("dashboard", __name__, url_prefix="/dashboard")
 
 
 @dashboard_bp.route("/stats", methods=["GET"])
+@inventory_etag(rollover_seconds=60)
 @api.validate(resp=SpectreeResponse(HTTP_200=DashboardStatsSchema, HTTP_500=ErrorResponseSchema))
 @inject
 def get_dashboard_stats(dashboard_service: DashboardService = Provide[ServiceContainer.dashboard_service]) -> Any:
@@ -37,6 +39,7 @@ def get_dashboard_stats(dashboard_service: DashboardService = Provide[ServiceCon
 
 
 @dashboard_bp.route("/recent-activity", methods=["GET"])
+@inventory_etag()
 @api.validate(resp=SpectreeResponse(HTTP_200=list[RecentActivitySchema], HTTP_500=ErrorResponseSchema))
 @inject
 def get_recent_activity(dashboard_service: DashboardService = Provide[ServiceContainer.dashboard_service]) -> Any:
@@ -67,6 +70,7 @@ def get_recent_activity(dashboard_service: DashboardService = Provide[ServiceCon
 
 
 @dashboard_bp.route("/storage-summary", methods=["GET"])
+@inventory_etag()
 @api.validate(resp=SpectreeResponse(HTTP_200=list[StorageSummarySchema], HTTP_500=ErrorResponseSchema))
 @inject
 def get_storage_summary(dashboard_service: DashboardService = Provide[ServiceContainer.dashboard_service]) -> Any:
@@ -82,6 +86,7 @@ def get_storage_summary(dashboard_service: DashboardService = Provide[ServiceCon
 
 
 @dashboard_bp.route("/low-stock", methods=["GET"])
+@inventory_etag()
 @api.validate(resp=SpectreeResponse(HTTP_200=list[LowStockItemSchema], HTTP_500=ErrorResponseSchema))
 @inject
 def get_low_stock_items(dashboard_service: DashboardService = Provide[ServiceContainer.dashboard_service]) -> Any:
@@ -112,6 +117,7 @@ def get_low_stock_items(dashboard_service: DashboardService = Provide[ServiceCon
 
 
 @dashboard_bp.route("/category-distribution", methods=["GET"])
+@inventory_etag()
 @api.validate(resp=SpectreeResponse(HTTP_200=list[CategoryDistributionSchema], HTTP_500=ErrorResponseSchema))
 @inject
 def get_category_distribution(dashboard_service: DashboardService = Provide[ServiceContainer.dashboard_service]) -> Any:
@@ -127,6 +133,7 @@ def get_category_distribution(dashboard_service: DashboardService = Provide[Serv
 
 
 @dashboard_bp.route("/parts-without-documents", methods=["GET"])
+@inventory_etag()
 @api.validate(resp=SpectreeResponse(HTTP_200=UndocumentedPartsSchema, HTTP_500=ErrorResponseSchema))
 @inject
 def get_parts_without_documents(dashboard_service: DashboardService = Provide[ServiceContainer.dashboard_service]) -> Any:
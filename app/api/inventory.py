@@ -9,14 +9,21 @@ from spectree import Response as SpectreeResponse
 from app.schemas.common import ErrorResponseSchema
 from app.schemas.inventory import (
     AddStockSchema,
+    LocationSuggestionQuerySchema,
     LocationSuggestionSchema,
     MoveStockSchema,
     RemoveStockSchema,
+    StockBatchResponseSchema,
+    StockBatchSchema,
+    SuggestedLocationSchema,
 )
 from app.schemas.part import PartLocationResponseSchema
+from app.schemas.reorganization import ReorganizationPlanRequestSchema
+from app.schemas.task_schema import TaskStartResponse
 from app.services.container import ServiceContainer
-from app.services.inventory_service import InventoryService
-from app.services.part_service import PartService
+from app.services.inventory_service import InventoryService, StockOperation
+from app.services.reorganization_plan_task import ReorganizationPlanTask
+from app.services.task_service import TaskService
 from app.utils.spectree_config import api
 
 inventory_bp = Blueprint("inventory", __name__, url_prefix="/inventory")
@@ -25,19 +32,17 @@ inventory_bp = Blueprint("inventory", __name__, url_prefix="/inventory")
 @inventory_bp.route("/parts/<string:part_key>/stock", methods=["POST"])
 @api.validate(json=AddStockSchema, resp=SpectreeResponse(HTTP_201=PartLocationResponseSchema, HTTP_400=ErrorResponseSchema, HTTP_404=ErrorResponseSchema))
 @inject
-def add_stock(part_key: str, part_service: PartService = Provide[ServiceContainer.part_service], inventory_service: InventoryService = Provide[ServiceContainer.inventory_service]) -> Any:
+def add_stock(part_key: str, inventory_service: InventoryService = Provide[ServiceContainer.inventory_service]) -> Any:
     """Add stock to a location."""
-    # Check if part exists (this will raise RecordNotFoundException if not found)
-    part = part_service.get_part(part_key)
-
     data = AddStockSchema.model_validate(request.get_json())
 
+    # Raises RecordNotFoundException if the part or location does not exist
     part_location = inventory_service.add_stock(
         part_key, data.box_no, data.loc_no, data.qty
     )
 
     return PartLocationResponseSchema(
-        key=part.key,
+        key=part_key,
         box_no=part_location.box_no,
         loc_no=part_location.loc_no,
         qty=part_location.qty
@@ -47,11 +52,8 @@ def add_stock(part_key: str, part_service: PartService = Provide[ServiceContaine
 @inventory_bp.route("/parts/<string:part_key>/stock", methods=["DELETE"])
 @api.validate(json=RemoveStockSchema, resp=SpectreeResponse(HTTP_204=None, HTTP_400=ErrorResponseSchema, HTTP_404=ErrorResponseSchema))
 @inject
-def remove_stock(part_key: str, part_service: PartService = Provide[ServiceContainer.part_service], inventory_service: InventoryService = Provide[ServiceContainer.inventory_service]) -> Any:
+def remove_stock(part_key: str, inventory_service: InventoryService = Provide[ServiceContainer.inventory_service]) -> Any:
     """Remove stock from a location."""
-    # Check if part exists (this will raise RecordNotFoundException if not found)
-    part_service.get_part(part_key)
-
     data = RemoveStockSchema.model_validate(request.get_json())
 
     inventory_service.remove_stock(
@@ -63,11 +65,8 @@ def remove_stock(part_key: str, part_service: PartService = Provide[ServiceConta
 @inventory_bp.route("/parts/<string:part_key>/move", methods=["POST"])
 @api.validate(json=MoveStockSchema, resp=SpectreeResponse(HTTP_204=None, HTTP_400=ErrorResponseSchema, HTTP_404=ErrorResponseSchema))
 @inject
-def move_stock(part_key: str, part_service: PartService = Provide[ServiceContainer.part_service], inventory_service: InventoryService = Provide[ServiceContainer.inventory_service]) -> Any:
+def move_stock(part_key: str, inventory_service: InventoryService = Provide[ServiceContainer.inventory_service]) -> Any:
     """Move stock between locations."""
-    # Check if part exists (this will raise RecordNotFoundException if not found)
-    part_service.get_part(part_key)
-
     data = MoveStockSchema.model_validate(request.get_json())
 
     inventory_service.move_stock(
@@ -81,10 +80,71 @@ def move_stock(part_key: str, part_service: PartService = Provide[ServiceContain
     return "", 204
 
 
+@inventory_bp.route("/batch", methods=["POST"])
+@api.validate(json=StockBatchSchema, resp=SpectreeResponse(HTTP_200=StockBatchResponseSchema, HTTP_400=ErrorResponseSchema, HTTP_404=ErrorResponseSchema, HTTP_409=ErrorResponseSchema))
+@inject
+def apply_stock_batch(inventory_service: InventoryService = Provide[ServiceContainer.inventory_service]) -> Any:
+    """Apply several add, remove and move operations in one transaction.
+
+    Operations run in order; if any of them fails, none are applied.
+    """
+    data = StockBatchSchema.model_validate(request.get_json())
+
+    levels = inventory_service.apply_stock_batch([
+        StockOperation(
+            op=operation.op.value,
+            part_key=operation.part_key,
+            box_no=operation.box_no,
+            loc_no=operation.loc_no,
+            qty=operation.qty,
+            to_box_no=operation.to_box_no,
+            to_loc_no=operation.to_loc_no,
+        )
+        for operation in data.operations
+    ])
+
+    return StockBatchResponseSchema(
+        locations=[
+            PartLocationResponseSchema(key=level.part_key, box_no=level.box_no, loc_no=level.loc_no, qty=level.qty)
+            for level in levels
+        ]
+    ).model_dump()
+
+
 @inventory_bp.route("/suggestions/<int:type_id>", methods=["GET"])
-@api.validate(resp=SpectreeResponse(HTTP_200=LocationSuggestionSchema, HTTP_404=ErrorResponseSchema))
+@api.validate(query=LocationSuggestionQuerySchema, resp=SpectreeResponse(HTTP_200=LocationSuggestionSchema, HTTP_400=ErrorResponseSchema, HTTP_404=ErrorResponseSchema))
 @inject
 def get_location_suggestion(type_id: int, inventory_service: InventoryService = Provide[ServiceContainer.inventory_service]) -> Any:
-    """Get location suggestions for part type."""
-    box_no, loc_no = inventory_service.suggest_location(type_id)
-    return LocationSuggestionSchema(box_no=box_no, loc_no=loc_no).model_dump()
+    """Get location suggestions for part type.
+
+    Boxes already holding parts of the type are preferred; ``count`` asks for
+    several free locations at once.
+    """
+    query = LocationSuggestionQuerySchema.model_validate(request.args.to_dict())
+    suggestions = inventory_service.suggest_locations(type_id, query.count)
+    box_no, loc_no = suggestions[0]
+    return LocationSuggestionSchema(
+        box_no=box_no,
+        loc_no=loc_no,
+        locations=[SuggestedLocationSchema(box_no=box, loc_no=loc) for box, loc in suggestions],
+    ).model_dump()
+
+
+@inventory_bp.route("/reorganization-plan", methods=["POST"])
+@api.validate(json=ReorganizationPlanRequestSchema, resp=SpectreeResponse(HTTP_201=TaskStartResponse, HTTP_400=ErrorResponseSchema))
+@inject
+def start_reorganization_plan(
+    task_service: TaskService = Provide[ServiceContainer.task_service],
+    container: ServiceContainer = Provide[ServiceContainer],
+) -> Any:
+    """Start computing a storage reorganization plan.
+
+    Returns the task ID; progress and the resulting plan are delivered over
+    SSE like other background tasks.
+    """
+    data = ReorganizationPlanRequestSchema.model_validate(request.get_json())
+
+    task = ReorganizationPlanTask(container=container)
+    task_start_response = task_service.start_task(task=task, sparse_threshold=data.sparse_threshold)
+
+    return task_start_response.model_dump(), 201
@@ -13,6 +13,7 @@ from app.exceptions import RecordNotFoundException
 from app.models.kit import KitStatus
 from app.schemas.common import ErrorResponseSchema
 from app.schemas.kit import (
+    KitAvailabilitySchema,
     KitContentCreateSchema,
     KitContentDetailSchema,
     KitContentUpdateSchema,
@@ -27,6 +28,7 @@ from app.schemas.kit import (
     KitShoppingListMembershipQueryItemSchema,
     KitShoppingListMembershipQueryResponseSchema,
     KitShoppingListRequestSchema,
+    KitShortfallPartSchema,
     KitSummarySchema,
     KitUpdateSchema,
 )
@@ -40,6 +42,8 @@ from app.services.kit_pick_list_service import KitPickListService
 from app.services.kit_service import KitService
 from app.services.kit_shopping_list_service import KitShoppingListService
 from app.utils.auth import safe_query
+from app.utils.etag import inventory_etag
+from app.utils.list_serialization import RowEncoder, list_json_response, validate_query
 from app.utils.spectree_config import api
 
 kits_bp = Blueprint("kits", __name__, url_prefix="/kits")
@@ -54,6 +58,27 @@ def _ensure_badge_attributes(kit: Any) -> None:
         kit.pick_list_badge_count = 0
 
 
+_KIT_SUMMARY_ENCODER = RowEncoder.for_schema(
+    KitSummarySchema,
+    overrides={
+        # Badge counts are attached by the service and may be missing
+        "shopping_list_badge_count": lambda kit: getattr(kit, "shopping_list_badge_count", 0) or 0,
+        "pick_list_badge_count": lambda kit: getattr(kit, "pick_list_badge_count", 0) or 0,
+        "is_archived": lambda kit: kit.status == KitStatus.ARCHIVED,
+    },
+)
+
+_KIT_SHORTFALL_PART_ENCODER = RowEncoder.for_schema(KitShortfallPartSchema)
+_KIT_AVAILABILITY_ENCODER = RowEncoder.for_schema(
+    KitAvailabilitySchema,
+    overrides={
+        "shortfall_parts": lambda availability: _KIT_SHORTFALL_PART_ENCODER.encode_many(
+            availability.shortfall_parts
+        ),
+    },
+)
+
+
 def _fetch_content_detail(kit_service: KitService, kit_id: int, content_id: int) -> tuple[Any, Any]:
     """Return kit detail payload alongside a specific content row."""
     kit = kit_service.get_kit_detail(kit_id)
@@ -67,30 +92,48 @@ def _fetch_content_detail(kit_service: KitService, kit_id: int, content_id: int)
 
 
 @kits_bp.route("", methods=["GET"])
+@inventory_etag()
 @api.validate(
     query=KitListQuerySchema,
     resp=SpectreeResponse(
         HTTP_200=list[KitSummarySchema],
         HTTP_400=ErrorResponseSchema,
     ),
+    # Sampled validation in list_json_response
+    skip_validation=True,
 )
 @inject
 def list_kits(
     kit_service: KitService = Provide[ServiceContainer.kit_service],
 ) -> Any:
     """List kits filtered by status and optional text query."""
-    query_params = KitListQuerySchema.model_validate(request.args.to_dict())
+    query_params = validate_query(KitListQuerySchema)
     status = KitStatus(query_params.status.value)
     kits = kit_service.list_kits(
         status=status,
         query=query_params.query,
         limit=query_params.limit,
     )
-    results = []
-    for kit in kits:
-        _ensure_badge_attributes(kit)
-        results.append(KitSummarySchema.model_validate(kit).model_dump())
-    return results
+    return list_json_response(_KIT_SUMMARY_ENCODER.encode_many(kits), KitSummarySchema)
+
+
+@kits_bp.route("/availability", methods=["GET"])
+@inventory_etag()
+@api.validate(
+    resp=SpectreeResponse(HTTP_200=list[KitAvailabilitySchema]),
+    # Sampled validation in list_json_response
+    skip_validation=True,
+)
+@inject
+def list_kit_availability(
+    kit_service: KitService = Provide[ServiceContainer.kit_service],
+) -> Any:
+    """List buildability, buildable units and shortfall parts of all active kits."""
+    availability = kit_service.get_active_kit_availability()
+    return list_json_response(
+        _KIT_AVAILABILITY_ENCODER.encode_many(availability),
+        KitAvailabilitySchema,
+    )
 
 
 @kits_bp.route("", methods=["POST"])
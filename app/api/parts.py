@@ -1,9 +1,15 @@
 """Parts management API endpoints."""
 
+import csv
+import io
+import json
+from collections.abc import Collection, Iterable, Iterator
+from datetime import datetime
+from operator import attrgetter
 from typing import Any
 
 from dependency_injector.wiring import Provide, inject
-from flask import Blueprint, request
+from flask import Blueprint, Response, request, stream_with_context
 from prometheus_client import Counter
 from spectree import Response as SpectreeResponse
 
@@ -14,14 +20,22 @@ from app.schemas.kit_reservations import (
     PartKitReservationsResponseSchema,
 )
 from app.schemas.part import (
+    PartBatchGetItemSchema,
+    PartBatchGetRequestSchema,
+    PartBatchGetResponseSchema,
+    PartBulkCreateResponseSchema,
+    PartBulkCreateSchema,
     PartCreateSchema,
+    PartFacetSearchResponseSchema,
     PartLocationListSchema,
     PartLocationResponseSchema,
     PartResponseSchema,
     PartUpdateSchema,
+    PartWithTotalModel,
     PartWithTotalSchema,
 )
 from app.schemas.part_kits import PartKitUsageSchema
+from app.schemas.part_seller import PartSellerLinkSchema
 from app.schemas.part_shopping_list import (
     PartShoppingListMembershipCreateSchema,
     PartShoppingListMembershipQueryItemSchema,
@@ -29,14 +43,26 @@ from app.schemas.part_shopping_list import (
     PartShoppingListMembershipQueryResponseSchema,
     PartShoppingListMembershipSchema,
 )
-from app.schemas.quantity_history import QuantityHistoryResponseSchema
+from app.schemas.quantity_history import (
+    QuantityHistoryBucketSchema,
+    QuantityHistoryResponseSchema,
+)
+from app.schemas.type import TypeResponseSchema
 from app.services.container import ServiceContainer
 from app.services.inventory_service import InventoryService
 from app.services.kit_reservation_service import KitReservationService
-from app.services.part_service import PartService
+from app.services.part_service import PartFacetFilters, PartService
+from app.services.quantity_history_service import (
+    HISTORY_BUCKETS,
+    QuantityHistoryService,
+)
 from app.services.shopping_list_line_service import ShoppingListLineService
 from app.services.shopping_list_service import ShoppingListService
 from app.utils.auth import safe_query
+from app.utils.cursor_pagination import decode_cursor, encode_cursor
+from app.utils.etag import inventory_etag
+from app.utils.list_serialization import RowEncoder, list_json_response
+from app.utils.request_parsing import parse_bool_query_param
 from app.utils.spectree_config import api
 
 # Part kit usage request metric
@@ -48,6 +74,9 @@ PART_KIT_USAGE_REQUESTS_TOTAL = Counter(
 
 parts_bp = Blueprint("parts", __name__, url_prefix="/parts")
 
+# Largest page a cursor-paginated listing or search may request
+MAX_PAGE_LIMIT = 500
+
 
 class IncludeParameterError(ValidationException):
     """Exception raised for invalid include parameter values."""
@@ -96,6 +125,76 @@ def _parse_include_parameter(include_param: str | None) -> tuple[bool, bool, boo
     return (include_locations, include_kits, include_shopping_lists, include_cover)
 
 
+class FieldsParameterError(ValidationException):
+    """Exception raised for invalid fields parameter values."""
+    def __init__(self, message: str):
+        super().__init__(message)
+
+
+# Fields a ?fields= selection may name. The include-driven lists (locations,
+# kits, shopping_lists) are controlled by the include parameter instead.
+PART_LIST_FIELDS = frozenset(PartWithTotalSchema.model_fields) - {"locations", "kits", "shopping_lists"}
+PART_DETAIL_FIELDS = frozenset(PartResponseSchema.model_fields) | frozenset(PartResponseSchema.model_computed_fields)
+
+
+def _parse_fields_parameter(fields_param: str | None, allowed_fields: Collection[str]) -> frozenset[str] | None:
+    """Parse and validate the fields query parameter.
+
+    Args:
+        fields_param: Comma-separated list of response fields
+        allowed_fields: Field names the endpoint can return
+
+    Returns:
+        The selected field names, or None to return every field
+
+    Raises:
+        FieldsParameterError: If the parameter is invalid or too long
+    """
+    if not fields_param:
+        return None
+
+    # DoS protection: reject if parameter is too long
+    if len(fields_param) > 500:
+        raise FieldsParameterError("fields parameter exceeds maximum length of 500 characters")
+
+    fields = frozenset(token.strip() for token in fields_param.split(",") if token.strip())
+    for field in fields:
+        if field not in allowed_fields:
+            raise FieldsParameterError(f"invalid field '{field}'. Allowed values: {', '.join(sorted(allowed_fields))}")
+
+    return fields or None
+
+
+def _sparse_part_data(part: Any, fields: Collection[str], total_quantity: int) -> dict[str, Any]:
+    """Serialize only the selected fields of a part.
+
+    Relationships are only touched when selected, so callers must eager-load
+    exactly those to avoid per-row lazy loads.
+    """
+    data: dict[str, Any] = {}
+    for field in fields:
+        if field == "total_quantity":
+            data[field] = total_quantity
+        elif field == "seller_links":
+            data[field] = [
+                PartSellerLinkSchema.model_validate(link).model_dump()
+                for link in part.seller_links
+            ]
+        elif field == "type":
+            data[field] = TypeResponseSchema.model_validate(part.type).model_dump() if part.type else None
+        else:
+            data[field] = getattr(part, field)
+    return data
+
+
+def _parse_page_limit(default: int = 50) -> int:
+    """Read the limit query parameter for cursor pagination, rejecting out of range values."""
+    limit = request.args.get("limit", default, type=int)
+    if limit < 1 or limit > MAX_PAGE_LIMIT:
+        raise ValidationException(f"limit must be between 1 and {MAX_PAGE_LIMIT}")
+    return limit
+
+
 def _convert_part_to_schema_data(part: Any, total_quantity: int) -> dict[str, Any]:
     """Convert Part model to PartWithTotalSchema data dict."""
     # Convert seller_links relationship to schema format
@@ -139,6 +238,24 @@ def _convert_part_to_schema_data(part: Any, total_quantity: int) -> dict[str, An
     }
 
 
+# Fast-path encoders for the part list. Locations, kits and shopping lists
+# are filled in by list_parts when included.
+_SELLER_LINK_ENCODER = RowEncoder.for_schema(PartSellerLinkSchema)
+_PART_LIST_ENCODER = RowEncoder.for_schema(
+    PartWithTotalSchema,
+    source="part",
+    overrides={
+        "seller_links": lambda row: _SELLER_LINK_ENCODER.encode_many(row.part.seller_links),
+        "total_quantity": attrgetter("total_quantity"),
+        "locations": None,
+        "kits": None,
+        "shopping_lists": None,
+    },
+)
+_PART_LOCATION_ENCODER = RowEncoder.for_schema(PartLocationListSchema)
+_PART_KIT_USAGE_ENCODER = RowEncoder.for_schema(PartKitUsageSchema)
+
+
 @parts_bp.route("", methods=["POST"])
 @api.validate(json=PartCreateSchema, resp=SpectreeResponse(HTTP_201=PartResponseSchema, HTTP_400=ErrorResponseSchema))
 @inject
@@ -166,76 +283,151 @@ def create_part(part_service: PartService = Provide[ServiceContainer.part_servic
     return PartResponseSchema.model_validate(part).model_dump(), 201
 
 
+@parts_bp.route("/bulk", methods=["POST"])
+@api.validate(json=PartBulkCreateSchema, resp=SpectreeResponse(HTTP_201=PartBulkCreateResponseSchema, HTTP_400=ErrorResponseSchema))
+@inject
+def create_parts_bulk(part_service: PartService = Provide[ServiceContainer.part_service]) -> Any:
+    """Create several parts in a single transaction."""
+    data = PartBulkCreateSchema.model_validate(request.get_json())
+    parts = part_service.create_parts([part_data.model_dump() for part_data in data.parts])
+
+    return PartBulkCreateResponseSchema(keys=[part.key for part in parts]).model_dump(), 201
+
+
+@parts_bp.route("/batch-get", methods=["POST"])
+@api.validate(
+    json=PartBatchGetRequestSchema,
+    resp=SpectreeResponse(
+        HTTP_200=PartBatchGetResponseSchema,
+        HTTP_400=ErrorResponseSchema,
+        HTTP_404=ErrorResponseSchema,
+    ),
+)
+@safe_query
+@inject
+def batch_get_parts(inventory_service: InventoryService = Provide[ServiceContainer.inventory_service]) -> Any:
+    """Get full details for several parts in one request.
+
+    Runs a fixed number of queries regardless of how many keys are requested.
+    Responds with 404 if any key does not exist.
+    """
+    data = PartBatchGetRequestSchema.model_validate(request.get_json())
+    # Kit reservations are needed for used_in_kits
+    parts_with_totals = inventory_service.get_parts_with_totals_by_keys(
+        data.keys,
+        include_locations=data.include_locations,
+        include_kits=True,
+    )
+
+    parts = []
+    for part_with_total in parts_with_totals:
+        part = part_with_total.part
+        item = PartBatchGetItemSchema.model_validate(part)
+        update: dict[str, Any] = {"used_in_kits": bool(getattr(part, "_kit_reservations_data", []))}
+        if data.include_locations:
+            update["locations"] = [
+                PartLocationListSchema.model_validate(part_location)
+                for part_location in getattr(part, "_part_locations_data", [])
+            ]
+        parts.append(item.model_copy(update=update))
+
+    return PartBatchGetResponseSchema(parts=parts).model_dump()
+
+
 @parts_bp.route("", methods=["GET"])
-@api.validate(resp=SpectreeResponse(HTTP_200=list[PartWithTotalSchema], HTTP_400=ErrorResponseSchema))
+@inventory_etag()
+# Full rows get sampled validation in list_json_response; sparse ?fields= rows
+# would fail the schema
+@api.validate(resp=SpectreeResponse(HTTP_200=list[PartWithTotalSchema], HTTP_400=ErrorResponseSchema), skip_validation=True)
 @inject
 def list_parts(inventory_service: InventoryService = Provide[ServiceContainer.inventory_service]) -> Any:
     """List parts with pagination, total quantities, and optional related data.
 
     Query Parameters:
-        limit: Maximum number of parts to return (default: 50)
+        limit: Maximum number of parts to return (default: 50; 1 to 500
+            with cursor)
         offset: Number of parts to skip (default: 0)
+        cursor: Opaque keyset cursor (optional). Pass an empty value for the
+            first page, then the X-Next-Cursor response header of the previous
+            page. The header is omitted on the last page. Cannot be combined
+            with offset.
         type_id: Filter by part type ID (optional)
         include: Comma-separated list of optional data to include (optional)
             - locations: Include location details
             - kits: Include kit memberships
             - shopping_lists: Include shopping list memberships
             - cover: Include cover attachment URLs
+        fields: Comma-separated list of part fields to return (optional),
+            e.g. key,description,total_quantity. Relationships that are not
+            selected are neither loaded nor serialized. Lists requested with
+            include are always returned.
     """
     limit = int(request.args.get("limit", 50))
     offset = int(request.args.get("offset", 0))
     type_filter = request.args.get("type_id", type=int)
     include_param = request.args.get("include", type=str)
 
+    # Keyset mode: any cursor parameter (even empty) switches to cursor paging
+    cursor_mode = "cursor" in request.args
+    after: tuple[datetime, int] | None = None
+    if cursor_mode:
+        if "offset" in request.args:
+            raise ValidationException("cursor and offset parameters cannot be combined")
+        limit = _parse_page_limit()
+        cursor_param = request.args.get("cursor", "")
+        if cursor_param:
+            created_at, part_id = decode_cursor(cursor_param, datetime, int)
+            after = (created_at, part_id)
+
     # Parse include parameter - IncludeParameterError (a ValidationException
     # subclass) propagates to Flask's error handler for a 400 response.
     include_locations, include_kits, include_shopping_lists, include_cover = _parse_include_parameter(include_param)
+    fields = _parse_fields_parameter(request.args.get("fields", type=str), PART_LIST_FIELDS)
 
     # Get parts with calculated total quantities and optional bulk-loaded data
+    # In cursor mode fetch one extra row to learn whether another page exists
     parts_with_totals = inventory_service.get_all_parts_with_totals(
-        limit=limit,
+        limit=limit + 1 if cursor_mode else limit,
         offset=offset,
         type_id=type_filter,
         include_locations=include_locations,
         include_kits=include_kits,
         include_shopping_lists=include_shopping_lists,
-        include_cover=include_cover,
+        include_cover=include_cover or (fields is not None and "cover_url" in fields),
+        after=after,
+        include_seller_links=fields is None or "seller_links" in fields,
     )
 
+    headers: dict[str, str] = {}
+    if cursor_mode and len(parts_with_totals) > limit:
+        # limit >= 1 in cursor mode, so the trimmed page is never empty
+        parts_with_totals = parts_with_totals[:limit]
+        last_part = parts_with_totals[-1].part
+        headers["X-Next-Cursor"] = encode_cursor(last_part.created_at, last_part.id)
+
     result = []
     for part_with_total in parts_with_totals:
         part = part_with_total.part
-        total_qty = part_with_total.total_quantity
 
-        # Convert using helper function
-        part_data = _convert_part_to_schema_data(part, total_qty)
+        if fields is None:
+            part_data = _PART_LIST_ENCODER(part_with_total)
+        else:
+            part_data = _sparse_part_data(part, fields, part_with_total.total_quantity)
 
         # Add locations if requested
         if include_locations:
-            locations = []
-            part_locations_data = getattr(part, '_part_locations_data', [])
-            for part_location in part_locations_data:
-                location_data = PartLocationListSchema(
-                    box_no=part_location.box_no,
-                    loc_no=part_location.loc_no,
-                    qty=part_location.qty
-                )
-                locations.append(location_data.model_dump())
-            part_data["locations"] = locations
+            part_data["locations"] = _PART_LOCATION_ENCODER.encode_many(
+                getattr(part, '_part_locations_data', [])
+            )
 
         # Add kit memberships if requested
         if include_kits:
-            from app.schemas.part_kits import PartKitUsageSchema
-            kits = []
-            kit_reservations_data = getattr(part, '_kit_reservations_data', [])
-            for reservation in kit_reservations_data:
-                kit_data = PartKitUsageSchema.model_validate(reservation)
-                kits.append(kit_data.model_dump())
-            part_data["kits"] = kits
+            part_data["kits"] = _PART_KIT_USAGE_ENCODER.encode_many(
+                getattr(part, '_kit_reservations_data', [])
+            )
 
         # Add shopping list memberships if requested
         if include_shopping_lists:
-            from app.schemas.part_shopping_list import PartShoppingListMembershipSchema
             shopping_lists = []
             shopping_list_memberships_data = getattr(part, '_shopping_list_memberships_data', [])
             for line in shopping_list_memberships_data:
@@ -243,22 +435,255 @@ def list_parts(inventory_service: InventoryService = Provide[ServiceContainer.in
                 shopping_lists.append(membership.model_dump())
             part_data["shopping_lists"] = shopping_lists
 
-        # Validate through schema to compute cover_url and exclude internal fields
-        validated_data = PartWithTotalSchema.model_validate(part_data).model_dump()
-        result.append(validated_data)
+        result.append(part_data)
+
+    if fields is not None:
+        return result, 200, headers
+    return list_json_response(result, PartWithTotalSchema, headers=headers)
+
+
+# Flat column order for CSV exports; nested lists are packed into one cell
+_EXPORT_CSV_COLUMNS = [
+    "key",
+    "manufacturer_code",
+    "manufacturer",
+    "description",
+    "type_name",
+    "tags",
+    "product_page",
+    "package",
+    "pin_count",
+    "pin_pitch",
+    "voltage_rating",
+    "input_voltage",
+    "output_voltage",
+    "mounting_type",
+    "series",
+    "dimensions",
+    "total_quantity",
+    "locations",
+    "seller_links",
+    "created_at",
+    "updated_at",
+]
+
+
+def _export_value(value: Any) -> Any:
+    """Convert export row values to JSON-compatible primitives."""
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return value
+
+
+def _iter_ndjson_export(rows: Iterable[dict[str, Any]]) -> Iterator[str]:
+    """Serialize export rows as newline-delimited JSON."""
+    for row in rows:
+        yield json.dumps({name: _export_value(value) for name, value in row.items()}) + "\n"
+
+
+def _iter_csv_export(rows: Iterable[dict[str, Any]]) -> Iterator[str]:
+    """Serialize export rows as CSV, one header line followed by one line per part."""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+
+    def flush() -> str:
+        line = buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+        return line
+
+    writer.writerow(_EXPORT_CSV_COLUMNS)
+    yield flush()
+
+    for row in rows:
+        cells = dict(row)
+        cells["tags"] = ", ".join(row["tags"] or [])
+        cells["locations"] = "; ".join(
+            f"{loc['box_no']}-{loc['loc_no']}:{loc['qty']}" for loc in row["locations"]
+        )
+        cells["seller_links"] = "; ".join(
+            f"{link['seller_name']} {link['link']}" for link in row["seller_links"]
+        )
+        writer.writerow([_export_value(cells[column]) for column in _EXPORT_CSV_COLUMNS])
+        yield flush()
+
+
+@parts_bp.route("/export", methods=["GET"])
+@inject
+def export_parts(inventory_service: InventoryService = Provide[ServiceContainer.inventory_service]) -> Any:
+    """Stream the full inventory as a download.
+
+    Query Parameters:
+        format: ndjson (default) or csv
+
+    Each record holds the part fields, total quantity, locations and seller
+    links. Rows are written as they are read from the database so memory use
+    does not grow with the size of the inventory.
+    """
+    export_format = request.args.get("format", "ndjson")
+    if export_format == "ndjson":
+        body = _iter_ndjson_export(inventory_service.iter_parts_for_export())
+        mimetype = "application/x-ndjson"
+    elif export_format == "csv":
+        body = _iter_csv_export(inventory_service.iter_parts_for_export())
+        mimetype = "text/csv"
+    else:
+        raise ValidationException("format must be one of: csv, ndjson")
+
+    # Keep the request context (and its database session) alive while the
+    # generator is consumed; teardown runs once the stream completes
+    response = Response(stream_with_context(body), mimetype=mimetype)
+    response.headers["Content-Disposition"] = f'attachment; filename="parts.{export_format}"'
+    response.headers["Cache-Control"] = "no-cache"
+    return response
+
+
+@parts_bp.route("/facets", methods=["GET"])
+@inventory_etag()
+@api.validate(resp=SpectreeResponse(HTTP_200=PartFacetSearchResponseSchema, HTTP_400=ErrorResponseSchema))
+@inject
+def faceted_search_parts(part_service: PartService = Provide[ServiceContainer.part_service]) -> Any:
+    """Filter parts by facets and count the values of every facet.
+
+    Repeat a parameter to select several values of one facet (they are
+    alternatives); different facets and all tags must match together.
+    Each facet's counts apply all other selected filters but not its own.
+
+    Query Parameters:
+        type_id: Part type ID (repeatable)
+        package: Package, e.g. DIP-8 (repeatable)
+        mounting_type: Mounting type (repeatable)
+        series: Series (repeatable)
+        voltage_rating: Voltage rating (repeatable)
+        tag: Tag the part must carry (repeatable; all must match)
+        in_stock: true for parts with stock, false for parts without (optional)
+        limit: Maximum number of parts to return (default: 50, 1 to 500)
+        offset: Number of parts to skip (default: 0)
+    """
+    try:
+        type_ids = tuple(int(value) for value in _facet_values("type_id"))
+    except ValueError as exc:
+        raise ValidationException("type_id must be an integer") from exc
+
+    in_stock_param = request.args.get("in_stock")
+    filters = PartFacetFilters(
+        type_ids=type_ids,
+        packages=_facet_values("package"),
+        mounting_types=_facet_values("mounting_type"),
+        series=_facet_values("series"),
+        voltage_ratings=_facet_values("voltage_rating"),
+        tags=_facet_values("tag"),
+        in_stock=None if in_stock_param is None else parse_bool_query_param(in_stock_param),
+    )
+
+    limit = _parse_page_limit()
+    offset = request.args.get("offset", 0, type=int)
+    if offset < 0:
+        raise ValidationException("offset must not be negative")
+
+    result = part_service.faceted_search(filters, limit=limit, offset=offset)
+
+    facets = {
+        name: [
+            {
+                "value": value,
+                "label": result.type_names.get(value) if name == "type_id" else None,
+                "count": count,
+            }
+            for value, count in values
+        ]
+        for name, values in result.facets.items()
+    }
+    return {
+        "parts": _PART_LIST_ENCODER.encode_many(
+            PartWithTotalModel(part=part, total_quantity=part.total_quantity) for part in result.parts
+        ),
+        "total": result.total,
+        "facets": facets,
+    }
 
-    return result
+
+def _facet_values(name: str) -> tuple[str, ...]:
+    """Read the distinct non-blank values of a repeatable facet parameter."""
+    values = (value.strip() for value in request.args.getlist(name))
+    return tuple(dict.fromkeys(value for value in values if value))
+
+
+@parts_bp.route("/search", methods=["GET"])
+@api.validate(resp=SpectreeResponse(HTTP_200=list[PartWithTotalSchema], HTTP_400=ErrorResponseSchema))
+@inject
+def search_parts(part_service: PartService = Provide[ServiceContainer.part_service]) -> Any:
+    """Search parts by text, best matches first.
+
+    Query Parameters:
+        q: Search text (required). Supports quoted phrases and -exclusions.
+        limit: Maximum number of parts to return (default: 50, 1 to 500)
+        cursor: Opaque cursor from the X-Next-Cursor header of the previous
+            page (optional). The header is omitted on the last page.
+    """
+    query = request.args.get("q", "").strip()
+    if not query:
+        raise ValidationException("q parameter is required")
+    if len(query) > 200:
+        raise ValidationException("q parameter exceeds maximum length of 200 characters")
+
+    limit = _parse_page_limit()
+
+    after: tuple[float, int] | None = None
+    cursor_param = request.args.get("cursor", "")
+    if cursor_param:
+        rank, part_id = decode_cursor(cursor_param, float, int)
+        after = (rank, part_id)
+
+    # Fetch one extra row to learn whether another page exists
+    matches = part_service.search_parts(query, limit=limit + 1, after=after)
+
+    headers: dict[str, str] = {}
+    if len(matches) > limit:
+        matches = matches[:limit]
+        last_part, last_rank = matches[-1]
+        headers["X-Next-Cursor"] = encode_cursor(last_rank, last_part.id)
+
+    result = [
+        PartWithTotalSchema.model_validate(
+            _convert_part_to_schema_data(part, part.total_quantity)
+        ).model_dump()
+        for part, _rank in matches
+    ]
+
+    return result, 200, headers
 
 
 @parts_bp.route("/<string:part_key>", methods=["GET"])
-@api.validate(resp=SpectreeResponse(HTTP_200=PartResponseSchema, HTTP_404=ErrorResponseSchema))
+# Validated in the view; sparse ?fields= responses would fail the schema
+@api.validate(resp=SpectreeResponse(HTTP_200=PartResponseSchema, HTTP_404=ErrorResponseSchema), skip_validation=True)
 @inject
 def get_part(
     part_key: str,
     part_service: PartService = Provide[ServiceContainer.part_service],
     kit_reservation_service: KitReservationService = Provide[ServiceContainer.kit_reservation_service],
 ) -> Any:
-    """Get single part with full details."""
+    """Get single part with full details.
+
+    Query Parameters:
+        fields: Comma-separated list of part fields to return (optional).
+            Relationships that are not selected are neither loaded nor
+            serialized.
+    """
+    fields = _parse_fields_parameter(request.args.get("fields", type=str), PART_DETAIL_FIELDS)
+    if fields is not None:
+        part = part_service.get_part(
+            part_key,
+            include_type="type" in fields,
+            include_seller_links="seller_links" in fields,
+        )
+        part_data = _sparse_part_data(part, fields - {"used_in_kits"}, part.total_quantity)
+        if "used_in_kits" in fields:
+            part_data["used_in_kits"] = bool(
+                kit_reservation_service.list_active_reservations_for_part(part.id)
+            )
+        return part_data
+
     part = part_service.get_part(part_key)
     reservations = kit_reservation_service.list_active_reservations_for_part(part.id)
     part_schema = PartResponseSchema.model_validate(part)
@@ -462,24 +887,87 @@ def get_part_locations(part_key: str, part_service: PartService = Provide[Servic
     ]
 
 
-@parts_bp.route("/<string:part_key>/history", methods=["GET"])
-@api.validate(resp=SpectreeResponse(HTTP_200=list[QuantityHistoryResponseSchema], HTTP_404=ErrorResponseSchema))
-@inject
-def get_part_history(part_key: str, part_service: PartService = Provide[ServiceContainer.part_service]) -> Any:
-    """Get quantity change history for a part."""
-    # Ensure part exists first
-    part = part_service.get_part(part_key)
-
-    # Query history directly instead of relying on relationship
-    from sqlalchemy import select
+_HISTORY_ENCODER = RowEncoder.for_schema(QuantityHistoryResponseSchema)
+_HISTORY_BUCKET_ENCODER = RowEncoder.for_schema(QuantityHistoryBucketSchema)
 
-    from app.models.quantity_history import QuantityHistory
 
-    db_session = part_service.db
-    stmt = select(QuantityHistory).where(QuantityHistory.part_id == part.id).order_by(QuantityHistory.timestamp.desc())
-    history_records = list(db_session.execute(stmt).scalars().all())
+@parts_bp.route("/<string:part_key>/history", methods=["GET"])
+# Rows get sampled validation in list_json_response; bucket and NDJSON
+# responses do not match the documented row list
+@api.validate(
+    resp=SpectreeResponse(
+        HTTP_200=list[QuantityHistoryResponseSchema], HTTP_400=ErrorResponseSchema, HTTP_404=ErrorResponseSchema
+    ),
+    skip_validation=True,
+)
+@inject
+def get_part_history(
+    part_key: str,
+    part_service: PartService = Provide[ServiceContainer.part_service],
+    quantity_history_service: QuantityHistoryService = Provide[ServiceContainer.quantity_history_service],
+) -> Any:
+    """Get quantity change history for a part, newest first.
 
-    return [
-        QuantityHistoryResponseSchema.model_validate(history).model_dump()
-        for history in history_records
-    ]
+    Query Parameters:
+        before_timestamp: Only changes before this ISO 8601 time (optional)
+        limit: Maximum number of changes to return (1 to 500). Without limit
+            or cursor the whole history is returned.
+        cursor: Opaque keyset cursor (optional). Pass an empty value for the
+            first page, then the X-Next-Cursor response header of the previous
+            page. The header is omitted on the last page.
+        format: json (default) or ndjson to stream one change per line
+        bucket: day, week or month to return net quantity changes per bucket,
+            oldest first, instead of individual changes. Includes history
+            past the retention period.
+    """
+    part = part_service.get_part(part_key, include_type=False, include_seller_links=False)
+
+    bucket = request.args.get("bucket")
+    if bucket is not None:
+        if any(name in request.args for name in ("before_timestamp", "limit", "cursor", "format")):
+            raise ValidationException("bucket cannot be combined with before_timestamp, limit, cursor or format")
+        if bucket not in HISTORY_BUCKETS:
+            raise ValidationException(f"bucket must be one of: {', '.join(HISTORY_BUCKETS)}")
+        buckets = quantity_history_service.get_part_history_buckets(part.id, bucket)
+        return list_json_response(_HISTORY_BUCKET_ENCODER.encode_many(buckets), QuantityHistoryBucketSchema)
+
+    before: datetime | None = None
+    before_param = request.args.get("before_timestamp")
+    if before_param is not None:
+        try:
+            before = datetime.fromisoformat(before_param)
+        except ValueError as exc:
+            raise ValidationException("before_timestamp must be an ISO 8601 date and time") from exc
+
+    paged = "limit" in request.args or "cursor" in request.args
+    history_format = request.args.get("format", "json")
+    if history_format == "ndjson":
+        if paged:
+            raise ValidationException("limit and cursor cannot be combined with format=ndjson")
+        body = _iter_ndjson_export(quantity_history_service.iter_part_history(part.id, before=before))
+        # Keep the request context (and its database session) alive while
+        # the generator is consumed
+        response = Response(stream_with_context(body), mimetype="application/x-ndjson")
+        response.headers["Cache-Control"] = "no-cache"
+        return response
+    if history_format != "json":
+        raise ValidationException("format must be one of: json, ndjson")
+
+    if not paged:
+        rows = quantity_history_service.get_part_history(part.id, before=before)
+        return list_json_response(_HISTORY_ENCODER.encode_many(rows), QuantityHistoryResponseSchema)
+
+    limit = _parse_page_limit()
+    after: tuple[datetime, int] | None = None
+    cursor_param = request.args.get("cursor", "")
+    if cursor_param:
+        after_timestamp, after_id = decode_cursor(cursor_param, datetime, int)
+        after = (after_timestamp, after_id)
+
+    # Fetch one extra row to learn whether another page exists
+    rows = quantity_history_service.get_part_history(part.id, limit=limit + 1, before=before, after=after)
+    headers: dict[str, str] = {}
+    if len(rows) > limit:
+        rows = rows[:limit]
+        headers["X-Next-Cursor"] = encode_cursor(rows[-1].timestamp, rows[-1].id)
+    return list_json_response(_HISTORY_ENCODER.encode_many(rows), QuantityHistoryResponseSchema, headers=headers)
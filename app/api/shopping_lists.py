@@ -1,5 +1,6 @@
 """Shopping list API endpoints."""
 
+from operator import attrgetter
 from typing import Any
 
 from dependency_injector.wiring import Provide, inject
@@ -13,6 +14,7 @@ from app.schemas.common import ErrorResponseSchema
 from app.schemas.shopping_list import (
     KitChipSchema,
     ShoppingListCreateSchema,
+    ShoppingListLineCountsSchema,
     ShoppingListListQuerySchema,
     ShoppingListListSchema,
     ShoppingListResponseSchema,
@@ -27,6 +29,7 @@ from app.schemas.shopping_list_seller import (
 from app.services.container import ServiceContainer
 from app.services.kit_shopping_list_service import KitShoppingListService
 from app.services.shopping_list_service import ShoppingListService
+from app.utils.list_serialization import RowEncoder, list_json_response, validate_query
 from app.utils.request_parsing import (
     parse_bool_query_param,
     parse_enum_list_query_param,
@@ -34,6 +37,19 @@ from app.utils.request_parsing import (
 from app.utils.spectree_config import api
 
 shopping_lists_bp = Blueprint("shopping_lists", __name__, url_prefix="/shopping-lists")
+
+_LINE_COUNTS_ENCODER = RowEncoder.for_schema(
+    ShoppingListLineCountsSchema,
+    overrides={"total": lambda counts: counts.new + counts.ordered + counts.done},
+)
+_SHOPPING_LIST_SUMMARY_ENCODER = RowEncoder.for_schema(
+    ShoppingListListSchema,
+    overrides={
+        "line_counts": lambda summary: _LINE_COUNTS_ENCODER(summary.line_counts),
+        "last_updated": attrgetter("updated_at"),
+        "has_ordered_lines": lambda summary: summary.line_counts.ordered > 0,
+    },
+)
 @shopping_lists_bp.route("", methods=["POST"])
 @api.validate(
     json=ShoppingListCreateSchema,
@@ -65,12 +81,16 @@ def create_shopping_list(
     resp=SpectreeResponse(
         HTTP_200=list[ShoppingListListSchema],
     ),
+    # Sampled validation in list_json_response
+    skip_validation=True,
 )
 @inject
 def list_shopping_lists(
     shopping_list_service: ShoppingListService = Provide[ServiceContainer.shopping_list_service],
 ) -> Any:
     """List shopping lists, optionally including completed ones."""
+    # Spectree's request validation is skipped along with its response check
+    validate_query(ShoppingListListQuerySchema)
     include_done = parse_bool_query_param(
         request.args.get("include_done"),
         default=False,
@@ -91,10 +111,10 @@ def list_shopping_lists(
         include_done=include_done,
         statuses=statuses,
     )
-    return [
-        ShoppingListListSchema.model_validate(shopping_list).model_dump()
-        for shopping_list in shopping_lists
-    ]
+    return list_json_response(
+        _SHOPPING_LIST_SUMMARY_ENCODER.encode_many(shopping_lists),
+        ShoppingListListSchema,
+    )
 
 
 @shopping_lists_bp.route("/<int:list_id>/kits", methods=["GET"])
@@ -15,6 +15,7 @@ from app.schemas.type import (
 )
 from app.services.container import ServiceContainer
 from app.services.type_service import TypeService
+from app.utils.etag import inventory_etag
 from app.utils.spectree_config import api
 
 types_bp = Blueprint("types", __name__, url_prefix="/types")
@@ -31,6 +32,7 @@ def create_type(type_service: TypeService = Provide[ServiceContainer.type_servic
 
 
 @types_bp.route("", methods=["GET"])
+@inventory_etag()
 @api.validate(resp=SpectreeResponse(HTTP_200=list[TypeResponseSchema]))
 @inject
 def list_types(type_service: TypeService = Provide[ServiceContainer.type_service]) -> Any:
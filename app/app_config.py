@@ -113,6 +113,31 @@ class AppEnvironment(BaseSettings):
         description="Mouser Search API key for part search integration",
     )
 
+    # Quantity history
+    QUANTITY_HISTORY_RETENTION_DAYS: int = Field(
+        default=365,
+        ge=0,
+        description="Days of raw quantity history kept by compact-quantity-history; "
+        "older changes only remain in the daily rollups (0 keeps everything)",
+    )
+
+    # Dashboard metrics
+    DASHBOARD_METRICS_RECONCILE_SECONDS: int = Field(
+        default=3600,
+        ge=1,
+        description="Seconds between full recomputations of the dashboard gauges; "
+        "in between they follow inventory change events",
+    )
+
+    # API responses
+    RESPONSE_VALIDATION_SAMPLE_RATE: float | None = Field(
+        default=None,
+        ge=0.0,
+        le=1.0,
+        description="Fraction of fast-path list responses validated against their schema "
+        "(default: 0.01 in production, 1.0 otherwise)",
+    )
+
 
 class AppSettings(BaseModel):
     """Application-specific settings for Electronics Inventory.
@@ -202,6 +227,24 @@ class AppSettings(BaseModel):
         description="Mouser Search API key for part search integration",
     )
 
+    # Quantity history
+    quantity_history_retention_days: int = Field(
+        default=365,
+        description="Days of raw quantity history kept by compact-quantity-history (0 keeps everything)",
+    )
+
+    # Dashboard metrics
+    dashboard_metrics_reconcile_seconds: int = Field(
+        default=3600,
+        description="Seconds between full recomputations of the dashboard gauges",
+    )
+
+    # API responses
+    response_validation_sample_rate: float = Field(
+        default=1.0,
+        description="Fraction of fast-path list responses validated against their schema",
+    )
+
     @property
     def real_ai_allowed(self) -> bool:
         """Determine whether real AI analysis is permitted."""
@@ -224,6 +267,11 @@ class AppSettings(BaseModel):
         # Compute ai_testing_mode: force True if testing, else use env value
         ai_testing_mode = True if flask_env == "testing" else env.AI_TESTING_MODE
 
+        # Validate every fast-path response outside production
+        response_validation_sample_rate = env.RESPONSE_VALIDATION_SAMPLE_RATE
+        if response_validation_sample_rate is None:
+            response_validation_sample_rate = 0.01 if flask_env == "production" else 1.0
+
         return cls(
             max_image_size=env.MAX_IMAGE_SIZE,
             max_file_size=env.MAX_FILE_SIZE,
@@ -242,4 +290,7 @@ class AppSettings(BaseModel):
             ai_cleanup_cache_path=env.AI_CLEANUP_CACHE_PATH,
             ai_testing_mode=ai_testing_mode,
             mouser_search_api_key=env.MOUSER_SEARCH_API_KEY,
+            quantity_history_retention_days=env.QUANTITY_HISTORY_RETENTION_DAYS,
+            dashboard_metrics_reconcile_seconds=env.DASHBOARD_METRICS_RECONCILE_SECONDS,
+            response_validation_sample_rate=response_validation_sample_rate,
         )
@@ -3,6 +3,7 @@
 # Import all models here for Alembic auto-generation
 from app.models.attachment import Attachment, AttachmentType
 from app.models.box import Box
+from app.models.inventory_version import InventoryVersion
 from app.models.kit import Kit, KitStatus
 from app.models.kit_content import KitContent
 from app.models.kit_pick_list import KitPickList, KitPickListStatus
@@ -13,6 +14,7 @@ from app.models.part import Part
 from app.models.part_location import PartLocation
 from app.models.part_seller import PartSeller
 from app.models.quantity_history import QuantityHistory
+from app.models.quantity_history_daily import QuantityHistoryDaily
 from app.models.shopping_list import ShoppingList, ShoppingListStatus
 from app.models.shopping_list_line import (
     ShoppingListLine,
@@ -25,11 +27,13 @@ __all__: list[str] = [
     "Attachment",
     "AttachmentType",
     "Box",
+    "InventoryVersion",
     "Location",
     "Part",
     "PartLocation",
     "PartSeller",
     "QuantityHistory",
+    "QuantityHistoryDaily",
     "KitContent",
     "Kit",
     "KitStatus",
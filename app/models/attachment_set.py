@@ -3,7 +3,7 @@
 from datetime import datetime
 from typing import TYPE_CHECKING
 
-from sqlalchemy import ForeignKey, func
+from sqlalchemy import ForeignKey, Index, Integer, func, text
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from app.extensions import db
@@ -27,6 +27,11 @@ class AttachmentSet(db.Model):  # type: ignore[name-defined]
         ForeignKey("attachments.id", ondelete="SET NULL", use_alter=True, name="fk_attachment_sets_cover"),
         nullable=True
     )
+    # Denormalized COUNT(attachments), maintained by
+    # app.utils.attachment_count on every attachment write
+    attachment_count: Mapped[int] = mapped_column(
+        Integer, nullable=False, default=0, server_default="0"
+    )
     created_at: Mapped[datetime] = mapped_column(
         nullable=False, server_default=func.now()
     )
@@ -49,5 +54,16 @@ class AttachmentSet(db.Model):  # type: ignore[name-defined]
         foreign_keys=[cover_attachment_id]
     )
 
+    __table_args__ = (
+        # Sets without attachments: the "parts without documents" count reads
+        # this index instead of counting attachments per set (migration 032)
+        Index(
+            "ix_attachment_sets_empty",
+            "id",
+            postgresql_where=text("attachment_count = 0"),
+            sqlite_where=text("attachment_count = 0"),
+        ),
+    )
+
     def __repr__(self) -> str:
         return f"<AttachmentSet {self.id}: {len(self.attachments)} attachments>"
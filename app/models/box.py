@@ -25,6 +25,11 @@ class Box(db.Model):  # type: ignore[name-defined]
     )
     description: Mapped[str] = mapped_column(nullable=False)
     capacity: Mapped[int] = mapped_column(nullable=False)
+    # Number of occupied locations, maintained by
+    # app.utils.location_occupancy on every part location write
+    occupied_locations: Mapped[int] = mapped_column(
+        nullable=False, default=0, server_default="0"
+    )
     created_at: Mapped[datetime] = mapped_column(
         nullable=False, server_default=func.now()
     )
@@ -0,0 +1,25 @@
+"""Inventory version model for Electronics Inventory."""
+
+from sqlalchemy import BigInteger
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.extensions import db
+
+
+class InventoryVersion(db.Model):  # type: ignore[name-defined]
+    """Single-row counter bumped by every transaction that changes inventory data.
+
+    Read endpoints expose the counter as an ETag so unchanged polls can be
+    answered with 304 Not Modified without running their queries.
+    """
+
+    __tablename__ = "inventory_version"
+
+    # The table holds exactly one row with this id
+    SINGLETON_ID = 1
+
+    id: Mapped[int] = mapped_column(primary_key=True)
+    version: Mapped[int] = mapped_column(BigInteger, nullable=False, default=0, server_default="0")
+
+    def __repr__(self) -> str:
+        return f"<InventoryVersion {self.version}>"
@@ -80,10 +80,10 @@ class KitPickListLine(db.Model):  # type: ignore[name-defined]
         default=PickListLineStatus.OPEN,
         server_default=PickListLineStatus.OPEN.value,
     )
-    inventory_change_id: Mapped[int | None] = mapped_column(
-        ForeignKey("quantity_history.id", ondelete="SET NULL"),
-        nullable=True,
-    )
+    # Not a foreign key: a partitioned quantity_history (migration 031) has no
+    # unique constraint on id alone. The retention job clears references to
+    # the rows it drops.
+    inventory_change_id: Mapped[int | None] = mapped_column(Integer, nullable=True)
     picked_at: Mapped[datetime | None] = mapped_column(nullable=True)
     created_at: Mapped[datetime] = mapped_column(
         nullable=False, server_default=func.now()
@@ -108,6 +108,7 @@ class KitPickListLine(db.Model):  # type: ignore[name-defined]
     )
     inventory_change: Mapped[QuantityHistory | None] = relationship(
         "QuantityHistory",
+        primaryjoin="foreign(KitPickListLine.inventory_change_id) == QuantityHistory.id",
         lazy="selectin",
     )
 
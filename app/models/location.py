@@ -2,7 +2,7 @@
 
 from typing import TYPE_CHECKING
 
-from sqlalchemy import ForeignKey, UniqueConstraint
+from sqlalchemy import ForeignKey, Index, UniqueConstraint, false, text
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from app.extensions import db
@@ -20,11 +20,27 @@ class Location(db.Model):  # type: ignore[name-defined]
     box_id: Mapped[int] = mapped_column(ForeignKey("boxes.id"), nullable=False)
     box_no: Mapped[int] = mapped_column(nullable=False)
     loc_no: Mapped[int] = mapped_column(nullable=False)
+    # Whether any part is stored here, maintained by
+    # app.utils.location_occupancy on every part location write
+    is_occupied: Mapped[bool] = mapped_column(
+        nullable=False, default=False, server_default=false()
+    )
 
     # Relationships
     box: Mapped["Box"] = relationship("Box", back_populates="locations")
 
-    __table_args__ = (UniqueConstraint("box_no", "loc_no"),)
+    __table_args__ = (
+        UniqueConstraint("box_no", "loc_no"),
+        # Free-slot index: location suggestions walk the free locations of a
+        # box in order without touching occupied ones (migration 030)
+        Index(
+            "ix_locations_free",
+            "box_no",
+            "loc_no",
+            postgresql_where=text("NOT is_occupied"),
+            sqlite_where=text("NOT is_occupied"),
+        ),
+    )
 
     @property
     def box_description(self) -> str:
@@ -1,23 +1,38 @@
 """Part model for Electronics Inventory."""
 
 from datetime import datetime
-from typing import TYPE_CHECKING, Optional
+from typing import TYPE_CHECKING, Any, Optional
 
 from sqlalchemy import (
     CHAR,
     JSON,
     CheckConstraint,
+    Column,
+    Computed,
     ForeignKey,
+    Index,
     Integer,
     String,
     Text,
     func,
 )
 from sqlalchemy.dialects import postgresql
-from sqlalchemy.orm import Mapped, mapped_column, relationship
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.orm import Mapped, mapped_column, relationship, validates
+from sqlalchemy.schema import CreateColumn
 
 from app.extensions import db
 from app.utils.cas_url import build_cas_url
+from app.utils.manufacturer_code import normalize_manufacturer_code
+
+# Generated full-text search document, weighted so codes rank above names and
+# names above free text (see migration 026)
+PART_SEARCH_VECTOR_EXPRESSION = (
+    "setweight(to_tsvector('english', coalesce(manufacturer_code, '')), 'A') || "
+    "setweight(to_tsvector('english', coalesce(manufacturer, '') || ' ' || coalesce(series, '')), 'B') || "
+    "setweight(to_tsvector('english', coalesce(description, '')), 'C') || "
+    "setweight(to_tsvector('english', coalesce(parts_tags_to_text(tags), '')), 'C')"
+)
 
 if TYPE_CHECKING:
     from app.models.attachment_set import AttachmentSet
@@ -36,6 +51,9 @@ class Part(db.Model):  # type: ignore[name-defined]
     id: Mapped[int] = mapped_column(primary_key=True, autoincrement=True)
     key: Mapped[str] = mapped_column(CHAR(4), unique=True, nullable=False)
     manufacturer_code: Mapped[str | None] = mapped_column(String(255), nullable=True)
+    # Upper-cased alphanumeric core of manufacturer_code for fuzzy lookups,
+    # kept in sync by _sync_manufacturer_code_normalized()
+    manufacturer_code_normalized: Mapped[str | None] = mapped_column(String(255), nullable=True)
     type_id: Mapped[int | None] = mapped_column(
         ForeignKey("types.id"), nullable=True
     )
@@ -60,6 +78,12 @@ class Part(db.Model):  # type: ignore[name-defined]
     series: Mapped[str | None] = mapped_column(String(100), nullable=True, index=True)
     dimensions: Mapped[str | None] = mapped_column(String(100), nullable=True)
 
+    # Denormalized SUM(part_locations.qty), maintained by
+    # app.utils.part_total_quantity on every part location write
+    total_quantity: Mapped[int] = mapped_column(
+        Integer, nullable=False, default=0, server_default="0", index=True
+    )
+
     created_at: Mapped[datetime] = mapped_column(
         nullable=False, server_default=func.now()
     )
@@ -70,8 +94,34 @@ class Part(db.Model):  # type: ignore[name-defined]
     # Table-level constraints
     __table_args__ = (
         CheckConstraint("pin_count > 0 OR pin_count IS NULL", name="ck_parts_pin_count_positive"),
+        # Keyset pagination over the parts listing walks this index
+        Index("ix_parts_created_at_id", "created_at", "id"),
+        # Full-text search document maintained by PostgreSQL (migration 026).
+        # Declared on the table only: the ORM never loads or writes it, and
+        # SQLite test databases omit it (see _skip_postgresql_only_columns)
+        Column(
+            "search_vector",
+            postgresql.TSVECTOR,
+            Computed(PART_SEARCH_VECTOR_EXPRESSION, persisted=True),
+            nullable=True,
+            info={"postgresql_only": True},
+        ),
+        Index("ix_parts_search_vector", "search_vector", postgresql_using="gin").ddl_if(
+            dialect="postgresql"
+        ),
+        # Fuzzy manufacturer code lookups (migration 027)
+        Index(
+            "ix_parts_manufacturer_code_normalized_trgm",
+            "manufacturer_code_normalized",
+            postgresql_using="gin",
+            postgresql_ops={"manufacturer_code_normalized": "gin_trgm_ops"},
+        ).ddl_if(dialect="postgresql"),
+        # Tag containment filters in faceted search (migration 029)
+        Index("ix_parts_tags", "tags", postgresql_using="gin").ddl_if(dialect="postgresql"),
     )
 
+    __mapper_args__ = {"exclude_properties": ["search_vector"]}
+
     # Relationships
     # Note: lazy="select" (default) to avoid cascading eager loads.
     # Use explicit selectinload() in queries where relationships are needed.
@@ -100,6 +150,12 @@ class Part(db.Model):  # type: ignore[name-defined]
         single_parent=True
     )
 
+    @validates("manufacturer_code")
+    def _sync_manufacturer_code_normalized(self, key: str, value: str | None) -> str | None:
+        """Keep manufacturer_code_normalized in step with manufacturer_code."""
+        self.manufacturer_code_normalized = normalize_manufacturer_code(value)
+        return value
+
     @property
     def cover_url(self) -> str | None:
         """Build CAS URL for the cover image from AttachmentSet.
@@ -126,3 +182,11 @@ class Part(db.Model):  # type: ignore[name-defined]
 
         specs_str = f" ({', '.join(specs)})" if specs else ""
         return f"<Part {self.key}: {self.manufacturer_code or 'N/A'}{specs_str}>"
+
+
+@compiles(CreateColumn, "sqlite")
+def _skip_postgresql_only_columns(create: CreateColumn, compiler: Any, **kw: Any) -> str | None:
+    """Leave PostgreSQL-only columns out of SQLite tables built with create_all()."""
+    if create.element.info.get("postgresql_only"):
+        return None
+    return compiler.visit_create_column(create, **kw)  # type: ignore[no-any-return]
@@ -3,7 +3,7 @@
 from datetime import datetime
 from typing import TYPE_CHECKING
 
-from sqlalchemy import CheckConstraint, ForeignKey, UniqueConstraint, func
+from sqlalchemy import CheckConstraint, ForeignKey, Index, UniqueConstraint, func
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from app.extensions import db
@@ -20,6 +20,8 @@ class PartLocation(db.Model):  # type: ignore[name-defined]
     __table_args__ = (
         UniqueConstraint("part_id", "box_no", "loc_no", name="uq_part_location"),
         CheckConstraint("qty > 0", name="ck_positive_qty"),
+        # Occupancy checks of a location (migration 030)
+        Index("ix_part_locations_location_id", "location_id"),
     )
 
     id: Mapped[int] = mapped_column(primary_key=True, autoincrement=True)
@@ -3,7 +3,7 @@
 from datetime import datetime
 from typing import TYPE_CHECKING
 
-from sqlalchemy import ForeignKey, String, func
+from sqlalchemy import ForeignKey, Index, String, func, text
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from app.extensions import db
@@ -13,9 +13,23 @@ if TYPE_CHECKING:
 
 
 class QuantityHistory(db.Model):  # type: ignore[name-defined]
-    """Model representing quantity changes for parts over time."""
+    """Model representing quantity changes for parts over time.
+
+    On PostgreSQL the table is range partitioned by month on ``timestamp``
+    (migration 031), which makes its primary key ``(id, timestamp)``; ``id``
+    alone is still unique because it comes from a single sequence. Every row
+    is also counted in ``quantity_history_daily`` as it is written (see
+    app.utils.quantity_history_rollup), so raw rows past the retention period
+    can be dropped without losing trends.
+    """
 
     __tablename__ = "quantity_history"
+    __table_args__ = (
+        # Part history pages newest first
+        Index("ix_quantity_history_part_id_timestamp", "part_id", text("timestamp DESC")),
+        # Recent activity and time window counts (migration 009)
+        Index("idx_quantity_history_timestamp_part_id", "timestamp", "part_id"),
+    )
 
     id: Mapped[int] = mapped_column(primary_key=True, autoincrement=True)
     part_id: Mapped[int] = mapped_column(
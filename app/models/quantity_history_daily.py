@@ -0,0 +1,37 @@
+"""Daily quantity history rollup model for Electronics Inventory."""
+
+from datetime import date
+
+from sqlalchemy import Date, ForeignKey, Index
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.extensions import db
+
+
+class QuantityHistoryDaily(db.Model):  # type: ignore[name-defined]
+    """Per part and day totals of the quantity history.
+
+    Rows are maintained incrementally as history is written (see
+    app.utils.quantity_history_rollup) and outlive the raw rows, which the
+    retention job drops after the configured period. Trend queries read these
+    instead of scanning the raw history.
+    """
+
+    __tablename__ = "quantity_history_daily"
+    __table_args__ = (
+        Index("ix_quantity_history_daily_day", "day"),
+    )
+
+    part_id: Mapped[int] = mapped_column(
+        ForeignKey("parts.id", ondelete="CASCADE"), primary_key=True
+    )
+    day: Mapped[date] = mapped_column(Date, primary_key=True)
+    change_count: Mapped[int] = mapped_column(nullable=False, default=0)
+    qty_added: Mapped[int] = mapped_column(nullable=False, default=0)
+    qty_removed: Mapped[int] = mapped_column(nullable=False, default=0)
+
+    def __repr__(self) -> str:
+        return (
+            f"<QuantityHistoryDaily {self.part_id} @ {self.day}: "
+            f"{self.change_count} changes, +{self.qty_added}/-{self.qty_removed}>"
+        )
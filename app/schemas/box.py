@@ -6,7 +6,7 @@ from typing import TYPE_CHECKING
 
 from pydantic import BaseModel, ConfigDict, Field
 
-from app.schemas.location import LocationResponseSchema
+from app.schemas.location import LocationResponseSchema, LocationWithPartResponseSchema
 
 if TYPE_CHECKING:
     from app.models.box import Box
@@ -31,6 +31,26 @@ class BoxCreateSchema(BaseModel):
     )
 
 
+class BoxBulkCreateSchema(BaseModel):
+    """Schema for creating several boxes in one request."""
+
+    boxes: list[BoxCreateSchema] = Field(
+        ...,
+        min_length=1,
+        max_length=100,
+        description="Boxes to create, in the order their numbers are returned",
+    )
+
+
+class BoxBulkCreateResponseSchema(BaseModel):
+    """Response schema for bulk box creation."""
+
+    box_nos: list[int] = Field(
+        description="Numbers of the created boxes, in request order",
+        json_schema_extra={"example": [7, 8]},
+    )
+
+
 class BoxUpdateSchema(BaseModel):
     """Schema for updating an existing box."""
 
@@ -169,6 +189,28 @@ class BoxUsageStatsSchema(BaseModel):
     model_config = ConfigDict(from_attributes=True)
 
 
+class BoxMapSchema(BaseModel):
+    """Schema for a box with the location grid it renders."""
+
+    box_no: int = Field(
+        description="Sequential box number",
+        json_schema_extra={"example": 7}
+    )
+    description: str = Field(
+        description="Descriptive name for the box",
+        json_schema_extra={"example": "Small Components Storage"}
+    )
+    capacity: int = Field(
+        description="Maximum number of storage locations in this box",
+        json_schema_extra={"example": 60}
+    )
+    locations: list[LocationWithPartResponseSchema] = Field(
+        description="All locations of the box with their part assignments, ordered by location number"
+    )
+
+    model_config = ConfigDict(from_attributes=True)
+
+
 @dataclass
 class BoxUsageStatsModel:
     """Service layer model for box usage statistics."""
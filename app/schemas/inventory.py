@@ -1,6 +1,10 @@
 """Inventory schemas for request/response validation."""
 
-from pydantic import BaseModel, Field
+from enum import StrEnum
+
+from pydantic import BaseModel, Field, model_validator
+
+from app.schemas.part import PartLocationResponseSchema
 
 
 class AddStockSchema(BaseModel):
@@ -76,6 +80,111 @@ class MoveStockSchema(BaseModel):
     )
 
 
+class StockOperationType(StrEnum):
+    """Kinds of stock operation accepted by the batch endpoint."""
+
+    ADD = "add"
+    REMOVE = "remove"
+    MOVE = "move"
+
+
+class StockBatchOperationSchema(BaseModel):
+    """Schema for one operation in a stock batch."""
+
+    op: StockOperationType = Field(
+        ...,
+        description="Operation to apply",
+        json_schema_extra={"example": "add"}
+    )
+    part_key: str = Field(
+        ...,
+        description="4-character part identifier",
+        json_schema_extra={"example": "BZQP"}
+    )
+    box_no: int = Field(
+        ...,
+        description="Box number to add to or remove from (the source box for moves)",
+        json_schema_extra={"example": 7}
+    )
+    loc_no: int = Field(
+        ...,
+        description="Location number within the box (the source location for moves)",
+        json_schema_extra={"example": 3}
+    )
+    to_box_no: int | None = Field(
+        default=None,
+        description="Destination box number (moves only)",
+        json_schema_extra={"example": 8}
+    )
+    to_loc_no: int | None = Field(
+        default=None,
+        description="Destination location number within box (moves only)",
+        json_schema_extra={"example": 15}
+    )
+    qty: int = Field(
+        ...,
+        gt=0,
+        description="Quantity to add, remove or move (must be positive)",
+        json_schema_extra={"example": 10}
+    )
+
+    @model_validator(mode="after")
+    def _check_destination(self) -> "StockBatchOperationSchema":
+        """Require a destination for moves and reject it otherwise."""
+        has_destination = self.to_box_no is not None or self.to_loc_no is not None
+        if self.op == StockOperationType.MOVE:
+            if self.to_box_no is None or self.to_loc_no is None:
+                raise ValueError("move operations require to_box_no and to_loc_no")
+        elif has_destination:
+            raise ValueError(f"{self.op.value} operations do not take to_box_no or to_loc_no")
+        return self
+
+
+class StockBatchSchema(BaseModel):
+    """Schema for applying several stock operations in one transaction."""
+
+    operations: list[StockBatchOperationSchema] = Field(
+        ...,
+        min_length=1,
+        max_length=500,
+        description="Operations applied in order; if any fails, none are applied",
+    )
+
+
+class StockBatchResponseSchema(BaseModel):
+    """Response schema for a stock batch."""
+
+    locations: list[PartLocationResponseSchema] = Field(
+        description="Resulting quantity of every part location the batch touched, "
+        "in order of first use; emptied locations report 0",
+    )
+
+
+class LocationSuggestionQuerySchema(BaseModel):
+    """Query parameters for location suggestions."""
+
+    count: int = Field(
+        default=1,
+        ge=1,
+        le=100,
+        description="Number of free locations to suggest, e.g. for bulk receiving",
+        json_schema_extra={"example": 5},
+    )
+
+
+class SuggestedLocationSchema(BaseModel):
+    """Schema for one suggested location."""
+
+    box_no: int = Field(
+        description="Suggested box number",
+        json_schema_extra={"example": 7}
+    )
+    loc_no: int = Field(
+        description="Suggested location number within box",
+        json_schema_extra={"example": 3}
+    )
+
+
 class LocationSuggestionSchema(BaseModel):
     """Schema for location suggestions."""
 
@@ -87,3 +196,7 @@ class LocationSuggestionSchema(BaseModel):
         description="Suggested location number within box",
         json_schema_extra={"example": 3}
     )
+    locations: list[SuggestedLocationSchema] = Field(
+        description="All suggested locations, best first (the first one is also "
+        "returned as box_no/loc_no); fewer than requested when not enough are free",
+    )
@@ -641,3 +641,56 @@ class KitDetailResponseSchema(BaseModel):
             getattr(self, "pick_list_badge_count", 0) or 0,
         )
         return self
+
+
+class KitShortfallPartSchema(BaseModel):
+    """Schema for a kit content that stock cannot cover."""
+
+    model_config = ConfigDict(from_attributes=True)
+
+    part_key: str = Field(
+        description="Key of the part that falls short",
+        json_schema_extra={"example": "ABCD"},
+    )
+    total_required: int = Field(
+        description="Quantity needed for the kit's build target",
+        json_schema_extra={"example": 10},
+    )
+    available: int = Field(
+        description="Stock left after reservations by other active kits",
+        json_schema_extra={"example": 4},
+    )
+    shortfall: int = Field(
+        description="Quantity missing to reach the build target",
+        json_schema_extra={"example": 6},
+    )
+
+
+class KitAvailabilitySchema(BaseModel):
+    """Schema for the buildability of an active kit."""
+
+    model_config = ConfigDict(from_attributes=True)
+
+    kit_id: int = Field(
+        description="Unique kit identifier",
+        json_schema_extra={"example": 17},
+    )
+    name: str = Field(
+        description="Kit display name",
+        json_schema_extra={"example": "Portable Synth Voice"},
+    )
+    build_target: int = Field(
+        description="Target quantity of complete kits to keep on hand",
+        json_schema_extra={"example": 5},
+    )
+    buildable: bool = Field(
+        description="Whether stock covers every content for the build target",
+        json_schema_extra={"example": False},
+    )
+    max_buildable_units: int | None = Field(
+        description="Complete kits the available stock allows; null for kits without contents",
+        json_schema_extra={"example": 2},
+    )
+    shortfall_parts: list[KitShortfallPartSchema] = Field(
+        description="Contents that fall short of the build target, ordered by part key",
+    )
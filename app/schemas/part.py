@@ -6,7 +6,7 @@ from dataclasses import dataclass
 from datetime import datetime
 from typing import TYPE_CHECKING
 
-from pydantic import BaseModel, ConfigDict, Field, computed_field
+from pydantic import BaseModel, ConfigDict, Field, computed_field, field_validator
 
 from app.schemas.part_kits import PartKitUsageSchema
 from app.schemas.part_seller import PartSellerLinkSchema
@@ -112,6 +112,26 @@ class PartCreateSchema(BaseModel):
     )
 
 
+class PartBulkCreateSchema(BaseModel):
+    """Schema for creating several parts in one request."""
+
+    parts: list[PartCreateSchema] = Field(
+        ...,
+        min_length=1,
+        max_length=1000,
+        description="Parts to create, in the order their keys are returned",
+    )
+
+
+class PartBulkCreateResponseSchema(BaseModel):
+    """Response schema for bulk part creation."""
+
+    keys: list[str] = Field(
+        description="Keys of the created parts, in request order",
+        json_schema_extra={"example": ["ABCD", "EFGH"]},
+    )
+
+
 class PartUpdateSchema(BaseModel):
     """Schema for updating an existing part."""
 
@@ -319,12 +339,12 @@ class PartResponseSchema(BaseModel):
         json_schema_extra={"example": "2024-01-15T14:45:00Z"}
     )
 
-    @computed_field  # type: ignore[prop-decorator]
-    @property
-    def total_quantity(self) -> int:
-        """Computed field for total quantity across all locations."""
-        # This will access the part_locations relationship from the ORM model
-        return sum(location.qty for location in self.part_locations) if hasattr(self, 'part_locations') and self.part_locations else 0
+    # Read from the denormalized parts.total_quantity column
+    total_quantity: int = Field(
+        default=0,
+        description="Total quantity across all locations",
+        json_schema_extra={"example": 150}
+    )
 
     model_config = ConfigDict(from_attributes=True)
 
@@ -547,6 +567,99 @@ class PartLocationResponseSchema(BaseModel):
     model_config = ConfigDict(from_attributes=True)
 
 
+class PartBatchGetRequestSchema(BaseModel):
+    """Schema for looking up several parts by key in one request."""
+
+    keys: list[str] = Field(
+        ...,
+        min_length=1,
+        max_length=100,
+        description="Part keys to look up; parts are returned in this order",
+        json_schema_extra={"example": ["BZQP", "ABCD"]},
+    )
+    include_locations: bool = Field(
+        default=False,
+        description="Include location details with quantities for each part",
+    )
+
+    @field_validator("keys")
+    @classmethod
+    def _validate_keys(cls, keys: list[str]) -> list[str]:
+        """Normalise whitespace and enforce uniqueness."""
+        normalised: list[str] = []
+        seen: set[str] = set()
+
+        for raw_key in keys:
+            key = raw_key.strip()
+            if not key:
+                raise ValueError("keys must not contain blank values")
+
+            if key in seen:
+                raise ValueError("keys must not contain duplicate values")
+            seen.add(key)
+            normalised.append(key)
+
+        return normalised
+
+
+class PartBatchGetItemSchema(PartResponseSchema):
+    """Schema for one part in a batch lookup response."""
+
+    locations: list[PartLocationListSchema] | None = Field(
+        default=None,
+        description="Location details with quantities (when include_locations is true)",
+        json_schema_extra={"example": [{"box_no": 7, "loc_no": 3, "qty": 25}]},
+    )
+
+
+class PartBatchGetResponseSchema(BaseModel):
+    """Response schema for a batch part lookup."""
+
+    parts: list[PartBatchGetItemSchema] = Field(
+        description="Full part details, in request order",
+    )
+
+
+class PartFacetValueSchema(BaseModel):
+    """Schema for one value of a facet and the number of matching parts."""
+
+    value: int | str | bool = Field(
+        description="Facet value; select it by passing it as the facet's query parameter",
+        json_schema_extra={"example": "DIP-8"},
+    )
+    label: str | None = Field(
+        default=None,
+        description="Display name for ID values (type names for the type_id facet)",
+        json_schema_extra={"example": "Relay"},
+    )
+    count: int = Field(
+        description="Parts matching the other selected filters and this value",
+        json_schema_extra={"example": 12},
+    )
+
+
+class PartFacetCountsSchema(BaseModel):
+    """Schema for value counts of every facet, most frequent first."""
+
+    type_id: list[PartFacetValueSchema] = Field(description="Counts per part type")
+    package: list[PartFacetValueSchema] = Field(description="Counts per package")
+    mounting_type: list[PartFacetValueSchema] = Field(description="Counts per mounting type")
+    series: list[PartFacetValueSchema] = Field(description="Counts per series")
+    voltage_rating: list[PartFacetValueSchema] = Field(description="Counts per voltage rating")
+    in_stock: list[PartFacetValueSchema] = Field(description="Counts of parts with and without stock")
+
+
+class PartFacetSearchResponseSchema(BaseModel):
+    """Response schema for faceted part search."""
+
+    parts: list[PartWithTotalSchema] = Field(description="Page of matching parts, newest first")
+    total: int = Field(
+        description="Number of parts matching all selected filters",
+        json_schema_extra={"example": 42},
+    )
+    facets: PartFacetCountsSchema = Field(description="Value counts per facet")
+
+
 @dataclass
 class PartWithTotalModel:
     """Service layer model combining Part ORM model with total quantity."""
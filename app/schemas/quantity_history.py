@@ -1,6 +1,6 @@
 """Quantity History schemas for request/response validation."""
 
-from datetime import datetime
+from datetime import date, datetime
 
 from pydantic import BaseModel, ConfigDict, Field
 
@@ -26,3 +26,30 @@ class QuantityHistoryResponseSchema(BaseModel):
     )
 
     model_config = ConfigDict(from_attributes=True)
+
+
+class QuantityHistoryBucketSchema(BaseModel):
+    """Schema for a part's quantity changes aggregated over a day, week or month."""
+
+    bucket_start: date = Field(
+        description="First day of the bucket (weeks start on Monday)",
+        json_schema_extra={"example": "2024-01-15"}
+    )
+    change_count: int = Field(
+        description="Number of quantity changes in the bucket",
+        json_schema_extra={"example": 4}
+    )
+    qty_added: int = Field(
+        description="Total quantity added in the bucket",
+        json_schema_extra={"example": 100}
+    )
+    qty_removed: int = Field(
+        description="Total quantity removed in the bucket",
+        json_schema_extra={"example": 35}
+    )
+    net_delta: int = Field(
+        description="Net quantity change in the bucket (added minus removed)",
+        json_schema_extra={"example": 65}
+    )
+
+    model_config = ConfigDict(from_attributes=True)
@@ -0,0 +1,106 @@
+"""Storage reorganization plan schemas."""
+
+from pydantic import BaseModel, ConfigDict, Field
+
+
+class ReorganizationPlanRequestSchema(BaseModel):
+    """Schema for starting a reorganization planning task."""
+
+    sparse_threshold: float = Field(
+        default=0.25,
+        ge=0,
+        le=1,
+        description="Occupied share of a box's locations at or below which the box "
+        "is considered nearly empty and planned to be emptied",
+        json_schema_extra={"example": 0.25},
+    )
+
+
+class ReorganizationMoveSchema(BaseModel):
+    """Schema for one planned move."""
+
+    part_key: str = Field(
+        description="Key of the part to move",
+        json_schema_extra={"example": "BZQP"},
+    )
+    from_box_no: int = Field(description="Box to take the stock from", json_schema_extra={"example": 7})
+    from_loc_no: int = Field(description="Location to take the stock from", json_schema_extra={"example": 3})
+    to_box_no: int = Field(description="Box to put the stock in", json_schema_extra={"example": 2})
+    to_loc_no: int = Field(description="Location to put the stock in", json_schema_extra={"example": 14})
+    qty: int = Field(
+        description="Quantity to move; always everything at the source location",
+        json_schema_extra={"example": 25},
+    )
+    reason: str = Field(
+        description="Why the move is planned: consolidate (gather a split part), "
+        "empty_box (empty a nearly empty box) or group_type (bring a part to its type's box)",
+        json_schema_extra={"example": "consolidate"},
+    )
+
+    model_config = ConfigDict(from_attributes=True)
+
+
+class ReorganizationPlanSchema(BaseModel):
+    """Schema for a reorganization plan."""
+
+    moves: list[ReorganizationMoveSchema] = Field(
+        description="Planned moves, ordered by source location; they can be applied in any order",
+    )
+    split_parts: int = Field(
+        description="Number of parts stored in more than one location",
+        json_schema_extra={"example": 12},
+    )
+    sparse_boxes: list[int] = Field(
+        description="Box numbers of nearly empty boxes",
+        json_schema_extra={"example": [4, 9]},
+    )
+    emptied_boxes: list[int] = Field(
+        description="Box numbers the plan empties completely",
+        json_schema_extra={"example": [9]},
+    )
+    scattered_types: list[str] = Field(
+        description="Names of part types stored in more than one box",
+        json_schema_extra={"example": ["Resistors"]},
+    )
+    locations_freed: int = Field(
+        description="Number of locations the plan frees",
+        json_schema_extra={"example": 20},
+    )
+
+    model_config = ConfigDict(from_attributes=True)
+
+
+class ReorganizationPlanTaskResultSchema(BaseModel):
+    """Schema for task result returned by the reorganization planning task."""
+
+    success: bool = Field(
+        description="Whether planning completed successfully",
+        json_schema_extra={"example": True}
+    )
+    plan: ReorganizationPlanSchema | None = Field(
+        default=None,
+        description="Reorganization plan if successful"
+    )
+    error_message: str | None = Field(
+        default=None,
+        description="Error message if planning failed",
+    )
+
+    model_config = ConfigDict(from_attributes=True)
+
+
+class ReorganizationPlanTaskCancelledResultSchema(BaseModel):
+    """Schema for cancelled reorganization planning task result."""
+
+    cancelled: bool = Field(
+        default=True,
+        description="Indicates the task was cancelled",
+        json_schema_extra={"example": True}
+    )
+    message: str = Field(
+        default="Reorganization planning cancelled by user",
+        description="Cancellation message",
+        json_schema_extra={"example": "Reorganization planning cancelled by user"}
+    )
+
+    model_config = ConfigDict(from_attributes=True)
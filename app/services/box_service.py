@@ -1,22 +1,46 @@
 """Box service for core box and location management logic."""
 
-from dataclasses import dataclass
-from typing import TYPE_CHECKING
+import threading
+from collections.abc import Sequence
+from dataclasses import dataclass, field
+from time import monotonic
+from typing import TYPE_CHECKING, Any
 
-from sqlalchemy import func, select
+from prometheus_client import Counter
+from sqlalchemy import Row, Select, delete, func, insert, select, update
+from sqlalchemy.orm import lazyload
 
 from app.exceptions import InvalidOperationException, RecordNotFoundException
+from app.models.attachment import Attachment
+from app.models.attachment_set import AttachmentSet
 from app.models.box import Box
 from app.models.location import Location
 from app.models.part import Part
 from app.models.part_location import PartLocation
 from app.utils.cas_url import build_cas_url
+from app.utils.inventory_change_events import (
+    InventoryChange,
+    record_inventory_change,
+    subscribe,
+    unsubscribe,
+)
+from app.utils.inventory_version_tracking import has_pending_inventory_writes
 
 if TYPE_CHECKING:
     from sqlalchemy.orm import Session
 
     from app.schemas.box import BoxUsageStatsModel, BoxWithUsageModel
 
+BOX_GRID_CACHE_TOTAL = Counter(
+    "box_grid_cache_total",
+    "Box location grid requests by cache result",
+    ["result"],
+)
+
+# Change events miss bulk statements and writes by other processes (e.g. CLI
+# commands), so a cached grid is recomputed after this long regardless
+BOX_GRID_MAX_AGE_SECONDS = 60.0
+
 
 @dataclass
 class PartAssignmentData:
@@ -37,17 +61,126 @@ class LocationWithPartData:
     part_assignments: list[PartAssignmentData]
 
 
+@dataclass
+class BoxMapData:
+    """Data class for a box with the location grid it renders."""
+    box_no: int
+    description: str
+    capacity: int
+    locations: list[LocationWithPartData]
+
+
+@dataclass
+class _BoxGrid:
+    """A box's location grid plus the entities whose changes invalidate it."""
+    locations: list[LocationWithPartData] = field(default_factory=list)
+    part_ids: set[int] = field(default_factory=set)
+    attachment_set_ids: set[int] = field(default_factory=set)
+    taken_at: float = 0.0
+
+
+class BoxGridCache:
+    """In-process cache of the location grids of individual boxes.
+
+    A committed inventory change (see app.utils.inventory_change_events)
+    drops only the grids of the boxes it names and of the boxes showing one of
+    its parts or attachment sets, so stock changes in one box leave the other
+    grids cached. Grids are stored under the change sequence number read
+    before they were computed and discarded if a change was published in the
+    meantime.
+
+    The cache serves nothing until started, as it depends on the change
+    events to stay current.
+    """
+
+    def __init__(self, max_age_seconds: float = BOX_GRID_MAX_AGE_SECONDS) -> None:
+        self.max_age_seconds = max_age_seconds
+        self._lock = threading.Lock()
+        self._grids: dict[int, _BoxGrid] = {}
+        self._sequence = 0
+        self._active = False
+
+    def start(self) -> None:
+        """Subscribe to inventory changes and start serving grids."""
+        subscribe(self.on_inventory_change)
+        with self._lock:
+            self._active = True
+
+    def stop(self) -> None:
+        """Stop receiving change events and drop every grid."""
+        unsubscribe(self.on_inventory_change)
+        with self._lock:
+            self._active = False
+            self._grids.clear()
+
+    def sequence(self) -> int | None:
+        """Return the current change sequence number, or None while the cache is stopped."""
+        with self._lock:
+            return self._sequence if self._active else None
+
+    def get(self, box_no: int) -> list[LocationWithPartData] | None:
+        """Return the cached grid of a box, unless it is too old.
+
+        The returned locations are shared between requests and must not be
+        modified.
+        """
+        with self._lock:
+            grid = self._grids.get(box_no)
+        if grid is None or monotonic() - grid.taken_at > self.max_age_seconds:
+            return None
+        return list(grid.locations)
+
+    def put(self, box_no: int, sequence: int, grid: _BoxGrid) -> None:
+        """Store a grid computed after reading the given sequence number."""
+        with self._lock:
+            if not self._active or sequence != self._sequence:
+                return
+            grid.taken_at = monotonic()
+            self._grids[box_no] = grid
+
+    def on_inventory_change(self, change: InventoryChange) -> None:
+        """Drop the grids the committed change may affect."""
+        with self._lock:
+            self._sequence += 1
+            for box_no, grid in list(self._grids.items()):
+                if (
+                    box_no in change.box_nos
+                    or not grid.part_ids.isdisjoint(change.part_ids)
+                    or not grid.attachment_set_ids.isdisjoint(change.attachment_set_ids)
+                ):
+                    del self._grids[box_no]
+
+    def clear(self) -> None:
+        """Drop every grid."""
+        with self._lock:
+            self._sequence += 1
+            self._grids.clear()
+
+
 class BoxService:
     """Service class for box and location management operations."""
 
-    def __init__(self, db: "Session") -> None:
+    def __init__(self, db: "Session", grid_cache: BoxGridCache | None = None) -> None:
         self.db = db
+        self.grid_cache = grid_cache
 
     def create_box(self, description: str, capacity: int) -> Box:
         """Create box and generate all locations (1 to capacity)."""
-        # Create the box and let the database sequence assign box_no
-        box = Box(description=description, capacity=capacity)
-        self.db.add(box)
+        return self.create_boxes([(description, capacity)])[0]
+
+    def create_boxes(self, boxes: Sequence[tuple[str, int]]) -> list[Box]:
+        """Create several boxes with all their locations, returning them in input order.
+
+        Each entry is a (description, capacity) pair. The boxes are written
+        with one multi-row INSERT ... RETURNING and their locations with one
+        set-based insert, so the number of statements grows with neither the
+        number of boxes nor their capacity (SQLite inserts boxes one by one).
+        """
+        if not boxes:
+            return []
+
+        created = [Box(description=description, capacity=capacity) for description, capacity in boxes]
+        self.db.add_all(created)
 
         bind = self.db.bind
         if bind is not None and bind.dialect.name == "sqlite":
@@ -56,18 +189,14 @@ class BoxService:
                 max_box_no = self.db.execute(
                     select(func.coalesce(func.max(Box.box_no), 0))
                 ).scalar()
-            box.box_no = (max_box_no or 0) + 1
+            for offset, box in enumerate(created, start=1):
+                box.box_no = (max_box_no or 0) + offset
 
-        # Force flush so the database populates id and box_no before locations are created
+        # Batched into a single INSERT ... RETURNING, which populates id and
+        # the sequence-assigned box_no before the locations are created
         self.db.flush()
-
-        # Generate all locations
-        locations = [
-            Location(box_id=box.id, box_no=box.box_no, loc_no=loc_no)
-            for loc_no in range(1, capacity + 1)
-        ]
-        self.db.add_all(locations)
-        return box
+        self._insert_locations(created, first_loc_no=1)
+        return created
 
     def get_box(self, box_no: int) -> Box:
         """Get box."""
@@ -88,10 +217,15 @@ class BoxService:
         """Update box capacity and description.
 
         If increasing capacity, new locations are created.
-        If decreasing capacity, validates that higher-numbered locations are empty.
+        If decreasing capacity, the higher-numbered locations are removed;
+        they must all be empty.
+
+        Raises:
+            RecordNotFoundException: If the box does not exist
+            InvalidOperationException: If a location to be removed holds parts
         """
-        # Find box by box_no
-        stmt = select(Box).where(Box.box_no == box_no)
+        # Find box by box_no; its locations are changed with set-based statements
+        stmt = select(Box).options(lazyload(Box.locations)).where(Box.box_no == box_no)
         box = self.db.execute(stmt).scalar_one_or_none()
         if not box:
             raise RecordNotFoundException("Box", box_no)
@@ -99,34 +233,66 @@ class BoxService:
         current_capacity = box.capacity
 
         if new_capacity < current_capacity:
-            # Check if locations to be removed would have parts
-            # For now, just check if locations exist (they shouldn't have parts in basic implementation)
-            stmt = select(Location).where(
-                Location.box_no == box_no, Location.loc_no > new_capacity
-            )
-            locations_to_remove = list(self.db.execute(stmt).scalars().all())
-
-            # Remove the higher-numbered locations
-            for location in locations_to_remove:
-                self.db.delete(location)
-
-        elif new_capacity > current_capacity:
-            # Add new locations
-            new_locations = [
-                Location(box_id=box.id, box_no=box_no, loc_no=loc_no)
-                for loc_no in range(current_capacity + 1, new_capacity + 1)
-            ]
-            self.db.add_all(new_locations)
+            self._remove_locations(box_no, new_capacity, current_capacity - new_capacity)
 
         # Update box
         box.capacity = new_capacity
         box.description = new_description
 
+        if new_capacity > current_capacity:
+            # Flush the new capacity, which the location insert reads
+            self.db.flush()
+            self._insert_locations([box], first_loc_no=current_capacity + 1)
+
         # Expire the locations relationship so it will be reloaded on next access
         self.db.expire(box, ['locations'])
 
         return box
 
+    def _insert_locations(self, boxes: Sequence[Box], first_loc_no: int) -> None:
+        """Create the locations first_loc_no to capacity of flushed boxes in one statement."""
+        bind = self.db.bind
+        if bind is not None and bind.dialect.name == "sqlite":
+            # No generate_series on SQLite; a single executemany instead
+            self.db.execute(insert(Location), [
+                {"box_id": box.id, "box_no": box.box_no, "loc_no": loc_no}
+                for box in boxes
+                for loc_no in range(first_loc_no, box.capacity + 1)
+            ])
+        else:
+            slots = (
+                select(Box.id, Box.box_no, func.generate_series(first_loc_no, Box.capacity))
+                .where(Box.id.in_([box.id for box in boxes]))
+            )
+            self.db.execute(
+                insert(Location).from_select(["box_id", "box_no", "loc_no"], slots)
+            )
+        # Not flushed through the ORM: reload the boxes' locations on next
+        # access and name the boxes for change subscribers
+        for box in boxes:
+            self.db.expire(box, ["locations"])
+        record_inventory_change(self.db, box_nos=[box.box_no for box in boxes])
+
+    def _remove_locations(self, box_no: int, new_capacity: int, expected: int) -> None:
+        """Delete a box's locations above new_capacity in one statement.
+
+        The delete skips locations holding parts; if it did not remove all
+        expected locations, it is rolled back and the operation refused.
+        """
+        holds_parts = select(PartLocation.id).where(PartLocation.location_id == Location.id).exists()
+        with self.db.begin_nested():
+            deleted = self.db.execute(
+                delete(Location)
+                .where(Location.box_no == box_no, Location.loc_no > new_capacity, ~holds_parts)
+                .execution_options(synchronize_session="fetch")
+            )
+            if deleted.rowcount != expected:
+                raise InvalidOperationException(
+                    f"reduce capacity of box {box_no} to {new_capacity}",
+                    "locations beyond the new capacity still contain parts",
+                )
+        record_inventory_change(self.db, box_nos=[box_no])
+
     def delete_box(self, box_no: int) -> None:
         """Delete box if it exists and contains no parts."""
         # Find box by box_no
@@ -150,8 +316,6 @@ class BoxService:
 
     def calculate_box_usage(self, box_no: int) -> 'BoxUsageStatsModel':
         """Calculate usage statistics for a specific box."""
-        from sqlalchemy import func
-
         from app.schemas.box import BoxUsageStatsModel
 
         # Get box info
@@ -159,12 +323,7 @@ class BoxService:
 
         # Count total locations and occupied locations
         total_locations = box.capacity
-
-        # Count occupied locations (those with parts)
-        occupied_stmt = select(func.count(func.distinct(PartLocation.loc_no))).where(
-            PartLocation.box_no == box_no
-        )
-        occupied_count = self.db.execute(occupied_stmt).scalar() or 0
+        occupied_count = box.occupied_locations
 
         # Calculate usage percentage
         usage_percentage = (occupied_count / total_locations * 100) if total_locations > 0 else 0
@@ -178,24 +337,19 @@ class BoxService:
         )
 
     def get_all_boxes_with_usage(self) -> list['BoxWithUsageModel']:
-        """Get all boxes with their usage statistics calculated."""
-        from sqlalchemy import func
+        """Get all boxes with their usage statistics calculated.
 
+        Usage comes from the denormalized ``occupied_locations`` counter, so
+        neither part locations nor the boxes' locations are loaded.
+        """
         from app.schemas.box import BoxWithUsageModel
 
-        # Query to get all boxes with usage stats in one go
-        stmt = select(
-            Box,
-            func.count(func.distinct(PartLocation.loc_no)).label('occupied_count')
-        ).outerjoin(
-            PartLocation, Box.box_no == PartLocation.box_no
-        ).group_by(Box.id).order_by(Box.box_no)
-
-        results = self.db.execute(stmt).all()
+        stmt = select(Box).options(lazyload(Box.locations)).order_by(Box.box_no)
+        boxes = self.db.execute(stmt).scalars().all()
 
         boxes_with_usage = []
-        for box, occupied_count in results:
-            occupied_count = occupied_count or 0
+        for box in boxes:
+            occupied_count = box.occupied_locations
             usage_percentage = (occupied_count / box.capacity * 100) if box.capacity > 0 else 0
 
             box_with_usage = BoxWithUsageModel(
@@ -209,24 +363,122 @@ class BoxService:
 
         return boxes_with_usage
 
+    def check_occupancy(self, repair: bool = False) -> list[tuple[int, int, int]]:
+        """Compare the stored per-box occupancy counters with the part locations.
+
+        Args:
+            repair: Recompute every location's occupied flag and overwrite the
+                drifted box counters with the actual count
+
+        Returns:
+            (box_no, stored, actual) for every box whose counter is off
+        """
+        still_used = select(PartLocation.id).where(PartLocation.location_id == Location.id).exists()
+        actual = (
+            select(func.count(Location.id))
+            .where(Location.box_no == Box.box_no, still_used)
+            .correlate(Box)
+            .scalar_subquery()
+        )
+        stmt = (
+            select(Box.box_no, Box.occupied_locations, actual)
+            .where(Box.occupied_locations != actual)
+            .order_by(Box.box_no)
+        )
+        drifted = self.db.execute(stmt).all()
+
+        if repair:
+            self.db.execute(
+                update(Location)
+                .where(Location.is_occupied != still_used)
+                .values(is_occupied=still_used)
+                .execution_options(synchronize_session="fetch")
+            )
+            for box_no, _stored, actual_count in drifted:
+                self.db.execute(
+                    update(Box)
+                    .where(Box.box_no == box_no)
+                    .values(occupied_locations=actual_count, updated_at=Box.updated_at)
+                    .execution_options(synchronize_session="fetch")
+                )
+            self.db.flush()
+
+        return [(box_no, stored, int(actual_count)) for box_no, stored, actual_count in drifted]
+
     def get_box_locations_with_parts(self, box_no: int) -> list[LocationWithPartData]:
-        """Get all locations for a box with part assignment information."""
+        """Get all locations for a box with part assignment information.
+
+        With a grid cache, a grid computed since the box's last change is
+        returned without querying. The cache is bypassed while the session
+        holds uncommitted inventory writes.
+        """
+        cache, sequence = self._grid_cache_sequence()
+        if cache is not None and sequence is not None:
+            cached = cache.get(box_no)
+            if cached is not None:
+                BOX_GRID_CACHE_TOTAL.labels(result="hit").inc()
+                return cached
+            BOX_GRID_CACHE_TOTAL.labels(result="miss").inc()
+
         # First verify the box exists
         self.get_box(box_no)
 
-        # Query locations with their part assignments
-        # Use a LEFT JOIN to include empty locations
-        # Also join with PartAttachment to get cover image data
-        from app.models.attachment import Attachment
-        from app.models.attachment_set import AttachmentSet
+        stmt = self._grid_statement().where(Location.box_no == box_no)
+        grid = self._build_grids(self.db.execute(stmt).all()).get(box_no, _BoxGrid())
+        if cache is not None and sequence is not None:
+            cache.put(box_no, sequence, grid)
+        return grid.locations
+
+    def get_box_map(self) -> list[BoxMapData]:
+        """Get every box with its location grid, ordered by box number.
 
-        stmt = select(
+        All grids are read in a single statement. With a grid cache they are
+        also stored as the boxes' cached grids.
+        """
+        cache, sequence = self._grid_cache_sequence()
+
+        stmt = (
+            self._grid_statement()
+            .join(Box, Location.box_id == Box.id)
+            .add_columns(Box.description.label("box_description"), Box.capacity)
+        )
+        rows = self.db.execute(stmt).all()
+        grids = self._build_grids(rows)
+
+        boxes: dict[int, BoxMapData] = {}
+        for row in rows:
+            if row.box_no not in boxes:
+                boxes[row.box_no] = BoxMapData(
+                    box_no=row.box_no,
+                    description=row.box_description,
+                    capacity=row.capacity,
+                    locations=grids[row.box_no].locations,
+                )
+
+        if cache is not None and sequence is not None:
+            for box_no, grid in grids.items():
+                cache.put(box_no, sequence, grid)
+        return list(boxes.values())
+
+    def _grid_cache_sequence(self) -> tuple[BoxGridCache | None, int | None]:
+        """Return the grid cache and its sequence number, if grids may be cached now."""
+        if self.grid_cache is None or has_pending_inventory_writes(self.db):
+            return None, None
+        return self.grid_cache, self.grid_cache.sequence()
+
+    def _grid_statement(self) -> Select[Any]:
+        """Build the location grid query, one row per location and part, by box and location."""
+        # Outer joins keep empty locations; the attachment set's cover
+        # attachment provides the cover image
+        return select(
             Location.box_no,
             Location.loc_no,
+            Part.id.label("part_id"),
             Part.key,
             PartLocation.qty,
             Part.manufacturer_code,
             Part.description,
+            Part.attachment_set_id,
             Attachment.s3_key.label("cover_s3_key"),
             Attachment.content_type.label("cover_content_type"),
         ).select_from(
@@ -242,30 +494,33 @@ class BoxService:
         ).outerjoin(
             Attachment,
             AttachmentSet.cover_attachment_id == Attachment.id
-        ).where(
-            Location.box_no == box_no
-        ).order_by(Location.loc_no)
-
-        results = self.db.execute(stmt).all()
+        ).order_by(Location.box_no, Location.loc_no)
 
-        # Group results by location
-        locations_dict: dict[int, LocationWithPartData] = {}
+    def _build_grids(self, results: "Sequence[Row[Any]]") -> dict[int, _BoxGrid]:
+        """Group grid query rows by box and location."""
+        grids: dict[int, _BoxGrid] = {}
+        current: LocationWithPartData | None = None
 
         for result in results:
-            loc_no = result.loc_no
+            grid = grids.get(result.box_no)
+            if grid is None:
+                grid = grids[result.box_no] = _BoxGrid()
 
-            # Initialize location if not seen before
-            if loc_no not in locations_dict:
-                locations_dict[loc_no] = LocationWithPartData(
+            # Rows are ordered, so a new location starts whenever it changes
+            if current is None or (current.box_no, current.loc_no) != (result.box_no, result.loc_no):
+                current = LocationWithPartData(
                     box_no=result.box_no,
-                    loc_no=loc_no,
+                    loc_no=result.loc_no,
                     is_occupied=False,
                     part_assignments=[]
                 )
+                grid.locations.append(current)
 
             # Add part assignment if there is one
             if result.key is not None:
-                locations_dict[loc_no].is_occupied = True
+                current.is_occupied = True
+                grid.part_ids.add(result.part_id)
+                grid.attachment_set_ids.add(result.attachment_set_id)
                 # Build cover_url if cover attachment is an image
                 cover_url = None
                 if (
@@ -274,14 +529,12 @@ class BoxService:
                     and result.cover_content_type.startswith("image/")
                 ):
                     cover_url = build_cas_url(result.cover_s3_key)
-                part_assignment = PartAssignmentData(
+                current.part_assignments.append(PartAssignmentData(
                     key=result.key,
                     qty=result.qty,
                     manufacturer_code=result.manufacturer_code,
                     description=result.description or "",
                     cover_url=cover_url,
-                )
-                locations_dict[loc_no].part_assignments.append(part_assignment)
+                ))
 
-        # Return ordered list by location number
-        return [locations_dict[loc_no] for loc_no in sorted(locations_dict.keys())]
+        return grids
@@ -11,9 +11,9 @@ from app.config import Settings
 from app.services.ai_service import AIService
 from app.services.attachment_set_service import AttachmentSetService
 from app.services.auth_service import AuthService
-from app.services.box_service import BoxService
+from app.services.box_service import BoxGridCache, BoxService
 from app.services.cas_image_service import CasImageService
-from app.services.dashboard_service import DashboardService
+from app.services.dashboard_service import DashboardService, DashboardStatsCache
 from app.services.datasheet_extraction_service import DatasheetExtractionService
 from app.services.document_service import DocumentService
 from app.services.download_cache_service import DownloadCacheService
@@ -22,16 +22,21 @@ from app.services.frontend_version_service import FrontendVersionService
 from app.services.health_service import HealthService
 from app.services.html_document_handler import HtmlDocumentHandler
 from app.services.inventory_service import InventoryService
+from app.services.inventory_version_service import InventoryVersionService
 from app.services.kit_pick_list_service import KitPickListService
 from app.services.kit_reservation_service import KitReservationService
 from app.services.kit_service import KitService
 from app.services.kit_shopping_list_service import KitShoppingListService
+from app.services.metrics.dashboard_metrics import DashboardGaugeUpdater
 from app.services.metrics_service import MetricsService
 from app.services.mouser_service import MouserService
 from app.services.oidc_client_service import OidcClientService
+from app.services.part_key_allocator import PartKeyAllocator
 from app.services.part_seller_service import PartSellerService
 from app.services.part_service import PartService
 from app.services.pick_list_report_service import PickListReportService
+from app.services.quantity_history_service import QuantityHistoryService
+from app.services.reorganization_service import ReorganizationService
 from app.services.s3_service import S3Service
 from app.services.seller_service import SellerService
 from app.services.setup_service import SetupService
@@ -97,6 +102,9 @@ def register_for_background_startup(fn: Callable[[Any], None]) -> None:
 class ServiceContainer(containers.DeclarativeContainer):
     """Container for service dependency injection."""
 
+    # Passed to providers that need the container itself
+    __self__ = providers.Self()
+
     # Configuration and database session providers
     config = providers.Dependency(instance_of=Settings)
     app_config = providers.Dependency(instance_of=AppSettings)
@@ -124,13 +132,19 @@ class ServiceContainer(containers.DeclarativeContainer):
         settings=config
     )
 
+    # Part key allocator - Singleton holding the in-memory bitmap of used keys
+    part_key_allocator = providers.Singleton(PartKeyAllocator)
+
     # Service providers - Factory creates new instances for each request
     part_service = providers.Factory(
         PartService,
         db=db_session,
-        attachment_set_service=attachment_set_service
+        attachment_set_service=attachment_set_service,
+        part_key_allocator=part_key_allocator,
     )
-    box_service = providers.Factory(BoxService, db=db_session)
+    box_grid_cache = providers.Singleton(BoxGridCache)
+    register_for_background_startup(lambda c: c.box_grid_cache().start())
+    box_service = providers.Factory(BoxService, db=db_session, grid_cache=box_grid_cache)
     type_service = providers.Factory(TypeService, db=db_session)
     seller_service = providers.Factory(
         SellerService,
@@ -144,7 +158,16 @@ class ServiceContainer(containers.DeclarativeContainer):
         part_service=part_service,
         seller_service=seller_service,
     )
-    dashboard_service = providers.Factory(DashboardService, db=db_session)
+    # Dashboard stats cache - Singleton holding the latest stats snapshot
+    dashboard_stats_cache = providers.Singleton(DashboardStatsCache)
+    dashboard_service = providers.Factory(
+        DashboardService, db=db_session, stats_cache=dashboard_stats_cache
+    )
+    inventory_version_service = providers.Factory(InventoryVersionService, db=db_session)
+    reorganization_service = providers.Factory(ReorganizationService, db=db_session)
+    quantity_history_service = providers.Factory(
+        QuantityHistoryService, db=db_session, app_config=app_config
+    )
     setup_service = providers.Factory(SetupService, db=db_session)
     shopping_list_service = providers.Factory(
         ShoppingListService,
@@ -194,9 +217,20 @@ class ServiceContainer(containers.DeclarativeContainer):
     # Metrics service - Singleton for background thread management
     metrics_service = providers.Singleton(
         MetricsService,
-        container=providers.Self(),
+        container=__self__,
         lifecycle_coordinator=lifecycle_coordinator,
     )
+    register_for_background_startup(
+        lambda c: c.metrics_service().start_background_updater(c.config().metrics_update_interval)
+    )
+
+    # Dashboard gauges - Singleton applying inventory change events to the gauges
+    dashboard_gauge_updater = providers.Singleton(
+        DashboardGaugeUpdater,
+        container=__self__,
+        reconcile_interval_seconds=app_config.provided.dashboard_metrics_reconcile_seconds,
+    )
+    register_for_background_startup(lambda c: c.dashboard_gauge_updater().start())
 
     # Auth services - Singletons for OIDC authentication
     auth_service = providers.Singleton(
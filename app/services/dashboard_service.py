@@ -1,86 +1,190 @@
 """Dashboard service for aggregating dashboard statistics and data."""
 
-from datetime import UTC, datetime, timedelta
+import threading
+from datetime import UTC, datetime, time, timedelta
+from time import monotonic
 from typing import TYPE_CHECKING, Any, cast
 
-from sqlalchemy import func, select
+from prometheus_client import Counter
+from sqlalchemy import func, or_, select, true
 
+from app.models.attachment_set import AttachmentSet
 from app.models.box import Box
+from app.models.inventory_version import InventoryVersion
 from app.models.part import Part
-from app.models.part_location import PartLocation
 from app.models.quantity_history import QuantityHistory
+from app.models.quantity_history_daily import QuantityHistoryDaily
 from app.models.type import Type
 from app.services.type_service import TypeService
+from app.utils.inventory_version_tracking import has_pending_inventory_writes
 
 if TYPE_CHECKING:
     from sqlalchemy.orm import Session
 
+DASHBOARD_STATS_CACHE_TOTAL = Counter(
+    "dashboard_stats_cache_total",
+    "Dashboard stats requests by snapshot cache result",
+    ["result"],
+)
+
+# Stocked parts at or below this total quantity count as low stock
+LOW_STOCK_THRESHOLD = 5
+
+# Undocumented parts listed on the dashboard
+UNDOCUMENTED_SAMPLE_SIZE = 10
+
+# The 7 and 30 day change counts move with the clock, so a snapshot is
+# recomputed after this long even when the inventory did not change
+STATS_SNAPSHOT_MAX_AGE_SECONDS = 60.0
+
+
+class DashboardStatsCache:
+    """In-process snapshot of the dashboard statistics.
+
+    The snapshot is keyed by the inventory version: any committed inventory
+    write bumps the version and so invalidates it, without the writers
+    knowing about the cache.
+    """
+
+    def __init__(self, max_age_seconds: float = STATS_SNAPSHOT_MAX_AGE_SECONDS) -> None:
+        self.max_age_seconds = max_age_seconds
+        self._lock = threading.Lock()
+        self._snapshot: tuple[int, float, dict[str, Any]] | None = None
+
+    def get(self, version: int) -> dict[str, Any] | None:
+        """Return a copy of the snapshot taken at this version, unless it is too old."""
+        with self._lock:
+            snapshot = self._snapshot
+        if snapshot is None:
+            return None
+        snapshot_version, taken_at, stats = snapshot
+        if snapshot_version != version or monotonic() - taken_at > self.max_age_seconds:
+            return None
+        return dict(stats)
+
+    def put(self, version: int, stats: dict[str, Any]) -> None:
+        """Store the stats computed at this version."""
+        with self._lock:
+            self._snapshot = (version, monotonic(), dict(stats))
+
+    def clear(self) -> None:
+        """Drop the snapshot."""
+        with self._lock:
+            self._snapshot = None
+
 
 class DashboardService:
     """Service class for dashboard data aggregation operations."""
 
-    def __init__(self, db: "Session") -> None:
+    def __init__(self, db: "Session", stats_cache: DashboardStatsCache | None = None) -> None:
         self.db = db
+        self.stats_cache = stats_cache
 
     def get_dashboard_stats(self) -> dict[str, Any]:
         """Returns aggregated dashboard statistics.
 
+        With a stats cache, a snapshot taken at the current inventory version
+        is returned after a single version lookup. The cache is bypassed while
+        the session holds uncommitted inventory writes.
+
         Returns:
             Dictionary containing total parts count, total quantity,
             active boxes count, types count, recent activity counts,
             and low stock count.
         """
-        # Query total parts count
-        parts_count_stmt = select(func.count(Part.id))
-        total_parts = self.db.execute(parts_count_stmt).scalar() or 0
-
-        # Calculate total quantity sum from part_locations table
-        quantity_sum_stmt = select(func.sum(PartLocation.qty))
-        total_quantity = self.db.execute(quantity_sum_stmt).scalar() or 0
-
-        # Count active boxes
-        boxes_count_stmt = select(func.count(Box.id))
-        total_boxes = self.db.execute(boxes_count_stmt).scalar() or 0
-
-        # Count types
-        types_count_stmt = select(func.count(Type.id))
-        total_types = self.db.execute(types_count_stmt).scalar() or 0
-
-        # Count quantity changes in last 7 and 30 days
-        now = datetime.now(UTC)
-        seven_days_ago = now - timedelta(days=7)
-        thirty_days_ago = now - timedelta(days=30)
+        if self.stats_cache is None:
+            return self._compute_dashboard_stats()[1]
 
-        changes_7d_stmt = select(func.count(QuantityHistory.id)).where(
-            QuantityHistory.timestamp >= seven_days_ago
+        version_stmt = select(InventoryVersion.version).where(
+            InventoryVersion.id == InventoryVersion.SINGLETON_ID
         )
-        changes_7d = self.db.execute(changes_7d_stmt).scalar() or 0
+        version = self.db.execute(version_stmt).scalar_one_or_none() or 0
+        cacheable = not has_pending_inventory_writes(self.db)
+        if cacheable:
+            cached = self.stats_cache.get(version)
+            if cached is not None:
+                DASHBOARD_STATS_CACHE_TOTAL.labels(result="hit").inc()
+                return cached
+
+        DASHBOARD_STATS_CACHE_TOTAL.labels(result="miss").inc()
+        computed_version, stats = self._compute_dashboard_stats()
+        if cacheable:
+            self.stats_cache.put(computed_version, stats)
+        return stats
+
+    def _compute_dashboard_stats(self) -> tuple[int, dict[str, Any]]:
+        """Compute the dashboard statistics and the inventory version they reflect.
+
+        Everything is read in a single statement, so the numbers and the
+        version come from the same snapshot of the database.
+        """
+        now = datetime.now(UTC)
+        since_7d = now - timedelta(days=7)
+        since_30d = now - timedelta(days=30)
+        full_days_7d = _first_full_day(since_7d)
+        full_days_30d = _first_full_day(since_30d)
+
+        part_totals = select(
+            func.count(Part.id).label("total_parts"),
+            func.coalesce(func.sum(Part.total_quantity), 0).label("total_quantity"),
+            func.count(Part.id).filter(
+                Part.total_quantity > 0, Part.total_quantity <= LOW_STOCK_THRESHOLD
+            ).label("low_stock_count"),
+        ).cte("part_totals")
+        box_totals = select(func.count(Box.id).label("total_boxes")).cte("box_totals")
+        type_totals = select(func.count(Type.id).label("total_types")).cte("type_totals")
+
+        # Whole days are summed from the daily rollups and only the partial
+        # first day of each window is counted in the raw history, so the cost
+        # follows the window rather than the amount of history
+        daily_changes = select(
+            func.coalesce(func.sum(QuantityHistoryDaily.change_count).filter(
+                QuantityHistoryDaily.day >= full_days_7d.date()
+            ), 0).label("days_7d"),
+            func.coalesce(func.sum(QuantityHistoryDaily.change_count), 0).label("days_30d"),
+        ).where(QuantityHistoryDaily.day >= full_days_30d.date()).cte("daily_changes")
+        partial_day_changes = select(
+            func.count(QuantityHistory.id).filter(
+                QuantityHistory.timestamp >= since_7d, QuantityHistory.timestamp < full_days_7d
+            ).label("partial_7d"),
+            func.count(QuantityHistory.id).filter(
+                QuantityHistory.timestamp >= since_30d, QuantityHistory.timestamp < full_days_30d
+            ).label("partial_30d"),
+        ).where(or_(
+            (QuantityHistory.timestamp >= since_7d) & (QuantityHistory.timestamp < full_days_7d),
+            (QuantityHistory.timestamp >= since_30d) & (QuantityHistory.timestamp < full_days_30d),
+        )).cte("partial_day_changes")
+
+        version = select(InventoryVersion.version).where(
+            InventoryVersion.id == InventoryVersion.SINGLETON_ID
+        ).scalar_subquery()
 
-        changes_30d_stmt = select(func.count(QuantityHistory.id)).where(
-            QuantityHistory.timestamp >= thirty_days_ago
+        stmt = select(
+            func.coalesce(version, 0),
+            part_totals.c.total_parts,
+            part_totals.c.total_quantity,
+            box_totals.c.total_boxes,
+            type_totals.c.total_types,
+            daily_changes.c.days_7d + partial_day_changes.c.partial_7d,
+            daily_changes.c.days_30d + partial_day_changes.c.partial_30d,
+            part_totals.c.low_stock_count,
+        ).select_from(
+            part_totals
+            .join(box_totals, true())
+            .join(type_totals, true())
+            .join(daily_changes, true())
+            .join(partial_day_changes, true())
         )
-        changes_30d = self.db.execute(changes_30d_stmt).scalar() or 0
-
-        # Count parts with total quantity <= 5
-        low_stock_subquery = select(
-            PartLocation.part_id,
-            func.sum(PartLocation.qty).label('total_qty')
-        ).group_by(PartLocation.part_id).subquery()
-
-        low_stock_stmt = select(func.count()).select_from(
-            low_stock_subquery
-        ).where(low_stock_subquery.c.total_qty <= 5)
-
-        low_stock_count = self.db.execute(low_stock_stmt).scalar() or 0
-
-        return {
-            'total_parts': total_parts,
-            'total_quantity': total_quantity,
-            'total_boxes': total_boxes,
-            'total_types': total_types,
-            'changes_7d': changes_7d,
-            'changes_30d': changes_30d,
-            'low_stock_count': low_stock_count
+        row = self.db.execute(stmt).one()
+
+        return row[0], {
+            'total_parts': row[1] or 0,
+            'total_quantity': row[2] or 0,
+            'total_boxes': row[3] or 0,
+            'total_types': row[4] or 0,
+            'changes_7d': row[5] or 0,
+            'changes_30d': row[6] or 0,
+            'low_stock_count': row[7] or 0
         }
 
     def get_recent_activity(self, limit: int = 20) -> list[dict[str, Any]]:
@@ -118,23 +222,18 @@ class DashboardService:
             List of dictionaries containing box_no, description,
             total_locations (capacity), occupied_locations, and usage_percentage.
         """
-        # Query all boxes with their capacities and count occupied locations
+        # Occupancy is the per-box counter kept by app.utils.location_occupancy
         stmt = select(
             Box.box_no,
             Box.description,
             Box.capacity,
-            func.count(func.distinct(
-                func.concat(PartLocation.box_no, '-', PartLocation.loc_no)
-            )).label('occupied_locations')
-        ).outerjoin(
-            PartLocation, Box.box_no == PartLocation.box_no
-        ).group_by(Box.id, Box.box_no, Box.description, Box.capacity).order_by(Box.box_no)
+            Box.occupied_locations
+        ).order_by(Box.box_no)
 
         results = self.db.execute(stmt).all()
 
         storage_data = []
-        for box_no, description, capacity, occupied_locations in results:
-            occupied = occupied_locations or 0
+        for box_no, description, capacity, occupied in results:
             usage_percentage = (occupied / capacity * 100) if capacity > 0 else 0
 
             storage_data.append({
@@ -147,7 +246,7 @@ class DashboardService:
 
         return storage_data
 
-    def get_low_stock_items(self, threshold: int = 5) -> list[dict[str, Any]]:
+    def get_low_stock_items(self, threshold: int = LOW_STOCK_THRESHOLD) -> list[dict[str, Any]]:
         """Returns parts below threshold quantity.
 
         Args:
@@ -157,25 +256,19 @@ class DashboardService:
             List of dictionaries containing part key, description,
             type name, and current quantity, ordered by quantity ascending.
         """
-        # Aggregate quantities per part
-        part_qty_subquery = select(
-            PartLocation.part_id,
-            func.sum(PartLocation.qty).label('total_qty')
-        ).group_by(PartLocation.part_id).subquery()
-
-        # Join with parts and types to get complete information
+        # Only stocked parts count as low stock; parts without any location
+        # assignment have a total of zero and are excluded
         stmt = select(
             Part.key,
             Part.description,
             Type.name.label('type_name'),
-            part_qty_subquery.c.total_qty
-        ).join(
-            part_qty_subquery, Part.id == part_qty_subquery.c.part_id
+            Part.total_quantity
         ).outerjoin(
             Type, Part.type_id == Type.id
         ).where(
-            part_qty_subquery.c.total_qty <= threshold
-        ).order_by(part_qty_subquery.c.total_qty.asc())
+            Part.total_quantity > 0,
+            Part.total_quantity <= threshold
+        ).order_by(Part.total_quantity.asc())
 
         results = self.db.execute(stmt).all()
 
@@ -215,48 +308,44 @@ class DashboardService:
     def get_parts_without_documents(self) -> dict[str, Any]:
         """Returns count and sample of parts without documents.
 
+        Both queries filter on the denormalized attachment count of the
+        part's attachment set, so neither touches the attachments table.
+
         Returns:
             Dictionary containing count of undocumented parts
             and list of first 10 part details.
         """
-        # Find parts whose attachment_set has no attachments
-        # Import Attachment model for the query
-        from app.models.attachment import Attachment
-        from app.models.attachment_set import AttachmentSet
-
-        # Subquery to count attachments per attachment_set
-        attachment_count_subquery = select(
-            Attachment.attachment_set_id,
-            func.count(Attachment.id).label('attachment_count')
-        ).group_by(Attachment.attachment_set_id).subquery()
-
-        # Find parts where the attachment_set has 0 attachments or no attachments at all
-        parts_without_docs_stmt = select(Part).join(
-            AttachmentSet, Part.attachment_set_id == AttachmentSet.id
-        ).outerjoin(
-            attachment_count_subquery,
-            AttachmentSet.id == attachment_count_subquery.c.attachment_set_id
-        ).where(
-            (attachment_count_subquery.c.attachment_count.is_(None)) |
-            (attachment_count_subquery.c.attachment_count == 0)
-        )
+        undocumented = AttachmentSet.attachment_count == 0
 
-        # Get all undocumented parts (for counting)
-        all_undocumented_parts = self.db.execute(parts_without_docs_stmt).scalars().all()
-        total_count = len(all_undocumented_parts)
+        count_stmt = select(func.count(Part.id)).join(
+            AttachmentSet, Part.attachment_set_id == AttachmentSet.id
+        ).where(undocumented)
+        total_count = self.db.execute(count_stmt).scalar() or 0
 
-        # Take first 10 for sample
-        sample_parts = all_undocumented_parts[:10]
+        sample_stmt = select(
+            Part.key,
+            Part.description,
+            Type.name
+        ).join(
+            AttachmentSet, Part.attachment_set_id == AttachmentSet.id
+        ).outerjoin(
+            Type, Part.type_id == Type.id
+        ).where(undocumented).order_by(Part.id).limit(UNDOCUMENTED_SAMPLE_SIZE)
 
         sample_data = []
-        for part in sample_parts:
+        for part_key, description, type_name in self.db.execute(sample_stmt):
             sample_data.append({
-                'part_key': part.key,
-                'description': part.description,
-                'type_name': part.type.name if part.type else None
+                'part_key': part_key,
+                'description': description,
+                'type_name': type_name
             })
 
         return {
             'count': total_count,
             'sample_parts': sample_data
         }
+
+
+def _first_full_day(since: datetime) -> datetime:
+    """Start of the first whole day after a point in time."""
+    return datetime.combine(since.date() + timedelta(days=1), time.min, tzinfo=since.tzinfo)
@@ -3,6 +3,7 @@
 import json
 import logging
 import os
+import re
 import time
 from typing import Any
 
@@ -41,6 +42,11 @@ AI_DUPLICATE_SEARCH_PARTS_DUMP_SIZE = Gauge(
 
 logger = logging.getLogger(__name__)
 
+# Search tokens that may be manufacturer part numbers ("G5Q-1A4", "LM7805CT")
+_CODE_TOKEN_PATTERN = re.compile(r"[A-Za-z0-9][A-Za-z0-9\-_./]{2,}[A-Za-z0-9]")
+_MAX_CODE_TOKENS = 5
+_MAX_CANDIDATES_PER_TOKEN = 5
+
 
 class DuplicateSearchService:
     """Service for finding duplicate parts using LLM-based similarity matching.
@@ -108,8 +114,12 @@ class DuplicateSearchService:
 
                 return DuplicateSearchResponse(matches=[])
 
+            # Cheap trigram pre-filter on manufacturer codes to point the LLM
+            # at the most likely MPN matches
+            code_candidates = self._find_code_candidates(request.search)
+
             # Build prompt with parts inventory
-            system_prompt = self._build_prompt(parts_data)
+            system_prompt = self._build_prompt(parts_data, code_candidates)
 
             # Call LLM with structured output
             if not self.ai_runner:
@@ -185,11 +195,39 @@ class DuplicateSearchService:
             # Return empty matches to allow graceful degradation
             return DuplicateSearchResponse(matches=[])
 
-    def _build_prompt(self, parts_data: list[dict[str, Any]]) -> str:
+    def _find_code_candidates(self, search: str) -> list[str]:
+        """Find part keys whose manufacturer code resembles a code in the search text.
+
+        Args:
+            search: Free-form component description from the request
+
+        Returns:
+            Part keys in order of discovery, without duplicates
+        """
+        tokens = [
+            token for token in dict.fromkeys(_CODE_TOKEN_PATTERN.findall(search))
+            # Part numbers mix letters and digits; plain words are left to the LLM
+            if any(c.isalpha() for c in token) and any(c.isdigit() for c in token)
+        ]
+
+        candidate_keys: dict[str, None] = {}
+        for token in tokens[:_MAX_CODE_TOKENS]:
+            for part, _similarity in self.part_service.similar_parts(
+                token, limit=_MAX_CANDIDATES_PER_TOKEN
+            ):
+                candidate_keys[part.key] = None
+
+        return list(candidate_keys)
+
+    def _build_prompt(
+        self, parts_data: list[dict[str, Any]], code_candidates: list[str] | None = None
+    ) -> str:
         """Build the system prompt with inventory data.
 
         Args:
             parts_data: List of part dictionaries from get_all_parts_for_search()
+            code_candidates: Optional part keys with manufacturer codes similar
+                to codes in the search text
 
         Returns:
             Rendered prompt string with inventory JSON embedded
@@ -197,7 +235,7 @@ class DuplicateSearchService:
         # Convert parts data to formatted JSON
         parts_json = json.dumps(parts_data, indent=2)
 
-        context = {"parts_json": parts_json}
+        context = {"parts_json": parts_json, "code_candidates": code_candidates or []}
 
         # Use cached template
         return self._prompt_template.render(**context)
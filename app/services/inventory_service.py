@@ -1,11 +1,25 @@
 """Inventory service for managing part locations and quantities."""
 
-from collections.abc import Sequence
-from typing import TYPE_CHECKING
+from collections.abc import Iterator, Sequence
+from dataclasses import dataclass
+from datetime import datetime
+from typing import TYPE_CHECKING, Any
 
 from prometheus_client import Counter
-from sqlalchemy import and_, func, select
-from sqlalchemy.orm import Session, selectinload
+from sqlalchemy import (
+    Insert,
+    and_,
+    case,
+    delete,
+    func,
+    insert,
+    literal,
+    select,
+    tuple_,
+    update,
+)
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import Session, aliased, selectinload
 
 from app.exceptions import (
     InsufficientQuantityException,
@@ -16,6 +30,13 @@ from app.models.location import Location
 from app.models.part_location import PartLocation
 from app.models.quantity_history import QuantityHistory
 from app.services.part_service import PartService
+from app.utils.inventory_change_events import record_inventory_change
+from app.utils.location_occupancy import (
+    mark_location_occupied,
+    refresh_location_occupancy,
+)
+from app.utils.part_total_quantity import apply_total_quantity_delta
+from app.utils.quantity_history_rollup import roll_up_quantity_history
 
 # Inventory activity metrics
 INVENTORY_QUANTITY_CHANGES_TOTAL = Counter(
@@ -24,6 +45,37 @@ INVENTORY_QUANTITY_CHANGES_TOTAL = Counter(
     ["operation"],
 )
 
+# Attempts of the atomic stock removal before giving up on a location whose
+# quantity keeps changing under it
+_TAKE_STOCK_ATTEMPTS = 3
+
+
+@dataclass(frozen=True, slots=True)
+class StockOperation:
+    """One add, remove or move operation of a stock batch.
+
+    ``box_no``/``loc_no`` is the source location of a move.
+    """
+
+    op: str
+    part_key: str
+    box_no: int
+    loc_no: int
+    qty: int
+    to_box_no: int | None = None
+    to_loc_no: int | None = None
+
+
+@dataclass(frozen=True, slots=True)
+class StockLevel:
+    """Quantity of a part at a location after a stock batch."""
+
+    part_key: str
+    box_no: int
+    loc_no: int
+    qty: int
+
+
 if TYPE_CHECKING:
     from app.schemas.part import PartWithTotalModel
     from app.services.kit_reservation_service import KitReservationService
@@ -56,49 +108,23 @@ class InventoryService:
     def add_stock(
         self, part_key: str, box_no: int, loc_no: int, qty: int
     ) -> PartLocation:
-        """Add stock to a location."""
+        """Add stock to a location.
+
+        The quantity is added with a single upsert, so concurrent additions to
+        the same location never overwrite each other.
+        """
         if qty <= 0:
             raise InvalidOperationException("add negative or zero stock", "quantity must be positive")
 
-        # Validate location exists
-        location = self._get_location(box_no, loc_no)
-        if not location:
-            raise RecordNotFoundException("Location", f"{box_no}-{loc_no}")
+        part_id = self._get_part_id(part_key)
+        location_id = self._get_location_id(box_no, loc_no)
 
-        part = self.part_service.get_part(part_key)
-
-        # Check if part already exists at this location
-        stmt = select(PartLocation).where(
-            and_(
-                PartLocation.part_id == part.id,
-                PartLocation.box_no == box_no,
-                PartLocation.loc_no == loc_no,
-            )
-        )
-        existing_location = self.db.execute(stmt).scalar_one_or_none()
-
-        if existing_location:
-            # Add to existing quantity and refresh relationship collection when already loaded
-            existing_location.qty += qty
-            part_location = existing_location
-            if "part_locations" in part.__dict__ and existing_location not in part.part_locations:
-                part.part_locations.append(existing_location)
-        else:
-            # Create new location assignment and attach to the part relationship
-            part_location = PartLocation(
-                part=part,
-                box_no=box_no,
-                loc_no=loc_no,
-                location_id=location.id,
-                qty=qty,
-            )
-            self.db.add(part_location)
-            if "part_locations" in part.__dict__:
-                part.part_locations.append(part_location)
+        part_location = self._put_stock(part_id, location_id, box_no, loc_no, qty)
+        self._record_stock_change(part_id, qty)
 
         # Add quantity history record
         history = QuantityHistory(
-            part_id=part.id,
+            part_id=part_id,
             delta_qty=qty,
             location_reference=f"{box_no}-{loc_no}",
         )
@@ -113,40 +139,23 @@ class InventoryService:
     def remove_stock(
         self, part_key: str, box_no: int, loc_no: int, qty: int
     ) -> QuantityHistory:
-        """Remove stock from a location and return the quantity history entry."""
+        """Remove stock from a location and return the quantity history entry.
+
+        The quantity is taken with a conditional ``UPDATE ... WHERE qty > :n``
+        (or ``DELETE ... WHERE qty = :n`` when the location is emptied), so
+        concurrent removals can never take more than the location holds.
+        """
         if qty <= 0:
             raise InvalidOperationException("remove negative or zero stock", "quantity must be positive")
 
-        # Find existing location assignment
-        from app.models.part import Part
-        stmt = select(PartLocation).join(
-            Part, PartLocation.part_id == Part.id
-        ).where(
-            and_(
-                Part.key == part_key,
-                PartLocation.box_no == box_no,
-                PartLocation.loc_no == loc_no,
-            )
-        )
-        part_location = self.db.execute(stmt).scalar_one_or_none()
-
-        if not part_location:
-            raise RecordNotFoundException("Part location", f"{part_key} at {box_no}-{loc_no}")
-
-        if part_location.qty < qty:
-            raise InsufficientQuantityException(qty, part_location.qty, f"{box_no}-{loc_no}")
+        part_id = self._get_part_id(part_key)
 
-        # Update quantity
-        part_location.qty -= qty
-
-        # Remove location assignment if quantity reaches zero
-        if part_location.qty == 0:
-            self.db.delete(part_location)
+        self._take_stock(part_id, part_key, box_no, loc_no, qty)
+        self._record_stock_change(part_id, -qty)
 
         # Add negative quantity history record
-        part = self.part_service.get_part(part_key)
         history = QuantityHistory(
-            part_id=part.id,
+            part_id=part_id,
             delta_qty=-qty,
             location_reference=f"{box_no}-{loc_no}",
         )
@@ -155,9 +164,6 @@ class InventoryService:
         # Record metrics for quantity change
         INVENTORY_QUANTITY_CHANGES_TOTAL.labels(operation="remove").inc(qty)
 
-        # Check if total quantity is now zero and cleanup if needed
-        self.cleanup_zero_quantities(part_key)
-
         self.db.flush()
         return history
 
@@ -170,85 +176,171 @@ class InventoryService:
         to_loc: int,
         qty: int,
     ) -> None:
-        """Move stock between locations."""
+        """Move stock between locations.
+
+        Uses the same atomic statements as ``remove_stock`` and ``add_stock``;
+        the part's total quantity is unchanged.
+        """
         if qty <= 0:
             raise InvalidOperationException("move negative or zero stock", "quantity must be positive")
 
-        # Validate source has sufficient quantity
-        from app.models.part import Part
-        stmt = select(PartLocation).join(
-            Part, PartLocation.part_id == Part.id
-        ).where(
-            and_(
-                Part.key == part_key,
-                PartLocation.box_no == from_box,
-                PartLocation.loc_no == from_loc,
-            )
-        )
-        source_location = self.db.execute(stmt).scalar_one_or_none()
-
-        if not source_location:
-            raise RecordNotFoundException("Part location", f"{part_key} at {from_box}-{from_loc}")
-
-        if source_location.qty < qty:
-            raise InsufficientQuantityException(qty, source_location.qty, f"{from_box}-{from_loc}")
-
-        # Validate destination location exists
-        dest_location = self._get_location(to_box, to_loc)
-        if not dest_location:
-            raise RecordNotFoundException("Location", f"{to_box}-{to_loc}")
-
-        # Begin transaction: remove from source, add to destination
-        try:
-            # Remove from source
-            source_location.qty -= qty
-            if source_location.qty == 0:
-                self.db.delete(source_location)
-
-            # Add history for removal
-            part = self.part_service.get_part(part_key)
-            remove_history = QuantityHistory(
-                part_id=part.id,
+        part_id = self._get_part_id(part_key)
+        # Validate the destination before writing anything
+        dest_location_id = self._get_location_id(to_box, to_loc)
+
+        self._take_stock(part_id, part_key, from_box, from_loc, qty)
+        self._put_stock(part_id, dest_location_id, to_box, to_loc, qty)
+        self._record_stock_change(part_id, 0)
+
+        self.db.add_all([
+            QuantityHistory(
+                part_id=part_id,
                 delta_qty=-qty,
                 location_reference=f"{from_box}-{from_loc}",
-            )
-            self.db.add(remove_history)
+            ),
+            QuantityHistory(
+                part_id=part_id,
+                delta_qty=qty,
+                location_reference=f"{to_box}-{to_loc}",
+            ),
+        ])
+        self.db.flush()
 
-            # Add to destination
-            stmt = select(PartLocation).join(
-                Part, PartLocation.part_id == Part.id
-            ).where(
+    def apply_stock_batch(self, operations: Sequence[StockOperation]) -> list[StockLevel]:
+        """Apply add, remove and move operations as one all-or-nothing unit.
+
+        All parts are resolved in one query and all locations, with the
+        existing stock of the batch's parts at them, in a second one. The
+        operations are then applied in order in memory, so later operations
+        see the effect of earlier ones, and the quantity history is written
+        with a single multi-row insert. Any failing operation raises before
+        anything is flushed, and the caller's rollback discards the batch.
+
+        Args:
+            operations: Operations to apply, in order
+
+        Returns:
+            The resulting quantity of every touched part location, in order of
+            first use; locations emptied by the batch report 0
+
+        Raises:
+            InvalidOperationException: If an operation has an unknown type or
+                a non-positive quantity, or a move has no destination
+            RecordNotFoundException: If a part or location does not exist, or
+                stock is removed from a location that does not hold the part
+            InsufficientQuantityException: If a location holds less than an
+                operation removes
+        """
+        from app.models.part import Part
+
+        if not operations:
+            return []
+
+        location_refs: list[tuple[int, int]] = []
+        for operation in operations:
+            if operation.op not in ("add", "remove", "move"):
+                raise InvalidOperationException("apply stock batch", f"unknown operation '{operation.op}'")
+            if operation.qty <= 0:
+                raise InvalidOperationException("apply stock batch", "quantity must be positive")
+            location_refs.append((operation.box_no, operation.loc_no))
+            if operation.op == "move":
+                if operation.to_box_no is None or operation.to_loc_no is None:
+                    raise InvalidOperationException("apply stock batch", "move operations require a destination")
+                location_refs.append((operation.to_box_no, operation.to_loc_no))
+
+        part_keys = list(dict.fromkeys(operation.part_key for operation in operations))
+        part_ids: dict[str, int] = dict(
+            self.db.execute(select(Part.key, Part.id).where(Part.key.in_(part_keys))).tuples().all()
+        )
+        for part_key in part_keys:
+            if part_key not in part_ids:
+                raise RecordNotFoundException("Part", part_key)
+
+        # Locations plus the batch parts' existing stock at them
+        location_refs = list(dict.fromkeys(location_refs))
+        stmt = (
+            select(Location, PartLocation)
+            .outerjoin(
+                PartLocation,
                 and_(
-                    Part.key == part_key,
-                    PartLocation.box_no == to_box,
-                    PartLocation.loc_no == to_loc,
-                )
+                    PartLocation.location_id == Location.id,
+                    PartLocation.part_id.in_(part_ids.values()),
+                ),
             )
-            existing_dest = self.db.execute(stmt).scalar_one_or_none()
-
-            if existing_dest:
-                existing_dest.qty += qty
-            else:
-                new_dest = PartLocation(
-                    part_id=part.id,
-                    box_no=to_box,
-                    loc_no=to_loc,
-                    location_id=dest_location.id,
-                    qty=qty,
+            .where(tuple_(Location.box_no, Location.loc_no).in_(location_refs))
+        )
+        locations: dict[tuple[int, int], Location] = {}
+        stock: dict[tuple[int, int, int], PartLocation] = {}
+        for location, part_location in self.db.execute(stmt).tuples():
+            locations[(location.box_no, location.loc_no)] = location
+            if part_location is not None:
+                stock[(part_location.part_id, location.box_no, location.loc_no)] = part_location
+        for box_no, loc_no in location_refs:
+            if (box_no, loc_no) not in locations:
+                raise RecordNotFoundException("Location", f"{box_no}-{loc_no}")
+
+        touched: dict[tuple[int, int, int], str] = {}
+        history_rows: list[dict[str, Any]] = []
+
+        def change(part_key: str, box_no: int, loc_no: int, delta: int) -> None:
+            part_id = part_ids[part_key]
+            stock_key = (part_id, box_no, loc_no)
+            part_location = stock.get(stock_key)
+            if delta < 0:
+                if part_location is None or part_location.qty == 0:
+                    raise RecordNotFoundException("Part location", f"{part_key} at {box_no}-{loc_no}")
+                if part_location.qty < -delta:
+                    raise InsufficientQuantityException(-delta, part_location.qty, f"{box_no}-{loc_no}")
+            if part_location is None:
+                part_location = PartLocation(
+                    part_id=part_id,
+                    box_no=box_no,
+                    loc_no=loc_no,
+                    location_id=locations[(box_no, loc_no)].id,
+                    qty=0,
                 )
-                self.db.add(new_dest)
+                stock[stock_key] = part_location
+
+            part_location.qty += delta
+            touched.setdefault(stock_key, part_key)
+            history_rows.append({
+                "part_id": part_id,
+                "delta_qty": delta,
+                "location_reference": f"{box_no}-{loc_no}",
+            })
+
+        for operation in operations:
+            if operation.op == "add":
+                change(operation.part_key, operation.box_no, operation.loc_no, operation.qty)
+            elif operation.op == "remove":
+                change(operation.part_key, operation.box_no, operation.loc_no, -operation.qty)
+            else:
+                assert operation.to_box_no is not None and operation.to_loc_no is not None
+                change(operation.part_key, operation.box_no, operation.loc_no, -operation.qty)
+                change(operation.part_key, operation.to_box_no, operation.to_loc_no, operation.qty)
+
+        # Everything validated; write the final state of each touched location
+        for stock_key in touched:
+            part_location = stock[stock_key]
+            persistent = part_location.id is not None
+            if part_location.qty > 0 and not persistent:
+                self.db.add(part_location)
+            elif part_location.qty == 0 and persistent:
+                self.db.delete(part_location)
 
-            # Add history for addition
-            add_history = QuantityHistory(
-                part_id=part.id,
-                delta_qty=qty,
-                location_reference=f"{to_box}-{to_loc}",
-            )
-            self.db.add(add_history)
+        self.db.flush()
+        history_ids = self.db.scalars(insert(QuantityHistory).returning(QuantityHistory.id), history_rows).all()
+        roll_up_quantity_history(self.db, history_ids)
+        record_inventory_change(self.db, history_rows=len(history_ids))
 
-        except Exception:
-            # Let the caller handle transaction rollback
-            raise
+        for operation in operations:
+            if operation.op in ("add", "remove"):
+                INVENTORY_QUANTITY_CHANGES_TOTAL.labels(operation=operation.op).inc(operation.qty)
+
+        return [
+            StockLevel(part_key=part_key, box_no=box_no, loc_no=loc_no, qty=stock[(part_id, box_no, loc_no)].qty)
+            for (part_id, box_no, loc_no), part_key in touched.items()
+        ]
 
     def get_part_locations(self, part_key: str) -> list[PartLocation]:
         """Get all locations where a part is stored."""
@@ -260,29 +352,64 @@ class InventoryService:
 
     def suggest_location(self, type_id: int | None) -> tuple[int, int]:
         """Suggest a location for a part based on type and availability."""
-        # For now, implement simple first-available algorithm
-        # Future enhancement: prefer same-category boxes
-        from sqlalchemy import exists
+        return self.suggest_locations(type_id)[0]
 
-        # Find first available location (not in part_locations)
-        stmt = (
-            select(Location.box_no, Location.loc_no)
-            .where(
-                ~exists().where(
-                    and_(
-                        PartLocation.box_no == Location.box_no,
-                        PartLocation.loc_no == Location.loc_no,
-                    )
-                )
+    def suggest_locations(self, type_id: int | None, count: int = 1) -> list[tuple[int, int]]:
+        """Suggest free locations for new stock, preferring boxes holding the same type.
+
+        Boxes already holding parts of ``type_id`` come first, most such parts
+        first, followed by all other boxes in box order; within a box the
+        lowest free location numbers come first. Free locations are read
+        through the partial ``ix_locations_free`` index, so the cost follows
+        the number of suggestions rather than the number of locations.
+
+        Args:
+            type_id: Type of the part to store, or None for no preference
+            count: Number of locations to suggest
+
+        Returns:
+            Up to ``count`` (box_no, loc_no) pairs, best first
+
+        Raises:
+            RecordNotFoundException: If no location is free
+        """
+        from app.models.part import Part
+
+        preferred_boxes: list[int] = []
+        if type_id is not None:
+            boxes_stmt = (
+                select(PartLocation.box_no)
+                .join(Part, PartLocation.part_id == Part.id)
+                .where(Part.type_id == type_id)
+                .group_by(PartLocation.box_no)
+                .order_by(func.count().desc(), PartLocation.box_no)
             )
-            .order_by(Location.box_no, Location.loc_no)
-            .limit(1)
-        )
+            preferred_boxes = list(self.db.execute(boxes_stmt).scalars())
 
-        result = self.db.execute(stmt).first()
-        if not result:
+        free = select(Location.box_no, Location.loc_no).where(~Location.is_occupied)
+        suggestions: list[tuple[int, int]] = []
+
+        if preferred_boxes:
+            rank = case(
+                {box_no: position for position, box_no in enumerate(preferred_boxes)},
+                value=Location.box_no,
+            )
+            stmt = (
+                free.where(Location.box_no.in_(preferred_boxes))
+                .order_by(rank, Location.loc_no)
+                .limit(count)
+            )
+            suggestions.extend(self.db.execute(stmt).tuples())
+
+        if len(suggestions) < count:
+            stmt = free.order_by(Location.box_no, Location.loc_no).limit(count - len(suggestions))
+            if preferred_boxes:
+                stmt = stmt.where(Location.box_no.not_in(preferred_boxes))
+            suggestions.extend(self.db.execute(stmt).tuples())
+
+        if not suggestions:
             raise RecordNotFoundException("Available location", "none found")
-        return (result[0], result[1])
+        return suggestions
 
     def cleanup_zero_quantities(self, part_key: str) -> None:
         """Remove all location assignments when total quantity reaches zero."""
@@ -300,9 +427,7 @@ class InventoryService:
     def calculate_total_quantity(self, part_key: str) -> int:
         """Calculate total quantity across all locations for a part."""
         from app.models.part import Part
-        stmt = select(func.coalesce(func.sum(PartLocation.qty), 0)).join(
-            Part, PartLocation.part_id == Part.id
-        ).where(Part.key == part_key)
+        stmt = select(Part.total_quantity).where(Part.key == part_key)
         result = self.db.execute(stmt).scalar()
         return result or 0
 
@@ -315,9 +440,15 @@ class InventoryService:
         include_kits: bool = False,
         include_shopping_lists: bool = False,
         include_cover: bool = False,
+        after: tuple[datetime, int] | None = None,
+        include_seller_links: bool = True,
     ) -> list['PartWithTotalModel']:
         """Get all parts with their total quantities calculated and optional bulk-loaded data.
 
+        Parts are ordered newest first by ``(created_at, id)``. Callers can page
+        either with ``offset`` or, for constant cost per page, by passing the
+        ``(created_at, id)`` of the last part already seen as ``after``.
+
         Args:
             limit: Maximum number of parts to return
             offset: Number of parts to skip
@@ -326,6 +457,9 @@ class InventoryService:
             include_kits: If True, bulk-load kit membership data for all parts
             include_shopping_lists: If True, bulk-load shopping list membership data for all parts
             include_cover: If True, eager-load cover_attachment for all parts
+            after: Optional keyset position; only parts sorting after it are returned
+            include_seller_links: If False, skip eager-loading seller links for
+                callers that do not serialize them
 
         Returns:
             List of PartWithTotalModel instances with optional related data attached
@@ -334,9 +468,12 @@ class InventoryService:
         from app.models.part_seller import PartSeller
         from app.schemas.part import PartWithTotalModel
 
-        # Base query for parts with total quantity calculation
+        # Base query for parts
         # Eager-load seller_links since the API serializes them for every part
-        options = [selectinload(Part.seller_links).selectinload(PartSeller.seller)]
+        # unless a sparse field selection leaves them out
+        options = []
+        if include_seller_links:
+            options.append(selectinload(Part.seller_links).selectinload(PartSeller.seller))
         if include_cover:
             # Eager-load attachment_set and its cover_attachment
             from app.models.attachment_set import AttachmentSet
@@ -344,33 +481,119 @@ class InventoryService:
                 selectinload(Part.attachment_set).selectinload(AttachmentSet.cover_attachment)
             )
 
-        stmt = select(
-            Part,
-            func.coalesce(func.sum(PartLocation.qty), 0).label('total_quantity')
-        ).outerjoin(
-            PartLocation, Part.id == PartLocation.part_id
-        ).options(*options).group_by(Part.id)
+        # Total quantity is denormalized onto parts, so the listing is a plain
+        # walk of the (created_at, id) index without aggregating part_locations
+        stmt = select(Part).options(*options)
 
         # Apply type filter if specified
         if type_id is not None:
             stmt = stmt.where(Part.type_id == type_id)
 
-        stmt = stmt.order_by(Part.created_at.desc()).limit(limit).offset(offset)
+        if after is not None:
+            after_created_at, after_id = after
+            anchor_created_at: Any = literal(after_created_at)
+            bind = self.db.bind
+            if bind is not None and bind.dialect.name == "sqlite":
+                # SQLite stores timestamps as text, so seek against the anchor
+                # row's stored value to compare like with like; fall back to
+                # the cursor value if the anchor was deleted
+                anchor = aliased(Part)
+                anchor_created_at = func.coalesce(
+                    select(anchor.created_at).where(anchor.id == after_id).scalar_subquery(),
+                    after_created_at,
+                )
+            stmt = stmt.where(
+                tuple_(Part.created_at, Part.id) < tuple_(anchor_created_at, literal(after_id))
+            )
+
+        stmt = stmt.order_by(Part.created_at.desc(), Part.id.desc()).limit(limit).offset(offset)
 
-        results = self.db.execute(stmt).all()
+        results = self.db.execute(stmt).scalars().all()
 
         # Convert to list of PartWithTotalModel instances
-        parts_with_totals = []
-        for part, total_qty in results:
-            part_with_total = PartWithTotalModel(
-                part=part,
-                total_quantity=int(total_qty)
+        parts_with_totals = [
+            PartWithTotalModel(part=part, total_quantity=part.total_quantity)
+            for part in results
+        ]
+
+        self._attach_related_data(
+            parts_with_totals,
+            include_locations=include_locations,
+            include_kits=include_kits,
+            include_shopping_lists=include_shopping_lists,
+        )
+        return parts_with_totals
+
+    def get_parts_with_totals_by_keys(
+        self,
+        part_keys: Sequence[str],
+        include_locations: bool = False,
+        include_kits: bool = False,
+        include_shopping_lists: bool = False,
+    ) -> list['PartWithTotalModel']:
+        """Get several parts by key with full details in a fixed number of queries.
+
+        Type, seller links and cover attachment are always eager-loaded; the
+        optional data is bulk-loaded the same way as for the part list.
+
+        Args:
+            part_keys: Part keys to look up
+            include_locations: If True, bulk-load location data for all parts
+            include_kits: If True, bulk-load kit membership data for all parts
+            include_shopping_lists: If True, bulk-load shopping list membership data for all parts
+
+        Returns:
+            List of PartWithTotalModel instances in the order of ``part_keys``
+
+        Raises:
+            RecordNotFoundException: If any key does not exist
+        """
+        from app.models.attachment_set import AttachmentSet
+        from app.models.part import Part
+        from app.models.part_seller import PartSeller
+        from app.schemas.part import PartWithTotalModel
+
+        if not part_keys:
+            return []
+
+        stmt = (
+            select(Part)
+            .options(
+                selectinload(Part.type),
+                selectinload(Part.seller_links).selectinload(PartSeller.seller),
+                selectinload(Part.attachment_set).selectinload(AttachmentSet.cover_attachment),
             )
-            parts_with_totals.append(part_with_total)
+            .where(Part.key.in_(part_keys))
+        )
+        parts_by_key = {part.key: part for part in self.db.execute(stmt).scalars()}
+
+        for part_key in part_keys:
+            if part_key not in parts_by_key:
+                raise RecordNotFoundException("Part", part_key)
+
+        parts_with_totals = [
+            PartWithTotalModel(part=parts_by_key[key], total_quantity=parts_by_key[key].total_quantity)
+            for key in part_keys
+        ]
+
+        self._attach_related_data(
+            parts_with_totals,
+            include_locations=include_locations,
+            include_kits=include_kits,
+            include_shopping_lists=include_shopping_lists,
+        )
+        return parts_with_totals
 
-        # Bulk load optional data if requested
+    def _attach_related_data(
+        self,
+        parts_with_totals: Sequence['PartWithTotalModel'],
+        include_locations: bool,
+        include_kits: bool,
+        include_shopping_lists: bool,
+    ) -> None:
+        """Bulk-load optional related data and attach it to the parts."""
         if not parts_with_totals:
-            return parts_with_totals
+            return
 
         part_ids = [pwt.part.id for pwt in parts_with_totals]
 
@@ -409,7 +632,86 @@ class InventoryService:
                 memberships = shopping_list_memberships.get(part_with_total.part.id, [])
                 part_with_total.part._shopping_list_memberships_data = memberships
 
-        return parts_with_totals
+    def iter_parts_for_export(self, batch_size: int = 500) -> Iterator[dict[str, Any]]:
+        """Stream every part with its total, locations and seller links.
+
+        Parts are read through a server-side cursor in batches of
+        ``batch_size``; locations and seller links are bulk-loaded per batch.
+        Only plain column rows are selected so nothing accumulates in the
+        session identity map and memory stays flat regardless of inventory
+        size.
+
+        Args:
+            batch_size: Number of parts fetched from the cursor at a time
+
+        Yields:
+            One dictionary per part, ordered by part id
+        """
+        from app.models.part import Part
+        from app.models.part_seller import PartSeller
+        from app.models.seller import Seller
+        from app.models.type import Type
+
+        stmt = (
+            select(
+                Part.id,
+                Part.key,
+                Part.manufacturer_code,
+                Part.manufacturer,
+                Part.description,
+                Type.name.label("type_name"),
+                Part.tags,
+                Part.product_page,
+                Part.package,
+                Part.pin_count,
+                Part.pin_pitch,
+                Part.voltage_rating,
+                Part.input_voltage,
+                Part.output_voltage,
+                Part.mounting_type,
+                Part.series,
+                Part.dimensions,
+                Part.total_quantity,
+                Part.created_at,
+                Part.updated_at,
+            )
+            .outerjoin(Type, Part.type_id == Type.id)
+            .order_by(Part.id)
+            .execution_options(yield_per=batch_size)
+        )
+
+        for batch in self.db.execute(stmt).partitions():
+            part_ids = [row.id for row in batch]
+
+            locations_by_part_id: dict[int, list[dict[str, int]]] = {}
+            location_stmt = (
+                select(PartLocation.part_id, PartLocation.box_no, PartLocation.loc_no, PartLocation.qty)
+                .where(PartLocation.part_id.in_(part_ids))
+                .order_by(PartLocation.box_no, PartLocation.loc_no)
+            )
+            for part_id, box_no, loc_no, qty in self.db.execute(location_stmt):
+                locations_by_part_id.setdefault(part_id, []).append(
+                    {"box_no": box_no, "loc_no": loc_no, "qty": qty}
+                )
+
+            seller_links_by_part_id: dict[int, list[dict[str, str]]] = {}
+            seller_stmt = (
+                select(PartSeller.part_id, Seller.name, PartSeller.link)
+                .join(Seller, PartSeller.seller_id == Seller.id)
+                .where(PartSeller.part_id.in_(part_ids))
+                .order_by(Seller.name)
+            )
+            for part_id, seller_name, link in self.db.execute(seller_stmt):
+                seller_links_by_part_id.setdefault(part_id, []).append(
+                    {"seller_name": seller_name, "link": link}
+                )
+
+            for row in batch:
+                part_data = row._asdict()
+                part_id = part_data.pop("id")
+                part_data["locations"] = locations_by_part_id.get(part_id, [])
+                part_data["seller_links"] = seller_links_by_part_id.get(part_id, [])
+                yield part_data
 
     def get_total_quantities_by_part_keys(
         self,
@@ -423,15 +725,7 @@ class InventoryService:
 
         from app.models.part import Part
 
-        stmt = (
-            select(
-                Part.key,
-                func.coalesce(func.sum(PartLocation.qty), 0),
-            )
-            .join(Part, Part.id == PartLocation.part_id)
-            .where(Part.key.in_(lookup_keys))
-            .group_by(Part.key)
-        )
+        stmt = select(Part.key, Part.total_quantity).where(Part.key.in_(lookup_keys))
 
         totals = dict.fromkeys(part_keys, 0)
         for key, total in self.db.execute(stmt).all():
@@ -439,9 +733,136 @@ class InventoryService:
 
         return totals
 
-    def _get_location(self, box_no: int, loc_no: int) -> Location | None:
-        """Get location by box_no and loc_no."""
-        stmt = select(Location).where(
-            and_(Location.box_no == box_no, Location.loc_no == loc_no)
+    def check_total_quantities(self, repair: bool = False) -> list[tuple[str, int, int]]:
+        """Compare denormalized part totals against the sum of their locations.
+
+        Args:
+            repair: If True, overwrite every drifted total with the actual sum
+
+        Returns:
+            List of (part key, stored total, actual total) for each drifted part
+        """
+        from app.models.part import Part
+
+        actual_total = (
+            select(func.coalesce(func.sum(PartLocation.qty), 0))
+            .where(PartLocation.part_id == Part.id)
+            .correlate(Part)
+            .scalar_subquery()
+        )
+        stmt = (
+            select(Part.id, Part.key, Part.total_quantity, actual_total)
+            .where(Part.total_quantity != actual_total)
+            .order_by(Part.key)
         )
-        return self.db.execute(stmt).scalar_one_or_none()
+        drifted = self.db.execute(stmt).all()
+
+        if repair:
+            for part_id, _key, _stored, actual in drifted:
+                self.db.execute(
+                    update(Part)
+                    .where(Part.id == part_id)
+                    .values(total_quantity=actual, updated_at=Part.updated_at)
+                    .execution_options(synchronize_session="fetch")
+                )
+            self.db.flush()
+
+        return [(key, stored, int(actual)) for _id, key, stored, actual in drifted]
+
+    def _get_part_id(self, part_key: str) -> int:
+        """Resolve a part key to its id without loading the part."""
+        from app.models.part import Part
+        part_id = self.db.execute(select(Part.id).where(Part.key == part_key)).scalar_one_or_none()
+        if part_id is None:
+            raise RecordNotFoundException("Part", part_key)
+        return part_id
+
+    def _get_location_id(self, box_no: int, loc_no: int) -> int:
+        """Resolve a location to its id, raising if it does not exist."""
+        location_id = self.db.execute(
+            select(Location.id).where(and_(Location.box_no == box_no, Location.loc_no == loc_no))
+        ).scalar_one_or_none()
+        if location_id is None:
+            raise RecordNotFoundException("Location", f"{box_no}-{loc_no}")
+        return location_id
+
+    def _put_stock(self, part_id: int, location_id: int, box_no: int, loc_no: int, qty: int) -> PartLocation:
+        """Add qty of a part to a location with a single upsert."""
+        values = {"part_id": part_id, "box_no": box_no, "loc_no": loc_no, "location_id": location_id, "qty": qty}
+        index_elements = [PartLocation.part_id, PartLocation.box_no, PartLocation.loc_no]
+        set_ = {"qty": PartLocation.qty + qty, "updated_at": func.now()}
+        bind = self.db.bind
+        upsert: Insert
+        if bind is not None and bind.dialect.name == "sqlite":
+            upsert = sqlite.insert(PartLocation).values(values).on_conflict_do_update(
+                index_elements=index_elements, set_=set_
+            )
+        else:
+            upsert = postgresql.insert(PartLocation).values(values).on_conflict_do_update(
+                index_elements=index_elements, set_=set_
+            )
+        stmt = upsert.returning(PartLocation).execution_options(populate_existing=True)
+        part_location = self.db.execute(stmt).scalar_one()
+        mark_location_occupied(self.db, location_id)
+        record_inventory_change(self.db, part_ids=[part_id], box_nos=[box_no])
+        return part_location
+
+    def _take_stock(self, part_id: int, part_key: str, box_no: int, loc_no: int, qty: int) -> None:
+        """Remove qty of a part from a location atomically.
+
+        A partial removal is one conditional UPDATE and emptying the location
+        one conditional DELETE (the check constraint forbids a zero quantity).
+        Only when neither matches is the current quantity read, to report the
+        failure; if it changed in between the attempt is repeated.
+
+        Raises:
+            RecordNotFoundException: If the location does not hold the part
+            InsufficientQuantityException: If the location holds less than qty
+            InvalidOperationException: If the quantity kept changing between
+                the attempts
+        """
+        at_location = and_(
+            PartLocation.part_id == part_id,
+            PartLocation.box_no == box_no,
+            PartLocation.loc_no == loc_no,
+        )
+        record_inventory_change(self.db, part_ids=[part_id], box_nos=[box_no])
+        for _attempt in range(_TAKE_STOCK_ATTEMPTS):
+            updated = self.db.execute(
+                update(PartLocation)
+                .where(at_location, PartLocation.qty > qty)
+                .values(qty=PartLocation.qty - qty)
+                .returning(PartLocation.id)
+                .execution_options(synchronize_session="fetch")
+            ).first()
+            if updated is not None:
+                return
+
+            deleted = self.db.execute(
+                delete(PartLocation)
+                .where(at_location, PartLocation.qty == qty)
+                .returning(PartLocation.location_id)
+                .execution_options(synchronize_session="fetch")
+            ).first()
+            if deleted is not None:
+                refresh_location_occupancy(self.db, deleted.location_id)
+                return
+
+            available = self.db.execute(select(PartLocation.qty).where(at_location)).scalar_one_or_none()
+            if available is None:
+                raise RecordNotFoundException("Part location", f"{part_key} at {box_no}-{loc_no}")
+            if available < qty:
+                raise InsufficientQuantityException(qty, available, f"{box_no}-{loc_no}")
+
+        # Enough stock every time, but concurrent writes changed it in between
+        raise InvalidOperationException(
+            "remove stock", f"the quantity at {box_no}-{loc_no} kept changing concurrently"
+        )
+
+    def _record_stock_change(self, part_id: int, delta: int) -> None:
+        """Bring the part's counters and loaded state in line with an atomic stock write."""
+        from app.models.part import Part
+        apply_total_quantity_delta(self.db, part_id, delta)
+        part = self.db.identity_map.get(Session.identity_key(Part, part_id))
+        if part is not None:
+            self.db.expire(part, ["part_locations"])
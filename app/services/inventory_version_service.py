@@ -0,0 +1,28 @@
+"""Inventory version service for change detection on read endpoints."""
+
+from typing import TYPE_CHECKING
+
+from sqlalchemy import select
+
+from app.models.inventory_version import InventoryVersion
+
+if TYPE_CHECKING:
+    from sqlalchemy.orm import Session
+
+
+class InventoryVersionService:
+    """Service class for reading the global inventory version.
+
+    The version is bumped by app.utils.inventory_version_tracking in every
+    transaction that writes inventory data.
+    """
+
+    def __init__(self, db: "Session") -> None:
+        self.db = db
+
+    def get_version(self) -> int:
+        """Return the current inventory version (0 before the first write)."""
+        stmt = select(InventoryVersion.version).where(
+            InventoryVersion.id == InventoryVersion.SINGLETON_ID
+        )
+        return self.db.execute(stmt).scalar_one_or_none() or 0
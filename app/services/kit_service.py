@@ -2,7 +2,9 @@
 
 from __future__ import annotations
 
+from collections import defaultdict
 from collections.abc import Sequence
+from dataclasses import dataclass, field
 from datetime import UTC, datetime
 from time import perf_counter
 from typing import Any
@@ -58,6 +60,29 @@ KIT_CONTENT_UPDATE_DURATION_SECONDS = Histogram(
 MAX_BULK_KIT_QUERY = 100
 
 
+@dataclass(frozen=True, slots=True)
+class KitShortfallPart:
+    """A kit content that cannot be covered for the kit's build target."""
+
+    part_key: str
+    total_required: int
+    available: int
+    shortfall: int
+
+
+@dataclass(slots=True)
+class KitAvailability:
+    """Buildability of an active kit from current stock."""
+
+    kit_id: int
+    name: str
+    build_target: int
+    buildable: bool = True
+    # None for kits without contents, which are not limited by stock
+    max_buildable_units: int | None = None
+    shortfall_parts: list[KitShortfallPart] = field(default_factory=list)
+
+
 class KitService:
     """Service encapsulating kit overview operations and lifecycle rules."""
 
@@ -274,6 +299,72 @@ class KitService:
         KIT_DETAIL_VIEWS_TOTAL.inc()
         return kit
 
+    def get_active_kit_availability(self) -> list[KitAvailability]:
+        """Return the buildability of every active kit, in overview order.
+
+        Contents are evaluated as in ``get_kit_detail``: a part's available
+        quantity is its stock minus what the other active kits reserve for
+        their build targets, and a content falls short when that does not
+        cover its own build target. A kit is buildable when no content falls
+        short, and can build as many units as its scarcest content allows.
+
+        The active kits' contents are exactly the reservations, so kits,
+        contents and part totals are read in one statement and the
+        reservations are summed from the same rows.
+        """
+        stmt = (
+            select(
+                Kit.id.label("kit_id"),
+                Kit.name,
+                Kit.build_target,
+                KitContent.part_id,
+                KitContent.required_per_unit,
+                Part.key.label("part_key"),
+                Part.total_quantity,
+            )
+            .outerjoin(KitContent, KitContent.kit_id == Kit.id)
+            .outerjoin(Part, Part.id == KitContent.part_id)
+            .where(Kit.status == KitStatus.ACTIVE)
+            .order_by(Kit.updated_at.desc(), Kit.id, Part.key)
+        )
+        rows = self.db.execute(stmt).all()
+
+        reserved_by_part: dict[int, int] = defaultdict(int)
+        for row in rows:
+            if row.part_id is not None:
+                reserved_by_part[row.part_id] += row.required_per_unit * row.build_target
+
+        kits: dict[int, KitAvailability] = {}
+        for row in rows:
+            availability = kits.get(row.kit_id)
+            if availability is None:
+                availability = kits[row.kit_id] = KitAvailability(
+                    kit_id=row.kit_id,
+                    name=row.name,
+                    build_target=row.build_target,
+                )
+            if row.part_id is None:
+                continue
+
+            total_required = row.required_per_unit * row.build_target
+            peer_reserved = reserved_by_part[row.part_id] - total_required
+            available = max((row.total_quantity or 0) - peer_reserved, 0)
+            shortfall = max(total_required - available, 0)
+
+            units = available // row.required_per_unit
+            if availability.max_buildable_units is None or units < availability.max_buildable_units:
+                availability.max_buildable_units = units
+            if shortfall:
+                availability.buildable = False
+                availability.shortfall_parts.append(KitShortfallPart(
+                    part_key=row.part_key,
+                    total_required=total_required,
+                    available=available,
+                    shortfall=shortfall,
+                ))
+
+        return list(kits.values())
+
     def get_active_kit_for_flow(self, kit_id: int, *, operation: str) -> Kit:
         """Ensure kit exists and is active before proceeding with workflow."""
         kit = self.db.get(Kit, kit_id)
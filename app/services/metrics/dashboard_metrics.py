@@ -1,19 +1,39 @@
-"""Periodic dashboard gauge metrics updated via background polling.
+"""Dashboard gauge metrics maintained from inventory change events.
 
-These gauges are refreshed on each polling tick by a callback registered
-with MetricsService.  The callback queries DashboardService for current
-inventory, storage, and category statistics.
+A full reconcile loads the parts, boxes and types the gauges are derived
+from into an in-process shadow state and sets every gauge. After that,
+committed inventory changes (see app.utils.inventory_change_events) are
+queued, and each polling tick re-reads only the parts, boxes and types named
+in the queue and applies the differences to the gauges. A tick without
+changes does not touch the database.
+
+The full reconcile still runs every reconcile interval as a safety net. It
+picks up writes the events do not see, such as those of other processes or
+raw SQL, and it moves the 7 and 30 day change windows forward.
 """
 
 from __future__ import annotations
 
 import logging
-from collections.abc import Callable
+import threading
+from dataclasses import dataclass
+from time import monotonic
 from typing import TYPE_CHECKING
 
 from prometheus_client import Gauge
+from sqlalchemy import select
+
+from app.models.attachment_set import AttachmentSet
+from app.models.box import Box
+from app.models.part import Part
+from app.models.type import Type
+from app.services.dashboard_service import LOW_STOCK_THRESHOLD
+from app.utils.inventory_change_events import InventoryChange, subscribe, unsubscribe
+from app.utils.lifecycle_coordinator import LifecycleEvent
 
 if TYPE_CHECKING:
+    from sqlalchemy.orm import Session
+
     from app.services.container import ServiceContainer
 
 logger = logging.getLogger(__name__)
@@ -63,64 +83,218 @@ INVENTORY_PARTS_BY_TYPE = Gauge(
 )
 
 
-def create_dashboard_polling_callback(
-    container: ServiceContainer,
-) -> Callable[[], None]:
-    """Return a closure that updates all dashboard gauges.
+@dataclass(frozen=True)
+class _PartState:
+    type_id: int | None
+    total_quantity: int
+    documented: bool
+
+    @property
+    def low_stock(self) -> bool:
+        return 0 < self.total_quantity <= LOW_STOCK_THRESHOLD
+
+
+@dataclass(frozen=True)
+class _BoxState:
+    capacity: int
+    occupied: int
+
+    @property
+    def usage_percentage(self) -> float:
+        return round(self.occupied / self.capacity * 100, 1) if self.capacity > 0 else 0
+
+
+def _remove_label(gauge: Gauge, value: str) -> None:
+    try:
+        gauge.remove(value)
+    except KeyError:
+        pass
 
-    The closure follows the singleton session pattern:
-    try / commit / except / rollback / finally / reset.
 
-    Args:
-        container: The DI service container (captured by the closure).
+class DashboardGaugeUpdater:
+    """Keeps the dashboard gauges current by applying inventory change events.
+
+    Call ``start`` to subscribe to change events and register ``poll`` with
+    MetricsService; the first tick runs a full reconcile.
     """
 
-    def _poll() -> None:
-        session = container.db_session()
+    def __init__(self, container: ServiceContainer, reconcile_interval_seconds: float) -> None:
+        self.container = container
+        self.reconcile_interval_seconds = reconcile_interval_seconds
 
-        try:
-            dashboard_service = container.dashboard_service()
-
-            # Inventory stats
-            stats = dashboard_service.get_dashboard_stats()
-            INVENTORY_TOTAL_PARTS.set(stats["total_parts"])
-            INVENTORY_TOTAL_QUANTITY.set(stats["total_quantity"])
-            INVENTORY_LOW_STOCK_PARTS.set(stats["low_stock_count"])
-            INVENTORY_RECENT_CHANGES_7D.set(stats["changes_7d"])
-            INVENTORY_RECENT_CHANGES_30D.set(stats["changes_30d"])
-
-            # Parts without docs
-            undocumented = dashboard_service.get_parts_without_documents()
-            INVENTORY_PARTS_WITHOUT_DOCS.set(undocumented["count"])
-
-            # Storage summary (per-box utilization)
-            storage_summary = dashboard_service.get_storage_summary()
-            INVENTORY_BOX_UTILIZATION_PERCENT.clear()
-            for box_data in storage_summary:
-                box_no = str(box_data["box_no"])
-                utilization = box_data["usage_percentage"]
-                INVENTORY_BOX_UTILIZATION_PERCENT.labels(box_no=box_no).set(
-                    utilization
-                )
-            INVENTORY_TOTAL_BOXES.set(len(storage_summary))
-
-            # Category distribution
-            category_distribution = dashboard_service.get_category_distribution()
-            INVENTORY_PARTS_BY_TYPE.clear()
-            for category_data in category_distribution:
-                type_name = category_data["type_name"]
-                part_count = category_data["part_count"]
-                INVENTORY_PARTS_BY_TYPE.labels(type_name=type_name).set(
-                    part_count
-                )
+        self._lock = threading.Lock()
+        self._pending = InventoryChange()
+        self._last_reconcile: float | None = None
 
-            session.commit()
+        # Shadow state from the last reconcile plus the changes applied since
+        self._parts: dict[int, _PartState] = {}
+        self._boxes: dict[int, _BoxState] = {}
+        self._type_names: dict[int, str] = {}
+        self._type_counts: dict[int, int] = {}
+        self._total_quantity = 0
+        self._low_stock = 0
+        self._undocumented = 0
+        self._changes_7d = 0
+        self._changes_30d = 0
+
+    def start(self) -> None:
+        """Subscribe to inventory changes and register for metrics polling."""
+        subscribe(self.on_inventory_change)
+        self.container.metrics_service().register_for_polling("dashboard_gauges", self.poll)
+        self.container.lifecycle_coordinator().register_lifecycle_notification(self._on_lifecycle_event)
 
+    def on_inventory_change(self, change: InventoryChange) -> None:
+        """Queue a committed change for the next tick."""
+        with self._lock:
+            self._pending.merge(change)
+
+    def poll(self) -> None:
+        """Apply queued changes, or run a full reconcile when one is due.
+
+        Follows the singleton session pattern:
+        try / commit / except / rollback / finally / reset.
+        """
+        reconcile_due = (
+            self._last_reconcile is None
+            or monotonic() - self._last_reconcile >= self.reconcile_interval_seconds
+        )
+        with self._lock:
+            change, self._pending = self._pending, InventoryChange()
+        if not reconcile_due and not change:
+            return
+
+        session = self.container.db_session()
+        try:
+            if reconcile_due:
+                # Changes committed before the swap are in the reconciled state
+                self.reconcile(session)
+            else:
+                self.apply_change(session, change)
+            session.commit()
         except Exception as e:
             session.rollback()
-            logger.error("Error in dashboard polling callback: %s", e)
-
+            if not reconcile_due:
+                # Retry the change on the next tick
+                self.on_inventory_change(change)
+            logger.error("Error in dashboard gauge update: %s", e)
         finally:
-            container.db_session.reset()
+            self.container.db_session.reset()
+
+    def reconcile(self, session: Session) -> None:
+        """Reload the complete shadow state and set every gauge."""
+        self._parts = self._load_parts(session, None)
+        self._boxes = self._load_boxes(session, None)
+        self._type_names = dict(session.execute(select(Type.id, Type.name)).tuples().all())
+
+        self._type_counts = dict.fromkeys(self._type_names, 0)
+        self._total_quantity = self._low_stock = self._undocumented = 0
+        for state in self._parts.values():
+            self._add_part(state, 1)
+
+        stats = self.container.dashboard_service().get_dashboard_stats()
+        self._changes_7d = stats["changes_7d"]
+        self._changes_30d = stats["changes_30d"]
+
+        INVENTORY_BOX_UTILIZATION_PERCENT.clear()
+        INVENTORY_PARTS_BY_TYPE.clear()
+        self._publish(self._boxes, self._type_names)
+        self._last_reconcile = monotonic()
+
+    def apply_change(self, session: Session, change: InventoryChange) -> None:
+        """Re-read the entities named by a change and apply the differences."""
+        renamed: dict[int, str] = {}
+        if change.type_ids:
+            names = dict(session.execute(
+                select(Type.id, Type.name).where(Type.id.in_(change.type_ids))
+            ).tuples().all())
+            for type_id in change.type_ids:
+                old_name = self._type_names.pop(type_id, None)
+                if old_name is not None and names.get(type_id) != old_name:
+                    _remove_label(INVENTORY_PARTS_BY_TYPE, old_name)
+                if type_id in names:
+                    self._type_names[type_id] = renamed[type_id] = names[type_id]
+                    self._type_counts.setdefault(type_id, 0)
+                else:
+                    self._type_counts.pop(type_id, None)
+
+        part_ids = set(change.part_ids)
+        if change.attachment_set_ids:
+            part_ids.update(session.execute(
+                select(Part.id).where(Part.attachment_set_id.in_(change.attachment_set_ids))
+            ).scalars())
+        if part_ids:
+            loaded = self._load_parts(session, part_ids)
+            for part_id in part_ids:
+                old, new = self._parts.pop(part_id, None), loaded.get(part_id)
+                if old is not None:
+                    self._add_part(old, -1)
+                if new is not None:
+                    self._add_part(new, 1)
+                    self._parts[part_id] = new
+
+        touched_boxes: dict[int, _BoxState] = {}
+        if change.box_nos:
+            loaded_boxes = self._load_boxes(session, change.box_nos)
+            for box_no in change.box_nos:
+                if box_no in loaded_boxes:
+                    self._boxes[box_no] = touched_boxes[box_no] = loaded_boxes[box_no]
+                elif self._boxes.pop(box_no, None) is not None:
+                    _remove_label(INVENTORY_BOX_UTILIZATION_PERCENT, str(box_no))
+
+        self._changes_7d += change.history_rows
+        self._changes_30d += change.history_rows
+
+        # Part type moves change the counts of types not named in the change
+        self._publish(touched_boxes, self._type_names if part_ids else renamed)
+
+    def shutdown(self) -> None:
+        """Stop receiving change events."""
+        unsubscribe(self.on_inventory_change)
+
+    def _load_parts(self, session: Session, part_ids: set[int] | None) -> dict[int, _PartState]:
+        stmt = select(
+            Part.id, Part.type_id, Part.total_quantity, AttachmentSet.attachment_count > 0
+        ).join(AttachmentSet, Part.attachment_set_id == AttachmentSet.id)
+        if part_ids is not None:
+            stmt = stmt.where(Part.id.in_(part_ids))
+        return {
+            part_id: _PartState(type_id, total_quantity, bool(documented))
+            for part_id, type_id, total_quantity, documented in session.execute(stmt)
+        }
+
+    def _load_boxes(self, session: Session, box_nos: set[int] | None) -> dict[int, _BoxState]:
+        stmt = select(Box.box_no, Box.capacity, Box.occupied_locations)
+        if box_nos is not None:
+            stmt = stmt.where(Box.box_no.in_(box_nos))
+        return {
+            box_no: _BoxState(capacity, occupied)
+            for box_no, capacity, occupied in session.execute(stmt)
+        }
+
+    def _add_part(self, state: _PartState, sign: int) -> None:
+        """Add a part's contribution to the running totals (sign 1) or take it out (-1)."""
+        self._total_quantity += sign * state.total_quantity
+        self._low_stock += sign * state.low_stock
+        self._undocumented += sign * (not state.documented)
+        if state.type_id is not None and state.type_id in self._type_counts:
+            self._type_counts[state.type_id] += sign
+
+    def _publish(self, boxes: dict[int, _BoxState], type_names: dict[int, str]) -> None:
+        """Set the scalar gauges and the labelled gauges of the given boxes and types."""
+        INVENTORY_TOTAL_PARTS.set(len(self._parts))
+        INVENTORY_TOTAL_QUANTITY.set(self._total_quantity)
+        INVENTORY_LOW_STOCK_PARTS.set(self._low_stock)
+        INVENTORY_PARTS_WITHOUT_DOCS.set(self._undocumented)
+        INVENTORY_RECENT_CHANGES_7D.set(self._changes_7d)
+        INVENTORY_RECENT_CHANGES_30D.set(self._changes_30d)
+        INVENTORY_TOTAL_BOXES.set(len(self._boxes))
+
+        for box_no, box_state in boxes.items():
+            INVENTORY_BOX_UTILIZATION_PERCENT.labels(box_no=str(box_no)).set(box_state.usage_percentage)
+        for type_id, type_name in type_names.items():
+            INVENTORY_PARTS_BY_TYPE.labels(type_name=type_name).set(self._type_counts.get(type_id, 0))
 
-    return _poll
+    def _on_lifecycle_event(self, event: LifecycleEvent) -> None:
+        match event:
+            case LifecycleEvent.SHUTDOWN:
+                self.shutdown()
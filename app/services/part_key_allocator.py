@@ -0,0 +1,237 @@
+"""In-process allocator for 4-letter part keys.
+
+Part keys are four uppercase letters, a space of only 26^4 = 456,976 keys.
+Picking random keys and probing the database gets slower and less reliable
+as the inventory fills up. This allocator keeps a bitmap of used keys
+(one bit per key, ~56 KiB), loaded once from ``parts.key``, and picks free
+keys from it without touching the database.
+
+The bitmap is only authoritative for this process. Before keys are handed
+out they are checked against ``parts.key`` in a single query, so keys taken
+by another process since the bitmap was loaded are skipped; the unique
+constraint on ``parts.key`` remains the final guard (see
+``is_part_key_conflict``).
+
+The bitmap follows the transaction that allocated or freed a key: keys
+allocated in a transaction that rolls back are freed again, and keys of
+deleted parts are only freed once the deletion commits.
+"""
+
+import logging
+import random
+import string
+import threading
+from collections.abc import Iterable
+
+from prometheus_client import Gauge
+from sqlalchemy import event, select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session, SessionTransaction
+
+from app.exceptions import InvalidOperationException
+from app.models.part import Part
+
+logger = logging.getLogger(__name__)
+
+KEY_LENGTH = 4
+KEY_ALPHABET = string.ascii_uppercase
+KEY_SPACE_SIZE = len(KEY_ALPHABET) ** KEY_LENGTH
+
+PART_KEY_SPACE_UTILIZATION = Gauge(
+    "part_key_space_utilization_ratio",
+    "Fraction of the 4-letter part key space in use",
+)
+
+# Random probes before falling back to a scan for a free slot
+_MAX_RANDOM_PROBES = 16
+
+# Session.info keys mapping allocators to keys allocated or freed in the
+# session's current transaction
+_ALLOCATED_KEYS_KEY = "part_key_allocator_allocated"
+_RELEASED_KEYS_KEY = "part_key_allocator_released"
+
+# Names of the parts.key unique constraint in PostgreSQL and SQLite errors
+_PART_KEY_CONSTRAINT_MARKERS = ("parts_key_key", "parts.key")
+
+
+def key_to_index(key: str) -> int | None:
+    """Map a part key to its bitmap index, or None if it is not a 4-letter key."""
+    if len(key) != KEY_LENGTH:
+        return None
+    index = 0
+    for char in key:
+        digit = KEY_ALPHABET.find(char)
+        if digit < 0:
+            return None
+        index = index * len(KEY_ALPHABET) + digit
+    return index
+
+
+def index_to_key(index: int) -> str:
+    """Map a bitmap index back to its part key."""
+    chars = []
+    for _ in range(KEY_LENGTH):
+        index, digit = divmod(index, len(KEY_ALPHABET))
+        chars.append(KEY_ALPHABET[digit])
+    return "".join(reversed(chars))
+
+
+def is_part_key_conflict(exc: IntegrityError) -> bool:
+    """Check whether an insert failed on the parts.key unique constraint."""
+    message = str(exc.orig)
+    return any(marker in message for marker in _PART_KEY_CONSTRAINT_MARKERS)
+
+
+class PartKeyAllocator:
+    """Hands out unused part keys from an in-memory bitmap of the key space."""
+
+    def __init__(self) -> None:
+        """Initialize an empty allocator; the bitmap is loaded on first use."""
+        self._bitmap = bytearray((KEY_SPACE_SIZE + 7) // 8)
+        self._used_count = 0
+        self._loaded = False
+        self._lock = threading.Lock()
+
+    @property
+    def used_count(self) -> int:
+        """Number of keys currently marked as used."""
+        return self._used_count
+
+    def allocate(self, db: Session, count: int = 1) -> list[str]:
+        """Allocate count distinct keys that are not used by any part.
+
+        Args:
+            db: Session used to load the bitmap and verify the picked keys
+            count: Number of keys to allocate
+
+        Returns:
+            The allocated keys, already marked as used; they are freed again
+            if the session's transaction rolls back
+
+        Raises:
+            InvalidOperationException: If the key space is exhausted
+        """
+        with self._lock:
+            if not self._loaded:
+                self._load(db)
+
+            keys: list[str] = []
+            while len(keys) < count:
+                candidates = [self._take_free_index() for _ in range(count - len(keys))]
+                candidate_keys = [index_to_key(index) for index in candidates]
+
+                # Another process may have used some of these keys since the
+                # bitmap was loaded; they stay marked and are replaced
+                stmt = select(Part.key).where(Part.key.in_(candidate_keys))
+                taken = set(db.execute(stmt).scalars())
+                if taken:
+                    logger.info("Skipping %d part keys used by another process", len(taken))
+                keys.extend(key for key in candidate_keys if key not in taken)
+
+            self._update_metric()
+
+        db.info.setdefault(_ALLOCATED_KEYS_KEY, {}).setdefault(self, []).extend(keys)
+        return keys
+
+    def release(self, keys: Iterable[str], db: Session | None = None) -> None:
+        """Mark keys as free again right away.
+
+        Args:
+            keys: Keys to free
+            db: Session the keys were allocated in, if any; they are no longer
+                freed again when its transaction rolls back
+        """
+        keys = list(keys)
+        if db is not None:
+            allocated = db.info.get(_ALLOCATED_KEYS_KEY, {}).get(self)
+            if allocated:
+                allocated[:] = [key for key in allocated if key not in keys]
+
+        with self._lock:
+            if not self._loaded:
+                return
+            for key in keys:
+                index = key_to_index(key)
+                if index is not None and self._is_used(index):
+                    self._bitmap[index >> 3] &= ~(1 << (index & 7)) & 0xFF
+                    self._used_count -= 1
+            self._update_metric()
+
+    def release_on_commit(self, db: Session, keys: Iterable[str]) -> None:
+        """Mark the keys of deleted parts as free once the session commits."""
+        db.info.setdefault(_RELEASED_KEYS_KEY, {}).setdefault(self, []).extend(keys)
+
+    def reset(self) -> None:
+        """Forget the bitmap so it is reloaded from the database on next use."""
+        with self._lock:
+            self._bitmap = bytearray(len(self._bitmap))
+            self._used_count = 0
+            self._loaded = False
+
+    def _load(self, db: Session) -> None:
+        """Mark every existing part key as used."""
+        for key in db.execute(select(Part.key)).scalars():
+            index = key_to_index(key)
+            if index is not None:
+                self._mark_used(index)
+        self._loaded = True
+        logger.info("Loaded %d part keys into key allocator", self._used_count)
+
+    def _is_used(self, index: int) -> bool:
+        return bool(self._bitmap[index >> 3] & (1 << (index & 7)))
+
+    def _mark_used(self, index: int) -> None:
+        if not self._is_used(index):
+            self._bitmap[index >> 3] |= 1 << (index & 7)
+            self._used_count += 1
+
+    def _take_free_index(self) -> int:
+        """Pick a random free index and mark it as used."""
+        if self._used_count >= KEY_SPACE_SIZE:
+            raise InvalidOperationException("allocate part key", "all part keys are in use")
+
+        # Random probing succeeds almost immediately until the space is nearly full
+        for _ in range(_MAX_RANDOM_PROBES):
+            index = random.randrange(KEY_SPACE_SIZE)
+            if not self._is_used(index):
+                self._mark_used(index)
+                return index
+
+        # Nearly full: scan bytes from a random offset for one with a clear bit
+        start = random.randrange(len(self._bitmap))
+        for offset in range(len(self._bitmap)):
+            byte_index = (start + offset) % len(self._bitmap)
+            byte = self._bitmap[byte_index]
+            if byte == 0xFF:
+                continue
+            for bit in range(8):
+                index = (byte_index << 3) | bit
+                if index < KEY_SPACE_SIZE and not byte & (1 << bit):
+                    self._mark_used(index)
+                    return index
+
+        raise InvalidOperationException("allocate part key", "all part keys are in use")
+
+    def _update_metric(self) -> None:
+        PART_KEY_SPACE_UTILIZATION.set(self._used_count / KEY_SPACE_SIZE)
+
+
+@event.listens_for(Session, "after_commit")
+def _apply_released_keys(session: Session) -> None:
+    """Keep keys allocated in the committed transaction and free deleted ones."""
+    if session.in_nested_transaction():
+        # Released savepoint; the outer transaction can still roll back
+        return
+    session.info.pop(_ALLOCATED_KEYS_KEY, None)
+    for allocator, keys in session.info.pop(_RELEASED_KEYS_KEY, {}).items():
+        allocator.release(keys)
+
+
+@event.listens_for(Session, "after_transaction_end")
+def _release_uncommitted_keys(session: Session, transaction: SessionTransaction) -> None:
+    """Free keys allocated in a transaction that ended without committing."""
+    if transaction.parent is not None:
+        return
+    for allocator, keys in session.info.pop(_ALLOCATED_KEYS_KEY, {}).items():
+        allocator.release(keys)
+    session.info.pop(_RELEASED_KEYS_KEY, None)
@@ -1,45 +1,111 @@
 """Part service for managing electronics parts."""
 
-import random
-import string
-from collections.abc import Sequence
+import logging
+from collections.abc import Callable, Sequence
+from dataclasses import dataclass, field
 from typing import Any
 
-from sqlalchemy import func, select
+from sqlalchemy import (
+    ColumnElement,
+    Float,
+    Integer,
+    Select,
+    SQLColumnExpression,
+    String,
+    and_,
+    case,
+    cast,
+    func,
+    insert,
+    literal,
+    literal_column,
+    or_,
+    select,
+    true,
+    tuple_,
+    union_all,
+)
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import selectinload
 
 from app.exceptions import InvalidOperationException, RecordNotFoundException
+from app.models.attachment_set import AttachmentSet
 from app.models.part import Part
-from app.models.part_location import PartLocation
+from app.models.part_seller import PartSeller
+from app.models.type import Type
+from app.services.part_key_allocator import PartKeyAllocator, is_part_key_conflict
+from app.utils.manufacturer_code import (
+    TRIGRAM_SIMILARITY_THRESHOLD,
+    normalize_manufacturer_code,
+    trigram_similarity,
+)
+
+logger = logging.getLogger(__name__)
+
+# Text search configuration used for parts.search_vector (see migration 026)
+PART_SEARCH_CONFIG = "english"
+
+# Part attributes offered as facets, in response order
+PART_FACETS = ("type_id", "package", "mounting_type", "series", "voltage_rating", "in_stock")
+
+
+@dataclass(frozen=True, slots=True)
+class PartFacetFilters:
+    """Facet selection for a faceted part search.
+
+    Values selected within one facet are alternatives; different facets and
+    all tags must match together. An empty selection leaves a facet open.
+    """
+
+    type_ids: tuple[int, ...] = ()
+    packages: tuple[str, ...] = ()
+    mounting_types: tuple[str, ...] = ()
+    series: tuple[str, ...] = ()
+    voltage_ratings: tuple[str, ...] = ()
+    tags: tuple[str, ...] = ()
+    in_stock: bool | None = None
+
+
+@dataclass(slots=True)
+class PartFacetSearchResult:
+    """A page of faceted search results with per-facet value counts."""
+
+    parts: list[Part]
+    total: int
+    # Facet name -> (value, count) pairs, most frequent first
+    facets: dict[str, list[tuple[Any, int]]] = field(default_factory=dict)
+    # Names of the types counted in the type_id facet
+    type_names: dict[int, str] = field(default_factory=dict)
 
 
 class PartService:
     """Service class for part management operations."""
 
-    def __init__(self, db: Any, attachment_set_service: Any):
+    def __init__(
+        self,
+        db: Any,
+        attachment_set_service: Any,
+        part_key_allocator: PartKeyAllocator | None = None,
+    ):
         """Initialize part service with dependencies.
 
         Args:
             db: SQLAlchemy database session
             attachment_set_service: Attachment set service for managing attachments (required)
+            part_key_allocator: Shared key allocator; a private one is used if omitted
         """
         self.db = db
         self.attachment_set_service = attachment_set_service
+        self.part_key_allocator = part_key_allocator or PartKeyAllocator()
 
     def generate_part_key(self) -> str:
-        """Generate unique 4-character part key with collision handling."""
-        max_attempts = 3
-        for _ in range(max_attempts):
-            # Generate 4 random uppercase letters
-            key = "".join(random.choices(string.ascii_uppercase, k=4))
-
-            # Check if key already exists
-            stmt = select(Part).where(Part.key == key)
-            existing = self.db.execute(stmt).scalar_one_or_none()
-            if not existing:
-                return key
+        """Allocate a unique 4-character part key."""
+        return self.part_key_allocator.allocate(self.db)[0]
 
-        raise InvalidOperationException("generate unique part key", f"failed after {max_attempts} attempts")
+    def generate_part_keys(self, count: int) -> list[str]:
+        """Allocate count unique 4-character part keys with a single lookup."""
+        return self.part_key_allocator.allocate(self.db, count)
 
     def create_part(
         self,
@@ -64,43 +130,112 @@ class PartService:
         Every part gets an AttachmentSet created during part creation to
         enforce the invariant that all parts have an attachment set.
         """
-        key = self.generate_part_key()
-
         # Create attachment set first (eager creation)
         attachment_set = self.attachment_set_service.create_attachment_set()
         attachment_set_id = attachment_set.id
 
-        part = Part(
-            key=key,
-            manufacturer_code=manufacturer_code,
-            type_id=type_id,
-            description=description,
-            tags=tags,
-            manufacturer=manufacturer,
-            product_page=product_page,
-            package=package,
-            pin_count=pin_count,
-            pin_pitch=pin_pitch,
-            voltage_rating=voltage_rating,
-            input_voltage=input_voltage,
-            output_voltage=output_voltage,
-            mounting_type=mounting_type,
-            series=series,
-            dimensions=dimensions,
-            attachment_set_id=attachment_set_id,
-        )
-        self.db.add(part)
-        self.db.flush()  # Get the ID immediately
-        return part
+        fields: dict[str, Any] = {
+            "manufacturer_code": manufacturer_code,
+            "type_id": type_id,
+            "description": description,
+            "tags": tags,
+            "manufacturer": manufacturer,
+            "product_page": product_page,
+            "package": package,
+            "pin_count": pin_count,
+            "pin_pitch": pin_pitch,
+            "voltage_rating": voltage_rating,
+            "input_voltage": input_voltage,
+            "output_voltage": output_voltage,
+            "mounting_type": mounting_type,
+            "series": series,
+            "dimensions": dimensions,
+            "attachment_set_id": attachment_set_id,
+        }
+
+        def build_parts(keys: list[str]) -> list[Part]:
+            return [Part(key=keys[0], **fields)]
+
+        return self._insert_parts_with_new_keys(1, build_parts)[0]
+
+    def create_parts(self, parts_data: Sequence[dict[str, Any]]) -> list[Part]:
+        """Create several parts in one go, returning them in input order.
+
+        Each entry takes the keyword arguments of ``create_part``. Keys are
+        allocated with a single lookup and the attachment sets and parts are
+        written with multi-row inserts, so the number of statements does not
+        grow with the number of parts.
+        """
+        if not parts_data:
+            return []
+
+        # Every part still gets its own attachment set (see create_part)
+        attachment_set_ids = self.db.execute(
+            insert(AttachmentSet).returning(AttachmentSet.id, sort_by_parameter_order=True),
+            [{"cover_attachment_id": None} for _ in parts_data],
+        ).scalars().all()
+
+        def build_parts(keys: list[str]) -> list[Part]:
+            return [
+                Part(key=key, attachment_set_id=attachment_set_id, **data)
+                for key, attachment_set_id, data in zip(keys, attachment_set_ids, parts_data, strict=True)
+            ]
+
+        # Batched into a single INSERT ... RETURNING
+        return self._insert_parts_with_new_keys(len(parts_data), build_parts)
+
+    def _insert_parts_with_new_keys(
+        self, count: int, build_parts: Callable[[list[str]], list[Part]]
+    ) -> list[Part]:
+        """Allocate count keys and flush the parts built for them.
+
+        The key allocator only knows the keys of this process, so another
+        process can insert one of the allocated keys first. The flush runs in
+        a savepoint and is retried once with fresh keys when it fails on the
+        parts.key unique constraint.
+        """
+        keys = self.generate_part_keys(count)
+        try:
+            with self.db.begin_nested():
+                parts = build_parts(keys)
+                self.db.add_all(parts)
+            return parts
+        except IntegrityError as exc:
+            if not is_part_key_conflict(exc):
+                raise
+            logger.warning("Part key conflict with another process, retrying with new keys")
+
+        # The conflicting key is in the database by now, so allocating again
+        # marks it as used; the other keys were never written
+        self.part_key_allocator.release(keys, self.db)
+        keys = self.generate_part_keys(count)
+        with self.db.begin_nested():
+            parts = build_parts(keys)
+            self.db.add_all(parts)
+        return parts
+
+    def get_part(
+        self,
+        part_key: str,
+        include_type: bool = True,
+        include_seller_links: bool = True,
+    ) -> Part:
+        """Get part by 4-character key with relationships for full details.
 
-    def get_part(self, part_key: str) -> Part:
-        """Get part by 4-character key with relationships for full details."""
+        Args:
+            part_key: 4-character part key
+            include_type: If False, skip eager-loading the part type
+            include_seller_links: If False, skip eager-loading seller links
+        """
         from app.models.part_seller import PartSeller
 
-        stmt = select(Part).options(
-            selectinload(Part.type),
-            selectinload(Part.seller_links).selectinload(PartSeller.seller),
-        ).where(Part.key == part_key)
+        options = []
+        if include_type:
+            options.append(selectinload(Part.type))
+        if include_seller_links:
+            options.append(selectinload(Part.seller_links).selectinload(PartSeller.seller))
+
+        stmt = select(Part).options(*options).where(Part.key == part_key)
         part: Part = self.db.execute(stmt).scalar_one_or_none()
         if not part:
             raise RecordNotFoundException("Part", part_key)
@@ -160,13 +295,12 @@ class PartService:
 
         # Delete the part (cascaded deletes will handle relationships)
         self.db.delete(part)
+        self.part_key_allocator.release_on_commit(self.db, [part_key])
 
     def get_total_quantity(self, part_key: str) -> int:
         """Get total quantity across all locations for a part."""
-        # Need to join with Part table since PartLocation now references parts.id
-        stmt = select(func.coalesce(func.sum(PartLocation.qty), 0)).join(
-            Part, PartLocation.part_id == Part.id
-        ).where(Part.key == part_key)
+        # Read the denormalized total maintained on every part location write
+        stmt = select(Part.total_quantity).where(Part.key == part_key)
         result = self.db.execute(stmt).scalar()
         return result or 0
 
@@ -207,3 +341,274 @@ class PartService:
             result.append(part_summary)
 
         return result
+
+    def faceted_search(
+        self,
+        filters: PartFacetFilters,
+        limit: int = 50,
+        offset: int = 0,
+    ) -> PartFacetSearchResult:
+        """Filter parts by facet values and count the values of every facet.
+
+        Each facet's counts apply all other selected filters but not the
+        facet's own, so the counts show what selecting another value of that
+        facet would return. Parts without a value for a facet are not
+        counted for it. On PostgreSQL all counts, including the total, come
+        from a single GROUPING SETS query over one scan of ``parts``.
+
+        Args:
+            filters: Selected facet values and tags
+            limit: Maximum number of parts to return
+            offset: Number of parts to skip
+
+        Returns:
+            The page of matching parts (newest first, seller links
+            eager-loaded), the total number of matches and the facet counts
+        """
+        # The in-stock comparison is repeated in SELECT and GROUP BY, so keep
+        # it free of bound parameters for PostgreSQL to match the two
+        in_stock = Part.total_quantity > literal_column("0")
+        facet_columns: dict[str, SQLColumnExpression[Any]] = {
+            "type_id": Part.type_id,
+            "package": Part.package,
+            "mounting_type": Part.mounting_type,
+            "series": Part.series,
+            "voltage_rating": Part.voltage_rating,
+            "in_stock": in_stock,
+        }
+        selections: dict[str, Sequence[Any]] = {
+            "type_id": filters.type_ids,
+            "package": filters.packages,
+            "mounting_type": filters.mounting_types,
+            "series": filters.series,
+            "voltage_rating": filters.voltage_ratings,
+        }
+        conditions: dict[str, ColumnElement[bool]] = {
+            name: facet_columns[name].in_(values)
+            for name, values in selections.items()
+            if values
+        }
+        if filters.in_stock is not None:
+            conditions["in_stock"] = in_stock if filters.in_stock else ~in_stock
+        tags_condition = self._tags_condition(filters.tags) if filters.tags else true()
+
+        page_stmt = (
+            select(Part)
+            .options(selectinload(Part.seller_links).selectinload(PartSeller.seller))
+            .where(tags_condition, *conditions.values())
+            .order_by(Part.created_at.desc(), Part.id.desc())
+            .limit(limit)
+            .offset(offset)
+        )
+        parts = list(self.db.execute(page_stmt).scalars().all())
+
+        def others(name: str | None) -> list[ColumnElement[bool]]:
+            return [condition for facet, condition in conditions.items() if facet != name]
+
+        bind = self.db.bind
+        if bind is not None and bind.dialect.name == "sqlite":
+            # SQLite has no GROUPING SETS, so count each facet in its own
+            # branch of one UNION ALL statement
+            branches: list[Select[Any]] = [
+                select(literal(name).label("facet"), column.label("value"), func.count().label("count"))
+                .where(tags_condition, *others(name))
+                .group_by(column)
+                for name, column in facet_columns.items()
+            ]
+            branches.append(
+                select(literal(None, String).label("facet"), literal(None).label("value"), func.count())
+                .where(tags_condition, *others(None))
+            )
+            rows = [tuple(row) for row in self.db.execute(union_all(*branches)).all()]
+        else:
+            rows = self._facet_counts_with_grouping_sets(facet_columns, conditions, tags_condition)
+
+        total = 0
+        facets: dict[str, list[tuple[Any, int]]] = {name: [] for name in PART_FACETS}
+        for facet, value, count in rows:
+            if facet is None:
+                total = count
+            elif value is not None and count:
+                facets[facet].append((bool(value) if facet == "in_stock" else value, count))
+        for values in facets.values():
+            values.sort(key=lambda item: (-item[1], str(item[0])))
+
+        type_names: dict[int, str] = {}
+        if facets["type_id"]:
+            type_ids = [type_id for type_id, _count in facets["type_id"]]
+            type_names = dict(
+                self.db.execute(select(Type.id, Type.name).where(Type.id.in_(type_ids))).tuples().all()
+            )
+
+        return PartFacetSearchResult(parts=parts, total=total, facets=facets, type_names=type_names)
+
+    def _facet_counts_with_grouping_sets(
+        self,
+        facet_columns: dict[str, SQLColumnExpression[Any]],
+        conditions: dict[str, ColumnElement[bool]],
+        tags_condition: ColumnElement[bool],
+    ) -> list[tuple[str | None, Any, int]]:
+        """Count facet values in one GROUPING SETS query (PostgreSQL).
+
+        Each grouping set groups by one facet; its count is filtered by the
+        other facets' conditions. The empty grouping set counts all matches.
+        Rows failing more than one facet condition cannot contribute to any
+        count, so they are excluded up front.
+        """
+        names = list(facet_columns)
+        columns = list(facet_columns.values())
+
+        counts: list[ColumnElement[int]] = []
+        for name in [*names, None]:
+            other_conditions = [condition for facet, condition in conditions.items() if facet != name]
+            if other_conditions:
+                counts.append(func.count().filter(and_(*other_conditions)))
+            else:
+                counts.append(func.count())
+
+        stmt = select(*columns, func.grouping(*columns).label("grouping"), *counts).where(tags_condition)
+        if len(conditions) > 1:
+            failed = sum(
+                (case((condition, 0), else_=1) for condition in conditions.values()),
+                start=literal_column("0", Integer),
+            )
+            stmt = stmt.where(failed <= 1)
+        stmt = stmt.group_by(func.grouping_sets(*(tuple_(column) for column in columns), tuple_()))
+
+        rows: list[tuple[str | None, Any, int]] = []
+        all_rolled_up = (1 << len(names)) - 1
+        for row in self.db.execute(stmt).all():
+            grouping = row[len(names)]
+            if grouping == all_rolled_up:
+                rows.append((None, None, row[-1]))
+                continue
+            # GROUPING() sets a bit for every rolled-up column, first column
+            # in the highest bit; exactly one column is grouped per set
+            index = next(
+                i for i in range(len(names))
+                if not grouping & (1 << (len(names) - 1 - i))
+            )
+            rows.append((names[index], row[index], row[len(names) + 1 + index]))
+        return rows
+
+    def _tags_condition(self, tags: Sequence[str]) -> ColumnElement[bool]:
+        """Match parts carrying every one of the given tags."""
+        bind = self.db.bind
+        if bind is not None and bind.dialect.name == "sqlite":
+            # tags is a JSON array on SQLite test databases
+            conditions = []
+            for tag in tags:
+                elements = func.json_each(Part.tags).table_valued("value")
+                conditions.append(select(elements.c.value).where(elements.c.value == tag).exists())
+            return and_(*conditions)
+
+        # Array containment, served by the GIN index on parts.tags
+        return Part.tags.contains(list(tags))
+
+    def search_parts(
+        self,
+        query: str,
+        limit: int = 50,
+        after: tuple[float, int] | None = None,
+    ) -> list[tuple[Part, float]]:
+        """Full-text search over part descriptions, codes, manufacturer, series and tags.
+
+        On PostgreSQL this matches against the generated ``parts.search_vector``
+        column (GIN indexed) and ranks results with ``ts_rank``. Results are
+        ordered by ``(rank, id)`` descending; pass the pair of the last result
+        already seen as ``after`` to fetch the next page.
+
+        Args:
+            query: Search text in web search syntax (quoted phrases, -exclusions)
+            limit: Maximum number of parts to return
+            after: Optional keyset position; only parts ranking after it are returned
+
+        Returns:
+            List of (part, rank) tuples with seller links eager-loaded
+        """
+        stmt = self._search_statement(query, limit, after)
+        return [(part, float(part_rank)) for part, part_rank in self.db.execute(stmt).all()]
+
+    def _search_statement(
+        self, query: str, limit: int, after: tuple[float, int] | None
+    ) -> Select[tuple[Part, float]]:
+        bind = self.db.bind
+        if bind is not None and bind.dialect.name == "sqlite":
+            # SQLite has no tsvector support, so fall back to unranked
+            # substring matching for tests
+            rank: ColumnElement[float] = literal(0.0, Float(53))
+            match = and_(*(self._substring_match(term) for term in query.split()))
+        else:
+            search_vector = Part.__table__.c.search_vector
+            ts_query = postgresql.websearch_to_tsquery(PART_SEARCH_CONFIG, query)
+            # ts_rank returns float4; rank in double precision so the value
+            # returned in the cursor compares equal to the row it came from
+            rank = cast(func.ts_rank(search_vector, ts_query), Float(53))
+            match = search_vector.op("@@")(ts_query)
+
+        stmt = (
+            select(Part, rank.label("rank"))
+            .options(selectinload(Part.seller_links).selectinload(PartSeller.seller))
+            .where(match)
+        )
+        if after is not None:
+            after_rank, after_id = after
+            stmt = stmt.where(tuple_(rank, Part.id) < tuple_(literal(after_rank, Float(53)), literal(after_id)))
+        return stmt.order_by(rank.desc(), Part.id.desc()).limit(limit)
+
+    @staticmethod
+    def _substring_match(term: str) -> ColumnElement[bool]:
+        """Match a single search term against any of the searchable columns."""
+        pattern = f"%{term}%"
+        return or_(
+            Part.description.ilike(pattern),
+            Part.manufacturer_code.ilike(pattern),
+            Part.manufacturer.ilike(pattern),
+            Part.series.ilike(pattern),
+            cast(Part.tags, String).ilike(pattern),
+        )
+
+    def similar_parts(self, code: str, limit: int = 10) -> list[tuple[Part, float]]:
+        """Find parts whose manufacturer code resembles the given code.
+
+        Codes are compared in normalized form (see normalize_manufacturer_code),
+        so punctuation and casing differences are ignored and small typos still
+        match. On PostgreSQL the lookup uses the pg_trgm GIN index on
+        ``parts.manufacturer_code_normalized``.
+
+        Args:
+            code: Manufacturer part number as typed by the user
+            limit: Maximum number of parts to return
+
+        Returns:
+            List of (part, similarity) tuples, most similar first, where
+            similarity is between 0 and 1 (1 is an exact normalized match)
+        """
+        normalized = normalize_manufacturer_code(code)
+        if normalized is None:
+            return []
+
+        bind = self.db.bind
+        if bind is not None and bind.dialect.name == "sqlite":
+            # SQLite has no pg_trgm, so score candidates in Python for tests
+            stmt = select(Part).where(Part.manufacturer_code_normalized.is_not(None))
+            scored = [
+                (part, trigram_similarity(part.manufacturer_code_normalized or "", normalized))
+                for part in self.db.execute(stmt).scalars()
+            ]
+            matches = [
+                (part, score) for part, score in scored
+                if score >= TRIGRAM_SIMILARITY_THRESHOLD
+            ]
+            matches.sort(key=lambda match: (-match[1], match[0].id))
+            return matches[:limit]
+
+        similarity = func.similarity(Part.manufacturer_code_normalized, normalized)
+        stmt = (
+            select(Part, similarity.label("similarity"))
+            # The % operator applies pg_trgm.similarity_threshold and can use the index
+            .where(Part.manufacturer_code_normalized.op("%")(normalized))
+            .order_by(similarity.desc(), Part.id)
+            .limit(limit)
+        )
+        return [(part, float(score)) for part, score in self.db.execute(stmt).all()]
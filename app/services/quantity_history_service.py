@@ -0,0 +1,294 @@
+"""Quantity history retention and partition maintenance."""
+
+import re
+from collections.abc import Iterator, Sequence
+from dataclasses import dataclass, field
+from datetime import UTC, date, datetime, timedelta
+from typing import TYPE_CHECKING, Any
+
+from sqlalchemy import Row, Select, delete, func, literal, select, text, tuple_, update
+from sqlalchemy.orm import aliased
+
+from app.exceptions import InvalidOperationException
+from app.models.kit_pick_list_line import KitPickListLine
+from app.models.quantity_history import QuantityHistory
+from app.models.quantity_history_daily import QuantityHistoryDaily
+
+if TYPE_CHECKING:
+    from sqlalchemy.orm import Session
+
+    from app.app_config import AppSettings
+
+# Monthly partitions are created this many months ahead of the current one
+PARTITION_MONTHS_AHEAD = 3
+
+# The dashboard's 30-day window reads raw rows for its first, partial day
+MIN_RETENTION_DAYS = 31
+
+# Bucket sizes for aggregated part history
+HISTORY_BUCKETS = ("day", "week", "month")
+
+_PARTITION_NAME = re.compile(r"^quantity_history_p(\d{4})(\d{2})$")
+_DEFAULT_PARTITION = "quantity_history_default"
+
+
+@dataclass
+class CompactionResult:
+    """Outcome of a quantity history compaction run."""
+
+    cutoff: datetime | None
+    rows_deleted: int = 0
+    partitions_created: list[str] = field(default_factory=list)
+    partitions_dropped: list[str] = field(default_factory=list)
+
+
+@dataclass
+class HistoryBucket:
+    """Quantity changes of a part within one day, week or month."""
+
+    bucket_start: date
+    change_count: int = 0
+    qty_added: int = 0
+    qty_removed: int = 0
+
+    @property
+    def net_delta(self) -> int:
+        return self.qty_added - self.qty_removed
+
+
+def _month_start(value: date) -> date:
+    return value.replace(day=1)
+
+
+def _next_month(month: date) -> date:
+    return (month + timedelta(days=32)).replace(day=1)
+
+
+def _partition_name(month: date) -> str:
+    return f"quantity_history_p{month.year:04d}{month.month:02d}"
+
+
+class QuantityHistoryService:
+    """Service class for bounding the growth of the raw quantity history.
+
+    Every history row is counted in ``quantity_history_daily`` when it is
+    written, so compaction only has to drop raw rows older than the retention
+    period: trends and dashboard counts keep reading the rollups. On
+    PostgreSQL whole monthly partitions are dropped, which is independent of
+    their size, and partitions for the coming months are created so new rows
+    never land in the default partition.
+    """
+
+    def __init__(self, db: "Session", app_config: "AppSettings") -> None:
+        self.db = db
+        self.app_config = app_config
+
+    def compact(self, retention_days: int | None = None, now: datetime | None = None) -> CompactionResult:
+        """Create upcoming partitions and drop raw history past the retention period.
+
+        Pick list lines referring to a dropped row lose the reference, which
+        means such old picks can no longer be undone.
+
+        Args:
+            retention_days: Days of raw history to keep; defaults to the
+                configured retention, 0 keeps everything
+            now: Reference time, for tests
+
+        Returns:
+            What was created and dropped
+
+        Raises:
+            InvalidOperationException: If the retention period is shorter than
+                the dashboard's 30-day window
+        """
+        if retention_days is None:
+            retention_days = self.app_config.quantity_history_retention_days
+        if 0 < retention_days < MIN_RETENTION_DAYS:
+            raise InvalidOperationException(
+                "compact quantity history",
+                f"retention must be at least {MIN_RETENTION_DAYS} days",
+            )
+        now = now or datetime.now(UTC)
+
+        result = CompactionResult(cutoff=now - timedelta(days=retention_days) if retention_days else None)
+        partitioned = self._is_postgresql()
+        if partitioned:
+            result.partitions_created = self._create_upcoming_partitions(now)
+        if result.cutoff is None:
+            return result
+
+        history = QuantityHistory.__table__
+        expired_ids = select(history.c.id).where(history.c.timestamp < result.cutoff)
+        self.db.execute(
+            update(KitPickListLine)
+            .where(KitPickListLine.inventory_change_id.in_(expired_ids))
+            # Preserve updated_at: the line itself was not edited
+            .values(inventory_change_id=None, updated_at=KitPickListLine.updated_at)
+            .execution_options(synchronize_session=False)
+        )
+
+        if partitioned:
+            result.partitions_dropped = self._drop_partitions_before(_month_start(result.cutoff.date()))
+        # Plain statement: the dropped rows stay counted in the daily rollups
+        deleted = self.db.execute(delete(history).where(history.c.timestamp < result.cutoff))
+        result.rows_deleted = deleted.rowcount
+        return result
+
+    def get_part_history(
+        self,
+        part_id: int,
+        limit: int | None = None,
+        before: datetime | None = None,
+        after: tuple[datetime, int] | None = None,
+    ) -> Sequence[Row[Any]]:
+        """Return a part's history rows, newest first.
+
+        Only the response columns are selected, so no ORM objects (and no
+        eager-loaded parts) are built per row. The query walks the
+        ``(part_id, timestamp DESC)`` index.
+
+        Args:
+            part_id: Part to read the history of
+            limit: Maximum number of rows; all rows when None
+            before: Only rows with an earlier timestamp
+            after: Keyset position ``(timestamp, id)`` of the last row already
+                seen; only rows sorting after it are returned
+        """
+        stmt = self._part_history_query(part_id, before, after)
+        if limit is not None:
+            stmt = stmt.limit(limit)
+        return self.db.execute(stmt).all()
+
+    def iter_part_history(
+        self, part_id: int, before: datetime | None = None, batch_size: int = 500
+    ) -> Iterator[dict[str, Any]]:
+        """Stream a part's history rows, newest first, in batches of batch_size."""
+        stmt = self._part_history_query(part_id, before, None).execution_options(yield_per=batch_size)
+        for row in self.db.execute(stmt):
+            yield row._asdict()
+
+    def get_part_history_buckets(self, part_id: int, bucket: str) -> list[HistoryBucket]:
+        """Aggregate a part's history per day, week (from Monday) or month, oldest first.
+
+        Reads the daily rollups, so the cost follows the number of days with
+        changes rather than the number of changes, and history past the
+        retention period is still included.
+        """
+        if bucket not in HISTORY_BUCKETS:
+            raise InvalidOperationException(
+                "aggregate part history", f"bucket must be one of: {', '.join(HISTORY_BUCKETS)}"
+            )
+
+        stmt = (
+            select(
+                QuantityHistoryDaily.day,
+                QuantityHistoryDaily.change_count,
+                QuantityHistoryDaily.qty_added,
+                QuantityHistoryDaily.qty_removed,
+            )
+            .where(QuantityHistoryDaily.part_id == part_id, QuantityHistoryDaily.change_count > 0)
+            .order_by(QuantityHistoryDaily.day)
+        )
+        buckets: dict[date, HistoryBucket] = {}
+        for day, change_count, qty_added, qty_removed in self.db.execute(stmt):
+            if bucket == "week":
+                start = day - timedelta(days=day.weekday())
+            elif bucket == "month":
+                start = _month_start(day)
+            else:
+                start = day
+            entry = buckets.get(start)
+            if entry is None:
+                entry = buckets[start] = HistoryBucket(bucket_start=start)
+            entry.change_count += change_count
+            entry.qty_added += qty_added
+            entry.qty_removed += qty_removed
+        return list(buckets.values())
+
+    def _part_history_query(
+        self, part_id: int, before: datetime | None, after: tuple[datetime, int] | None
+    ) -> Select[Any]:
+        stmt = select(
+            QuantityHistory.id,
+            QuantityHistory.delta_qty,
+            QuantityHistory.location_reference,
+            QuantityHistory.timestamp,
+        ).where(QuantityHistory.part_id == part_id)
+
+        if before is not None:
+            stmt = stmt.where(QuantityHistory.timestamp < before)
+
+        if after is not None:
+            after_timestamp, after_id = after
+            anchor_timestamp: Any = literal(after_timestamp)
+            bind = self.db.bind
+            if bind is not None and bind.dialect.name == "sqlite":
+                # SQLite stores timestamps as text, so seek against the anchor
+                # row's stored value; fall back to the cursor value if the
+                # anchor was deleted by retention
+                anchor = aliased(QuantityHistory)
+                anchor_timestamp = func.coalesce(
+                    select(anchor.timestamp).where(anchor.id == after_id).scalar_subquery(),
+                    after_timestamp,
+                )
+            stmt = stmt.where(
+                tuple_(QuantityHistory.timestamp, QuantityHistory.id) < tuple_(anchor_timestamp, literal(after_id))
+            )
+
+        # Rows written in one transaction share their timestamp; id breaks ties
+        return stmt.order_by(QuantityHistory.timestamp.desc(), QuantityHistory.id.desc())
+
+    def _is_postgresql(self) -> bool:
+        bind = self.db.bind
+        return bind is not None and bind.dialect.name == "postgresql"
+
+    def _monthly_partitions(self) -> dict[date, str]:
+        """Return the attached monthly partitions by the month they hold."""
+        names = self.db.execute(text(
+            "SELECT c.relname FROM pg_inherits i JOIN pg_class c ON c.oid = i.inhrelid "
+            "WHERE i.inhparent = 'quantity_history'::regclass"
+        )).scalars()
+        partitions: dict[date, str] = {}
+        for name in names:
+            match = _PARTITION_NAME.match(name)
+            if match:
+                partitions[date(int(match.group(1)), int(match.group(2)), 1)] = name
+        return partitions
+
+    def _create_upcoming_partitions(self, now: datetime) -> list[str]:
+        existing = self._monthly_partitions()
+        created: list[str] = []
+        month = _month_start(now.date())
+        for _ in range(PARTITION_MONTHS_AHEAD + 1):
+            if month not in existing:
+                self._create_partition(month)
+                created.append(_partition_name(month))
+            month = _next_month(month)
+        return created
+
+    def _create_partition(self, month: date) -> None:
+        """Create a month's partition, taking over its rows from the default partition.
+
+        Attaching a range the default partition holds rows for would fail, so
+        the partition is built as a plain table first and attached once the
+        rows have moved.
+        """
+        name = _partition_name(month)
+        bounds = {"lower": month, "upper": _next_month(month)}
+        in_range = '"timestamp" >= :lower AND "timestamp" < :upper'
+        self.db.execute(text(f"CREATE TABLE {name} (LIKE quantity_history INCLUDING DEFAULTS)"))
+        self.db.execute(text(f"INSERT INTO {name} SELECT * FROM {_DEFAULT_PARTITION} WHERE {in_range}"), bounds)
+        self.db.execute(text(f"DELETE FROM {_DEFAULT_PARTITION} WHERE {in_range}"), bounds)
+        self.db.execute(text(
+            f"ALTER TABLE quantity_history ATTACH PARTITION {name} "
+            f"FOR VALUES FROM ('{bounds['lower'].isoformat()}') TO ('{bounds['upper'].isoformat()}')"
+        ))
+
+    def _drop_partitions_before(self, month: date) -> list[str]:
+        dropped: list[str] = []
+        for partition_month, name in sorted(self._monthly_partitions().items()):
+            if partition_month >= month:
+                break
+            self.db.execute(text(f"DROP TABLE {name}"))
+            dropped.append(name)
+        return dropped
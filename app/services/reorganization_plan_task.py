@@ -0,0 +1,72 @@
+"""Storage reorganization planning background task."""
+
+import logging
+from typing import Any
+
+from sqlalchemy.orm import Session
+
+from app.schemas.reorganization import (
+    ReorganizationPlanSchema,
+    ReorganizationPlanTaskCancelledResultSchema,
+    ReorganizationPlanTaskResultSchema,
+)
+from app.services.base_task import BaseSessionTask, ProgressHandle, SubProgressHandle
+from app.services.container import ServiceContainer
+from app.services.reorganization_service import plan_reorganization
+
+logger = logging.getLogger(__name__)
+
+
+class ReorganizationPlanTask(BaseSessionTask):
+    """Background task computing a storage reorganization plan."""
+
+    def __init__(self, container: ServiceContainer):
+        super().__init__(container)
+
+    def execute_session(
+        self, session: Session, progress_handle: ProgressHandle, **kwargs: Any
+    ) -> ReorganizationPlanTaskResultSchema | ReorganizationPlanTaskCancelledResultSchema:
+        """
+        Compute a reorganization plan with progress reporting.
+
+        Args:
+            session: Database session
+            progress_handle: Interface for sending progress updates
+            **kwargs: Task parameters including:
+                - sparse_threshold: Occupied share at or below which a box is
+                  planned to be emptied
+
+        Returns:
+            ReorganizationPlanTaskResultSchema or ReorganizationPlanTaskCancelledResultSchema
+        """
+        try:
+            sparse_threshold: float = kwargs.get("sparse_threshold", 0.25)
+
+            # Phase 1: Load the storage snapshot (0-20%)
+            progress_handle.send_progress("Loading storage layout", 0.0)
+            snapshot = self.container.reorganization_service().load_snapshot()
+
+            if self.is_cancelled:
+                return ReorganizationPlanTaskCancelledResultSchema()
+
+            # Phase 2: Plan (20-100%)
+            plan = plan_reorganization(
+                snapshot,
+                sparse_threshold,
+                SubProgressHandle(progress_handle, 0.2, 1.0).send_progress,
+            )
+
+            logger.info(
+                f"Reorganization plan with {len(plan.moves)} moves over "
+                f"{len(snapshot.items)} stock locations"
+            )
+
+            return ReorganizationPlanTaskResultSchema(
+                success=True, plan=ReorganizationPlanSchema.model_validate(plan)
+            )
+
+        except Exception as e:
+            logger.error(f"Unexpected error in reorganization planning task: {e}")
+            return ReorganizationPlanTaskResultSchema(
+                success=False, error_message=f"Unexpected error: {str(e)}"
+            )
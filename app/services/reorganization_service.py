@@ -0,0 +1,361 @@
+"""Storage reorganization planning.
+
+The planner works on an in-memory snapshot of the storage layout loaded with
+two bulk queries, so a plan for tens of thousands of locations is computed
+without further database round trips. It looks for three kinds of untidiness:
+
+- Split parts: a part stored in more than one location
+- Sparse boxes: boxes with only a few occupied locations
+- Type scattering: single parts of a type stored away from the box holding
+  most of that type
+
+and proposes moves that fix them. Every original stock location is moved at
+most once and straight to its final location, so the plan has the fewest moves
+for the fixes it makes and its moves can be applied in any order (for example
+as ``move`` operations of ``POST /api/inventory/batch``). Moves only target
+locations that are free in the snapshot or already hold the same part.
+"""
+
+import heapq
+from collections import Counter, defaultdict
+from collections.abc import Callable
+from dataclasses import dataclass, field
+
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from app.models.location import Location
+from app.models.part import Part
+from app.models.part_location import PartLocation
+from app.models.type import Type
+
+Slot = tuple[int, int]
+
+# Move reasons, in the order the planner applies them
+REASON_CONSOLIDATE = "consolidate"
+REASON_EMPTY_BOX = "empty_box"
+REASON_GROUP_TYPE = "group_type"
+
+
+@dataclass(frozen=True, slots=True)
+class StockItem:
+    """Stock of one part at one location."""
+
+    part_id: int
+    box_no: int
+    loc_no: int
+    qty: int
+
+
+@dataclass(slots=True)
+class StorageSnapshot:
+    """Storage layout needed for planning."""
+
+    # Every location, per box, in location order
+    box_locations: dict[int, list[int]]
+    free_slots: set[Slot]
+    items: list[StockItem]
+    part_keys: dict[int, str]
+    part_types: dict[int, int | None]
+    type_names: dict[int, str]
+
+
+@dataclass(frozen=True, slots=True)
+class PlannedMove:
+    """Move of all stock of a part at one location to another location."""
+
+    part_key: str
+    from_box_no: int
+    from_loc_no: int
+    to_box_no: int
+    to_loc_no: int
+    qty: int
+    reason: str
+
+
+@dataclass(slots=True)
+class ReorganizationPlan:
+    """Outcome of a planning run."""
+
+    moves: list[PlannedMove] = field(default_factory=list)
+    split_parts: int = 0
+    sparse_boxes: list[int] = field(default_factory=list)
+    emptied_boxes: list[int] = field(default_factory=list)
+    scattered_types: list[str] = field(default_factory=list)
+    locations_freed: int = 0
+
+
+class ReorganizationService:
+    """Service computing storage reorganization plans."""
+
+    def __init__(self, db: Session):
+        """Initialize service with database session.
+
+        Args:
+            db: SQLAlchemy database session
+        """
+        self.db = db
+
+    def load_snapshot(self) -> StorageSnapshot:
+        """Load the storage layout with one query for locations and one for stock."""
+        box_locations: dict[int, list[int]] = defaultdict(list)
+        free_slots: set[Slot] = set()
+        location_rows = self.db.execute(
+            select(Location.box_no, Location.loc_no, Location.is_occupied)
+            .order_by(Location.box_no, Location.loc_no)
+        )
+        for box_no, loc_no, is_occupied in location_rows:
+            box_locations[box_no].append(loc_no)
+            if not is_occupied:
+                free_slots.add((box_no, loc_no))
+
+        items: list[StockItem] = []
+        part_keys: dict[int, str] = {}
+        part_types: dict[int, int | None] = {}
+        type_names: dict[int, str] = {}
+        stock_rows = self.db.execute(
+            select(
+                PartLocation.part_id,
+                PartLocation.box_no,
+                PartLocation.loc_no,
+                PartLocation.qty,
+                Part.key,
+                Part.type_id,
+                Type.name,
+            )
+            .join(Part, PartLocation.part_id == Part.id)
+            .outerjoin(Type, Part.type_id == Type.id)
+            .order_by(PartLocation.box_no, PartLocation.loc_no, PartLocation.part_id)
+        )
+        for part_id, box_no, loc_no, qty, key, type_id, type_name in stock_rows:
+            items.append(StockItem(part_id, box_no, loc_no, qty))
+            part_keys[part_id] = key
+            part_types[part_id] = type_id
+            if type_id is not None:
+                type_names[type_id] = type_name
+
+        return StorageSnapshot(
+            box_locations=dict(box_locations),
+            free_slots=free_slots,
+            items=items,
+            part_keys=part_keys,
+            part_types=part_types,
+            type_names=type_names,
+        )
+
+    def plan(
+        self,
+        sparse_threshold: float = 0.25,
+        progress: Callable[[str, float], None] | None = None,
+    ) -> ReorganizationPlan:
+        """Load a snapshot and plan its reorganization."""
+        return plan_reorganization(self.load_snapshot(), sparse_threshold, progress)
+
+
+class _Planner:
+    """Mutable planning state over a snapshot.
+
+    ``dest[i]`` is the planned location of ``snapshot.items[i]``; items whose
+    destination differs from their origin become moves.
+    """
+
+    def __init__(self, snapshot: StorageSnapshot) -> None:
+        self.snapshot = snapshot
+        items = snapshot.items
+        self.dest: list[Slot] = [(item.box_no, item.loc_no) for item in items]
+        self.reason: list[str] = [""] * len(items)
+        # Items currently planned at each slot, and the occupied slots per box
+        self.at_slot: dict[Slot, list[int]] = defaultdict(list)
+        self.box_slots: dict[int, set[Slot]] = defaultdict(set)
+        for index, slot in enumerate(self.dest):
+            self.at_slot[slot].append(index)
+            self.box_slots[slot[0]].add(slot)
+        # Free locations per box as min-heaps, so boxes fill from the front
+        self.free: dict[int, list[int]] = defaultdict(list)
+        for box_no, loc_no in snapshot.free_slots:
+            self.free[box_no].append(loc_no)
+        for locations in self.free.values():
+            heapq.heapify(locations)
+
+    def relocate(self, source: Slot, target: Slot, reason: str, part_id: int | None = None) -> None:
+        """Plan everything at source (or only part_id's stock) to end up at target."""
+        indexes = self.at_slot.get(source, [])
+        moving = [i for i in indexes if part_id is None or self.snapshot.items[i].part_id == part_id]
+        if not moving:
+            return
+        remaining = [i for i in indexes if i not in moving]
+        if remaining:
+            self.at_slot[source] = remaining
+        else:
+            del self.at_slot[source]
+            self.box_slots[source[0]].discard(source)
+        for index in moving:
+            self.dest[index] = target
+            self.reason[index] = reason
+        self.at_slot[target].extend(moving)
+        self.box_slots[target[0]].add(target)
+
+    def slot_types(self, slot: Slot) -> set[int | None]:
+        part_types = self.snapshot.part_types
+        return {part_types[self.snapshot.items[i].part_id] for i in self.at_slot[slot]}
+
+    def take_free_slot(self, box_no: int) -> Slot | None:
+        locations = self.free.get(box_no)
+        if not locations:
+            return None
+        return (box_no, heapq.heappop(locations))
+
+    def free_count(self, box_no: int) -> int:
+        return len(self.free.get(box_no, ()))
+
+    def type_box_counts(self, excluded: set[int]) -> dict[int, Counter[int]]:
+        """Count the occupied locations of every type per box, skipping excluded boxes."""
+        counts: dict[int, Counter[int]] = defaultdict(Counter)
+        for box_no, slots in self.box_slots.items():
+            if box_no in excluded:
+                continue
+            for slot in slots:
+                for type_id in self.slot_types(slot):
+                    if type_id is not None:
+                        counts[type_id][box_no] += 1
+        return counts
+
+
+def plan_reorganization(
+    snapshot: StorageSnapshot,
+    sparse_threshold: float = 0.25,
+    progress: Callable[[str, float], None] | None = None,
+) -> ReorganizationPlan:
+    """Plan moves that consolidate split parts, empty sparse boxes and group types.
+
+    The phases run in this order, each on the result of the previous one:
+
+    1. Consolidate: every split part is gathered at the location holding
+       most of it, preferring locations outside sparse boxes
+    2. Empty sparse boxes: boxes with at most ``sparse_threshold`` of their
+       locations occupied are emptied, emptiest first, when the other boxes
+       have enough free locations; contents go to the box holding most of
+       their type where possible
+    3. Group types: a type's only location in a box moves to the box holding
+       most of that type, if that box has a free location
+
+    Args:
+        snapshot: Storage layout to plan for
+        sparse_threshold: Occupied share of a box's locations at or below which
+            the box counts as sparse
+        progress: Optional callback receiving a phase description and a
+            completion value between 0 and 1
+
+    Returns:
+        The plan, with moves ordered by origin location
+    """
+    def report(text: str, value: float) -> None:
+        if progress is not None:
+            progress(text, value)
+
+    planner = _Planner(snapshot)
+    items = snapshot.items
+    plan = ReorganizationPlan()
+    occupied_before = len(planner.at_slot)
+
+    sparse = {
+        box_no
+        for box_no, locations in snapshot.box_locations.items()
+        if 0 < len(planner.box_slots[box_no]) <= sparse_threshold * len(locations)
+    }
+    plan.sparse_boxes = sorted(sparse)
+
+    # Phase 1: gather every split part at one of its locations
+    report("Consolidating parts stored in several locations", 0.1)
+    part_items: dict[int, list[int]] = defaultdict(list)
+    for index, item in enumerate(items):
+        part_items[item.part_id].append(index)
+    for indexes in part_items.values():
+        if len(indexes) < 2:
+            continue
+        plan.split_parts += 1
+        anchor = min(
+            indexes,
+            key=lambda i: (items[i].box_no in sparse, -items[i].qty, items[i].box_no, items[i].loc_no),
+        )
+        for index in indexes:
+            if index != anchor:
+                planner.relocate(planner.dest[index], planner.dest[anchor], REASON_CONSOLIDATE, items[index].part_id)
+
+    # Phase 2: empty sparse boxes into the free locations of the others
+    report("Emptying sparse boxes", 0.4)
+    counts = planner.type_box_counts(excluded=sparse)
+    fallback_boxes = sorted(box_no for box_no in planner.free if box_no not in sparse)
+    spare = sum(planner.free_count(box_no) for box_no in fallback_boxes)
+    emptied: set[int] = set()
+    for box_no in sorted(sparse, key=lambda b: (len(planner.box_slots[b]), b)):
+        # Boxes consolidation already emptied count as emptied as well
+        slots = sorted(planner.box_slots[box_no])
+        if len(slots) > spare:
+            continue
+        for slot in slots:
+            # Shared locations move as a whole, following their first type
+            type_id = min(planner.slot_types(slot), key=lambda t: (t is None, t or 0))
+            target = None
+            if type_id is not None:
+                for home_box, _count in counts[type_id].most_common():
+                    if (target := planner.take_free_slot(home_box)) is not None:
+                        break
+            while target is None:
+                target = planner.take_free_slot(fallback_boxes[0])
+                if target is None:
+                    fallback_boxes.pop(0)
+            planner.relocate(slot, target, REASON_EMPTY_BOX)
+            spare -= 1
+            if type_id is not None:
+                counts[type_id][target[0]] += 1
+        emptied.add(box_no)
+    plan.emptied_boxes = sorted(emptied)
+
+    # Phase 3: bring lone locations of a type home
+    report("Grouping scattered part types", 0.7)
+    counts = planner.type_box_counts(excluded=emptied)
+    scattered: list[str] = []
+    for type_id, per_box in counts.items():
+        if len(per_box) < 2:
+            continue
+        scattered.append(snapshot.type_names[type_id])
+        home_box, home_count = max(per_box.items(), key=lambda entry: (entry[1], -entry[0]))
+        if home_count < 2:
+            continue
+        for box_no, count in sorted(per_box.items()):
+            if box_no == home_box or count != 1:
+                continue
+            stray = next(
+                (
+                    slot for slot in planner.box_slots[box_no]
+                    if len(planner.at_slot[slot]) == 1 and planner.slot_types(slot) == {type_id}
+                ),
+                None,
+            )
+            if stray is None:
+                continue
+            target = planner.take_free_slot(home_box)
+            if target is None:
+                break
+            planner.relocate(stray, target, REASON_GROUP_TYPE)
+    plan.scattered_types = sorted(scattered)
+
+    report("Collecting moves", 0.9)
+    for index, item in enumerate(items):
+        to_box_no, to_loc_no = planner.dest[index]
+        if (to_box_no, to_loc_no) == (item.box_no, item.loc_no):
+            continue
+        plan.moves.append(PlannedMove(
+            part_key=snapshot.part_keys[item.part_id],
+            from_box_no=item.box_no,
+            from_loc_no=item.loc_no,
+            to_box_no=to_box_no,
+            to_loc_no=to_loc_no,
+            qty=item.qty,
+            reason=planner.reason[index],
+        ))
+    plan.locations_freed = occupied_before - len(planner.at_slot)
+
+    report("Plan ready", 1.0)
+    return plan
@@ -13,12 +13,14 @@ Hook points called by create_app():
 
 Hook points called by CLI command handlers:
   - register_cli_commands()  -- register app-specific CLI commands
+    (check-part-quantities, check-box-occupancy, compact-quantity-history)
   - post_migration_hook()  -- after upgrade-db migrations
   - load_test_data_hook()  -- after load-test-data database recreation
 """
 
 from __future__ import annotations
 
+import sys
 from typing import TYPE_CHECKING
 
 import sqlalchemy as sa
@@ -184,13 +186,141 @@ def register_cli_commands(cli: click.Group) -> None:
     """Register app-specific CLI commands.
 
     Called by main() in cli.py before invoking the CLI group.
-    Currently no app-specific CLI commands exist. This hook is a
-    stable extension point for future app-specific commands.
 
     Args:
         cli: The Click CLI group to add commands to
     """
-    pass
+    import click
+
+    @cli.command("check-part-quantities")
+    @click.option("--repair", is_flag=True, help="Overwrite drifted totals with the actual sum")
+    @click.pass_context
+    def check_part_quantities(ctx: click.Context, repair: bool) -> None:
+        """Verify denormalized part totals against part locations."""
+        handle_check_part_quantities(app=ctx.obj["app"], repair=repair)
+
+    @cli.command("check-box-occupancy")
+    @click.option("--repair", is_flag=True, help="Recompute location flags and overwrite drifted box counters")
+    @click.pass_context
+    def check_box_occupancy(ctx: click.Context, repair: bool) -> None:
+        """Verify per-box occupied location counters against part locations."""
+        handle_check_box_occupancy(app=ctx.obj["app"], repair=repair)
+
+    @cli.command("compact-quantity-history")
+    @click.option(
+        "--retention-days",
+        type=click.IntRange(min=0),
+        default=None,
+        help="Days of raw history to keep (default: QUANTITY_HISTORY_RETENTION_DAYS, 0 keeps everything)",
+    )
+    @click.pass_context
+    def compact_quantity_history(ctx: click.Context, retention_days: int | None) -> None:
+        """Drop raw quantity history past retention and create upcoming partitions."""
+        handle_compact_quantity_history(app=ctx.obj["app"], retention_days=retention_days)
+
+
+def handle_check_part_quantities(app: Flask, repair: bool = False) -> None:
+    """Handle check-part-quantities command.
+
+    Exits with code 1 when drift is found and --repair was not given, so
+    the command can be used as a consistency check in scripts.
+    """
+    with app.app_context():
+        session = app.container.db_session()
+        try:
+            inventory_service = app.container.inventory_service()
+            drifted = inventory_service.check_total_quantities(repair=repair)
+
+            if not drifted:
+                print("All part total quantities are consistent")
+                return
+
+            for part_key, stored, actual in drifted:
+                print(f"   {part_key}: stored {stored}, actual {actual}")
+
+            if repair:
+                session.commit()
+                print(f"Repaired {len(drifted)} part total quantities")
+            else:
+                print(
+                    f"Found {len(drifted)} inconsistent part total quantities; "
+                    "run with --repair to fix",
+                    file=sys.stderr,
+                )
+                sys.exit(1)
+        finally:
+            app.container.db_session.reset()
+
+
+def handle_check_box_occupancy(app: Flask, repair: bool = False) -> None:
+    """Handle check-box-occupancy command.
+
+    Exits with code 1 when drift is found and --repair was not given, so
+    the command can be used as a consistency check in scripts.
+    """
+    with app.app_context():
+        session = app.container.db_session()
+        try:
+            box_service = app.container.box_service()
+            drifted = box_service.check_occupancy(repair=repair)
+
+            if not drifted:
+                if repair:
+                    # Location flags may have been fixed without box drift
+                    session.commit()
+                print("All box occupancy counters are consistent")
+                return
+
+            for box_no, stored, actual in drifted:
+                print(f"   Box {box_no}: stored {stored}, actual {actual}")
+
+            if repair:
+                session.commit()
+                print(f"Repaired {len(drifted)} box occupancy counters")
+            else:
+                print(
+                    f"Found {len(drifted)} inconsistent box occupancy counters; "
+                    "run with --repair to fix",
+                    file=sys.stderr,
+                )
+                sys.exit(1)
+        finally:
+            app.container.db_session.reset()
+
+
+def handle_compact_quantity_history(app: Flask, retention_days: int | None = None) -> None:
+    """Handle compact-quantity-history command.
+
+    Meant to run periodically (e.g. daily from cron). Dropped changes remain
+    in the daily rollups, so dashboard counts and trends are unaffected.
+    """
+    from app.exceptions import InvalidOperationException
+
+    with app.app_context():
+        session = app.container.db_session()
+        try:
+            quantity_history_service = app.container.quantity_history_service()
+            try:
+                result = quantity_history_service.compact(retention_days=retention_days)
+            except InvalidOperationException as e:
+                print(str(e), file=sys.stderr)
+                sys.exit(1)
+            session.commit()
+
+            for name in result.partitions_created:
+                print(f"   Created partition {name}")
+            for name in result.partitions_dropped:
+                print(f"   Dropped partition {name}")
+            if result.cutoff is None:
+                print("Quantity history retention is disabled; no history dropped")
+            else:
+                print(
+                    f"Dropped quantity history before {result.cutoff:%Y-%m-%d %H:%M} "
+                    f"({result.rows_deleted} rows deleted, "
+                    f"{len(result.partitions_dropped)} partitions dropped)"
+                )
+        finally:
+            app.container.db_session.reset()
 
 
 def post_migration_hook(app: Flask) -> None:
@@ -0,0 +1,78 @@
+"""
+Attachment Set Attachment Count Maintenance
+
+This module implements SQLAlchemy event handlers that keep the
+``attachment_sets.attachment_count`` column equal to the number of
+``attachments`` rows in each set. The dashboard's "parts without documents"
+count and sample read the column (through the partial
+``ix_attachment_sets_empty`` index) instead of grouping all attachments by
+set on every call.
+
+Every ``Attachment`` insert and delete flushed through the ORM, including the
+cascading delete of a set's attachments, adds or subtracts one with a single
+``UPDATE attachment_sets SET attachment_count = attachment_count + :delta``.
+An attachment moved to another set is taken out of the old one. Attachments
+are only written through the ORM; writes that bypass the flush are not
+tracked.
+"""
+
+from typing import Any
+
+from sqlalchemy import event, update
+from sqlalchemy.engine import Connection
+from sqlalchemy.orm import Mapper, Session, object_session
+
+from app.models.attachment import Attachment
+from app.models.attachment_set import AttachmentSet
+from app.utils.part_total_quantity import committed_value
+
+# Session.info key holding the set ids whose counter changed in this flush
+_TOUCHED_SET_IDS_KEY = "attachment_count_touched_ids"
+
+
+def _apply_delta(connection: Connection, target: Attachment, attachment_set_id: int, delta: int) -> None:
+    """Add delta to a set's attachment count and remember the set for expiry."""
+    sets = AttachmentSet.__table__
+    connection.execute(
+        update(sets)
+        .where(sets.c.id == attachment_set_id)
+        # Preserve updated_at: the count follows the attachments' own writes
+        .values(attachment_count=sets.c.attachment_count + delta, updated_at=sets.c.updated_at)
+    )
+
+    session = object_session(target)
+    if session is not None:
+        session.info.setdefault(_TOUCHED_SET_IDS_KEY, set()).add(attachment_set_id)
+
+
+@event.listens_for(Attachment, "after_insert")
+def count_new_attachment(mapper: Mapper[Any], connection: Connection, target: Attachment) -> None:
+    """Count a new attachment in its set."""
+    _apply_delta(connection, target, target.attachment_set_id, 1)
+
+
+@event.listens_for(Attachment, "after_update")
+def move_attachment_count(mapper: Mapper[Any], connection: Connection, target: Attachment) -> None:
+    """Move the count of an attachment that changed sets."""
+    old_set_id = committed_value(target, "attachment_set_id")
+    if old_set_id != target.attachment_set_id:
+        _apply_delta(connection, target, old_set_id, -1)
+        _apply_delta(connection, target, target.attachment_set_id, 1)
+
+
+@event.listens_for(Attachment, "after_delete")
+def uncount_removed_attachment(mapper: Mapper[Any], connection: Connection, target: Attachment) -> None:
+    """Take a removed attachment out of its set's count."""
+    _apply_delta(connection, target, committed_value(target, "attachment_set_id"), -1)
+
+
+@event.listens_for(Session, "after_flush_postexec")
+def expire_stale_attachment_counts(session: Session, flush_context: Any) -> None:
+    """Expire attachment_count on loaded sets so the next access reloads it."""
+    touched_ids = session.info.pop(_TOUCHED_SET_IDS_KEY, None)
+    if not touched_ids:
+        return
+
+    for obj in list(session.identity_map.values()):
+        if isinstance(obj, AttachmentSet) and obj.id in touched_ids:
+            session.expire(obj, ["attachment_count"])
@@ -0,0 +1,82 @@
+"""Opaque cursor encoding for keyset (seek) pagination.
+
+List endpoints that page with ``LIMIT/OFFSET`` get slower the deeper the
+client scrolls because the database has to produce and discard every row
+before the offset. Keyset pagination instead remembers the sort key of the
+last row returned and asks for rows strictly "after" it, which an index on
+the sort columns can answer directly.
+
+The sort key is handed to clients as an opaque, URL-safe token so the
+encoding can change without breaking the API contract.
+"""
+
+from __future__ import annotations
+
+import base64
+import binascii
+import json
+from datetime import datetime
+from typing import Any
+
+from app.exceptions import ValidationException
+
+CursorValue = datetime | int | float | str
+
+
+class InvalidCursorError(ValidationException):
+    """Exception raised when a pagination cursor cannot be decoded."""
+
+    def __init__(self) -> None:
+        super().__init__("cursor parameter is invalid or expired")
+
+
+def encode_cursor(*values: CursorValue) -> str:
+    """Encode the sort key of the last returned row into an opaque token."""
+    payload: list[Any] = [
+        value.isoformat() if isinstance(value, datetime) else value
+        for value in values
+    ]
+    raw = json.dumps(payload, separators=(",", ":")).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def decode_cursor(token: str, *types: type[CursorValue]) -> tuple[Any, ...]:
+    """Decode a token produced by ``encode_cursor``.
+
+    Args:
+        token: Opaque cursor string received from the client
+        types: Expected type of each value, in the order they were encoded
+
+    Returns:
+        Tuple of decoded values converted to the requested types
+
+    Raises:
+        InvalidCursorError: If the token is malformed or does not match types
+    """
+    try:
+        padded = token + "=" * (-len(token) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+    except (binascii.Error, UnicodeError, ValueError) as e:
+        raise InvalidCursorError() from e
+
+    if not isinstance(payload, list) or len(payload) != len(types):
+        raise InvalidCursorError()
+
+    decoded: list[Any] = []
+    for value, expected in zip(payload, types, strict=True):
+        try:
+            if expected is datetime:
+                decoded.append(datetime.fromisoformat(value))
+            elif expected is float and isinstance(value, int | float):
+                decoded.append(float(value))
+            elif isinstance(value, expected) and not isinstance(value, bool):
+                decoded.append(value)
+            else:
+                raise InvalidCursorError()
+        except (TypeError, ValueError) as e:
+            raise InvalidCursorError() from e
+
+    return tuple(decoded)
+
+
+__all__ = ["InvalidCursorError", "decode_cursor", "encode_cursor"]
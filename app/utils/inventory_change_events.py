@@ -0,0 +1,185 @@
+"""
+In-Process Inventory Change Events
+
+This module implements SQLAlchemy event handlers that collect which parts,
+boxes, types and attachment sets a transaction wrote, and publish them as an
+``InventoryChange`` to in-process subscribers once the transaction commits.
+Subscribers such as the dashboard gauges re-read only the entities named in
+the event instead of recomputing every aggregate.
+
+Changes are collected in two ways:
+1. ORM flushes that insert, update or delete parts, part locations, boxes,
+   locations, types, attachment sets, attachments or quantity history rows
+2. ``record_inventory_change`` calls by writes that bypass the flush, like
+   the atomic stock statements and bulk history inserts of the inventory
+   service
+
+Events name entities rather than carry values, so naming too much (for
+example writes of a rolled back savepoint) only costs a re-read. Rolled back
+transactions publish nothing. Other bulk statements are not tracked;
+subscribers are expected to reconcile periodically.
+"""
+
+import logging
+import threading
+from collections.abc import Callable, Iterable
+from dataclasses import dataclass, field
+from typing import Any
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session, SessionTransaction
+
+from app.models.attachment import Attachment
+from app.models.attachment_set import AttachmentSet
+from app.models.box import Box
+from app.models.location import Location
+from app.models.part import Part
+from app.models.part_location import PartLocation
+from app.models.quantity_history import QuantityHistory
+from app.models.type import Type
+from app.utils.part_total_quantity import committed_value
+
+logger = logging.getLogger(__name__)
+
+# Session.info key holding the InventoryChange collected in this transaction
+_PENDING_CHANGE_KEY = "inventory_change_events_pending"
+
+_subscribers: list[Callable[["InventoryChange"], None]] = []
+_subscribers_lock = threading.Lock()
+
+
+@dataclass
+class InventoryChange:
+    """Entities written by one or more committed transactions."""
+
+    part_ids: set[int] = field(default_factory=set)
+    box_nos: set[int] = field(default_factory=set)
+    type_ids: set[int] = field(default_factory=set)
+    attachment_set_ids: set[int] = field(default_factory=set)
+    history_rows: int = 0
+
+    def merge(self, other: "InventoryChange") -> None:
+        """Add the entities of another change to this one."""
+        self.part_ids |= other.part_ids
+        self.box_nos |= other.box_nos
+        self.type_ids |= other.type_ids
+        self.attachment_set_ids |= other.attachment_set_ids
+        self.history_rows += other.history_rows
+
+    def __bool__(self) -> bool:
+        return bool(
+            self.part_ids or self.box_nos or self.type_ids
+            or self.attachment_set_ids or self.history_rows
+        )
+
+
+def subscribe(callback: Callable[[InventoryChange], None]) -> None:
+    """Call callback with every committed InventoryChange in this process.
+
+    The callback runs in the committing thread right after the commit, so it
+    must be quick and must not use the database.
+    """
+    with _subscribers_lock:
+        _subscribers.append(callback)
+
+
+def unsubscribe(callback: Callable[[InventoryChange], None]) -> None:
+    """Stop calling a subscribed callback."""
+    with _subscribers_lock:
+        if callback in _subscribers:
+            _subscribers.remove(callback)
+
+
+def _pending_change(session: Session) -> InventoryChange:
+    change = session.info.get(_PENDING_CHANGE_KEY)
+    if change is None:
+        change = session.info[_PENDING_CHANGE_KEY] = InventoryChange()
+    return change
+
+
+def record_inventory_change(
+    session: Session,
+    part_ids: Iterable[int] = (),
+    box_nos: Iterable[int] = (),
+    type_ids: Iterable[int] = (),
+    attachment_set_ids: Iterable[int] = (),
+    history_rows: int = 0,
+) -> None:
+    """Record entities written without a flush, to be published on commit."""
+    if not _subscribers:
+        return
+
+    change = _pending_change(session)
+    change.part_ids.update(part_ids)
+    change.box_nos.update(box_nos)
+    change.type_ids.update(type_ids)
+    change.attachment_set_ids.update(attachment_set_ids)
+    change.history_rows += history_rows
+
+
+def _record_object(change: InventoryChange, obj: Any, is_update: bool) -> None:
+    """Record the entities affected by a flushed write of obj."""
+    if isinstance(obj, Part):
+        change.part_ids.add(obj.id)
+    elif isinstance(obj, PartLocation):
+        change.part_ids.add(obj.part_id)
+        change.box_nos.add(obj.box_no)
+        if is_update:
+            change.part_ids.add(committed_value(obj, "part_id"))
+            change.box_nos.add(committed_value(obj, "box_no"))
+    elif isinstance(obj, Box | Location):
+        change.box_nos.add(obj.box_no)
+    elif isinstance(obj, Type):
+        change.type_ids.add(obj.id)
+    elif isinstance(obj, AttachmentSet):
+        change.attachment_set_ids.add(obj.id)
+    elif isinstance(obj, Attachment):
+        change.attachment_set_ids.add(obj.attachment_set_id)
+        if is_update:
+            change.attachment_set_ids.add(committed_value(obj, "attachment_set_id"))
+
+
+@event.listens_for(Session, "after_flush")
+def collect_flushed_changes(session: Session, flush_context: Any) -> None:
+    """Record the entities written by the flush."""
+    if not _subscribers:
+        return
+
+    change = _pending_change(session)
+    for obj in session.new:
+        if isinstance(obj, QuantityHistory):
+            change.history_rows += 1
+        else:
+            _record_object(change, obj, is_update=False)
+    for obj in session.deleted:
+        _record_object(change, obj, is_update=False)
+    for obj in session.dirty:
+        if session.is_modified(obj, include_collections=False):
+            _record_object(change, obj, is_update=True)
+
+
+@event.listens_for(Session, "after_commit")
+def publish_committed_changes(session: Session) -> None:
+    """Publish the entities written by the committed transaction."""
+    if session.in_nested_transaction():
+        # Savepoint release; publish when the outer transaction commits
+        return
+
+    change = session.info.pop(_PENDING_CHANGE_KEY, None)
+    if not change:
+        return
+
+    with _subscribers_lock:
+        subscribers = list(_subscribers)
+    for callback in subscribers:
+        try:
+            callback(change)
+        except Exception as e:
+            logger.error("Error in inventory change subscriber: %s", e)
+
+
+@event.listens_for(Session, "after_transaction_end")
+def forget_uncommitted_changes(session: Session, transaction: SessionTransaction) -> None:
+    """Drop the collected changes when the outermost transaction ends without committing."""
+    if transaction.parent is None:
+        session.info.pop(_PENDING_CHANGE_KEY, None)
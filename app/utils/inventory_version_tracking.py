@@ -0,0 +1,135 @@
+"""
+Inventory Version Tracking
+
+This module implements SQLAlchemy event handlers that bump the single
+``inventory_version`` counter whenever a transaction writes inventory data.
+Read endpoints use the counter as an ETag (see app.utils.etag), so it must
+change whenever anything they return might have changed.
+
+Writes only mark the session as needing a bump; the counter is incremented
+once, right before the transaction commits. The bump is therefore part of the
+writing transaction (a rollback discards it, and a client can never observe
+new data under an old version), while the row lock on the counter is held
+only for the commit itself rather than from the first flush onwards.
+
+Two write paths are covered:
+1. ORM flushes that insert, update or delete rows of an inventory table
+2. ORM-enabled ``update()``/``delete()``/``insert()`` statements executed
+   through the session against an inventory table, which bypass the flush
+"""
+
+from typing import Any
+
+from sqlalchemy import event, insert, update
+from sqlalchemy.orm import ORMExecuteState, Session, SessionTransaction
+
+from app.extensions import db
+from app.models.inventory_version import InventoryVersion
+
+# Tables whose contents are served by the ETag'd read endpoints
+INVENTORY_TABLES = frozenset({
+    "parts",
+    "part_locations",
+    "part_sellers",
+    "quantity_history",
+    "attachment_sets",
+    # Attachment writes change the undocumented part counts; the
+    # attachment_count update runs on the connection, out of sight of the
+    # session events
+    "attachments",
+    # Seller names are embedded in part seller links
+    "sellers",
+    "boxes",
+    "locations",
+    "types",
+    "kits",
+    "kit_contents",
+    "kit_pick_lists",
+    "kit_pick_list_lines",
+    "kit_shopping_list_links",
+    "shopping_lists",
+    "shopping_list_lines",
+    "shopping_list_sellers",
+})
+
+# Session.info key set when the current transaction wrote inventory data
+_NEEDS_BUMP_KEY = "inventory_version_needs_bump"
+
+
+def _bump_inventory_version(session: Session) -> None:
+    """Increment the inventory version in the session's transaction."""
+    table = InventoryVersion.__table__
+    connection = session.connection()
+    result = connection.execute(
+        update(table)
+        .where(table.c.id == InventoryVersion.SINGLETON_ID)
+        .values(version=table.c.version + 1)
+    )
+    if result.rowcount == 0:
+        # The migration seeds the row; databases built with create_all()
+        # (tests) start without it
+        connection.execute(insert(table).values(id=InventoryVersion.SINGLETON_ID, version=1))
+
+
+def _is_inventory_table(obj: Any) -> bool:
+    """Check whether a model instance is stored in an inventory table."""
+    table = getattr(obj, "__table__", None)
+    return isinstance(obj, db.Model) and table is not None and table.name in INVENTORY_TABLES
+
+
+def _writes_inventory_data(session: Session) -> bool:
+    """Check whether the pending flush changes any inventory row."""
+    if any(_is_inventory_table(obj) for obj in session.new):
+        return True
+    if any(_is_inventory_table(obj) for obj in session.deleted):
+        return True
+    return any(
+        _is_inventory_table(obj) and session.is_modified(obj, include_collections=False)
+        for obj in session.dirty
+    )
+
+
+def has_pending_inventory_writes(session: Session) -> bool:
+    """Check whether the session's transaction wrote inventory data not yet committed.
+
+    Such writes are not reflected in the stored version until the commit, so
+    caches keyed by the version must not be used within that transaction.
+    """
+    return bool(session.info.get(_NEEDS_BUMP_KEY)) or _writes_inventory_data(session)
+
+
+@event.listens_for(Session, "after_flush")
+def mark_version_on_flush(session: Session, flush_context: Any) -> None:
+    """Mark the transaction for a version bump when a flush writes inventory rows."""
+    if _writes_inventory_data(session):
+        session.info[_NEEDS_BUMP_KEY] = True
+
+
+@event.listens_for(Session, "do_orm_execute")
+def mark_version_on_bulk_statement(orm_execute_state: ORMExecuteState) -> None:
+    """Mark the transaction for a version bump for ORM bulk DML on inventory tables."""
+    if not (orm_execute_state.is_update or orm_execute_state.is_delete or orm_execute_state.is_insert):
+        return
+    table = getattr(orm_execute_state.statement, "table", None)
+    if table is not None and table.name in INVENTORY_TABLES:
+        orm_execute_state.session.info[_NEEDS_BUMP_KEY] = True
+
+
+@event.listens_for(Session, "before_commit")
+def bump_version_before_commit(session: Session) -> None:
+    """Bump the inventory version once if the committing transaction wrote inventory data."""
+    if session.in_nested_transaction():
+        # Savepoint release; the outer commit does the bump
+        return
+
+    # Flush here rather than in commit() so the flush's writes are seen
+    session.flush()
+    if session.info.pop(_NEEDS_BUMP_KEY, False):
+        _bump_inventory_version(session)
+
+
+@event.listens_for(Session, "after_transaction_end")
+def forget_version_bump(session: Session, transaction: SessionTransaction) -> None:
+    """Drop a pending bump when the outermost transaction ends without committing."""
+    if transaction.parent is None:
+        session.info.pop(_NEEDS_BUMP_KEY, None)
@@ -0,0 +1,220 @@
+"""Fast-path serialization for large list responses.
+
+List endpoints normally build a Pydantic model per row and let spectree
+validate the whole response again, which dominates request time on big pages.
+This module offers an opt-in alternative:
+
+- ``RowEncoder`` turns ORM rows into response dicts with getters compiled once
+  per schema, so no model is instantiated per row
+- ``list_json_response`` encodes the rows in a single pass with a preconfigured
+  JSON encoder and validates them against the response schema only for a
+  sample of responses (see ``AppSettings.response_validation_sample_rate``)
+
+Endpoints using it must pass ``skip_validation=True`` to ``@api.validate``;
+the sampled validation here replaces spectree's per-response check. That also
+turns off spectree's request validation, so such endpoints parse their query
+with ``validate_query``, which answers invalid input the way spectree does.
+"""
+
+import json
+import logging
+import random
+from collections.abc import Callable, Iterable, Mapping
+from dataclasses import asdict, is_dataclass
+from datetime import UTC, date, datetime
+from decimal import Decimal
+from enum import Enum
+from operator import attrgetter
+from typing import Any, TypeVar
+from uuid import UUID
+
+from flask import abort, current_app, jsonify, make_response, request
+from flask.wrappers import Response
+from prometheus_client import Counter
+from pydantic import BaseModel, TypeAdapter, ValidationError
+from spectree.utils import get_multidict_items
+from werkzeug.http import http_date
+
+from app.utils import spectree_config
+
+logger = logging.getLogger(__name__)
+
+RESPONSE_VALIDATION_SAMPLES_TOTAL = Counter(
+    "response_validation_samples_total",
+    "Fast-path list responses validated against their schema, by outcome",
+    ["schema", "outcome"],
+)
+
+Getter = Callable[[Any], Any]
+
+QueryModel = TypeVar("QueryModel", bound=BaseModel)
+
+
+def _constant_none(row: Any) -> None:
+    return None
+
+
+class RowEncoder:
+    """Precompiled ORM row to response dict encoder.
+
+    The field order and names follow the response schema; each field is read
+    with a getter built when the encoder is created.
+    """
+
+    def __init__(self, getters: Mapping[str, Getter]) -> None:
+        self._getters = tuple(getters.items())
+
+    @classmethod
+    def for_schema(
+        cls,
+        schema: type[BaseModel],
+        overrides: Mapping[str, Getter | None] | None = None,
+        source: str | None = None,
+    ) -> "RowEncoder":
+        """Build an encoder producing the same keys as ``schema.model_dump()``.
+
+        Args:
+            schema: Response schema whose fields (including computed fields)
+                define the output keys
+            overrides: Getters for fields that are not plain attributes of the
+                row, e.g. nested lists or computed values. ``None`` always
+                yields ``None``, for fields the caller fills in afterwards.
+            source: Dotted attribute path to read plain fields from, when the
+                row wraps the ORM object (e.g. ``"part"``)
+
+        Raises:
+            ValueError: If a computed field has no override
+        """
+        overrides = overrides or {}
+        getters: dict[str, Getter] = {}
+        for name in schema.model_fields:
+            if name in overrides:
+                getters[name] = overrides[name] or _constant_none
+            else:
+                getters[name] = attrgetter(f"{source}.{name}" if source else name)
+        for name in schema.model_computed_fields:
+            if name not in overrides:
+                raise ValueError(f"{schema.__name__}.{name} is computed and needs an override")
+            getters[name] = overrides[name] or _constant_none
+        return cls(getters)
+
+    def __call__(self, row: Any) -> dict[str, Any]:
+        return {name: getter(row) for name, getter in self._getters}
+
+    def encode_many(self, rows: Iterable[Any]) -> list[dict[str, Any]]:
+        """Encode every row."""
+        return [{name: getter(row) for name, getter in self._getters} for row in rows]
+
+
+_WEEKDAYS = ("Mon", "Tue", "Wed", "Thu", "Fri", "Sat", "Sun")
+_MONTHS = ("", "Jan", "Feb", "Mar", "Apr", "May", "Jun", "Jul", "Aug", "Sep", "Oct", "Nov", "Dec")
+
+
+def _http_datetime(value: datetime) -> str:
+    """Format a datetime like ``werkzeug.http.http_date`` at a fraction of the cost."""
+    if value.tzinfo is None:
+        # http_date treats naive datetimes as UTC
+        utc = value
+    else:
+        utc = value.astimezone(UTC)
+    return (
+        f"{_WEEKDAYS[utc.weekday()]}, {utc.day:02d} {_MONTHS[utc.month]} {utc.year:04d} "
+        f"{utc.hour:02d}:{utc.minute:02d}:{utc.second:02d} GMT"
+    )
+
+
+def _json_default(value: Any) -> Any:
+    """Encode the non-JSON types the ORM returns, the way Flask's provider does."""
+    if isinstance(value, datetime):
+        return _http_datetime(value)
+    if isinstance(value, date):
+        return http_date(value)
+    if isinstance(value, Enum):
+        return value.value
+    if isinstance(value, Decimal | UUID):
+        return str(value)
+    if is_dataclass(value) and not isinstance(value, type):
+        return asdict(value)
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+_ENCODER = json.JSONEncoder(
+    default=_json_default,
+    ensure_ascii=False,
+    check_circular=False,
+    separators=(",", ":"),
+)
+
+# Row validators per schema, built on first use
+_list_adapters: dict[type[BaseModel], TypeAdapter[Any]] = {}
+
+
+def _validate_sample(schema: type[BaseModel], rows: list[dict[str, Any]]) -> None:
+    """Validate the rows against the schema for a sample of responses.
+
+    With a sample rate of 1 (development and tests) a mismatch raises, so a
+    wrong encoder fails loudly. Below 1 (production) the mismatch is logged
+    and counted and the response is still served.
+    """
+    sample_rate = current_app.container.app_config().response_validation_sample_rate
+    if sample_rate <= 0 or (sample_rate < 1 and random.random() >= sample_rate):
+        return
+
+    adapter = _list_adapters.get(schema)
+    if adapter is None:
+        adapter = _list_adapters[schema] = TypeAdapter(list[schema])  # type: ignore[valid-type]
+
+    try:
+        adapter.validate_python(rows)
+    except ValidationError as e:
+        RESPONSE_VALIDATION_SAMPLES_TOTAL.labels(schema=schema.__name__, outcome="invalid").inc()
+        if sample_rate >= 1:
+            raise
+        logger.error("Fast-path %s response failed validation: %s", schema.__name__, e)
+        return
+
+    RESPONSE_VALIDATION_SAMPLES_TOTAL.labels(schema=schema.__name__, outcome="valid").inc()
+
+
+def encode_json(payload: Any) -> str:
+    """Encode a response payload with the fast-path JSON encoder."""
+    return _ENCODER.encode(payload)
+
+
+def list_json_response(
+    rows: list[dict[str, Any]],
+    schema: type[BaseModel],
+    status: int = 200,
+    headers: Mapping[str, str] | None = None,
+) -> Response:
+    """Build a JSON response for encoded list rows.
+
+    Args:
+        rows: Rows produced by a ``RowEncoder`` (plus any fields added by the
+            caller)
+        schema: Row schema used for sampled validation
+        status: HTTP status code
+        headers: Extra response headers
+
+    Returns:
+        A ``application/json`` response
+    """
+    _validate_sample(schema, rows)
+    return current_app.response_class(
+        encode_json(rows),
+        status=status,
+        headers=dict(headers) if headers else None,
+        mimetype="application/json",
+    )
+
+
+def validate_query(schema: type[QueryModel]) -> QueryModel:
+    """Validate the request's query string like spectree's request validation.
+
+    For endpoints declared with ``skip_validation=True``. Invalid input
+    aborts with the same status and body spectree would have returned.
+    """
+    try:
+        return schema.model_validate(get_multidict_items(request.args, schema))
+    except ValidationError as e:
+        abort(make_response(jsonify(e.json(include_context=False)), spectree_config.api.validation_error_status))
@@ -0,0 +1,166 @@
+"""
+Location Occupancy Maintenance
+
+This module implements SQLAlchemy event handlers that keep the
+``locations.is_occupied`` flag equal to "at least one ``part_locations`` row
+references this location", and ``boxes.occupied_locations`` equal to the
+number of occupied locations in each box. Location suggestions read free
+locations through the partial ``ix_locations_free`` index, and box listings
+and the storage summary read the per-box counter, instead of aggregating
+``part_locations`` on each call.
+
+A ``PartLocation`` insert marks its location occupied with
+``UPDATE locations SET is_occupied = true WHERE ... AND NOT is_occupied``; a
+delete, or a move to another location, releases the location it left with a
+conditional update that only matches when no other assignment still uses it.
+Releasing conditionally rather than clearing keeps the flag right when several
+parts share a location. Only when one of these statements actually flips the
+flag is the box counter adjusted, in the same transaction.
+
+Writes that bypass the flush are not tracked. The atomic stock statements of
+the inventory service call ``mark_location_occupied`` and
+``refresh_location_occupancy`` themselves; the ``check-box-occupancy`` CLI
+command reports and repairs any other drift.
+"""
+
+from typing import Any
+
+from sqlalchemy import Update, event, false, select, true, update
+from sqlalchemy.engine import Connection
+from sqlalchemy.orm import Mapper, Session, object_session
+
+from app.models.box import Box
+from app.models.location import Location
+from app.models.part_location import PartLocation
+from app.utils.part_total_quantity import committed_value
+
+# Session.info keys holding the location ids whose flag may have changed and
+# the box numbers whose counter changed in this flush
+_TOUCHED_LOCATION_IDS_KEY = "location_occupancy_touched_ids"
+_TOUCHED_BOX_NOS_KEY = "location_occupancy_touched_box_nos"
+
+
+def _mark_statement(location_id: int) -> Update:
+    locations = Location.__table__
+    return (
+        update(locations)
+        .where(locations.c.id == location_id, ~locations.c.is_occupied)
+        .values(is_occupied=true())
+        .returning(locations.c.box_no)
+    )
+
+
+def _release_statement(location_id: int) -> Update:
+    locations = Location.__table__
+    part_locations = PartLocation.__table__
+    still_used = select(part_locations.c.id).where(part_locations.c.location_id == locations.c.id).exists()
+    return (
+        update(locations)
+        .where(locations.c.id == location_id, locations.c.is_occupied, ~still_used)
+        .values(is_occupied=false())
+        .returning(locations.c.box_no)
+    )
+
+
+def _count_statement(box_no: int, delta: int) -> Update:
+    boxes = Box.__table__
+    return (
+        update(boxes)
+        .where(boxes.c.box_no == box_no)
+        # Preserve updated_at: stock changes are not edits of the box
+        .values(occupied_locations=boxes.c.occupied_locations + delta, updated_at=boxes.c.updated_at)
+    )
+
+
+def _flip(executor: Connection | Session, statement: Update, delta: int) -> int | None:
+    """Run a mark or release statement and count a flip in its box; returns the box_no if flipped."""
+    flipped = executor.execute(statement).first()
+    if flipped is None:
+        return None
+    box_no = int(flipped.box_no)
+    executor.execute(_count_statement(box_no, delta))
+    return box_no
+
+
+def _remember(target: PartLocation | Location, location_id: int, box_no: int | None) -> None:
+    session = object_session(target)
+    if session is not None:
+        session.info.setdefault(_TOUCHED_LOCATION_IDS_KEY, set()).add(location_id)
+        if box_no is not None:
+            session.info.setdefault(_TOUCHED_BOX_NOS_KEY, set()).add(box_no)
+
+
+def _expire_loaded_location(session: Session, location_id: int) -> None:
+    location = session.identity_map.get(Session.identity_key(Location, location_id))
+    if location is not None:
+        session.expire(location, ["is_occupied"])
+
+
+def _expire_loaded_boxes(session: Session, box_nos: set[int]) -> None:
+    for obj in list(session.identity_map.values()):
+        if isinstance(obj, Box) and obj.box_no in box_nos:
+            session.expire(obj, ["occupied_locations"])
+
+
+@event.listens_for(PartLocation, "after_insert")
+def occupy_location(mapper: Mapper[Any], connection: Connection, target: PartLocation) -> None:
+    """Mark the location of a new location assignment occupied."""
+    box_no = _flip(connection, _mark_statement(target.location_id), 1)
+    _remember(target, target.location_id, box_no)
+
+
+@event.listens_for(PartLocation, "after_update")
+def move_location_occupancy(mapper: Mapper[Any], connection: Connection, target: PartLocation) -> None:
+    """Update both locations when an assignment moves to another location."""
+    old_location_id = committed_value(target, "location_id")
+    if old_location_id == target.location_id:
+        return
+
+    released_box_no = _flip(connection, _release_statement(old_location_id), -1)
+    occupied_box_no = _flip(connection, _mark_statement(target.location_id), 1)
+    _remember(target, old_location_id, released_box_no)
+    _remember(target, target.location_id, occupied_box_no)
+
+
+@event.listens_for(PartLocation, "after_delete")
+def release_location(mapper: Mapper[Any], connection: Connection, target: PartLocation) -> None:
+    """Release the location a removed assignment used, unless another still uses it."""
+    location_id = committed_value(target, "location_id")
+    box_no = _flip(connection, _release_statement(location_id), -1)
+    _remember(target, location_id, box_no)
+
+
+@event.listens_for(Location, "after_delete")
+def uncount_removed_location(mapper: Mapper[Any], connection: Connection, target: Location) -> None:
+    """Take a removed occupied location out of its box's count."""
+    if committed_value(target, "is_occupied"):
+        box_no = committed_value(target, "box_no")
+        connection.execute(_count_statement(box_no, -1))
+        _remember(target, target.id, box_no)
+
+
+@event.listens_for(Session, "after_flush_postexec")
+def expire_stale_occupancy(session: Session, flush_context: Any) -> None:
+    """Expire is_occupied and occupied_locations on loaded rows so the next access reloads them."""
+    touched_ids = session.info.pop(_TOUCHED_LOCATION_IDS_KEY, None)
+    touched_box_nos = session.info.pop(_TOUCHED_BOX_NOS_KEY, None)
+    for location_id in touched_ids or ():
+        _expire_loaded_location(session, location_id)
+    if touched_box_nos:
+        _expire_loaded_boxes(session, touched_box_nos)
+
+
+def mark_location_occupied(session: Session, location_id: int) -> None:
+    """Mark a location occupied after a stock write that bypassed the flush."""
+    box_no = _flip(session, _mark_statement(location_id), 1)
+    _expire_loaded_location(session, location_id)
+    if box_no is not None:
+        _expire_loaded_boxes(session, {box_no})
+
+
+def refresh_location_occupancy(session: Session, location_id: int) -> None:
+    """Release a location after a stock removal that bypassed the flush, unless still used."""
+    box_no = _flip(session, _release_statement(location_id), -1)
+    _expire_loaded_location(session, location_id)
+    if box_no is not None:
+        _expire_loaded_boxes(session, {box_no})
@@ -0,0 +1,40 @@
+"""Manufacturer part number normalization and trigram similarity helpers."""
+
+import re
+
+# Anything that is not a plain ASCII letter or digit is formatting noise in a
+# part number ("LM7805-CT" and "lm7805ct" are the same part). The migration
+# that backfills parts.manufacturer_code_normalized uses the same character class.
+_NON_ALNUM = re.compile(r"[^A-Za-z0-9]")
+
+# Default pg_trgm.similarity_threshold, used by the "%" operator
+TRIGRAM_SIMILARITY_THRESHOLD = 0.3
+
+
+def normalize_manufacturer_code(code: str | None) -> str | None:
+    """Return the upper-cased alphanumeric core of a manufacturer code.
+
+    Returns None when nothing alphanumeric remains.
+    """
+    if code is None:
+        return None
+    normalized = _NON_ALNUM.sub("", code).upper()
+    return normalized or None
+
+
+def _trigrams(value: str) -> set[str]:
+    padded = f"  {value.lower()} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+def trigram_similarity(a: str, b: str) -> float:
+    """Approximate pg_trgm similarity() for single-word values.
+
+    Used where the database has no pg_trgm extension (SQLite in tests).
+    """
+    a_trigrams = _trigrams(a)
+    b_trigrams = _trigrams(b)
+    union = a_trigrams | b_trigrams
+    if not union:
+        return 0.0
+    return len(a_trigrams & b_trigrams) / len(union)
@@ -0,0 +1,124 @@
+"""
+Denormalized Part Total Quantity Maintenance
+
+This module implements SQLAlchemy event handlers that keep the
+``parts.total_quantity`` column equal to ``SUM(part_locations.qty)`` for every
+part. Listings, low-stock filters and quantity lookups read the column instead
+of aggregating ``part_locations`` on every request.
+
+Every ``PartLocation`` insert, update and delete flushed through the ORM
+applies its quantity delta to the owning part with a single
+``UPDATE parts SET total_quantity = total_quantity + :delta``. Because the
+handlers run at flush time they cover every write path (inventory service,
+test data loading, cascading part deletes) without each caller having to
+remember to maintain the counter.
+
+Writes that bypass the flush (raw SQL, bulk statements) are not tracked.
+Code issuing such statements on purpose, like the atomic stock paths of the
+inventory service, applies the delta itself with ``apply_total_quantity_delta``;
+the ``check-part-quantities`` CLI command reports and repairs any other drift.
+"""
+
+from typing import Any
+
+from sqlalchemy import event, update
+from sqlalchemy.engine import Connection
+from sqlalchemy.orm import Mapper, Session, object_session
+from sqlalchemy.orm.attributes import get_history
+
+from app.models.part import Part
+from app.models.part_location import PartLocation
+
+# Session.info key holding the part ids whose counter changed in this flush
+_TOUCHED_PART_IDS_KEY = "part_total_quantity_touched_ids"
+
+
+def committed_value(target: PartLocation, attribute: str) -> Any:
+    """Return the value of an attribute as currently stored in the database."""
+    history = get_history(target, attribute)
+    if history.deleted:
+        return history.deleted[0]
+    if history.unchanged:
+        return history.unchanged[0]
+    return getattr(target, attribute)
+
+
+def _apply_delta(connection: Connection, target: PartLocation, part_id: int, delta: int) -> None:
+    """Add delta to a part's total quantity and remember the part for expiry."""
+    if delta == 0:
+        return
+
+    parts = Part.__table__
+    connection.execute(
+        update(parts)
+        .where(parts.c.id == part_id)
+        # Preserve updated_at: a stock change is not an edit of the part itself
+        .values(total_quantity=parts.c.total_quantity + delta, updated_at=parts.c.updated_at)
+    )
+
+    session = object_session(target)
+    if session is not None:
+        session.info.setdefault(_TOUCHED_PART_IDS_KEY, set()).add(part_id)
+
+
+@event.listens_for(PartLocation, "after_insert")
+def add_location_quantity(mapper: Mapper[Any], connection: Connection, target: PartLocation) -> None:
+    """Add the quantity of a new location assignment to its part."""
+    _apply_delta(connection, target, target.part_id, target.qty)
+
+
+@event.listens_for(PartLocation, "after_update")
+def update_location_quantity(mapper: Mapper[Any], connection: Connection, target: PartLocation) -> None:
+    """Move the quantity difference of a changed location assignment onto its part."""
+    old_part_id = committed_value(target, "part_id")
+    old_qty = committed_value(target, "qty")
+
+    if old_part_id == target.part_id:
+        _apply_delta(connection, target, target.part_id, target.qty - old_qty)
+    else:
+        _apply_delta(connection, target, old_part_id, -old_qty)
+        _apply_delta(connection, target, target.part_id, target.qty)
+
+
+@event.listens_for(PartLocation, "after_delete")
+def remove_location_quantity(mapper: Mapper[Any], connection: Connection, target: PartLocation) -> None:
+    """Subtract the stored quantity of a removed location assignment from its part."""
+    _apply_delta(
+        connection,
+        target,
+        committed_value(target, "part_id"),
+        -committed_value(target, "qty"),
+    )
+
+
+@event.listens_for(Session, "after_flush_postexec")
+def expire_stale_total_quantities(session: Session, flush_context: Any) -> None:
+    """Expire total_quantity on loaded parts so the next access reloads it."""
+    touched_ids = session.info.pop(_TOUCHED_PART_IDS_KEY, None)
+    if not touched_ids:
+        return
+
+    for obj in list(session.identity_map.values()):
+        if isinstance(obj, Part) and obj.id in touched_ids:
+            session.expire(obj, ["total_quantity"])
+
+
+def apply_total_quantity_delta(session: Session, part_id: int, delta: int) -> None:
+    """Add delta to a part's total quantity for a stock write that bypassed the flush.
+
+    The loaded part, if any, has its ``total_quantity`` expired like after a
+    flush.
+    """
+    if delta == 0:
+        return
+
+    session.execute(
+        update(Part)
+        .where(Part.id == part_id)
+        .values(total_quantity=Part.total_quantity + delta, updated_at=Part.updated_at)
+        .execution_options(synchronize_session=False)
+    )
+
+    part = session.identity_map.get(Session.identity_key(Part, part_id))
+    if part is not None:
+        session.expire(part, ["total_quantity"])
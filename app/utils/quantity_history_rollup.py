@@ -0,0 +1,117 @@
+"""
+Quantity History Daily Rollups
+
+This module implements SQLAlchemy event handlers that keep
+``quantity_history_daily`` equal to the per part and day totals of
+``quantity_history``: the number of changes and the quantities added and
+removed. Dashboard counts and part trends read the rollups, so their cost
+depends on the time window rather than on the amount of raw history, and the
+retention job can drop raw rows without losing them from trends.
+
+``QuantityHistory`` rows inserted by a flush are remembered and rolled up
+after the flush with a single ``INSERT ... SELECT ... ON CONFLICT DO UPDATE``
+that groups them by part and day. The day is taken from the stored timestamp,
+so rows with an explicit timestamp (test data, backfills) land on the right
+day. Deleting a raw row through the ORM, as a cascading part delete does,
+takes it out of its day again; the retention job deletes with plain
+statements, so dropped rows stay counted. History rows are never updated.
+
+Inserts that bypass the flush, like the bulk insert of the inventory
+service's stock batches, call ``roll_up_quantity_history`` with the new ids.
+"""
+
+from collections.abc import Collection
+from typing import Any
+
+from sqlalchemy import Date, case, event, func, select, update
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.engine import Connection
+from sqlalchemy.orm import Mapper, Session, object_session
+
+from app.models.quantity_history import QuantityHistory
+from app.models.quantity_history_daily import QuantityHistoryDaily
+
+# Session.info key holding the ids of history rows inserted in this flush
+_PENDING_HISTORY_IDS_KEY = "quantity_history_rollup_pending_ids"
+
+
+def _day(timestamp: Any) -> Any:
+    """Day of a stored timestamp; date() works on SQLite and PostgreSQL."""
+    return func.date(timestamp, type_=Date)
+
+
+def _roll_up(connection: Connection, history_ids: Collection[int]) -> None:
+    history = QuantityHistory.__table__
+    daily = QuantityHistoryDaily.__table__
+    rows = (
+        select(
+            history.c.part_id,
+            _day(history.c.timestamp),
+            func.count(),
+            func.sum(case((history.c.delta_qty > 0, history.c.delta_qty), else_=0)),
+            func.sum(case((history.c.delta_qty < 0, -history.c.delta_qty), else_=0)),
+        )
+        .where(history.c.id.in_(history_ids))
+        .group_by(history.c.part_id, _day(history.c.timestamp))
+    )
+
+    dialect = sqlite if connection.dialect.name == "sqlite" else postgresql
+    stmt = dialect.insert(daily).from_select(
+        ["part_id", "day", "change_count", "qty_added", "qty_removed"], rows
+    )
+    connection.execute(
+        stmt.on_conflict_do_update(
+            index_elements=[daily.c.part_id, daily.c.day],
+            set_={
+                "change_count": daily.c.change_count + stmt.excluded.change_count,
+                "qty_added": daily.c.qty_added + stmt.excluded.qty_added,
+                "qty_removed": daily.c.qty_removed + stmt.excluded.qty_removed,
+            },
+        )
+    )
+
+
+@event.listens_for(QuantityHistory, "after_insert")
+def remember_history_row(mapper: Mapper[Any], connection: Connection, target: QuantityHistory) -> None:
+    """Remember a new history row for the rollup after the flush."""
+    session = object_session(target)
+    if session is not None:
+        session.info.setdefault(_PENDING_HISTORY_IDS_KEY, set()).add(target.id)
+
+
+@event.listens_for(QuantityHistory, "before_delete")
+def remove_history_row(mapper: Mapper[Any], connection: Connection, target: QuantityHistory) -> None:
+    """Take a history row out of its day before the row is deleted."""
+    history = QuantityHistory.__table__
+    row = connection.execute(
+        select(history.c.part_id, _day(history.c.timestamp), history.c.delta_qty)
+        .where(history.c.id == target.id)
+    ).one_or_none()
+    if row is None:
+        return
+
+    part_id, day, delta_qty = row
+    daily = QuantityHistoryDaily.__table__
+    connection.execute(
+        update(daily)
+        .where(daily.c.part_id == part_id, daily.c.day == day)
+        .values(
+            change_count=daily.c.change_count - 1,
+            qty_added=daily.c.qty_added - max(delta_qty, 0),
+            qty_removed=daily.c.qty_removed - max(-delta_qty, 0),
+        )
+    )
+
+
+@event.listens_for(Session, "after_flush")
+def roll_up_flushed_history(session: Session, flush_context: Any) -> None:
+    """Add the history rows inserted by the flush to their daily rollups."""
+    history_ids = session.info.pop(_PENDING_HISTORY_IDS_KEY, None)
+    if history_ids:
+        _roll_up(session.connection(), history_ids)
+
+
+def roll_up_quantity_history(session: Session, history_ids: Collection[int]) -> None:
+    """Add history rows inserted without a flush to their daily rollups."""
+    if history_ids:
+        _roll_up(session.connection(), history_ids)
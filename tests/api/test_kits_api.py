@@ -1,5 +1,6 @@
 """Tests for kit API endpoints."""
 
+import json
 from datetime import UTC, datetime
 
 from app.models.kit import Kit, KitStatus
@@ -136,6 +137,27 @@ class TestKitsApi:
         assert len(payload) == 1
         assert payload[0]["name"] == "Portable Recorder Kit"
 
+    def test_list_kit_availability(self, client, session, make_attachment_set):
+        kit, part, _content = _seed_kit_with_content(session, make_attachment_set)
+        part.total_quantity = 3
+        session.commit()
+
+        response = client.get("/api/kits/availability")
+
+        assert response.status_code == 200, response.get_data(as_text=True)
+        assert response.get_json() == [
+            {
+                "kit_id": kit.id,
+                "name": kit.name,
+                "build_target": 2,
+                "buildable": False,
+                "max_buildable_units": 1,
+                "shortfall_parts": [
+                    {"part_key": "AP01", "total_required": 4, "available": 3, "shortfall": 1},
+                ],
+            }
+        ]
+
     def test_create_kit_endpoint(self, client, session):
         response = client.post(
             "/api/kits",
@@ -234,6 +256,9 @@ class TestKitsApi:
     def test_get_kits_rejects_invalid_status(self, client):
         response = client.get("/api/kits?status=bogus")
         assert response.status_code == 400
+        # Same body as spectree's request validation
+        errors = json.loads(response.get_json())
+        assert [(error["loc"], error["type"]) for error in errors] == [(["status"], "enum")]
 
     def test_update_archived_kit_returns_error(self, client, session, make_attachment_set):
         attachment_set = make_attachment_set()
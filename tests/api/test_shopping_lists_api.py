@@ -1,5 +1,6 @@
 """API tests for shopping list endpoints."""
 
+import json
 import uuid
 
 from app.models.kit import Kit, KitStatus
@@ -111,6 +112,13 @@ class TestShoppingListsAPI:
         invalid = client.get("/api/shopping-lists?status=invalid")
         assert invalid.status_code == 409
 
+    def test_list_shopping_lists_rejects_invalid_query(self, client):
+        response = client.get("/api/shopping-lists?include_done=notabool")
+
+        assert response.status_code == 400
+        errors = json.loads(response.get_json())
+        assert [(error["loc"], error["type"]) for error in errors] == [(["include_done"], "bool_parsing")]
+
     def test_status_transitions_validate_rules(self, client, session, container):
         shopping_list_service = container.shopping_list_service()
 
@@ -0,0 +1,176 @@
+"""Tests for the event-driven dashboard gauges."""
+
+from collections.abc import Generator
+
+import pytest
+from flask import Flask
+from prometheus_client import Gauge
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from app.extensions import db
+from app.models.attachment import Attachment, AttachmentType
+from app.models.type import Type
+from app.services.container import ServiceContainer
+from app.services.metrics.dashboard_metrics import (
+    INVENTORY_BOX_UTILIZATION_PERCENT,
+    INVENTORY_LOW_STOCK_PARTS,
+    INVENTORY_PARTS_BY_TYPE,
+    INVENTORY_PARTS_WITHOUT_DOCS,
+    INVENTORY_RECENT_CHANGES_7D,
+    INVENTORY_TOTAL_BOXES,
+    INVENTORY_TOTAL_PARTS,
+    INVENTORY_TOTAL_QUANTITY,
+    DashboardGaugeUpdater,
+)
+from app.utils.inventory_change_events import subscribe, unsubscribe
+
+_GAUGES = (
+    INVENTORY_TOTAL_PARTS,
+    INVENTORY_TOTAL_QUANTITY,
+    INVENTORY_LOW_STOCK_PARTS,
+    INVENTORY_PARTS_WITHOUT_DOCS,
+    INVENTORY_RECENT_CHANGES_7D,
+    INVENTORY_TOTAL_BOXES,
+    INVENTORY_BOX_UTILIZATION_PERCENT,
+    INVENTORY_PARTS_BY_TYPE,
+)
+
+
+def _samples(gauge: Gauge) -> dict[tuple[str, ...], float]:
+    return {tuple(sample.labels.values()): sample.value for sample in gauge.collect()[0].samples}
+
+
+def _snapshot() -> dict[str, dict[tuple[str, ...], float]]:
+    return {gauge._name: _samples(gauge) for gauge in _GAUGES}
+
+
+@pytest.fixture
+def updater(app: Flask, container: ServiceContainer) -> Generator[DashboardGaugeUpdater]:
+    updater = DashboardGaugeUpdater(container, reconcile_interval_seconds=3600)
+    subscribe(updater.on_inventory_change)
+    yield updater
+    unsubscribe(updater.on_inventory_change)
+
+
+class TestDashboardGaugeUpdater:
+    """Test cases for DashboardGaugeUpdater."""
+
+    def test_first_poll_reconciles_all_gauges(
+        self, app: Flask, session: Session, container: ServiceContainer, updater: DashboardGaugeUpdater
+    ):
+        """Test the first tick computes every gauge from the database."""
+        with app.app_context():
+            box = container.box_service().create_box("Test Box", 4)
+            sensor = Type(name="Sensor")
+            session.add(sensor)
+            session.flush()
+            part = container.part_service().create_part("Sensor part", type_id=sensor.id)
+            session.commit()
+            container.inventory_service().add_stock(part.key, box.box_no, 1, 3)
+            session.commit()
+
+            updater.poll()
+
+            assert _snapshot() == {
+                "inventory_total_parts": {(): 1},
+                "inventory_total_quantity": {(): 3},
+                "inventory_low_stock_parts": {(): 1},
+                "inventory_parts_without_docs": {(): 1},
+                "inventory_recent_changes_7d": {(): 1},
+                "inventory_total_boxes": {(): 1},
+                "inventory_box_utilization_percent": {(str(box.box_no),): 25.0},
+                "inventory_parts_by_type": {("Sensor",): 1},
+            }
+
+    def test_changes_are_applied_incrementally(
+        self, app: Flask, session: Session, container: ServiceContainer, updater: DashboardGaugeUpdater
+    ):
+        """Test gauges updated from change events equal a full recomputation."""
+        with app.app_context():
+            box = container.box_service().create_box("Test Box", 10)
+            part = container.part_service().create_part("Old part")
+            session.commit()
+            updater.poll()
+
+            session = container.db_session()
+            resistor = Type(name="Resistor")
+            session.add(resistor)
+            session.flush()
+            new_part = container.part_service().create_part("New part", type_id=resistor.id)
+            second_box = container.box_service().create_box("Second Box", 5)
+            session.commit()
+            inventory_service = container.inventory_service()
+            inventory_service.add_stock(new_part.key, box.box_no, 1, 20)
+            inventory_service.add_stock(part.key, second_box.box_no, 2, 2)
+            inventory_service.move_stock(new_part.key, box.box_no, 1, box.box_no, 2, 20)
+            session.add(Attachment(
+                attachment_set_id=part.attachment_set_id,
+                attachment_type=AttachmentType.URL,
+                title="Datasheet",
+                url="https://example.com/datasheet",
+            ))
+            resistor.name = "Resistors"
+            session.commit()
+
+            updater.poll()
+            incremental = _snapshot()
+            updater.reconcile(container.db_session())
+
+            assert incremental == _snapshot()
+            assert incremental["inventory_parts_by_type"] == {("Resistors",): 1}
+            assert incremental["inventory_parts_without_docs"] == {(): 1}
+            assert incremental["inventory_box_utilization_percent"][(str(second_box.box_no),)] == 20.0
+
+    def test_deletions_remove_labels(
+        self, app: Flask, session: Session, container: ServiceContainer, updater: DashboardGaugeUpdater
+    ):
+        """Test deleted boxes and types drop their labelled gauges."""
+        with app.app_context():
+            box = container.box_service().create_box("Test Box", 10)
+            capacitor = Type(name="Capacitor")
+            session.add(capacitor)
+            session.commit()
+            updater.poll()
+
+            session = container.db_session()
+            container.box_service().delete_box(box.box_no)
+            container.type_service().delete_type(capacitor.id)
+            session.commit()
+            updater.poll()
+
+            assert _samples(INVENTORY_BOX_UTILIZATION_PERCENT) == {}
+            assert _samples(INVENTORY_PARTS_BY_TYPE) == {}
+            assert _samples(INVENTORY_TOTAL_BOXES) == {(): 0}
+
+    def test_tick_without_changes_skips_database(
+        self, app: Flask, session: Session, container: ServiceContainer, updater: DashboardGaugeUpdater
+    ):
+        """Test a tick with no queued changes runs no statements."""
+        with app.app_context():
+            updater.poll()
+            statements: list[str] = []
+
+            def count_statement(conn, cursor, statement, parameters, context, executemany):
+                statements.append(statement)
+
+            event.listen(db.engine, "before_cursor_execute", count_statement)
+            try:
+                updater.poll()
+            finally:
+                event.remove(db.engine, "before_cursor_execute", count_statement)
+
+            assert statements == []
+
+    def test_rolled_back_changes_are_not_published(
+        self, app: Flask, session: Session, container: ServiceContainer, updater: DashboardGaugeUpdater
+    ):
+        """Test writes of a rolled back transaction queue nothing."""
+        with app.app_context():
+            updater.poll()
+
+            session = container.db_session()
+            container.part_service().create_part("Discarded part")
+            session.rollback()
+
+            assert not updater._pending
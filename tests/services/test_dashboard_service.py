@@ -10,6 +10,7 @@ from app.models.part import Part
 from app.models.quantity_history import QuantityHistory
 from app.models.type import Type
 from app.services.container import ServiceContainer
+from app.services.dashboard_service import DASHBOARD_STATS_CACHE_TOTAL
 
 
 class TestDashboardService:
@@ -456,3 +457,68 @@ class TestDashboardService:
 
         assert result['count'] == 15
         assert len(result['sample_parts']) == 10  # Limited to 10
+
+
+def _cache_count(result: str) -> float:
+    return DASHBOARD_STATS_CACHE_TOTAL.labels(result=result)._value.get()
+
+
+class TestDashboardStatsCache:
+    """Test cases for the version-keyed dashboard stats snapshot."""
+
+    def test_unchanged_inventory_is_served_from_snapshot(
+        self, app: Flask, session: Session, container: ServiceContainer
+    ):
+        """Test a repeated request without inventory writes hits the snapshot."""
+        with app.app_context():
+            container.part_service().create_part("Cached part")
+            session.commit()
+            hits, misses = _cache_count("hit"), _cache_count("miss")
+
+            first = container.dashboard_service().get_dashboard_stats()
+            second = container.dashboard_service().get_dashboard_stats()
+
+            assert first == second
+            assert second['total_parts'] == 1
+            assert (_cache_count("hit") - hits, _cache_count("miss") - misses) == (1, 1)
+
+    def test_committed_write_invalidates_snapshot(
+        self, app: Flask, session: Session, container: ServiceContainer
+    ):
+        """Test committing an inventory write makes the next request recompute."""
+        with app.app_context():
+            service = container.dashboard_service()
+            assert service.get_dashboard_stats()['total_parts'] == 0
+
+            container.part_service().create_part("New part")
+            session.commit()
+
+            assert service.get_dashboard_stats()['total_parts'] == 1
+
+    def test_uncommitted_writes_bypass_snapshot(
+        self, app: Flask, session: Session, container: ServiceContainer
+    ):
+        """Test a session with pending inventory writes sees them and does not cache them."""
+        with app.app_context():
+            service = container.dashboard_service()
+            assert service.get_dashboard_stats()['total_types'] == 0
+
+            session.add(Type(name="Pending type"))
+            assert service.get_dashboard_stats()['total_types'] == 1
+
+            session.rollback()
+            assert service.get_dashboard_stats()['total_types'] == 0
+
+    def test_snapshot_expires_after_max_age(
+        self, app: Flask, session: Session, container: ServiceContainer
+    ):
+        """Test an old snapshot is recomputed so the change windows keep moving."""
+        with app.app_context():
+            container.dashboard_stats_cache().max_age_seconds = 0
+            service = container.dashboard_service()
+            misses = _cache_count("miss")
+
+            service.get_dashboard_stats()
+            service.get_dashboard_stats()
+
+            assert _cache_count("miss") - misses == 2
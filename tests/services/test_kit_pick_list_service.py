@@ -2,11 +2,12 @@
 
 from __future__ import annotations
 
-from datetime import UTC, datetime
+from datetime import UTC, datetime, timedelta
 
 import pytest
-from sqlalchemy import select
+from sqlalchemy import select, update
 
+from app.app_config import AppSettings
 from app.exceptions import InvalidOperationException, RecordNotFoundException
 from app.models.attachment_set import AttachmentSet
 from app.models.box import Box
@@ -17,6 +18,7 @@ from app.models.kit_pick_list_line import KitPickListLine, PickListLineStatus
 from app.models.location import Location
 from app.models.part import Part
 from app.models.part_location import PartLocation
+from app.models.quantity_history import QuantityHistory
 from app.services.inventory_service import (
     INVENTORY_QUANTITY_CHANGES_TOTAL,
     InventoryService,
@@ -32,6 +34,7 @@ from app.services.kit_pick_list_service import (
 )
 from app.services.kit_reservation_service import KitReservationService
 from app.services.part_service import PartService
+from app.services.quantity_history_service import QuantityHistoryService
 
 
 class AttachmentSetStub:
@@ -354,6 +357,37 @@ class TestKitPickListService:
         assert after_undo_success - before_undo_success == 1.0
         assert after_qty_add - before_qty_add == consumed_qty
 
+    def test_history_compaction_clears_picked_line_reference(
+        self,
+        session,
+        kit_pick_list_service: KitPickListService,
+        make_attachment_set,
+    ) -> None:
+        kit = _create_active_kit(session, make_attachment_set)
+        part = _create_part(session, make_attachment_set, "OLDP", "Old Pick Part")
+        _attach_content(session, kit, part, required_per_unit=1)
+        location = _create_location(session, box_no=61, loc_no=1)
+        _attach_location(session, part, location, qty=2)
+
+        pick_list = kit_pick_list_service.create_pick_list(kit.id, requested_units=1)
+        line = kit_pick_list_service.pick_line(pick_list.id, pick_list.lines[0].id)
+        history_id = line.inventory_change_id
+        assert history_id is not None
+
+        now = datetime.now(UTC)
+        session.execute(
+            update(QuantityHistory)
+            .where(QuantityHistory.id == history_id)
+            .values(timestamp=now - timedelta(days=400))
+        )
+        QuantityHistoryService(session, AppSettings()).compact(retention_days=365, now=now)
+        session.expire_all()
+
+        assert session.get(QuantityHistory, history_id) is None
+        assert session.get(KitPickListLine, line.id).inventory_change_id is None
+        with pytest.raises(InvalidOperationException):
+            kit_pick_list_service.undo_line(pick_list.id, line.id)
+
     def test_undo_line_noop_when_line_open(
         self,
         kit_pick_list_service: KitPickListService,
@@ -3,6 +3,7 @@
 from datetime import UTC, datetime
 
 import pytest
+from sqlalchemy import event
 from sqlalchemy.orm import Session
 
 from app.exceptions import (
@@ -18,7 +19,7 @@ from app.models.kit_shopping_list_link import KitShoppingListLink
 from app.models.part import Part
 from app.models.shopping_list import ShoppingList, ShoppingListStatus
 from app.services.kit_reservation_service import KitReservationUsage
-from app.services.kit_service import KitService
+from app.services.kit_service import KitService, KitShortfallPart
 
 
 class InventoryStub:
@@ -432,6 +433,69 @@ class TestKitService:
         assert content_b.shortfall == 1
         assert content_b.active_reservations == []
 
+    def test_get_active_kit_availability_for_all_kits(
+        self,
+        session,
+        kit_service: KitService,
+        make_attachment_set,
+    ):
+        def make_kit(name: str, build_target: int, status: KitStatus = KitStatus.ACTIVE) -> Kit:
+            return Kit(
+                name=name,
+                build_target=build_target,
+                status=status,
+                archived_at=datetime.now(UTC) if status == KitStatus.ARCHIVED else None,
+                attachment_set_id=make_attachment_set().id,
+            )
+
+        short_kit = make_kit("Short Kit", 2)
+        ready_kit = make_kit("Ready Kit", 1)
+        empty_kit = make_kit("Empty Kit", 3)
+        archived_kit = make_kit("Archived Kit", 5, KitStatus.ARCHIVED)
+        part_a = Part(key="P001", description="Shift register", total_quantity=10, attachment_set_id=make_attachment_set().id)
+        part_b = Part(key="P002", description="Op amp", total_quantity=1, attachment_set_id=make_attachment_set().id)
+        session.add_all([short_kit, ready_kit, empty_kit, archived_kit, part_a, part_b])
+        session.flush()
+        session.add_all(
+            [
+                KitContent(kit=short_kit, part=part_a, required_per_unit=3),
+                KitContent(kit=short_kit, part=part_b, required_per_unit=1),
+                KitContent(kit=ready_kit, part=part_a, required_per_unit=2),
+                # Archived kits reserve nothing
+                KitContent(kit=archived_kit, part=part_a, required_per_unit=5),
+            ]
+        )
+        session.commit()
+
+        statements: list[str] = []
+
+        def count_statement(conn, cursor, statement, parameters, context, executemany):
+            statements.append(statement)
+
+        event.listen(session.get_bind(), "before_cursor_execute", count_statement)
+        try:
+            availability = {entry.name: entry for entry in kit_service.get_active_kit_availability()}
+        finally:
+            event.remove(session.get_bind(), "before_cursor_execute", count_statement)
+
+        assert len(statements) == 1
+        assert set(availability) == {"Short Kit", "Ready Kit", "Empty Kit"}
+
+        # P001: 10 in stock, Ready Kit reserves 2, so 8 remain for 6 required
+        short = availability["Short Kit"]
+        assert short.buildable is False
+        assert short.max_buildable_units == 1
+        assert short.shortfall_parts == [
+            KitShortfallPart(part_key="P002", total_required=2, available=1, shortfall=1)
+        ]
+
+        # P001: Short Kit reserves 6, so 4 remain for 2 per unit
+        ready = availability["Ready Kit"]
+        assert (ready.buildable, ready.max_buildable_units, ready.shortfall_parts) == (True, 2, [])
+
+        empty = availability["Empty Kit"]
+        assert (empty.buildable, empty.max_buildable_units, empty.shortfall_parts) == (True, None, [])
+
     def test_create_content_enforces_rules(
         self,
         session,
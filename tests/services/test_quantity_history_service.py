@@ -0,0 +1,188 @@
+"""Tests for quantity history rollups and retention."""
+
+from datetime import UTC, date, datetime, timedelta
+
+import pytest
+from flask import Flask
+from sqlalchemy import func, select
+from sqlalchemy.orm import Session
+
+from app.exceptions import InvalidOperationException
+from app.models.quantity_history import QuantityHistory
+from app.models.quantity_history_daily import QuantityHistoryDaily
+from app.services.container import ServiceContainer
+from app.services.inventory_service import StockOperation
+
+
+def _rollups(session: Session) -> dict[tuple[int, date], tuple[int, int, int]]:
+    rows = session.execute(
+        select(
+            QuantityHistoryDaily.part_id,
+            QuantityHistoryDaily.day,
+            QuantityHistoryDaily.change_count,
+            QuantityHistoryDaily.qty_added,
+            QuantityHistoryDaily.qty_removed,
+        )
+    ).all()
+    return {(part_id, day): (count, added, removed) for part_id, day, count, added, removed in rows}
+
+
+class TestQuantityHistoryRollups:
+    """Test cases for the incrementally maintained daily rollups."""
+
+    def test_stock_changes_are_rolled_up_per_day(self, app: Flask, session: Session, container: ServiceContainer):
+        """Test add, remove and move are counted in the day of their history rows."""
+        with app.app_context():
+            box = container.box_service().create_box("Test Box", 10)
+            part = container.part_service().create_part("Test part")
+            session.commit()
+
+            inventory_service = container.inventory_service()
+            inventory_service.add_stock(part.key, box.box_no, 1, 10)
+            inventory_service.remove_stock(part.key, box.box_no, 1, 3)
+            inventory_service.move_stock(part.key, box.box_no, 1, box.box_no, 2, 2)
+            session.commit()
+
+            today = session.execute(select(func.date(QuantityHistory.timestamp))).scalars().first()
+            assert _rollups(session) == {(part.id, date.fromisoformat(today)): (4, 12, 5)}
+
+    def test_explicit_timestamps_land_on_their_day(self, app: Flask, session: Session, container: ServiceContainer):
+        """Test rows with a timestamp in the past are added to that day."""
+        with app.app_context():
+            part = container.part_service().create_part("Test part")
+            session.commit()
+
+            session.add_all([
+                QuantityHistory(part_id=part.id, delta_qty=5, timestamp=datetime(2026, 3, 1, 10, 0)),
+                QuantityHistory(part_id=part.id, delta_qty=-2, timestamp=datetime(2026, 3, 1, 18, 0)),
+                QuantityHistory(part_id=part.id, delta_qty=7, timestamp=datetime(2026, 3, 2, 9, 0)),
+            ])
+            session.flush()
+            session.add(QuantityHistory(part_id=part.id, delta_qty=1, timestamp=datetime(2026, 3, 2, 23, 0)))
+            session.commit()
+
+            assert _rollups(session) == {
+                (part.id, date(2026, 3, 1)): (2, 5, 2),
+                (part.id, date(2026, 3, 2)): (2, 8, 0),
+            }
+
+    def test_stock_batch_is_rolled_up(self, app: Flask, session: Session, container: ServiceContainer):
+        """Test the bulk-inserted history of a stock batch is rolled up."""
+        with app.app_context():
+            box = container.box_service().create_box("Test Box", 10)
+            part = container.part_service().create_part("Test part")
+            session.commit()
+
+            container.inventory_service().apply_stock_batch([
+                StockOperation("add", part.key, box.box_no, 1, 8),
+                StockOperation("remove", part.key, box.box_no, 1, 3),
+            ])
+            session.commit()
+
+            assert list(_rollups(session).values()) == [(2, 8, 3)]
+
+    def test_deleted_rows_leave_their_day(self, app: Flask, session: Session, container: ServiceContainer):
+        """Test deleting history through the ORM takes it out of the rollup."""
+        with app.app_context():
+            part = container.part_service().create_part("Test part")
+            session.commit()
+            kept = QuantityHistory(part_id=part.id, delta_qty=4, timestamp=datetime(2026, 3, 1, 10, 0))
+            dropped = QuantityHistory(part_id=part.id, delta_qty=-1, timestamp=datetime(2026, 3, 1, 11, 0))
+            session.add_all([kept, dropped])
+            session.commit()
+
+            session.delete(dropped)
+            session.commit()
+
+            assert _rollups(session) == {(part.id, date(2026, 3, 1)): (1, 4, 0)}
+
+
+class TestPartHistoryBuckets:
+    """Test cases for QuantityHistoryService.get_part_history_buckets."""
+
+    def test_buckets_group_days_by_week_and_month(
+        self, app: Flask, session: Session, container: ServiceContainer
+    ):
+        """Test daily rollups are merged into weeks starting on Monday and calendar months."""
+        with app.app_context():
+            part = container.part_service().create_part("Test part")
+            session.commit()
+            session.add_all([
+                QuantityHistory(part_id=part.id, delta_qty=10, timestamp=datetime(2026, 3, 29, 10, 0)),
+                QuantityHistory(part_id=part.id, delta_qty=-4, timestamp=datetime(2026, 3, 31, 10, 0)),
+                QuantityHistory(part_id=part.id, delta_qty=-1, timestamp=datetime(2026, 4, 2, 10, 0)),
+            ])
+            session.commit()
+
+            service = container.quantity_history_service()
+            days = service.get_part_history_buckets(part.id, "day")
+            weeks = service.get_part_history_buckets(part.id, "week")
+            months = service.get_part_history_buckets(part.id, "month")
+
+            assert [(b.bucket_start, b.net_delta) for b in days] == [
+                (date(2026, 3, 29), 10), (date(2026, 3, 31), -4), (date(2026, 4, 2), -1),
+            ]
+            assert [(b.bucket_start, b.change_count, b.net_delta) for b in weeks] == [
+                (date(2026, 3, 23), 1, 10), (date(2026, 3, 30), 2, -5),
+            ]
+            assert [(b.bucket_start, b.qty_added, b.qty_removed) for b in months] == [
+                (date(2026, 3, 1), 10, 4), (date(2026, 4, 1), 0, 1),
+            ]
+
+
+class TestQuantityHistoryCompaction:
+    """Test cases for QuantityHistoryService.compact."""
+
+    def test_compact_drops_expired_rows_and_keeps_rollups(
+        self, app: Flask, session: Session, container: ServiceContainer
+    ):
+        """Test rows past retention are deleted while their rollups remain."""
+        with app.app_context():
+            part = container.part_service().create_part("Test part")
+            session.commit()
+            now = datetime.now(UTC)
+            session.add_all([
+                QuantityHistory(part_id=part.id, delta_qty=5, timestamp=now - timedelta(days=400)),
+                QuantityHistory(part_id=part.id, delta_qty=3, timestamp=now - timedelta(days=40)),
+                QuantityHistory(part_id=part.id, delta_qty=-1, timestamp=now - timedelta(days=2)),
+            ])
+            session.commit()
+            rollups_before = _rollups(session)
+            stats_before = container.dashboard_service().get_dashboard_stats()
+
+            result = container.quantity_history_service().compact(retention_days=31, now=now)
+            session.commit()
+
+            assert result.cutoff == now - timedelta(days=31)
+            assert result.rows_deleted == 2
+            assert result.partitions_created == []
+            assert session.execute(select(QuantityHistory.delta_qty)).scalars().all() == [-1]
+            assert _rollups(session) == rollups_before
+            stats_after = container.dashboard_service().get_dashboard_stats()
+            assert (stats_after["changes_7d"], stats_after["changes_30d"]) == (1, 1)
+            assert stats_after == stats_before
+
+    def test_compact_uses_configured_retention(self, app: Flask, session: Session, container: ServiceContainer):
+        """Test the configured retention applies and 0 keeps everything."""
+        with app.app_context():
+            part = container.part_service().create_part("Test part")
+            session.commit()
+            now = datetime.now(UTC)
+            session.add(QuantityHistory(part_id=part.id, delta_qty=5, timestamp=now - timedelta(days=3000)))
+            session.commit()
+
+            service = container.quantity_history_service()
+            assert service.compact(retention_days=0, now=now).cutoff is None
+            assert session.execute(select(func.count(QuantityHistory.id))).scalar() == 1
+
+            result = service.compact(now=now)
+            assert result.cutoff == now - timedelta(days=365)
+            assert result.rows_deleted == 1
+
+    def test_compact_rejects_retention_shorter_than_dashboard_window(
+        self, app: Flask, session: Session, container: ServiceContainer
+    ):
+        """Test a retention below 31 days is refused."""
+        with app.app_context():
+            with pytest.raises(InvalidOperationException):
+                container.quantity_history_service().compact(retention_days=7)
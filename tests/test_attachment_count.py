@@ -0,0 +1,87 @@
+"""Tests for the denormalized attachment_sets.attachment_count column."""
+
+from flask import Flask
+from sqlalchemy import func, select
+from sqlalchemy.orm import Session
+
+from app.models.attachment import Attachment, AttachmentType
+from app.models.attachment_set import AttachmentSet
+from app.services.container import ServiceContainer
+
+
+def _url_attachment(attachment_set_id: int, title: str) -> Attachment:
+    return Attachment(
+        attachment_set_id=attachment_set_id,
+        attachment_type=AttachmentType.URL,
+        title=title,
+        url="https://example.com/datasheet",
+    )
+
+
+def _stored_count(session: Session, attachment_set_id: int) -> int:
+    stmt = select(AttachmentSet.attachment_count).where(AttachmentSet.id == attachment_set_id)
+    return session.execute(stmt).scalar_one()
+
+
+def _actual_count(session: Session, attachment_set_id: int) -> int:
+    stmt = select(func.count(Attachment.id)).where(Attachment.attachment_set_id == attachment_set_id)
+    return session.execute(stmt).scalar_one()
+
+
+class TestAttachmentCount:
+    """Test cases for keeping attachment_sets.attachment_count in sync with attachments."""
+
+    def test_adding_and_deleting_attachments_keeps_count(
+        self, app: Flask, session: Session, container: ServiceContainer
+    ):
+        """Test inserts and service deletes maintain the stored count."""
+        with app.app_context():
+            part = container.part_service().create_part("Test part")
+            session.commit()
+            set_id = part.attachment_set_id
+            assert _stored_count(session, set_id) == 0
+
+            first = _url_attachment(set_id, "First")
+            session.add_all([first, _url_attachment(set_id, "Second")])
+            session.commit()
+            assert part.attachment_set.attachment_count == 2
+
+            container.attachment_set_service().delete_attachment(set_id, first.id)
+            session.commit()
+            assert _stored_count(session, set_id) == 1
+            assert _stored_count(session, set_id) == _actual_count(session, set_id)
+
+    def test_moved_attachment_changes_both_counts(
+        self, app: Flask, session: Session, container: ServiceContainer
+    ):
+        """Test moving an attachment to another set moves its count."""
+        with app.app_context():
+            source = container.part_service().create_part("Source part")
+            target = container.part_service().create_part("Target part")
+            session.commit()
+            attachment = _url_attachment(source.attachment_set_id, "Datasheet")
+            session.add(attachment)
+            session.commit()
+
+            attachment.attachment_set_id = target.attachment_set_id
+            session.commit()
+
+            assert _stored_count(session, source.attachment_set_id) == 0
+            assert _stored_count(session, target.attachment_set_id) == 1
+
+    def test_counts_drive_parts_without_documents(
+        self, app: Flask, session: Session, container: ServiceContainer
+    ):
+        """Test the dashboard count and sample follow attachment writes."""
+        with app.app_context():
+            documented = container.part_service().create_part("Documented part")
+            container.part_service().create_part("Undocumented part")
+            session.commit()
+            session.add(_url_attachment(documented.attachment_set_id, "Datasheet"))
+            session.commit()
+
+            result = container.dashboard_service().get_parts_without_documents()
+
+            assert result['count'] == 1
+            assert [part['description'] for part in result['sample_parts']] == ["Undocumented part"]
+            assert result['sample_parts'][0]['type_name'] is None
@@ -530,3 +530,54 @@ class TestBoxAPI:
         assert response2.status_code == 201
         box2_data = json.loads(response2.data)
         assert box2_data["box_no"] == 2
+
+    def test_get_box_map(self, client: FlaskClient, session: Session, container: ServiceContainer):
+        """Test the map returns every box with its location grid."""
+        first = container.box_service().create_box("First Box", 2)
+        second = container.box_service().create_box("Second Box", 3)
+        part = container.part_service().create_part("Mapped part", manufacturer_code="MAP-1")
+        session.commit()
+        container.inventory_service().add_stock(part.key, second.box_no, 2, 4)
+        session.commit()
+
+        response = client.get("/api/boxes/map")
+
+        assert response.status_code == 200
+        assert response.headers["ETag"]
+        response_data = json.loads(response.data)
+        assert [(box["box_no"], box["description"], box["capacity"]) for box in response_data] == [
+            (first.box_no, "First Box", 2), (second.box_no, "Second Box", 3),
+        ]
+        assert [location["is_occupied"] for location in response_data[1]["locations"]] == [False, True, False]
+        assert response_data[1]["locations"][1]["part_assignments"] == [{
+            "key": part.key,
+            "qty": 4,
+            "manufacturer_code": "MAP-1",
+            "description": "Mapped part",
+            "cover_url": None,
+        }]
+        assert response_data[0]["locations"][0]["part_assignments"] is None
+
+    def test_get_box_map_empty(self, client: FlaskClient):
+        """Test the map of an empty inventory is an empty list."""
+        response = client.get("/api/boxes/map")
+
+        assert response.status_code == 200
+        assert json.loads(response.data) == []
+
+    def test_create_boxes_bulk(self, client: FlaskClient, session: Session):
+        """Test creating several boxes in one request."""
+        data = {"boxes": [{"description": "Drawer A", "capacity": 40}, {"description": "Drawer B", "capacity": 8}]}
+        response = client.post("/api/boxes/bulk", data=json.dumps(data), content_type="application/json")
+
+        assert response.status_code == 201
+        assert json.loads(response.data) == {"box_nos": [1, 2]}
+
+        response = client.get("/api/boxes/2/locations")
+        assert [location["loc_no"] for location in json.loads(response.data)] == list(range(1, 9))
+
+    def test_create_boxes_bulk_rejects_empty_list(self, client: FlaskClient):
+        """Test a bulk request needs at least one box."""
+        response = client.post("/api/boxes/bulk", data=json.dumps({"boxes": []}), content_type="application/json")
+
+        assert response.status_code == 400
@@ -1,15 +1,18 @@
 """Tests for box service functionality."""
 
+from collections.abc import Callable, Generator
 from concurrent.futures import ThreadPoolExecutor
 
 import pytest
 from flask import Flask
+from sqlalchemy import event, select, update
 from sqlalchemy.orm import Session
 
 from app.exceptions import InvalidOperationException
+from app.extensions import db
 from app.models.box import Box
 from app.models.location import Location
-from app.services.box_service import BoxService
+from app.services.box_service import BoxGridCache, BoxService
 from app.services.container import ServiceContainer
 
 
@@ -214,6 +217,56 @@ class TestBoxService:
                 container.box_service().update_box_capacity(999, 10, "Non-existent")
             assert "Box 999 was not found" in str(exc_info.value)
 
+    def test_update_box_capacity_decrease_refused_for_occupied_locations(
+        self, app: Flask, session: Session, container: ServiceContainer
+    ):
+        """Test shrinking a box over a location holding parts removes nothing."""
+        with app.app_context():
+            box = container.box_service().create_box("Test Box", 6)
+            part = container.part_service().create_part("Test part")
+            session.commit()
+            container.inventory_service().add_stock(part.key, box.box_no, 5, 1)
+            session.commit()
+
+            with pytest.raises(InvalidOperationException):
+                container.box_service().update_box_capacity(box.box_no, 3, "Smaller Box")
+
+            remaining = session.scalars(
+                select(Location.loc_no).where(Location.box_no == box.box_no).order_by(Location.loc_no)
+            ).all()
+            assert remaining == [1, 2, 3, 4, 5, 6]
+
+            updated = container.box_service().update_box_capacity(box.box_no, 5, "Smaller Box")
+            assert [location.loc_no for location in updated.locations] == [1, 2, 3, 4, 5]
+
+    def test_create_boxes_in_bulk(self, app: Flask, session: Session, container: ServiceContainer):
+        """Test bulk creation numbers boxes in order and inserts all locations in one statement."""
+        with app.app_context():
+            existing = container.box_service().create_box("Existing Box", 1)
+            statements: list[str] = []
+
+            def count_statement(conn, cursor, statement, parameters, context, executemany):
+                statements.append(statement)
+
+            event.listen(db.engine, "before_cursor_execute", count_statement)
+            try:
+                boxes = container.box_service().create_boxes([("Cabinet A", 200), ("Cabinet B", 50), ("Cabinet C", 3)])
+            finally:
+                event.remove(db.engine, "before_cursor_execute", count_statement)
+            session.commit()
+
+            location_inserts = [statement for statement in statements if statement.startswith("INSERT INTO locations")]
+            assert len(location_inserts) == 1
+            assert not any(statement.startswith("SELECT locations") for statement in statements)
+            assert [(box.box_no, box.description) for box in boxes] == [
+                (existing.box_no + 1, "Cabinet A"),
+                (existing.box_no + 2, "Cabinet B"),
+                (existing.box_no + 3, "Cabinet C"),
+            ]
+            assert [len(box.locations) for box in boxes] == [200, 50, 3]
+            assert [location.loc_no for location in boxes[2].locations] == [1, 2, 3]
+            assert container.box_service().create_boxes([]) == []
+
     def test_delete_box_existing(self, app: Flask, session: Session, container: ServiceContainer):
         """Test deleting an existing box."""
         with app.app_context():
@@ -559,6 +612,68 @@ class TestBoxService:
                 container.box_service().calculate_box_usage(999)
             assert "Box 999 was not found" in str(exc_info.value)
 
+    def test_occupied_locations_counter_follows_stock_changes(
+        self, app: Flask, session: Session, container: ServiceContainer
+    ):
+        """Test the per-box counter changes only when a location becomes used or empty."""
+        with app.app_context():
+            box = container.box_service().create_box("Counter Box", 5)
+            other_box = container.box_service().create_box("Other Box", 5)
+            first = container.part_service().create_part("First part")
+            second = container.part_service().create_part("Second part")
+            session.commit()
+
+            def counters() -> tuple[int, int]:
+                session.expire_all()
+                return (
+                    session.get(Box, box.id).occupied_locations,
+                    session.get(Box, other_box.id).occupied_locations,
+                )
+
+            inventory_service = container.inventory_service()
+            inventory_service.add_stock(first.key, box.box_no, 1, 10)
+            inventory_service.add_stock(second.key, box.box_no, 1, 5)
+            inventory_service.add_stock(first.key, box.box_no, 2, 3)
+            session.commit()
+            assert counters() == (2, 0)
+
+            # Location 1 still holds the second part
+            inventory_service.remove_stock(first.key, box.box_no, 1, 10)
+            session.commit()
+            assert counters() == (2, 0)
+
+            inventory_service.move_stock(first.key, box.box_no, 2, other_box.box_no, 3, 3)
+            session.commit()
+            assert counters() == (1, 1)
+
+            inventory_service.remove_stock(second.key, box.box_no, 1, 5)
+            session.commit()
+            assert counters() == (0, 1)
+            assert container.box_service().check_occupancy() == []
+
+    def test_check_occupancy_reports_and_repairs_drift(
+        self, app: Flask, session: Session, container: ServiceContainer
+    ):
+        """Test drifted counters are reported and overwritten on repair."""
+        with app.app_context():
+            box = container.box_service().create_box("Drift Box", 5)
+            part = container.part_service().create_part("Test part")
+            session.commit()
+            container.inventory_service().add_stock(part.key, box.box_no, 1, 10)
+            container.inventory_service().add_stock(part.key, box.box_no, 2, 10)
+            session.commit()
+
+            session.execute(update(Box).where(Box.box_no == box.box_no).values(occupied_locations=5))
+            session.commit()
+
+            box_service = container.box_service()
+            assert box_service.check_occupancy() == [(box.box_no, 5, 2)]
+            assert box_service.check_occupancy(repair=True) == [(box.box_no, 5, 2)]
+            session.commit()
+
+            assert box_service.check_occupancy() == []
+            assert box_service.calculate_box_usage(box.box_no).occupied_locations == 2
+
     def test_get_all_boxes_with_usage_empty_database(self, app: Flask, session: Session, container: ServiceContainer):
         """Test getting all boxes with usage when no boxes exist."""
         with app.app_context():
@@ -879,3 +994,111 @@ class TestBoxService:
             assert locations_with_parts[9].is_occupied is True
             assert locations_with_parts[9].part_assignments[0].key == part4.key
             assert locations_with_parts[9].part_assignments[0].qty == 15
+
+
+@pytest.fixture
+def grid_cache(container: ServiceContainer) -> Generator[BoxGridCache]:
+    cache = container.box_grid_cache()
+    cache.start()
+    yield cache
+    cache.stop()
+
+
+class TestBoxGridCache:
+    """Test cases for the per-box location grid cache."""
+
+    @staticmethod
+    def _count_statements(read: Callable[[], object]) -> int:
+        statements: list[str] = []
+
+        def count_statement(conn, cursor, statement, parameters, context, executemany):
+            statements.append(statement)
+
+        event.listen(db.engine, "before_cursor_execute", count_statement)
+        try:
+            read()
+        finally:
+            event.remove(db.engine, "before_cursor_execute", count_statement)
+        return len(statements)
+
+    def test_grid_is_invalidated_only_by_changes_to_its_box(
+        self, app: Flask, session: Session, container: ServiceContainer, grid_cache: BoxGridCache
+    ):
+        """Test stock changes in another box leave a cached grid in place."""
+        with app.app_context():
+            box = container.box_service().create_box("Cached Box", 3)
+            other_box = container.box_service().create_box("Other Box", 3)
+            part = container.part_service().create_part("Test part")
+            other_part = container.part_service().create_part("Other part")
+            session.commit()
+            inventory_service = container.inventory_service()
+            inventory_service.add_stock(part.key, box.box_no, 1, 10)
+            session.commit()
+
+            box_service = container.box_service()
+            box_service.get_box_locations_with_parts(box.box_no)
+            inventory_service.add_stock(other_part.key, other_box.box_no, 2, 5)
+            session.commit()
+
+            def read() -> None:
+                grid = box_service.get_box_locations_with_parts(box.box_no)
+                assert [len(location.part_assignments) for location in grid] == [1, 0, 0]
+
+            assert self._count_statements(read) == 0
+
+            inventory_service.add_stock(part.key, box.box_no, 1, 5)
+            session.commit()
+            grid = box_service.get_box_locations_with_parts(box.box_no)
+            assert grid[0].part_assignments[0].qty == 15
+
+    def test_part_edit_invalidates_grids_showing_the_part(
+        self, app: Flask, session: Session, container: ServiceContainer, grid_cache: BoxGridCache
+    ):
+        """Test editing a stored part refreshes the grid of its box."""
+        with app.app_context():
+            box = container.box_service().create_box("Cached Box", 2)
+            part = container.part_service().create_part("Old description")
+            session.commit()
+            container.inventory_service().add_stock(part.key, box.box_no, 2, 1)
+            session.commit()
+            box_service = container.box_service()
+            box_service.get_box_locations_with_parts(box.box_no)
+
+            part.description = "New description"
+            session.commit()
+
+            grid = box_service.get_box_locations_with_parts(box.box_no)
+            assert grid[1].part_assignments[0].description == "New description"
+
+    def test_box_map_matches_and_fills_box_grids(
+        self, app: Flask, session: Session, container: ServiceContainer, grid_cache: BoxGridCache
+    ):
+        """Test the map returns every box's grid and caches them."""
+        with app.app_context():
+            first = container.box_service().create_box("First Box", 2)
+            second = container.box_service().create_box("Second Box", 3)
+            part = container.part_service().create_part("Test part")
+            session.commit()
+            container.inventory_service().add_stock(part.key, second.box_no, 3, 7)
+            session.commit()
+
+            box_service = container.box_service()
+            box_map = box_service.get_box_map()
+
+            assert [(b.box_no, b.description, b.capacity) for b in box_map] == [
+                (first.box_no, "First Box", 2), (second.box_no, "Second Box", 3),
+            ]
+            assert [loc.loc_no for loc in box_map[1].locations] == [1, 2, 3]
+            assert box_map[1].locations[2].part_assignments[0].key == part.key
+            assert self._count_statements(lambda: box_service.get_box_locations_with_parts(first.box_no)) == 0
+            assert box_service.get_box_locations_with_parts(second.box_no) == box_map[1].locations
+
+    def test_stopped_cache_is_not_used(self, app: Flask, session: Session, container: ServiceContainer):
+        """Test grids are computed on every call while the cache is stopped."""
+        with app.app_context():
+            box = container.box_service().create_box("Test Box", 2)
+            session.commit()
+            box_service = container.box_service()
+            box_service.get_box_locations_with_parts(box.box_no)
+
+            assert self._count_statements(lambda: box_service.get_box_locations_with_parts(box.box_no)) > 0
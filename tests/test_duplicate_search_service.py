@@ -335,3 +335,46 @@ class TestDuplicateSearchService:
 
         assert len(response.matches) == 1
         assert response.matches[0].confidence == "medium"
+
+    def test_search_duplicates_includes_code_candidates_in_prompt(
+        self, session: Session, dup_search_app_settings: AppSettings, sample_parts: list[Part]
+    ):
+        """Test that parts with similar manufacturer codes are pointed out to the LLM."""
+        attachment_set_service = AttachmentSetStub(db=session)
+        part_service = PartService(db=session, attachment_set_service=attachment_set_service)
+
+        mock_runner = Mock(spec=AIRunner)
+        mock_response = Mock(spec=AIResponse)
+        mock_response.response = DuplicateMatchLLMResponse(matches=[])
+        mock_runner.run.return_value = mock_response
+
+        service = DuplicateSearchService(
+            app_config=dup_search_app_settings,
+            part_service=part_service,
+            ai_runner=mock_runner,
+        )
+
+        # Formatting differs from the stored "OMRON G5Q-1A4"
+        service.search_duplicates(DuplicateSearchRequest(search="omron-g5q1a4 relay"))
+
+        prompt = mock_runner.run.call_args[0][0].system_prompt
+        assert "Manufacturer Code Candidates" in prompt
+        assert "- `ABCD`" in prompt
+        assert "- `EFGH`" not in prompt
+
+    def test_build_prompt_without_code_candidates(
+        self, session: Session, dup_search_app_settings: AppSettings, sample_parts: list[Part]
+    ):
+        """Test that the candidates section is omitted when nothing resembles the search."""
+        attachment_set_service = AttachmentSetStub(db=session)
+        part_service = PartService(db=session, attachment_set_service=attachment_set_service)
+
+        service = DuplicateSearchService(
+            app_config=dup_search_app_settings,
+            part_service=part_service,
+            ai_runner=None,
+        )
+
+        assert service._find_code_candidates("5V relay") == []
+        prompt = service._build_prompt(part_service.get_all_parts_for_search())
+        assert "Manufacturer Code Candidates" not in prompt
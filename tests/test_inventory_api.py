@@ -1,12 +1,15 @@
 """Tests for inventory API endpoints."""
 
 import json
+from unittest.mock import ANY, patch
 
 from flask import Flask
 from flask.testing import FlaskClient
 from sqlalchemy.orm import Session
 
+from app.schemas.task_schema import TaskStartResponse, TaskStatus
 from app.services.container import ServiceContainer
+from app.services.reorganization_plan_task import ReorganizationPlanTask
 
 
 class TestInventoryAPI:
@@ -235,8 +238,90 @@ class TestInventoryAPI:
             assert response_data["box_no"] == box.box_no
             assert response_data["loc_no"] == 2
 
+    def test_get_location_suggestion_count(self, app: Flask, client: FlaskClient, session: Session, container: ServiceContainer):
+        """Test asking for several suggested locations at once."""
+        with app.app_context():
+            box = container.box_service().create_box("Test Box", 3)
+            session.commit()
+            box_no = box.box_no
+
+            response = client.get("/api/inventory/suggestions/1?count=2")
+
+            assert response.status_code == 200
+            assert response.get_json() == {
+                "box_no": box_no,
+                "loc_no": 1,
+                "locations": [{"box_no": box_no, "loc_no": 1}, {"box_no": box_no, "loc_no": 2}],
+            }
+
+            assert client.get("/api/inventory/suggestions/1?count=0").status_code == 400
+            assert client.get("/api/inventory/suggestions/1?count=101").status_code == 400
+
+    def test_stock_batch(self, app: Flask, client: FlaskClient, session: Session, container: ServiceContainer):
+        """Test applying several stock operations in one request."""
+        with app.app_context():
+            box = container.box_service().create_box("Test Box", 10)
+            part = container.part_service().create_part("Test part")
+            session.commit()
+            key = part.key
+            box_no = box.box_no
+
+            response = client.post("/api/inventory/batch", json={"operations": [
+                {"op": "add", "part_key": key, "box_no": box_no, "loc_no": 1, "qty": 8},
+                {"op": "move", "part_key": key, "box_no": box_no, "loc_no": 1, "to_box_no": box_no, "to_loc_no": 2, "qty": 8},
+            ]})
+
+            assert response.status_code == 200
+            assert response.get_json() == {"locations": [
+                {"key": key, "box_no": box_no, "loc_no": 1, "qty": 0},
+                {"key": key, "box_no": box_no, "loc_no": 2, "qty": 8},
+            ]}
+
+    def test_stock_batch_rolls_back_on_failure(self, app: Flask, client: FlaskClient, session: Session, container: ServiceContainer):
+        """Test a failing operation rejects the whole batch."""
+        with app.app_context():
+            box = container.box_service().create_box("Test Box", 10)
+            part = container.part_service().create_part("Test part")
+            session.commit()
+            key = part.key
+            box_no = box.box_no
+
+            response = client.post("/api/inventory/batch", json={"operations": [
+                {"op": "add", "part_key": key, "box_no": box_no, "loc_no": 1, "qty": 2},
+                {"op": "remove", "part_key": key, "box_no": box_no, "loc_no": 1, "qty": 3},
+            ]})
+            assert response.status_code == 409
+
+            response = client.get(f"/api/parts/{key}/locations")
+            assert response.get_json() == []
+
+    def test_stock_batch_validation(self, client: FlaskClient):
+        """Test malformed operations are rejected."""
+        move_without_destination = {"op": "move", "part_key": "ABCD", "box_no": 1, "loc_no": 1, "qty": 1}
+        add_with_destination = {"op": "add", "part_key": "ABCD", "box_no": 1, "loc_no": 1, "to_box_no": 2, "to_loc_no": 1, "qty": 1}
+
+        assert client.post("/api/inventory/batch", json={"operations": []}).status_code == 400
+        assert client.post("/api/inventory/batch", json={"operations": [move_without_destination]}).status_code == 400
+        assert client.post("/api/inventory/batch", json={"operations": [add_with_destination]}).status_code == 400
+
     def test_get_location_suggestion_no_available(self, app: Flask, client: FlaskClient):
         """Test location suggestion when no locations are available."""
         # No boxes created, so no locations available
         response = client.get("/api/inventory/suggestions/1")
         assert response.status_code == 404
+
+    def test_start_reorganization_plan(self, client: FlaskClient, container: ServiceContainer):
+        """Test starting the reorganization planner as a background task."""
+        task_service = container.task_service()
+        started = TaskStartResponse(task_id="task-1", status=TaskStatus.PENDING)
+
+        with patch.object(task_service, "start_task", return_value=started) as start_task:
+            response = client.post("/api/inventory/reorganization-plan", json={"sparse_threshold": 0.1})
+
+        assert response.status_code == 201
+        assert response.get_json()["task_id"] == "task-1"
+        start_task.assert_called_once_with(task=ANY, sparse_threshold=0.1)
+        assert isinstance(start_task.call_args.kwargs["task"], ReorganizationPlanTask)
+
+        response = client.post("/api/inventory/reorganization-plan", json={"sparse_threshold": 2})
+        assert response.status_code == 400
@@ -1,16 +1,29 @@
 """Tests for inventory service functionality."""
 
+import sqlite3
+from collections.abc import Generator
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
 import pytest
 from flask import Flask
+from sqlalchemy import event, insert, select
 from sqlalchemy.orm import Session
 
+from app import create_app
+from app.app_config import AppSettings
+from app.config import Settings
 from app.exceptions import (
     InsufficientQuantityException,
     InvalidOperationException,
     RecordNotFoundException,
 )
+from app.models.location import Location
+from app.models.part import Part
 from app.models.part_location import PartLocation
+from app.models.quantity_history import QuantityHistory
 from app.services.container import ServiceContainer
+from app.services.inventory_service import StockLevel, StockOperation
 
 
 class TestInventoryService:
@@ -194,6 +207,71 @@ class TestInventoryService:
                     part.key, box.box_no, 1, 999, 1, 3
                 )
 
+    def test_apply_stock_batch(self, app: Flask, session: Session, container: ServiceContainer):
+        """Test a batch applies operations in order and keeps totals and history."""
+        with app.app_context():
+            box = container.box_service().create_box("Test Box", 10)
+            resistor = container.part_service().create_part("Resistor")
+            capacitor = container.part_service().create_part("Capacitor")
+            session.commit()
+
+            inventory_service = container.inventory_service()
+            inventory_service.add_stock(capacitor.key, box.box_no, 5, 4)
+            session.commit()
+
+            levels = inventory_service.apply_stock_batch([
+                StockOperation("add", resistor.key, box.box_no, 1, 10),
+                StockOperation("move", resistor.key, box.box_no, 1, 6, to_box_no=box.box_no, to_loc_no=2),
+                StockOperation("remove", capacitor.key, box.box_no, 5, 4),
+                StockOperation("remove", resistor.key, box.box_no, 2, 1),
+            ])
+            session.commit()
+
+            assert levels == [
+                StockLevel(resistor.key, box.box_no, 1, 4),
+                StockLevel(resistor.key, box.box_no, 2, 5),
+                StockLevel(capacitor.key, box.box_no, 5, 0),
+            ]
+            assert {(pl.loc_no, pl.qty) for pl in inventory_service.get_part_locations(resistor.key)} == {(1, 4), (2, 5)}
+            assert inventory_service.get_part_locations(capacitor.key) == []
+            assert inventory_service.calculate_total_quantity(resistor.key) == 9
+            assert inventory_service.calculate_total_quantity(capacitor.key) == 0
+
+            history = session.query(QuantityHistory).filter_by(part_id=resistor.id).all()
+            assert sorted((h.delta_qty, h.location_reference) for h in history) == [
+                (-6, f"{box.box_no}-1"),
+                (-1, f"{box.box_no}-2"),
+                (6, f"{box.box_no}-2"),
+                (10, f"{box.box_no}-1"),
+            ]
+
+    def test_apply_stock_batch_is_all_or_nothing(self, app: Flask, session: Session, container: ServiceContainer):
+        """Test a failing operation leaves earlier operations unapplied."""
+        with app.app_context():
+            box = container.box_service().create_box("Test Box", 10)
+            part = container.part_service().create_part("Test part")
+            session.commit()
+
+            inventory_service = container.inventory_service()
+            with pytest.raises(InsufficientQuantityException):
+                inventory_service.apply_stock_batch([
+                    StockOperation("add", part.key, box.box_no, 1, 3),
+                    StockOperation("remove", part.key, box.box_no, 1, 5),
+                ])
+            session.rollback()
+
+            assert inventory_service.get_part_locations(part.key) == []
+            assert session.query(QuantityHistory).filter_by(part_id=part.id).count() == 0
+
+            with pytest.raises(RecordNotFoundException, match="Location 999-1 was not found"):
+                inventory_service.apply_stock_batch([StockOperation("add", part.key, 999, 1, 3)])
+            with pytest.raises(RecordNotFoundException, match="Part ZZZZ was not found"):
+                inventory_service.apply_stock_batch([StockOperation("add", "ZZZZ", box.box_no, 1, 3)])
+            with pytest.raises(RecordNotFoundException, match="Part location"):
+                inventory_service.apply_stock_batch([StockOperation("remove", part.key, box.box_no, 2, 1)])
+            with pytest.raises(InvalidOperationException):
+                inventory_service.apply_stock_batch([StockOperation("add", part.key, box.box_no, 1, 0)])
+
     def test_get_part_locations(self, app: Flask, session: Session, container: ServiceContainer):
         """Test getting all locations for a part."""
         with app.app_context():
@@ -244,6 +322,92 @@ class TestInventoryService:
             assert suggestion is not None
             assert suggestion == (box.box_no, 2)
 
+    def test_suggest_locations_prefers_boxes_with_same_type(self, app: Flask, session: Session, container: ServiceContainer):
+        """Test boxes holding the part's type are suggested before other boxes."""
+        with app.app_context():
+            resistors = container.type_service().create_type("Resistors")
+            capacitors = container.type_service().create_type("Capacitors")
+            first_box = container.box_service().create_box("First Box", 3)
+            resistor_box = container.box_service().create_box("Resistor Box", 3)
+            capacitor_box = container.box_service().create_box("Capacitor Box", 3)
+            resistor = container.part_service().create_part("Resistor", type_id=resistors.id)
+            capacitor = container.part_service().create_part("Capacitor", type_id=capacitors.id)
+            session.commit()
+
+            inventory_service = container.inventory_service()
+            inventory_service.add_stock(resistor.key, resistor_box.box_no, 1, 10)
+            inventory_service.add_stock(capacitor.key, capacitor_box.box_no, 2, 10)
+            inventory_service.add_stock(capacitor.key, first_box.box_no, 1, 10)
+            session.commit()
+
+            assert inventory_service.suggest_location(resistors.id) == (resistor_box.box_no, 2)
+            assert inventory_service.suggest_location(None) == (first_box.box_no, 2)
+
+            # Capacitors: the box with most capacitor locations is a tie, so
+            # box order decides; then the remaining boxes follow
+            assert inventory_service.suggest_locations(capacitors.id, count=5) == [
+                (first_box.box_no, 2),
+                (first_box.box_no, 3),
+                (capacitor_box.box_no, 1),
+                (capacitor_box.box_no, 3),
+                (resistor_box.box_no, 2),
+            ]
+
+    def test_suggest_locations_returns_what_is_free(self, app: Flask, session: Session, container: ServiceContainer):
+        """Test asking for more locations than are free returns the free ones."""
+        with app.app_context():
+            box = container.box_service().create_box("Test Box", 3)
+            part = container.part_service().create_part("Test part")
+            session.commit()
+
+            inventory_service = container.inventory_service()
+            inventory_service.add_stock(part.key, box.box_no, 2, 1)
+            session.commit()
+
+            assert inventory_service.suggest_locations(None, count=10) == [(box.box_no, 1), (box.box_no, 3)]
+
+            inventory_service.add_stock(part.key, box.box_no, 1, 1)
+            inventory_service.add_stock(part.key, box.box_no, 3, 1)
+            with pytest.raises(RecordNotFoundException, match="Available location"):
+                inventory_service.suggest_locations(None, count=10)
+
+    def test_location_occupancy_follows_stock_changes(self, app: Flask, session: Session, container: ServiceContainer):
+        """Test locations.is_occupied tracks every stock write path."""
+        with app.app_context():
+            box = container.box_service().create_box("Test Box", 5)
+            first = container.part_service().create_part("First part")
+            second = container.part_service().create_part("Second part")
+            session.commit()
+
+            def occupied() -> set[int]:
+                return set(session.scalars(
+                    select(Location.loc_no).where(Location.box_no == box.box_no, Location.is_occupied)
+                ))
+
+            inventory_service = container.inventory_service()
+            inventory_service.add_stock(first.key, box.box_no, 1, 5)
+            inventory_service.add_stock(second.key, box.box_no, 1, 5)
+            assert occupied() == {1}
+
+            # Shared location stays occupied until its last part leaves
+            inventory_service.remove_stock(first.key, box.box_no, 1, 5)
+            assert occupied() == {1}
+            inventory_service.move_stock(second.key, box.box_no, 1, box.box_no, 2, 5)
+            assert occupied() == {2}
+
+            inventory_service.apply_stock_batch([
+                StockOperation("move", second.key, box.box_no, 2, 5, to_box_no=box.box_no, to_loc_no=3),
+                StockOperation("add", first.key, box.box_no, 4, 1),
+            ])
+            session.flush()
+            assert occupied() == {3, 4}
+
+            # Flushed ORM writes are tracked too
+            part_location = session.scalars(select(PartLocation).where(PartLocation.loc_no == 4)).one()
+            session.delete(part_location)
+            session.flush()
+            assert occupied() == {3}
+
     def test_cleanup_zero_quantities(self, app: Flask, session: Session, container: ServiceContainer):
         """Test cleanup when total quantity reaches zero."""
         with app.app_context():
@@ -395,3 +559,208 @@ class TestInventoryService:
             parts_with_totals = container.inventory_service().get_all_parts_with_totals(limit=3, offset=2)
 
             assert len(parts_with_totals) == 3
+
+    def test_iter_parts_for_export_spans_batches(self, app: Flask, session: Session, container: ServiceContainer):
+        """Test export streaming returns every part once with its own locations across batches."""
+        with app.app_context():
+            box = container.box_service().create_box("Test Box", 20)
+            keys = []
+            for i in range(5):
+                part = container.part_service().create_part(f"Part {i}")
+                container.inventory_service().add_stock(part.key, box.box_no, i + 1, i + 1)
+                keys.append(part.key)
+            session.commit()
+
+            rows = list(container.inventory_service().iter_parts_for_export(batch_size=2))
+
+            assert [row["key"] for row in rows] == keys
+            for i, row in enumerate(rows):
+                assert row["total_quantity"] == i + 1
+                assert row["locations"] == [{"box_no": box.box_no, "loc_no": i + 1, "qty": i + 1}]
+                assert row["seller_links"] == []
+
+    def test_get_all_parts_with_totals_keyset_pagination(self, app: Flask, session: Session, container: ServiceContainer):
+        """Test seeking past a (created_at, id) position returns the following parts."""
+        with app.app_context():
+            box = container.box_service().create_box("Test Box", 20)
+            expected_totals: dict[str, int] = {}
+            for i in range(5):
+                part = container.part_service().create_part(f"Part {i}")
+                container.inventory_service().add_stock(part.key, box.box_no, i + 1, i + 1)
+                expected_totals[part.key] = i + 1
+            session.commit()
+
+            inventory_service = container.inventory_service()
+            all_parts = inventory_service.get_all_parts_with_totals(limit=10)
+
+            first_page = inventory_service.get_all_parts_with_totals(limit=2)
+            last = first_page[-1].part
+            second_page = inventory_service.get_all_parts_with_totals(
+                limit=2, after=(last.created_at, last.id)
+            )
+
+            assert [pwt.part.key for pwt in first_page + second_page] == [
+                pwt.part.key for pwt in all_parts[:4]
+            ]
+            # Totals are still computed per part in keyset mode
+            for pwt in second_page:
+                assert pwt.total_quantity == expected_totals[pwt.part.key]
+
+
+@pytest.fixture
+def file_app(
+    tmp_path: Path, test_settings: Settings, test_app_settings: AppSettings, template_connection: sqlite3.Connection
+) -> Generator[Flask]:
+    """App on a file-backed copy of the template database.
+
+    Unlike the in-memory test database, every thread gets its own connection,
+    so concurrent transactions really compete for the same rows.
+    """
+    db_path = tmp_path / "inventory.db"
+    file_conn = sqlite3.connect(db_path)
+    template_connection.backup(file_conn)
+    file_conn.close()
+
+    settings = test_settings.model_copy(update={
+        "database_url": f"sqlite:///{db_path}",
+        "sqlalchemy_engine_options": {"connect_args": {"timeout": 30, "check_same_thread": False}},
+    })
+    app = create_app(settings, app_settings=test_app_settings, skip_background_services=True)
+
+    try:
+        yield app
+    finally:
+        app.container.lifecycle_coordinator().shutdown()
+        with app.app_context():
+            from app.extensions import db as flask_db
+
+            flask_db.session.remove()
+            flask_db.engine.dispose()
+
+
+class TestConcurrentStockChanges:
+    """Test the atomic stock paths under concurrent transactions."""
+
+    THREADS = 16
+
+    def _stock_part(self, app: Flask, qty: int) -> tuple[str, int]:
+        """Create a box and a part with qty in location 1, committed."""
+        container = app.container
+        with app.app_context():
+            session = container.db_session()
+            box = container.box_service().create_box("Test Box", 10)
+            part = container.part_service().create_part("Test part")
+            if qty:
+                container.inventory_service().add_stock(part.key, box.box_no, 1, qty)
+            session.commit()
+            key, box_no = part.key, box.box_no
+            session.close()
+            container.db_session.reset()
+        return key, box_no
+
+    def _run_in_transaction(self, app: Flask, change) -> str:
+        """Apply one stock change in its own session and transaction."""
+        container = app.container
+        with app.app_context():
+            session = container.db_session()
+            try:
+                change(container.inventory_service())
+                session.commit()
+                return "applied"
+            except (InsufficientQuantityException, RecordNotFoundException):
+                # Short stock, or the location was already emptied and removed
+                session.rollback()
+                return "rejected"
+            finally:
+                session.close()
+                container.db_session.reset()
+
+    def test_concurrent_removals_never_oversell(self, file_app: Flask):
+        """Test many pickers removing from one location take exactly what it holds."""
+        key, box_no = self._stock_part(file_app, 40)
+
+        with ThreadPoolExecutor(max_workers=self.THREADS) as executor:
+            outcomes = list(executor.map(
+                lambda _: self._run_in_transaction(
+                    file_app, lambda service: service.remove_stock(key, box_no, 1, 1)
+                ),
+                range(80),
+            ))
+
+        assert outcomes.count("applied") == 40
+        assert outcomes.count("rejected") == 40
+
+        container = file_app.container
+        with file_app.app_context():
+            session = container.db_session()
+            part = session.query(Part).filter_by(key=key).one()
+            assert part.total_quantity == 0
+            assert session.query(PartLocation).filter_by(part_id=part.id).count() == 0
+            deltas = [h.delta_qty for h in session.query(QuantityHistory).filter_by(part_id=part.id)]
+            assert sorted(deltas) == [-1] * 40 + [40]
+            session.close()
+
+    def test_concurrent_additions_are_not_lost(self, file_app: Flask):
+        """Test concurrent additions to a new location all end up in it."""
+        key, box_no = self._stock_part(file_app, 0)
+
+        with ThreadPoolExecutor(max_workers=self.THREADS) as executor:
+            outcomes = list(executor.map(
+                lambda _: self._run_in_transaction(
+                    file_app, lambda service: service.add_stock(key, box_no, 2, 3)
+                ),
+                range(48),
+            ))
+
+        assert outcomes == ["applied"] * 48
+
+        container = file_app.container
+        with file_app.app_context():
+            session = container.db_session()
+            part = session.query(Part).filter_by(key=key).one()
+            assert part.total_quantity == 144
+            assert [pl.qty for pl in session.query(PartLocation).filter_by(part_id=part.id)] == [144]
+            session.close()
+
+
+@pytest.mark.slow
+def test_suggest_locations_on_large_inventory(app: Flask, session: Session, container: ServiceContainer):
+    """Test suggestions with 300 boxes and 30k locations, mostly occupied, take three statements."""
+    with app.app_context():
+        from app.models.box import Box
+
+        resistors = container.type_service().create_type("Resistors")
+        part = container.part_service().create_part("Resistor", type_id=resistors.id)
+        session.flush()
+
+        boxes = [Box(box_no=box_no, description=f"Box {box_no}", capacity=100) for box_no in range(1, 301)]
+        session.add_all(boxes)
+        session.flush()
+        # Only the last ten locations of every tenth box are free
+        session.execute(insert(Location), [
+            {
+                "box_id": box.id,
+                "box_no": box.box_no,
+                "loc_no": loc_no,
+                "is_occupied": not (box.box_no % 10 == 0 and loc_no > 90),
+            }
+            for box in boxes
+            for loc_no in range(1, 101)
+        ])
+        container.inventory_service().add_stock(part.key, 250, 1, 1)
+        session.commit()
+
+        statements: list[str] = []
+
+        def listen(conn, cursor, statement, *args) -> None:
+            statements.append(statement)
+
+        event.listen(session.get_bind(), "before_cursor_execute", listen)
+        try:
+            suggestions = container.inventory_service().suggest_locations(resistors.id, count=25)
+        finally:
+            event.remove(session.get_bind(), "before_cursor_execute", listen)
+
+        assert suggestions[:10] == [(250, loc_no) for loc_no in range(91, 101)]
+        assert suggestions[10:] == [(10, loc_no) for loc_no in range(91, 101)] + [(20, loc_no) for loc_no in range(91, 96)]
+        assert len(statements) == 3
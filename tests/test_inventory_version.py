@@ -0,0 +1,165 @@
+"""Tests for the global inventory version and ETag support."""
+
+from flask import Flask
+from flask.testing import FlaskClient
+from sqlalchemy import update
+from sqlalchemy.orm import Session
+
+from app.models.attachment import Attachment, AttachmentType
+from app.models.part import Part
+from app.services.container import ServiceContainer
+
+
+class TestInventoryVersion:
+    """Test cases for bumping the inventory version on writes."""
+
+    def test_version_bumps_once_per_transaction(self, app: Flask, session: Session, container: ServiceContainer):
+        """Test several flushes in one transaction bump the version only once."""
+        with app.app_context():
+            version_service = container.inventory_version_service()
+            start = version_service.get_version()
+
+            container.type_service().create_type("Resistor")
+            container.part_service().create_part("Part one")
+            session.flush()
+            session.commit()
+
+            assert version_service.get_version() == start + 1
+
+    def test_reads_do_not_bump_version(self, app: Flask, session: Session, container: ServiceContainer):
+        """Test that queries and no-op flushes leave the version unchanged."""
+        with app.app_context():
+            container.part_service().create_part("Part one")
+            session.commit()
+            version_service = container.inventory_version_service()
+            start = version_service.get_version()
+
+            container.inventory_service().get_all_parts_with_totals()
+            session.flush()
+            session.commit()
+
+            assert version_service.get_version() == start
+
+    def test_rolled_back_write_does_not_bump_version(self, app: Flask, session: Session, container: ServiceContainer):
+        """Test the bump is part of the writing transaction."""
+        with app.app_context():
+            version_service = container.inventory_version_service()
+            container.part_service().create_part("Part one")
+            session.commit()
+            start = version_service.get_version()
+
+            container.part_service().create_part("Part two")
+            session.flush()
+            session.rollback()
+
+            assert version_service.get_version() == start
+
+    def test_bump_waits_for_commit(self, app: Flask, session: Session, container: ServiceContainer):
+        """Test a flushed write only bumps the version when the transaction commits."""
+        with app.app_context():
+            version_service = container.inventory_version_service()
+            start = version_service.get_version()
+
+            container.part_service().create_part("Part one")
+            session.flush()
+            assert version_service.get_version() == start
+
+            session.commit()
+            assert version_service.get_version() == start + 1
+
+    def test_attachment_writes_bump_version(self, app: Flask, session: Session, container: ServiceContainer, make_attachment_set):
+        """Test adding an attachment bumps the version even without touching its set."""
+        with app.app_context():
+            attachment_set = make_attachment_set()
+            session.commit()
+            version_service = container.inventory_version_service()
+            start = version_service.get_version()
+
+            session.add(Attachment(
+                attachment_set_id=attachment_set.id,
+                attachment_type=AttachmentType.URL,
+                title="Datasheet",
+                url="https://example.com/datasheet.pdf",
+            ))
+            session.commit()
+
+            assert version_service.get_version() == start + 1
+
+    def test_bulk_update_bumps_version(self, app: Flask, session: Session, container: ServiceContainer):
+        """Test ORM-enabled update statements bump the version without a flush."""
+        with app.app_context():
+            part = container.part_service().create_part("Part one")
+            session.commit()
+            version_service = container.inventory_version_service()
+            start = version_service.get_version()
+
+            session.execute(update(Part).where(Part.id == part.id).values(description="Renamed"))
+            session.commit()
+
+            assert version_service.get_version() == start + 1
+
+
+class TestInventoryETag:
+    """Test cases for conditional GET on inventory read endpoints."""
+
+    def test_unchanged_poll_returns_304(self, app: Flask, client: FlaskClient, session: Session, container: ServiceContainer):
+        """Test a matching If-None-Match returns 304 with the same ETag."""
+        with app.app_context():
+            container.type_service().create_type("Resistor")
+            session.commit()
+
+        response = client.get("/api/types")
+        assert response.status_code == 200
+        etag = response.headers["ETag"]
+
+        response = client.get("/api/types", headers={"If-None-Match": etag})
+        assert response.status_code == 304
+        assert response.headers["ETag"] == etag
+        assert response.data == b""
+
+    def test_write_changes_etag(self, app: Flask, client: FlaskClient, session: Session, container: ServiceContainer):
+        """Test a write makes the previous ETag stale."""
+        response = client.get("/api/parts")
+        etag = response.headers["ETag"]
+
+        response = client.post("/api/parts", json={"description": "New part"})
+        assert response.status_code == 201
+
+        response = client.get("/api/parts", headers={"If-None-Match": etag})
+        assert response.status_code == 200
+        assert response.headers["ETag"] != etag
+        assert len(response.get_json()) == 1
+
+    def test_attachment_changes_etag(self, app: Flask, client: FlaskClient, session: Session, container: ServiceContainer):
+        """Test adding a non-image attachment makes the undocumented parts ETag stale."""
+        with app.app_context():
+            part = container.part_service().create_part("Part one")
+            session.commit()
+            attachment_set_id = part.attachment_set_id
+
+        response = client.get("/api/dashboard/parts-without-documents")
+        assert response.get_json()["count"] == 1
+        etag = response.headers["ETag"]
+
+        with app.app_context():
+            session.add(Attachment(
+                attachment_set_id=attachment_set_id,
+                attachment_type=AttachmentType.URL,
+                title="Datasheet",
+                url="https://example.com/datasheet.pdf",
+            ))
+            session.commit()
+
+        response = client.get("/api/dashboard/parts-without-documents", headers={"If-None-Match": etag})
+        assert response.status_code == 200
+        assert response.headers["ETag"] != etag
+        assert response.get_json()["count"] == 0
+
+    def test_dashboard_stats_etag(self, client: FlaskClient):
+        """Test time-windowed dashboard stats are also served conditionally."""
+        response = client.get("/api/dashboard/stats")
+        assert response.status_code == 200
+        etag = response.headers["ETag"]
+
+        response = client.get("/api/dashboard/stats", headers={"If-None-Match": etag})
+        assert response.status_code == 304
@@ -0,0 +1,163 @@
+"""Tests for the fast-path list serializer."""
+
+import json
+from datetime import UTC, datetime
+from types import SimpleNamespace
+from typing import Any
+
+import pytest
+from flask import Flask
+from pydantic import ValidationError
+
+from app.models.kit import KitStatus
+from app.schemas.kit import KitSummarySchema
+from app.schemas.part import PartWithTotalSchema
+from app.services.container import ServiceContainer
+from app.utils.list_serialization import (
+    RowEncoder,
+    encode_json,
+    list_json_response,
+)
+
+
+def _make_part_rows(count: int) -> list[SimpleNamespace]:
+    """Build part list rows shaped like InventoryService.get_all_parts_with_totals results."""
+    now = datetime(2026, 1, 15, 10, 30, tzinfo=UTC)
+    rows = []
+    for i in range(count):
+        seller_links = [
+            SimpleNamespace(
+                id=i,
+                seller_id=1,
+                seller_name="DigiKey",
+                seller_website="https://www.digikey.com",
+                link=f"https://www.digikey.com/p/{i}",
+                logo_url="/api/cas/abc",
+                created_at=now,
+            )
+        ] if i % 2 else []
+        part = SimpleNamespace(
+            key=f"P{i:03d}"[-4:],
+            manufacturer_code=f"MC-{i}",
+            description=f"Part number {i} with ümlaut",
+            type_id=i % 5 or None,
+            tags=["smd", "0603"],
+            manufacturer="Texas Instruments",
+            seller_links=seller_links,
+            package="0603",
+            pin_count=2,
+            pin_pitch=None,
+            voltage_rating="50V",
+            input_voltage=None,
+            output_voltage=None,
+            mounting_type="SMD",
+            series=None,
+            dimensions=None,
+            created_at=now,
+            updated_at=now,
+            cover_url=None,
+        )
+        rows.append(SimpleNamespace(part=part, total_quantity=i * 3))
+    return rows
+
+
+def _part_list_encoder() -> RowEncoder:
+    # app.api can only be imported once the app (and spectree) is set up
+    from app.api.parts import _PART_LIST_ENCODER
+    return _PART_LIST_ENCODER
+
+
+def _validated_path(rows: list[SimpleNamespace]) -> list[dict[str, Any]]:
+    """The per-row Pydantic path list endpoints used before the fast path."""
+    result = []
+    for row in rows:
+        part = row.part
+        data = {name: getattr(part, name) for name in PartWithTotalSchema.model_fields if hasattr(part, name)}
+        data["seller_links"] = [vars(link) for link in part.seller_links]
+        data["total_quantity"] = row.total_quantity
+        result.append(PartWithTotalSchema.model_validate(data).model_dump())
+    # Spectree validated the returned payload once more
+    return [PartWithTotalSchema.model_validate(item).model_dump() for item in result]
+
+
+class TestRowEncoder:
+    """Test cases for RowEncoder."""
+
+    def test_output_matches_validated_path(self, app: Flask):
+        """Test the fast path renders the same JSON as validation plus Flask's provider."""
+        rows = _make_part_rows(20)
+
+        expected = json.loads(app.json.dumps(_validated_path(rows)))
+        actual = json.loads(encode_json(_part_list_encoder().encode_many(rows)))
+
+        assert actual == expected
+
+    def test_computed_fields_need_override(self):
+        """Test building an encoder fails when a computed field has no getter."""
+        with pytest.raises(ValueError, match="is_archived"):
+            RowEncoder.for_schema(KitSummarySchema)
+
+    def test_computed_field_override(self):
+        """Test computed fields are produced by their override."""
+        encoder = RowEncoder.for_schema(
+            KitSummarySchema,
+            overrides={"is_archived": lambda kit: kit.status == KitStatus.ARCHIVED},
+        )
+        kit = SimpleNamespace(
+            id=1,
+            name="Synth",
+            description=None,
+            status=KitStatus.ARCHIVED,
+            build_target=1,
+            archived_at=None,
+            updated_at=datetime(2026, 1, 1, tzinfo=UTC),
+            cover_url=None,
+            shopping_list_badge_count=0,
+            pick_list_badge_count=0,
+        )
+
+        data = encoder(kit)
+
+        assert data["is_archived"] is True
+        assert list(data) == list(KitSummarySchema.model_validate(kit).model_dump())
+
+
+class TestSampledValidation:
+    """Test cases for list_json_response's sampled validation."""
+
+    def test_invalid_rows_raise_at_full_rate(self, app: Flask):
+        """Test a schema mismatch fails loudly when every response is validated."""
+        with app.test_request_context():
+            with pytest.raises(ValidationError):
+                list_json_response([{"key": "ABCD"}], PartWithTotalSchema)
+
+    def test_invalid_rows_are_served_when_sampling(
+        self, app: Flask, container: ServiceContainer, monkeypatch: pytest.MonkeyPatch
+    ):
+        """Test a sampled schema mismatch is logged rather than failing the request."""
+        monkeypatch.setattr(container.app_config(), "response_validation_sample_rate", 0.5)
+        monkeypatch.setattr("app.utils.list_serialization.random.random", lambda: 0.0)
+
+        with app.test_request_context():
+            response = list_json_response([{"key": "ABCD"}], PartWithTotalSchema)
+
+        assert response.status_code == 200
+        assert response.get_json() == [{"key": "ABCD"}]
+
+    def test_unsampled_responses_skip_validation(
+        self, app: Flask, container: ServiceContainer, monkeypatch: pytest.MonkeyPatch
+    ):
+        """Test responses outside the sample are not validated."""
+        monkeypatch.setattr(container.app_config(), "response_validation_sample_rate", 0.5)
+        monkeypatch.setattr("app.utils.list_serialization.random.random", lambda: 0.9)
+
+        def fail(*args: Any) -> None:
+            raise AssertionError("validated an unsampled response")
+
+        monkeypatch.setattr("app.utils.list_serialization.TypeAdapter", fail)
+
+        with app.test_request_context():
+            response = list_json_response([{"key": "ABCD"}], KitSummarySchema)
+
+        assert response.status_code == 200
+
@@ -0,0 +1,138 @@
+"""Tests for the in-process part key allocator."""
+
+import string
+
+import pytest
+from flask import Flask
+from sqlalchemy.orm import Session
+
+from app.exceptions import InvalidOperationException
+from app.models.part import Part
+from app.services.container import ServiceContainer
+from app.services.part_key_allocator import (
+    KEY_SPACE_SIZE,
+    PART_KEY_SPACE_UTILIZATION,
+    PartKeyAllocator,
+    index_to_key,
+    key_to_index,
+)
+
+
+class TestPartKeyAllocator:
+    """Test cases for PartKeyAllocator."""
+
+    def test_key_index_round_trip(self):
+        """Test keys map onto the whole index range and back."""
+        assert key_to_index("AAAA") == 0
+        assert key_to_index("ZZZZ") == KEY_SPACE_SIZE - 1
+        assert index_to_key(key_to_index("QRST")) == "QRST"
+        assert key_to_index("ABC") is None
+        assert key_to_index("AB1D") is None
+
+    def test_allocate_skips_existing_keys(self, app: Flask, session: Session, make_attachment_set):
+        """Test keys loaded from the database are never handed out."""
+        with app.app_context():
+            session.add(Part(key="ABCD", description="Existing", attachment_set_id=make_attachment_set().id))
+            session.flush()
+
+            allocator = PartKeyAllocator()
+            keys = allocator.allocate(session, 50)
+
+            assert len(set(keys)) == 50
+            assert "ABCD" not in keys
+            assert all(len(key) == 4 and set(key) <= set(string.ascii_uppercase) for key in keys)
+            assert allocator.used_count == 51
+            assert PART_KEY_SPACE_UTILIZATION._value.get() == 51 / KEY_SPACE_SIZE
+
+    def test_allocate_skips_keys_taken_by_other_process(self, app: Flask, session: Session, make_attachment_set, monkeypatch):
+        """Test keys inserted after the bitmap was loaded are detected in the database."""
+        with app.app_context():
+            allocator = PartKeyAllocator()
+            allocator.allocate(session)
+
+            # Simulate another process inserting the key we are about to pick
+            session.add(Part(key="WXYZ", description="Elsewhere", attachment_set_id=make_attachment_set().id))
+            session.flush()
+            picks = iter([key_to_index("WXYZ"), key_to_index("KLMN")])
+            monkeypatch.setattr("app.services.part_key_allocator.random.randrange", lambda _n: next(picks))
+
+            assert allocator.allocate(session) == ["KLMN"]
+
+    def test_release_frees_key(self, app: Flask, session: Session):
+        """Test released keys no longer count as used."""
+        with app.app_context():
+            allocator = PartKeyAllocator()
+            [key] = allocator.allocate(session)
+
+            allocator.release([key, "ZZZZ", "not-a-key"])
+
+            assert allocator.used_count == 0
+
+    def test_allocate_nearly_full_space(self, app: Flask, session: Session):
+        """Test the scan fallback finds the last free key and then reports exhaustion."""
+        with app.app_context():
+            allocator = PartKeyAllocator()
+            allocator.allocate(session)
+            for index in range(KEY_SPACE_SIZE):
+                if index != key_to_index("MNOP"):
+                    allocator._mark_used(index)
+
+            assert allocator.allocate(session) == ["MNOP"]
+            with pytest.raises(InvalidOperationException):
+                allocator.allocate(session)
+
+    def test_part_service_uses_shared_allocator(self, app: Flask, session: Session, container: ServiceContainer):
+        """Test part creation and deletion keep the shared allocator in sync."""
+        with app.app_context():
+            allocator = container.part_key_allocator()
+            allocator.reset()
+
+            part = container.part_service().create_part("Tracked part")
+            session.commit()
+            assert allocator.used_count == 1
+
+            # Keys of deleted parts are only freed once the deletion commits
+            container.part_service().delete_part(part.key)
+            assert allocator.used_count == 1
+            session.commit()
+            assert allocator.used_count == 0
+
+    def test_rollback_frees_allocated_keys(self, app: Flask, session: Session, container: ServiceContainer):
+        """Test keys of parts that were never committed are freed again."""
+        with app.app_context():
+            allocator = container.part_key_allocator()
+            allocator.reset()
+
+            container.part_service().create_parts([{"description": "Rolled back"}] * 3)
+            assert allocator.used_count == 3
+
+            session.rollback()
+            assert allocator.used_count == 0
+            assert PART_KEY_SPACE_UTILIZATION._value.get() == 0
+
+    def test_create_part_retries_key_conflict(self, app: Flask, session: Session, container: ServiceContainer, make_attachment_set, monkeypatch):
+        """Test a key inserted by another process after the check is retried once."""
+        with app.app_context():
+            session.add(Part(key="WXYZ", description="Elsewhere", attachment_set_id=make_attachment_set().id))
+            session.flush()
+
+            # Hand out the conflicting key once, as if the other insert raced the check
+            allocator = container.part_key_allocator()
+            original_allocate = PartKeyAllocator.allocate
+            calls = []
+
+            def racing_allocate(self, db, count=1):
+                calls.append(count)
+                if len(calls) == 1:
+                    return ["WXYZ"]
+                return original_allocate(self, db, count)
+
+            monkeypatch.setattr(PartKeyAllocator, "allocate", racing_allocate)
+
+            part = container.part_service().create_part("Retried part")
+            session.commit()
+
+            assert len(calls) == 2
+            assert part.key != "WXYZ"
+            assert session.query(Part).filter(Part.key == part.key).one().description == "Retried part"
+            assert allocator.used_count >= 1
@@ -4,12 +4,15 @@ import string
 
 import pytest
 from flask import Flask
+from sqlalchemy import create_mock_engine
+from sqlalchemy.dialects import postgresql
 from sqlalchemy.orm import Session
 
 from app.exceptions import RecordNotFoundException
 from app.models.attachment_set import AttachmentSet
 from app.models.part import Part
 from app.services.container import ServiceContainer
+from app.services.part_service import PartFacetFilters, PartService
 
 
 class AttachmentSetStub:
@@ -509,6 +512,141 @@ class TestPartService:
             with pytest.raises(RecordNotFoundException, match=f"Part {unknown_key} was not found"):
                 part_service.get_part_ids_by_keys([part.key, unknown_key])
 
+    def test_search_parts_requires_every_term(self, app: Flask, session: Session, container: ServiceContainer):
+        """Test multi-word searches only return parts matching all terms."""
+        with app.app_context():
+            part_service = container.part_service()
+            both = part_service.create_part("SMD LED red", series="0805")
+            part_service.create_part("SMD resistor", series="0805")
+            part_service.create_part("Through-hole LED red")
+            session.commit()
+
+            results = part_service.search_parts("led 0805")
+
+            assert [part.key for part, _rank in results] == [both.key]
+
+    def test_search_rank_is_double_precision_on_postgresql(self):
+        """Test the keyset cursor compares the rank in the precision it was returned in."""
+        engine = create_mock_engine("postgresql://", lambda *args, **kwargs: None)
+        part_service = PartService(db=Session(bind=engine), attachment_set_service=None)
+
+        stmt = part_service._search_statement("led", 10, after=(0.0607927, 42))
+        compiled = stmt.compile(dialect=postgresql.dialect())
+        sql = str(compiled)
+
+        # Selected, compared with the cursor and ordered by as FLOAT(53),
+        # PostgreSQL's double precision
+        assert sql.count("CAST(ts_rank(") == 3
+        assert sql.count(")) AS FLOAT(53))") == 3
+        assert "AS FLOAT(53)), parts.id) < (%(param_1)s, %(param_2)s)" in sql
+        assert "ORDER BY CAST(ts_rank(" in sql
+        assert compiled.binds["param_1"].type.precision == 53
+
+    def test_faceted_search_counts_exclude_own_filter(self, app: Flask, session: Session, container: ServiceContainer):
+        """Test facet counts apply the other facets' filters but not their own."""
+        with app.app_context():
+            part_service = container.part_service()
+            dip_tht = part_service.create_part("Op-amp", package="DIP-8", mounting_type="THT", tags=["audio"])
+            dip_timer = part_service.create_part("Timer", package="DIP-8", mounting_type="THT")
+            part_service.create_part("Op-amp SMD", package="SOIC-8", mounting_type="SMD", tags=["audio"])
+            part_service.create_part("Unspecified part")
+            session.commit()
+
+            result = part_service.faceted_search(PartFacetFilters(packages=("DIP-8",)))
+
+            assert result.total == 2
+            assert {part.key for part in result.parts} == {dip_tht.key, dip_timer.key}
+            # Own filter ignored: both packages remain selectable
+            assert result.facets["package"] == [("DIP-8", 2), ("SOIC-8", 1)]
+            # Other facets are narrowed to DIP-8 parts
+            assert result.facets["mounting_type"] == [("THT", 2)]
+            assert result.facets["in_stock"] == [(False, 2)]
+
+            result = part_service.faceted_search(
+                PartFacetFilters(packages=("DIP-8", "SOIC-8"), tags=("audio",))
+            )
+
+            assert result.total == 2
+            assert result.facets["mounting_type"] == [("SMD", 1), ("THT", 1)]
+
+    def test_faceted_search_type_and_stock(self, app: Flask, session: Session, container: ServiceContainer):
+        """Test type counts carry type names and the in-stock filter uses totals."""
+        with app.app_context():
+            part_service = container.part_service()
+            relay = container.type_service().create_type("Relay")
+            box = container.box_service().create_box("Box", 10)
+            stocked = part_service.create_part("Stocked relay", type_id=relay.id)
+            part_service.create_part("Empty relay", type_id=relay.id)
+            session.commit()
+            container.inventory_service().add_stock(stocked.key, box.box_no, 1, 5)
+            session.commit()
+
+            result = part_service.faceted_search(PartFacetFilters(in_stock=True), limit=1)
+
+            assert [part.key for part in result.parts] == [stocked.key]
+            assert result.total == 1
+            assert result.facets["type_id"] == [(relay.id, 1)]
+            assert result.type_names == {relay.id: "Relay"}
+            assert result.facets["in_stock"] == [(False, 1), (True, 1)]
+
+    def test_manufacturer_code_normalized_tracks_code(self, app: Flask, session: Session, container: ServiceContainer):
+        """Test the normalized manufacturer code follows creates and updates."""
+        with app.app_context():
+            part_service = container.part_service()
+            part = part_service.create_part("Regulator", manufacturer_code="lm7805-ct")
+            session.commit()
+            assert part.manufacturer_code_normalized == "LM7805CT"
+
+            part_service.update_part_details(part.key, manufacturer_code=None)
+            session.commit()
+            assert part.manufacturer_code_normalized is None
+
+    def test_similar_parts_tolerates_formatting_and_typos(self, app: Flask, session: Session, container: ServiceContainer):
+        """Test fuzzy manufacturer code lookup ranks closest codes first."""
+        with app.app_context():
+            part_service = container.part_service()
+            exact = part_service.create_part("Regulator TO-220", manufacturer_code="LM7805CT")
+            variant = part_service.create_part("Regulator", manufacturer_code="LM7805")
+            part_service.create_part("Op-amp", manufacturer_code="NE5532P")
+            part_service.create_part("No code part")
+            session.commit()
+
+            results = part_service.similar_parts("lm7805-ct")
+
+            assert [part.key for part, _score in results] == [exact.key, variant.key]
+            assert results[0][1] == 1.0
+            assert 0 < results[1][1] < 1.0
+
+            assert part_service.similar_parts("---") == []
+
+    def test_create_parts_bulk(self, app: Flask, session: Session, container: ServiceContainer):
+        """Test bulk creation allocates distinct keys and keeps input order."""
+        with app.app_context():
+            part_service = container.part_service()
+            existing = part_service.create_part("Existing part")
+            session.commit()
+
+            parts = part_service.create_parts([
+                {"description": "First", "manufacturer_code": "LM-7805"},
+                {"description": "Second", "tags": ["smd"]},
+                {"description": "Third", "pin_count": 8},
+            ])
+            session.commit()
+
+            assert [part.description for part in parts] == ["First", "Second", "Third"]
+            keys = [part.key for part in parts]
+            assert len(set(keys + [existing.key])) == 4
+            assert all(len(key) == 4 for key in keys)
+            assert parts[0].manufacturer_code_normalized == "LM7805"
+            assert parts[1].tags == ["smd"]
+            assert parts[2].pin_count == 8
+
+            attachment_set_ids = {part.attachment_set_id for part in parts}
+            assert len(attachment_set_ids) == 3
+            assert session.query(AttachmentSet).filter(AttachmentSet.id.in_(attachment_set_ids)).count() == 3
+
+            assert part_service.create_parts([]) == []
+
 
 def test_get_all_parts_for_search_returns_all_parts(session: Session, make_attachment_set):
     """Test get_all_parts_for_search returns all parts with proper structure."""
@@ -0,0 +1,130 @@
+"""Tests for the denormalized parts.total_quantity column."""
+
+from flask import Flask
+from sqlalchemy import func, select, update
+from sqlalchemy.orm import Session
+
+from app.models.part import Part
+from app.models.part_location import PartLocation
+from app.services.container import ServiceContainer
+
+
+def _actual_total(session: Session, part_id: int) -> int:
+    stmt = select(func.coalesce(func.sum(PartLocation.qty), 0)).where(PartLocation.part_id == part_id)
+    return session.execute(stmt).scalar_one()
+
+
+def _stored_total(session: Session, part_id: int) -> int:
+    return session.execute(select(Part.total_quantity).where(Part.id == part_id)).scalar_one()
+
+
+class TestPartTotalQuantity:
+    """Test cases for keeping parts.total_quantity in sync with part locations."""
+
+    def test_new_part_starts_at_zero(self, app: Flask, session: Session, container: ServiceContainer):
+        """Test a freshly created part has a total of zero."""
+        with app.app_context():
+            part = container.part_service().create_part("Test part")
+            session.commit()
+
+            assert part.total_quantity == 0
+            assert _stored_total(session, part.id) == 0
+
+    def test_stock_operations_keep_total_in_sync(self, app: Flask, session: Session, container: ServiceContainer):
+        """Test add, move and remove stock all maintain the stored total."""
+        with app.app_context():
+            box = container.box_service().create_box("Test Box", 10)
+            part = container.part_service().create_part("Test part")
+            session.commit()
+
+            inventory_service = container.inventory_service()
+
+            inventory_service.add_stock(part.key, box.box_no, 1, 10)
+            inventory_service.add_stock(part.key, box.box_no, 2, 5)
+            inventory_service.add_stock(part.key, box.box_no, 1, 3)
+            session.commit()
+            assert _stored_total(session, part.id) == 18
+
+            inventory_service.move_stock(part.key, box.box_no, 1, box.box_no, 3, 13)
+            session.commit()
+            assert _stored_total(session, part.id) == 18
+
+            inventory_service.remove_stock(part.key, box.box_no, 2, 4)
+            session.commit()
+            assert _stored_total(session, part.id) == 14
+            assert _stored_total(session, part.id) == _actual_total(session, part.id)
+
+            inventory_service.remove_stock(part.key, box.box_no, 2, 1)
+            inventory_service.remove_stock(part.key, box.box_no, 3, 13)
+            session.commit()
+            assert _stored_total(session, part.id) == 0
+
+    def test_loaded_part_sees_updated_total(self, app: Flask, session: Session, container: ServiceContainer):
+        """Test a part already loaded in the session is refreshed after a stock change."""
+        with app.app_context():
+            box = container.box_service().create_box("Test Box", 10)
+            part = container.part_service().create_part("Test part")
+            session.commit()
+            assert part.total_quantity == 0
+
+            container.inventory_service().add_stock(part.key, box.box_no, 1, 7)
+
+            assert part.total_quantity == 7
+
+    def test_direct_part_location_writes_are_tracked(self, app: Flask, session: Session, container: ServiceContainer):
+        """Test part locations written outside the inventory service still update the total."""
+        with app.app_context():
+            box = container.box_service().create_box("Test Box", 10)
+            part = container.part_service().create_part("Test part")
+            session.commit()
+
+            location = box.locations[0]
+            part_location = PartLocation(
+                part_id=part.id,
+                box_no=box.box_no,
+                loc_no=location.loc_no,
+                location_id=location.id,
+                qty=12,
+            )
+            session.add(part_location)
+            session.commit()
+            assert _stored_total(session, part.id) == 12
+
+            part_location.qty = 4
+            session.commit()
+            assert _stored_total(session, part.id) == 4
+
+            session.delete(part_location)
+            session.commit()
+            assert _stored_total(session, part.id) == 0
+
+    def test_check_total_quantities_reports_and_repairs_drift(
+        self, app: Flask, session: Session, container: ServiceContainer
+    ):
+        """Test the consistency check finds drifted totals and repairs them on request."""
+        with app.app_context():
+            box = container.box_service().create_box("Test Box", 10)
+            part = container.part_service().create_part("Test part")
+            other = container.part_service().create_part("Other part")
+            session.commit()
+
+            inventory_service = container.inventory_service()
+            inventory_service.add_stock(part.key, box.box_no, 1, 6)
+            inventory_service.add_stock(other.key, box.box_no, 2, 2)
+            session.commit()
+
+            assert inventory_service.check_total_quantities() == []
+
+            # Simulate a write that bypassed the ORM
+            session.execute(update(Part).where(Part.id == part.id).values(total_quantity=99))
+            session.commit()
+
+            assert inventory_service.check_total_quantities() == [(part.key, 99, 6)]
+            # Without repair nothing changes
+            assert _stored_total(session, part.id) == 99
+
+            assert inventory_service.check_total_quantities(repair=True) == [(part.key, 99, 6)]
+            session.commit()
+
+            assert _stored_total(session, part.id) == 6
+            assert inventory_service.check_total_quantities() == []
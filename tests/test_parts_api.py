@@ -5,10 +5,12 @@ from datetime import UTC, datetime, timedelta
 
 from flask import Flask
 from flask.testing import FlaskClient
+from sqlalchemy import event
 from sqlalchemy.orm import Session
 
 from app.models.kit import Kit, KitStatus
 from app.models.kit_content import KitContent
+from app.models.quantity_history import QuantityHistory
 from app.models.shopping_list import ShoppingListStatus
 from app.models.shopping_list_line import ShoppingListLine, ShoppingListLineStatus
 from app.services.container import ServiceContainer
@@ -135,6 +137,198 @@ class TestPartsAPI:
             response_data = json.loads(response.data)
             assert len(response_data) == 2
 
+    def test_list_parts_with_cursor_pagination(self, app: Flask, client: FlaskClient, session: Session, container: ServiceContainer):
+        """Test walking the parts list with opaque keyset cursors."""
+        with app.app_context():
+            for i in range(5):
+                container.part_service().create_part(f"Part {i}")
+            session.commit()
+
+            expected_keys = [part["key"] for part in client.get("/api/parts").get_json()]
+
+            seen_keys: list[str] = []
+            response = client.get("/api/parts?limit=2&cursor=")
+            pages = 0
+            while pages < 10:
+                assert response.status_code == 200
+                seen_keys.extend(part["key"] for part in response.get_json())
+                pages += 1
+                next_cursor = response.headers.get("X-Next-Cursor")
+                if next_cursor is None:
+                    break
+                response = client.get(f"/api/parts?limit=2&cursor={next_cursor}")
+
+            assert pages == 3
+            assert seen_keys == expected_keys
+
+    def test_list_parts_cursor_header_exposed_to_cors(self, client: FlaskClient):
+        """Test the cross-origin frontend may read the next cursor header."""
+        response = client.get("/api/parts?cursor=", headers={"Origin": "http://localhost:3000"})
+
+        assert response.status_code == 200
+        exposed = response.headers["Access-Control-Expose-Headers"]
+        assert "X-Next-Cursor" in exposed
+
+    def test_list_parts_cursor_exact_page_has_no_next_cursor(self, app: Flask, client: FlaskClient, session: Session, container: ServiceContainer):
+        """Test that a final full page does not advertise another page."""
+        with app.app_context():
+            for i in range(2):
+                container.part_service().create_part(f"Part {i}")
+            session.commit()
+
+            response = client.get("/api/parts?limit=2&cursor=")
+            assert response.status_code == 200
+            assert len(response.get_json()) == 2
+            assert "X-Next-Cursor" not in response.headers
+
+    def test_list_parts_invalid_cursor(self, client: FlaskClient):
+        """Test that malformed cursors and cursor+offset are rejected."""
+        response = client.get("/api/parts?cursor=not-a-cursor")
+        assert response.status_code == 400
+
+        response = client.get("/api/parts?cursor=&offset=10")
+        assert response.status_code == 400
+
+        for limit in (0, -1, 501):
+            response = client.get(f"/api/parts?limit={limit}&cursor=")
+            assert response.status_code == 400
+
+    def test_search_parts(self, app: Flask, client: FlaskClient, session: Session, container: ServiceContainer):
+        """Test searching parts matches description, code, manufacturer and tags."""
+        with app.app_context():
+            part_service = container.part_service()
+            opamp = part_service.create_part("Dual operational amplifier", manufacturer_code="LM358")
+            timer = part_service.create_part("Precision timer", manufacturer="Texas Instruments")
+            tagged = part_service.create_part("Ceramic capacitor", tags=["smd", "decoupling"])
+            part_service.create_part("Unrelated resistor")
+            session.commit()
+
+            response = client.get("/api/parts/search?q=lm358")
+            assert response.status_code == 200
+            assert [part["key"] for part in response.get_json()] == [opamp.key]
+
+            response = client.get("/api/parts/search?q=texas")
+            assert [part["key"] for part in response.get_json()] == [timer.key]
+
+            response = client.get("/api/parts/search?q=decoupling")
+            data = response.get_json()
+            assert [part["key"] for part in data] == [tagged.key]
+            assert data[0]["total_quantity"] == 0
+
+    def test_search_parts_pagination(self, app: Flask, client: FlaskClient, session: Session, container: ServiceContainer):
+        """Test walking search results with keyset cursors."""
+        with app.app_context():
+            for i in range(5):
+                container.part_service().create_part(f"Header pin strip {i}")
+            container.part_service().create_part("Something else")
+            session.commit()
+
+            seen_keys: list[str] = []
+            response = client.get("/api/parts/search?q=header&limit=2")
+            pages = 0
+            while pages < 10:
+                assert response.status_code == 200
+                seen_keys.extend(part["key"] for part in response.get_json())
+                pages += 1
+                next_cursor = response.headers.get("X-Next-Cursor")
+                if next_cursor is None:
+                    break
+                response = client.get(f"/api/parts/search?q=header&limit=2&cursor={next_cursor}")
+
+            assert pages == 3
+            assert len(seen_keys) == 5
+            assert len(set(seen_keys)) == 5
+
+    def test_export_parts_ndjson(self, app: Flask, client: FlaskClient, session: Session, container: ServiceContainer):
+        """Test NDJSON export streams one record per part with locations and seller links."""
+        with app.app_context():
+            seller = container.seller_service().create_seller("Digi-Key", "https://www.digikey.com")
+            box = container.box_service().create_box("Export Box", 10)
+            part = container.part_service().create_part("Exported part", tags=["smd"])
+            container.part_service().create_part("Part without stock")
+            container.inventory_service().add_stock(part.key, box.box_no, 3, 7)
+            container.part_seller_service().add_seller_link(
+                part_key=part.key, seller_id=seller.id, link="https://www.digikey.com/product/1"
+            )
+            session.commit()
+
+            response = client.get("/api/parts/export")
+
+            assert response.status_code == 200
+            assert response.mimetype == "application/x-ndjson"
+            assert 'filename="parts.ndjson"' in response.headers["Content-Disposition"]
+
+            records = [json.loads(line) for line in response.get_data(as_text=True).splitlines()]
+            assert len(records) == 2
+            exported = next(record for record in records if record["key"] == part.key)
+            assert exported["total_quantity"] == 7
+            assert exported["tags"] == ["smd"]
+            assert exported["locations"] == [{"box_no": box.box_no, "loc_no": 3, "qty": 7}]
+            assert exported["seller_links"] == [
+                {"seller_name": "Digi-Key", "link": "https://www.digikey.com/product/1"}
+            ]
+
+    def test_export_parts_csv(self, app: Flask, client: FlaskClient, session: Session, container: ServiceContainer):
+        """Test CSV export writes a header and flattened rows."""
+        import csv
+        import io
+
+        with app.app_context():
+            box = container.box_service().create_box("Export Box", 10)
+            part = container.part_service().create_part("Resistor, 10k", tags=["smd", "0603"])
+            container.inventory_service().add_stock(part.key, box.box_no, 1, 4)
+            container.inventory_service().add_stock(part.key, box.box_no, 2, 6)
+            session.commit()
+
+            response = client.get("/api/parts/export?format=csv")
+
+            assert response.status_code == 200
+            assert response.mimetype == "text/csv"
+
+            rows = list(csv.DictReader(io.StringIO(response.get_data(as_text=True))))
+            assert len(rows) == 1
+            assert rows[0]["key"] == part.key
+            assert rows[0]["description"] == "Resistor, 10k"
+            assert rows[0]["tags"] == "smd, 0603"
+            assert rows[0]["total_quantity"] == "10"
+            assert rows[0]["locations"] == f"{box.box_no}-1:4; {box.box_no}-2:6"
+
+    def test_export_parts_invalid_format(self, client: FlaskClient):
+        """Test that unknown export formats are rejected."""
+        response = client.get("/api/parts/export?format=xml")
+        assert response.status_code == 400
+
+    def test_create_parts_bulk(self, app: Flask, client: FlaskClient, session: Session, container: ServiceContainer):
+        """Test bulk creation returns created keys in request order."""
+        response = client.post("/api/parts/bulk", json={"parts": [
+            {"description": "Resistor 10k"},
+            {"description": "Capacitor 100nF", "package": "0805"},
+        ]})
+
+        assert response.status_code == 201
+        keys = response.get_json()["keys"]
+        assert len(keys) == 2
+
+        with app.app_context():
+            part_service = container.part_service()
+            assert part_service.get_part(keys[0]).description == "Resistor 10k"
+            assert part_service.get_part(keys[1]).package == "0805"
+
+    def test_create_parts_bulk_validation(self, client: FlaskClient):
+        """Test that empty batches and invalid parts are rejected."""
+        assert client.post("/api/parts/bulk", json={"parts": []}).status_code == 400
+        response = client.post("/api/parts/bulk", json={"parts": [{"description": "Ok"}, {"description": ""}]})
+        assert response.status_code == 400
+
+    def test_search_parts_validation(self, client: FlaskClient):
+        """Test that missing, overlong queries and bad cursors are rejected."""
+        assert client.get("/api/parts/search").status_code == 400
+        assert client.get("/api/parts/search?q=%20%20").status_code == 400
+        assert client.get(f"/api/parts/search?q={'a' * 201}").status_code == 400
+        assert client.get("/api/parts/search?q=foo&cursor=bogus").status_code == 400
+        assert client.get("/api/parts/search?q=foo&limit=0").status_code == 400
+        assert client.get("/api/parts/search?q=foo&limit=501").status_code == 400
+
     def test_list_parts_with_type_filter(self, app: Flask, client: FlaskClient, session: Session, container: ServiceContainer):
         """Test listing parts with type filter parameter."""
         with app.app_context():
@@ -190,6 +384,140 @@ class TestPartsAPI:
             assert response_data["type"]["name"] == "Resistor"
             assert response_data["cover_url"] is None
 
+    def test_list_parts_sparse_fields(self, app: Flask, client: FlaskClient, session: Session, container: ServiceContainer):
+        """Test ?fields= returns only the selected fields plus included lists."""
+        with app.app_context():
+            part = container.part_service().create_part("10k resistor", manufacturer_code="RES-10K")
+            session.commit()
+
+            response = client.get("/api/parts?fields=key,description,total_quantity")
+            assert response.status_code == 200
+            assert response.get_json() == [{"key": part.key, "description": "10k resistor", "total_quantity": 0}]
+
+            response = client.get("/api/parts?fields=key,seller_links&include=locations")
+            assert response.status_code == 200
+            assert response.get_json() == [{"key": part.key, "seller_links": [], "locations": []}]
+
+    def test_get_part_sparse_fields(self, app: Flask, client: FlaskClient, session: Session, container: ServiceContainer):
+        """Test ?fields= on part details, including relationships and used_in_kits."""
+        with app.app_context():
+            type_obj = container.type_service().create_type("Resistor")
+            part = container.part_service().create_part("1k resistor", type_id=type_obj.id)
+            session.commit()
+
+            response = client.get(f"/api/parts/{part.key}?fields=key,total_quantity")
+            assert response.status_code == 200
+            assert response.get_json() == {"key": part.key, "total_quantity": 0}
+
+            response = client.get(f"/api/parts/{part.key}?fields=type,used_in_kits")
+            assert response.status_code == 200
+            data = response.get_json()
+            assert data["type"]["name"] == "Resistor"
+            assert data["used_in_kits"] is False
+            assert set(data) == {"type", "used_in_kits"}
+
+    def test_sparse_fields_validation(self, client: FlaskClient):
+        """Test unknown or overlong field selections are rejected."""
+        assert client.get("/api/parts?fields=key,secret").status_code == 400
+        assert client.get("/api/parts?fields=locations").status_code == 400
+        assert client.get(f"/api/parts?fields={'key,' * 200}").status_code == 400
+        assert client.get("/api/parts/AAAA?fields=bogus").status_code == 400
+
+    def test_batch_get_parts(self, app: Flask, client: FlaskClient, session: Session, container: ServiceContainer):
+        """Test batch lookup returns full details and totals in request order."""
+        with app.app_context():
+            box = container.box_service().create_box("Test Box", 10)
+            first = container.part_service().create_part("First part")
+            second = container.part_service().create_part("Second part")
+            session.commit()
+            container.inventory_service().add_stock(second.key, box.box_no, 2, 7)
+            session.commit()
+
+            response = client.post(
+                "/api/parts/batch-get",
+                json={"keys": [second.key, first.key], "include_locations": True},
+            )
+
+            assert response.status_code == 200
+            parts = response.get_json()["parts"]
+            assert [p["key"] for p in parts] == [second.key, first.key]
+            assert parts[0]["total_quantity"] == 7
+            assert parts[0]["locations"] == [{"box_no": box.box_no, "loc_no": 2, "qty": 7}]
+            assert parts[0]["used_in_kits"] is False
+            assert parts[1]["locations"] == []
+
+            response = client.post("/api/parts/batch-get", json={"keys": [first.key]})
+            assert response.get_json()["parts"][0]["locations"] is None
+
+    def test_batch_get_parts_query_count_is_fixed(
+        self, app: Flask, client: FlaskClient, session: Session, container: ServiceContainer
+    ):
+        """Test the number of queries does not grow with the number of keys."""
+        with app.app_context():
+            keys = [container.part_service().create_part(f"Part {i}").key for i in range(6)]
+            session.commit()
+
+            statements: list[str] = []
+
+            def count_statement(conn, cursor, statement, parameters, context, executemany):
+                statements.append(statement)
+
+            engine = session.get_bind()
+            event.listen(engine, "before_cursor_execute", count_statement)
+            try:
+                client.post("/api/parts/batch-get", json={"keys": keys[:1], "include_locations": True})
+                single_count = len(statements)
+                statements.clear()
+                client.post("/api/parts/batch-get", json={"keys": keys, "include_locations": True})
+                batch_count = len(statements)
+            finally:
+                event.remove(engine, "before_cursor_execute", count_statement)
+
+            assert batch_count == single_count
+
+    def test_batch_get_parts_errors(self, app: Flask, client: FlaskClient, session: Session, container: ServiceContainer):
+        """Test unknown keys, duplicates and oversized batches are rejected."""
+        with app.app_context():
+            key = container.part_service().create_part("Some part").key
+            session.commit()
+
+            response = client.post("/api/parts/batch-get", json={"keys": [key, "ZZZZ"]})
+            assert response.status_code == 404
+
+            response = client.post("/api/parts/batch-get", json={"keys": [key, key]})
+            assert response.status_code == 400
+
+            response = client.post("/api/parts/batch-get", json={"keys": [f"K{i:03d}" for i in range(101)]})
+            assert response.status_code == 400
+
+    def test_faceted_search(self, app: Flask, client: FlaskClient, session: Session, container: ServiceContainer):
+        """Test the facets endpoint filters by repeated parameters and returns counts."""
+        with app.app_context():
+            part = container.part_service().create_part("Relay", package="DIP-8", series="G5Q", tags=["12V", "relay"])
+            container.part_service().create_part("Timer", package="DIP-8", series="NE555", tags=["12V"])
+            session.commit()
+
+            response = client.get("/api/parts/facets?package=DIP-8&package=SOIC-8&tag=12V&tag=relay")
+
+            assert response.status_code == 200
+            data = response.get_json()
+            assert [p["key"] for p in data["parts"]] == [part.key]
+            assert data["total"] == 1
+            assert data["facets"]["package"] == [{"value": "DIP-8", "label": None, "count": 1}]
+            assert data["facets"]["series"] == [{"value": "G5Q", "label": None, "count": 1}]
+
+            response = client.get("/api/parts/facets?series=NE555")
+            assert response.get_json()["facets"]["series"] == [
+                {"value": "G5Q", "label": None, "count": 1},
+                {"value": "NE555", "label": None, "count": 1},
+            ]
+
+    def test_faceted_search_validation(self, client: FlaskClient):
+        """Test invalid facet parameters are rejected."""
+        assert client.get("/api/parts/facets?type_id=abc").status_code == 400
+        assert client.get("/api/parts/facets?limit=0").status_code == 400
+        assert client.get("/api/parts/facets?offset=-1").status_code == 400
+
     def test_get_part_nonexistent(self, app: Flask, client: FlaskClient):
         """Test getting a non-existent part."""
         response = client.get("/api/parts/AAAA")
@@ -314,6 +642,100 @@ class TestPartsAPI:
         response = client.get("/api/parts/AAAA/history")
         assert response.status_code == 404
 
+    def _create_history(self, session: Session, container: ServiceContainer) -> tuple[str, list[int]]:
+        """Create a part with five changes, two of them sharing a timestamp; return ids newest first."""
+        part = container.part_service().create_part("History part")
+        session.flush()
+        start = datetime(2026, 3, 2, 9, 0)  # a Monday
+        rows = [
+            QuantityHistory(part_id=part.id, delta_qty=10, timestamp=start),
+            QuantityHistory(part_id=part.id, delta_qty=-2, timestamp=start + timedelta(days=1)),
+            QuantityHistory(part_id=part.id, delta_qty=-3, timestamp=start + timedelta(days=8)),
+            QuantityHistory(part_id=part.id, delta_qty=3, timestamp=start + timedelta(days=8)),
+            QuantityHistory(part_id=part.id, delta_qty=5, timestamp=start + timedelta(days=40)),
+        ]
+        session.add_all(rows)
+        session.commit()
+        newest_first = sorted(rows, key=lambda row: (row.timestamp, row.id), reverse=True)
+        return part.key, [row.id for row in newest_first]
+
+    def test_get_part_history_cursor_pages(
+        self, app: Flask, client: FlaskClient, session: Session, container: ServiceContainer
+    ):
+        """Test cursor pages walk the history newest first without skipping tied timestamps."""
+        with app.app_context():
+            part_key, expected_ids = self._create_history(session, container)
+
+            seen: list[int] = []
+            cursor = ""
+            pages = 0
+            while True:
+                response = client.get(f"/api/parts/{part_key}/history", query_string={"limit": 2, "cursor": cursor})
+                assert response.status_code == 200
+                seen.extend(entry["id"] for entry in response.get_json())
+                pages += 1
+                cursor = response.headers.get("X-Next-Cursor")
+                if cursor is None:
+                    break
+
+            assert seen == expected_ids
+            assert pages == 3
+
+    def test_get_part_history_before_timestamp(
+        self, app: Flask, client: FlaskClient, session: Session, container: ServiceContainer
+    ):
+        """Test before_timestamp only returns older changes."""
+        with app.app_context():
+            part_key, expected_ids = self._create_history(session, container)
+
+            response = client.get(
+                f"/api/parts/{part_key}/history",
+                query_string={"before_timestamp": "2026-03-10T00:00:00", "limit": 10},
+            )
+
+            assert response.status_code == 200
+            assert [entry["delta_qty"] for entry in response.get_json()] == [-2, 10]
+            assert "X-Next-Cursor" not in response.headers
+
+            response = client.get(f"/api/parts/{part_key}/history?before_timestamp=yesterday")
+            assert response.status_code == 400
+
+    def test_get_part_history_ndjson(
+        self, app: Flask, client: FlaskClient, session: Session, container: ServiceContainer
+    ):
+        """Test the NDJSON mode streams one change per line, newest first."""
+        with app.app_context():
+            part_key, expected_ids = self._create_history(session, container)
+
+            response = client.get(f"/api/parts/{part_key}/history?format=ndjson")
+
+            assert response.status_code == 200
+            assert response.mimetype == "application/x-ndjson"
+            lines = [json.loads(line) for line in response.get_data(as_text=True).splitlines()]
+            assert [line["id"] for line in lines] == expected_ids
+            assert lines[-1]["timestamp"] == "2026-03-02T09:00:00"
+
+            response = client.get(f"/api/parts/{part_key}/history?format=ndjson&limit=2")
+            assert response.status_code == 400
+
+    def test_get_part_history_buckets(
+        self, app: Flask, client: FlaskClient, session: Session, container: ServiceContainer
+    ):
+        """Test bucket mode returns net changes per week, oldest first."""
+        with app.app_context():
+            part_key, _ids = self._create_history(session, container)
+
+            response = client.get(f"/api/parts/{part_key}/history?bucket=week")
+
+            assert response.status_code == 200
+            assert [
+                (entry["change_count"], entry["qty_added"], entry["qty_removed"], entry["net_delta"])
+                for entry in response.get_json()
+            ] == [(2, 10, 2, 8), (2, 3, 3, 0), (1, 5, 0, 5)]
+
+            assert client.get(f"/api/parts/{part_key}/history?bucket=year").status_code == 400
+            assert client.get(f"/api/parts/{part_key}/history?bucket=day&limit=5").status_code == 400
+
     def test_create_part_with_extended_fields_only(self, app: Flask, client: FlaskClient):
         """Test creating a part with only extended fields."""
         with app.app_context():
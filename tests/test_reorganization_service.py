@@ -0,0 +1,226 @@
+"""Tests for the storage reorganization planner."""
+
+import random
+from unittest.mock import Mock
+
+import pytest
+from flask import Flask
+from sqlalchemy.orm import Session
+
+from app.schemas.reorganization import ReorganizationPlanTaskResultSchema
+from app.services.container import ServiceContainer
+from app.services.inventory_service import StockOperation
+from app.services.reorganization_plan_task import ReorganizationPlanTask
+from app.services.reorganization_service import (
+    PlannedMove,
+    StockItem,
+    StorageSnapshot,
+    plan_reorganization,
+)
+
+
+def _snapshot(
+    capacities: dict[int, int],
+    stock: list[tuple[int, int, int, int]],
+    part_types: dict[int, int | None] | None = None,
+) -> StorageSnapshot:
+    """Build a snapshot from box capacities and (part_id, box_no, loc_no, qty) rows."""
+    occupied = {(box_no, loc_no) for _part_id, box_no, loc_no, _qty in stock}
+    part_ids = {part_id for part_id, *_rest in stock}
+    part_types = part_types or {}
+    return StorageSnapshot(
+        box_locations={box_no: list(range(1, capacity + 1)) for box_no, capacity in capacities.items()},
+        free_slots={
+            (box_no, loc_no)
+            for box_no, capacity in capacities.items()
+            for loc_no in range(1, capacity + 1)
+            if (box_no, loc_no) not in occupied
+        },
+        items=[StockItem(*row) for row in stock],
+        part_keys={part_id: f"P{part_id:03d}" for part_id in part_ids},
+        part_types={part_id: part_types.get(part_id) for part_id in part_ids},
+        type_names={type_id: f"Type {type_id}" for type_id in set(part_types.values()) if type_id is not None},
+    )
+
+
+class TestPlanReorganization:
+    """Test cases for plan_reorganization."""
+
+    def test_tidy_storage_needs_no_moves(self):
+        """Test a storage without split parts, sparse boxes or scattering yields no moves."""
+        snapshot = _snapshot({1: 4}, [(1, 1, 1, 5), (2, 1, 2, 5)])
+
+        plan = plan_reorganization(snapshot)
+
+        assert plan.moves == []
+        assert plan.locations_freed == 0
+
+    def test_split_part_is_gathered_at_its_largest_location(self):
+        """Test a split part is consolidated into the location holding most of it."""
+        snapshot = _snapshot({1: 4, 2: 4}, [
+            (1, 1, 1, 5), (2, 1, 2, 1),
+            (1, 2, 3, 10), (3, 2, 1, 1),
+        ])
+
+        plan = plan_reorganization(snapshot)
+
+        assert plan.split_parts == 1
+        assert plan.moves == [PlannedMove("P001", 1, 1, 2, 3, 5, "consolidate")]
+        assert plan.locations_freed == 1
+
+    def test_sparse_box_is_emptied_into_box_of_same_type(self):
+        """Test a nearly empty box is emptied, preferring the box holding the same type."""
+        snapshot = _snapshot(
+            {1: 4, 2: 4, 3: 8},
+            [(1, 1, 1, 5), (2, 1, 2, 5), (3, 2, 1, 5), (4, 2, 2, 5), (5, 3, 4, 5)],
+            part_types={1: 10, 2: 10, 3: 20, 4: 20, 5: 20},
+        )
+
+        plan = plan_reorganization(snapshot, sparse_threshold=0.25)
+
+        assert plan.sparse_boxes == [3]
+        assert plan.emptied_boxes == [3]
+        assert plan.moves == [PlannedMove("P005", 3, 4, 2, 3, 5, "empty_box")]
+
+    def test_sparse_box_is_kept_without_room_elsewhere(self):
+        """Test a sparse box is not emptied when the other boxes are full."""
+        snapshot = _snapshot({1: 2, 2: 8}, [(1, 1, 1, 5), (2, 1, 2, 5), (3, 2, 1, 5)])
+
+        plan = plan_reorganization(snapshot)
+
+        assert plan.sparse_boxes == [2]
+        assert plan.emptied_boxes == []
+        assert plan.moves == []
+
+    def test_lone_location_of_type_moves_to_type_box(self):
+        """Test a type's only location in a box moves to the box holding most of the type."""
+        snapshot = _snapshot(
+            {1: 4, 2: 4},
+            [(1, 1, 1, 5), (2, 1, 2, 5), (3, 2, 1, 5), (4, 2, 2, 5)],
+            part_types={1: 10, 2: 10, 3: 10, 4: 20},
+        )
+
+        plan = plan_reorganization(snapshot, sparse_threshold=0)
+
+        assert plan.scattered_types == ["Type 10"]
+        assert plan.moves == [PlannedMove("P003", 2, 1, 1, 3, 5, "group_type")]
+
+    def test_stock_moves_once_to_its_final_location(self):
+        """Test stock gathered into a box that is then emptied moves there directly."""
+        snapshot = _snapshot(
+            {1: 4, 2: 8, 3: 8},
+            [(2, 1, 1, 5), (3, 1, 2, 5), (1, 2, 1, 5), (1, 3, 1, 1)],
+        )
+
+        plan = plan_reorganization(snapshot)
+
+        # Part 1 is first gathered at 2-1, then box 2 is emptied into box 1
+        assert plan.emptied_boxes == [2, 3]
+        assert plan.moves == [
+            PlannedMove("P001", 2, 1, 1, 3, 5, "empty_box"),
+            PlannedMove("P001", 3, 1, 1, 3, 1, "empty_box"),
+        ]
+        assert plan.locations_freed == 1
+
+    def test_progress_is_reported(self):
+        """Test the progress callback receives increasing values up to 1."""
+        progress = Mock()
+
+        plan_reorganization(_snapshot({1: 2}, [(1, 1, 1, 1)]), progress=progress)
+
+        values = [call.args[1] for call in progress.call_args_list]
+        assert values == sorted(values)
+        assert values[-1] == 1.0
+
+
+class TestReorganizationService:
+    """Test cases for ReorganizationService against the database."""
+
+    def test_plan_can_be_applied_as_stock_batch(self, app: Flask, session: Session, container: ServiceContainer):
+        """Test a plan from the database snapshot applies cleanly as a batch of moves."""
+        with app.app_context():
+            resistors = container.type_service().create_type("Resistors")
+            first_box = container.box_service().create_box("First Box", 4)
+            second_box = container.box_service().create_box("Second Box", 8)
+            resistor = container.part_service().create_part("Resistor", type_id=resistors.id)
+            other = container.part_service().create_part("Other resistor", type_id=resistors.id)
+            session.commit()
+
+            inventory_service = container.inventory_service()
+            inventory_service.add_stock(resistor.key, first_box.box_no, 1, 10)
+            inventory_service.add_stock(other.key, first_box.box_no, 2, 4)
+            inventory_service.add_stock(resistor.key, second_box.box_no, 5, 3)
+            session.commit()
+
+            plan = container.reorganization_service().plan(sparse_threshold=0.25)
+
+            assert plan.split_parts == 1
+            assert plan.sparse_boxes == [second_box.box_no]
+            assert plan.emptied_boxes == [second_box.box_no]
+            assert plan.moves == [
+                PlannedMove(resistor.key, second_box.box_no, 5, first_box.box_no, 1, 3, "consolidate"),
+            ]
+
+            inventory_service.apply_stock_batch([
+                StockOperation(
+                    "move", move.part_key, move.from_box_no, move.from_loc_no, move.qty,
+                    to_box_no=move.to_box_no, to_loc_no=move.to_loc_no,
+                )
+                for move in plan.moves
+            ])
+            session.commit()
+
+            assert [(pl.box_no, pl.loc_no, pl.qty) for pl in inventory_service.get_part_locations(resistor.key)] == [
+                (first_box.box_no, 1, 13)
+            ]
+            assert container.reorganization_service().plan().moves == []
+
+    def test_task_returns_plan(self, app: Flask, session: Session, container: ServiceContainer):
+        """Test the background task computes a plan and reports progress."""
+        with app.app_context():
+            box = container.box_service().create_box("Test Box", 4)
+            part = container.part_service().create_part("Test part")
+            session.commit()
+            container.inventory_service().add_stock(part.key, box.box_no, 1, 1)
+            container.inventory_service().add_stock(part.key, box.box_no, 2, 1)
+            session.commit()
+
+            progress_handle = Mock()
+            result = ReorganizationPlanTask(container).execute(progress_handle, sparse_threshold=0.0)
+
+            assert isinstance(result, ReorganizationPlanTaskResultSchema)
+            assert result.success is True
+            assert result.plan is not None
+            assert [move.reason for move in result.plan.moves] == ["consolidate"]
+            progress_handle.send_progress.assert_called_with("Plan ready", 1.0)
+
+
+def _synthetic_snapshot(box_count: int, capacity: int, fill: float, seed: int = 7) -> StorageSnapshot:
+    """Build a messy storage: split parts, scattered types and some sparse boxes."""
+    rng = random.Random(seed)
+    stock: list[tuple[int, int, int, int]] = []
+    part_types: dict[int, int | None] = {}
+    part_id = 0
+    for box_no in range(1, box_count + 1):
+        box_fill = 0.1 if box_no % 20 == 0 else fill
+        for loc_no in range(1, capacity + 1):
+            if rng.random() >= box_fill:
+                continue
+            if part_id and rng.random() < 0.1:
+                # Another location of an existing part
+                stock.append((rng.randint(1, part_id), box_no, loc_no, rng.randint(1, 50)))
+                continue
+            part_id += 1
+            part_types[part_id] = rng.choice([None, *range(1, 40)]) if rng.random() < 0.2 else box_no % 40
+            stock.append((part_id, box_no, loc_no, rng.randint(1, 50)))
+    return _snapshot(dict.fromkeys(range(1, box_count + 1), capacity), stock, part_types)
+
+
+@pytest.mark.slow
+def test_plan_on_50k_locations():
+    """Test planning for 500 boxes of 100 locations, about 70% occupied, moves every location at most once."""
+    snapshot = _synthetic_snapshot(box_count=500, capacity=100, fill=0.7)
+
+    plan = plan_reorganization(snapshot)
+
+    assert len({(move.part_key, move.from_box_no, move.from_loc_no) for move in plan.moves}) == len(plan.moves)
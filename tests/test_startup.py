@@ -1,9 +1,12 @@
-"""Tests for app-specific startup hooks (post_migration_hook, load_test_data_hook).
+"""Tests for app-specific startup hooks (post_migration_hook, load_test_data_hook)
+and CLI command handlers (handle_check_part_quantities,
+handle_compact_quantity_history).
 
 These tests exercise the hooks at the function level with stubbed sessions
 and services. The CLI-level orchestration is tested in tests/test_cli.py.
 """
 
+from datetime import datetime
 from types import SimpleNamespace
 from typing import Any
 
@@ -11,6 +14,8 @@ import pytest
 from flask import Flask
 
 import app.startup as startup
+from app.exceptions import InvalidOperationException
+from app.services.quantity_history_service import CompactionResult
 
 # ---------------------------------------------------------------------------
 # Stubs
@@ -299,3 +304,230 @@ class TestLoadTestDataHook:
             startup.load_test_data_hook(app)
 
         assert session.closed is True
+
+
+# ---------------------------------------------------------------------------
+# handle_check_part_quantities
+# ---------------------------------------------------------------------------
+
+
+class _DummyInventoryService:
+    """Stubbed inventory service returning a fixed list of drifted totals."""
+
+    def __init__(self, drifted: list[tuple[str, int, int]]) -> None:
+        self._drifted = drifted
+        self.repair_calls: list[bool] = []
+
+    def check_total_quantities(self, repair: bool = False) -> list[tuple[str, int, int]]:
+        self.repair_calls.append(repair)
+        return self._drifted
+
+
+class _SessionProvider:
+    """Callable stand-in for the context-local db_session provider."""
+
+    def __init__(self, session: _DummySession) -> None:
+        self._session = session
+        self.reset_calls = 0
+
+    def __call__(self) -> _DummySession:
+        return self._session
+
+    def reset(self) -> None:
+        self.reset_calls += 1
+
+
+def _make_check_app(session: _DummySession, service: _DummyInventoryService) -> Flask:
+    """Create a minimal Flask app whose container serves the check-part-quantities handler."""
+    app = Flask(__name__)
+    app.container = SimpleNamespace(  # type: ignore[attr-defined]
+        db_session=_SessionProvider(session),
+        inventory_service=lambda: service,
+    )
+    return app
+
+
+class TestCheckPartQuantities:
+    """Tests for the handle_check_part_quantities CLI handler."""
+
+    def test_consistent_totals(self, capsys: pytest.CaptureFixture[str]) -> None:
+        """Without drift the handler reports success and does not commit."""
+        session = _DummySession()
+        service = _DummyInventoryService([])
+        app = _make_check_app(session, service)
+
+        startup.handle_check_part_quantities(app)
+
+        assert "consistent" in capsys.readouterr().out
+        assert session.committed is False
+        assert app.container.db_session.reset_calls == 1  # type: ignore[attr-defined]
+
+    def test_drift_exits_with_code_1(self, capsys: pytest.CaptureFixture[str]) -> None:
+        """Drift without --repair is reported, left uncommitted and exits with 1."""
+        session = _DummySession()
+        service = _DummyInventoryService([("ABCD", 5, 3)])
+        app = _make_check_app(session, service)
+
+        with pytest.raises(SystemExit) as exc_info:
+            startup.handle_check_part_quantities(app)
+
+        assert exc_info.value.code == 1
+        assert service.repair_calls == [False]
+        assert session.committed is False
+        captured = capsys.readouterr()
+        assert "ABCD: stored 5, actual 3" in captured.out
+        assert "--repair" in captured.err
+        assert app.container.db_session.reset_calls == 1  # type: ignore[attr-defined]
+
+    def test_repair_commits(self, capsys: pytest.CaptureFixture[str]) -> None:
+        """With --repair the corrected totals are committed."""
+        session = _DummySession()
+        service = _DummyInventoryService([("ABCD", 5, 3), ("WXYZ", 0, 2)])
+        app = _make_check_app(session, service)
+
+        startup.handle_check_part_quantities(app, repair=True)
+
+        assert service.repair_calls == [True]
+        assert session.committed is True
+        assert "Repaired 2 part total quantities" in capsys.readouterr().out
+
+
+# ---------------------------------------------------------------------------
+# handle_check_box_occupancy
+# ---------------------------------------------------------------------------
+
+
+class _DummyBoxService:
+    """Stubbed box service returning a fixed list of drifted counters."""
+
+    def __init__(self, drifted: list[tuple[int, int, int]]) -> None:
+        self._drifted = drifted
+        self.repair_calls: list[bool] = []
+
+    def check_occupancy(self, repair: bool = False) -> list[tuple[int, int, int]]:
+        self.repair_calls.append(repair)
+        return self._drifted
+
+
+def _make_box_check_app(session: _DummySession, service: _DummyBoxService) -> Flask:
+    """Create a minimal Flask app whose container serves the check-box-occupancy handler."""
+    app = Flask(__name__)
+    app.container = SimpleNamespace(  # type: ignore[attr-defined]
+        db_session=_SessionProvider(session),
+        box_service=lambda: service,
+    )
+    return app
+
+
+class TestCheckBoxOccupancy:
+    """Tests for the handle_check_box_occupancy CLI handler."""
+
+    def test_drift_exits_with_code_1(self, capsys: pytest.CaptureFixture[str]) -> None:
+        """Drift without --repair is reported, left uncommitted and exits with 1."""
+        session = _DummySession()
+        service = _DummyBoxService([(3, 4, 2)])
+        app = _make_box_check_app(session, service)
+
+        with pytest.raises(SystemExit) as exc_info:
+            startup.handle_check_box_occupancy(app)
+
+        assert exc_info.value.code == 1
+        assert session.committed is False
+        captured = capsys.readouterr()
+        assert "Box 3: stored 4, actual 2" in captured.out
+        assert "--repair" in captured.err
+        assert app.container.db_session.reset_calls == 1  # type: ignore[attr-defined]
+
+    def test_repair_commits(self, capsys: pytest.CaptureFixture[str]) -> None:
+        """With --repair the recomputed counters are committed."""
+        session = _DummySession()
+        service = _DummyBoxService([(3, 4, 2)])
+        app = _make_box_check_app(session, service)
+
+        startup.handle_check_box_occupancy(app, repair=True)
+
+        assert service.repair_calls == [True]
+        assert session.committed is True
+        assert "Repaired 1 box occupancy counters" in capsys.readouterr().out
+
+
+# ---------------------------------------------------------------------------
+# handle_compact_quantity_history
+# ---------------------------------------------------------------------------
+
+
+class _DummyQuantityHistoryService:
+    """Stubbed quantity history service returning a fixed compaction result."""
+
+    def __init__(self, result: CompactionResult | None = None, error: Exception | None = None) -> None:
+        self._result = result
+        self._error = error
+        self.retention_calls: list[int | None] = []
+
+    def compact(self, retention_days: int | None = None) -> CompactionResult:
+        self.retention_calls.append(retention_days)
+        if self._error is not None:
+            raise self._error
+        assert self._result is not None
+        return self._result
+
+
+def _make_compact_app(session: _DummySession, service: _DummyQuantityHistoryService) -> Flask:
+    """Create a minimal Flask app whose container serves the compact-quantity-history handler."""
+    app = Flask(__name__)
+    app.container = SimpleNamespace(  # type: ignore[attr-defined]
+        db_session=_SessionProvider(session),
+        quantity_history_service=lambda: service,
+    )
+    return app
+
+
+class TestCompactQuantityHistory:
+    """Tests for the handle_compact_quantity_history CLI handler."""
+
+    def test_compaction_commits_and_reports(self, capsys: pytest.CaptureFixture[str]) -> None:
+        """A compaction run is committed and summarized."""
+        session = _DummySession()
+        service = _DummyQuantityHistoryService(CompactionResult(
+            cutoff=datetime(2025, 10, 1, 12, 0),
+            rows_deleted=12,
+            partitions_created=["quantity_history_p202701"],
+            partitions_dropped=["quantity_history_p202508", "quantity_history_p202509"],
+        ))
+        app = _make_compact_app(session, service)
+
+        startup.handle_compact_quantity_history(app, retention_days=400)
+
+        assert service.retention_calls == [400]
+        assert session.committed is True
+        out = capsys.readouterr().out
+        assert "Created partition quantity_history_p202701" in out
+        assert "Dropped quantity history before 2025-10-01 12:00 (12 rows deleted, 2 partitions dropped)" in out
+        assert app.container.db_session.reset_calls == 1  # type: ignore[attr-defined]
+
+    def test_disabled_retention(self, capsys: pytest.CaptureFixture[str]) -> None:
+        """With retention disabled nothing is dropped."""
+        session = _DummySession()
+        service = _DummyQuantityHistoryService(CompactionResult(cutoff=None))
+        app = _make_compact_app(session, service)
+
+        startup.handle_compact_quantity_history(app)
+
+        assert service.retention_calls == [None]
+        assert "retention is disabled" in capsys.readouterr().out
+
+    def test_invalid_retention_exits_with_code_1(self, capsys: pytest.CaptureFixture[str]) -> None:
+        """A rejected retention period is reported without committing."""
+        session = _DummySession()
+        service = _DummyQuantityHistoryService(
+            error=InvalidOperationException("compact quantity history", "retention must be at least 31 days")
+        )
+        app = _make_compact_app(session, service)
+
+        with pytest.raises(SystemExit) as exc_info:
+            startup.handle_compact_quantity_history(app, retention_days=7)
+
+        assert exc_info.value.code == 1
+        assert session.committed is False
+        assert "at least 31 days" in capsys.readouterr().err
+        assert app.container.db_session.reset_calls == 1  # type: ignore[attr-defined]